@@ -9,21 +9,25 @@ import tempfile
 import requests
 
 from collections import deque
-from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
 import hashlib
 from rq import Queue, job, exceptions
 from sqlalchemy import not_
 
 from application import create_app  # type: ignore
+from application import feature_flags
 from application.config import CMDConfig
-from application.database import db
+from application.database import db, export_stream
 from application.defs import cre_defs as defs
 from application.defs import cre_exceptions
 from application.defs import osib_defs as odefs
 from application.utils import spreadsheet as sheet_utils
 from application.utils import redis
 from application.utils import db_backend
+from application.utils import embedding_store
 from application.utils import gap_analysis
+from application.utils import ga_backfill
+from application.utils import ga_payload
 from application.utils import cres_csv_export
 
 if TYPE_CHECKING:
@@ -166,6 +170,44 @@ def register_node(node: defs.Node, collection: db.Node_collection) -> db.Node:
     return linked_node
 
 
+def _bulk_registrable(node: defs.Node) -> bool:
+    # Node-to-node links make register_node consult links written earlier in
+    # the same import, and inline embeddings are written per row: both stay on
+    # the per-row path.
+    return not node.embeddings and all(
+        type(link.document).__name__ == defs.CRE.__name__ for link in node.links
+    )
+
+
+def register_nodes_bulk(
+    nodes: Sequence[defs.Node], collection: db.Node_collection
+) -> None:
+    """register_node for every entry of a resource, through one BulkNodeWriter.
+
+    Ends in the same state as calling register_node per entry. Entries the
+    writer cannot stage exactly go through register_node in their original
+    position, after everything staged before them has been written.
+    """
+    writer = collection.bulk_writer(list({n.name for n in nodes if n}))
+    for node in nodes:
+        if not node:
+            continue
+        cres: List[Optional[db.CRE]] = []
+        if _bulk_registrable(node):
+            cres = [writer.cre_for_name(link.document.name) for link in node.links]
+        staged = None
+        if _bulk_registrable(node) and all(cres):
+            staged = writer.stage_node(node)
+        if staged is None:
+            writer.flush()
+            register_node(node, collection)
+            writer.reload()
+            continue
+        for cre, link in zip(cres, node.links):
+            writer.stage_link(cre, staged, link.ltype)
+    writer.flush()
+
+
 def register_cre(cre: defs.CRE, collection: db.Node_collection) -> Tuple[db.CRE, bool]:
     if not cre.id or not re.match(r"\d\d\d-\d\d\d", cre.id):
         raise cre_exceptions.InvalidCREIDException(cre)
@@ -322,6 +364,20 @@ def schedule_gap_analysis_importing_vs_peers(
         )
 
 
+def compute_gap_analysis_importing_vs_peers_batched(
+    *,
+    collection: db.Node_collection,
+    importing_name: str,
+    peer_names: Optional[List[str]] = None,
+) -> Optional[gap_analysis.GapAnalysisBatchReport]:
+    """Compute both GA directions against every peer in one traversal and transaction."""
+    if os.environ.get("CRE_NO_CALCULATE_GAP_ANALYSIS") == "1":
+        return None
+    if peer_names is None:
+        peer_names = resolve_ga_peer_standard_names(collection, importing_name)
+    return db.gap_analysis_batch(importing_name, peer_names)
+
+
 def run_gap_pair_job(importing_name: str, peer_name: str, db_connection_str: str):
     """RQ job wrapper for one directed GA pair."""
     caps = db_backend.detect_backend(db_connection_str)
@@ -404,7 +460,11 @@ def register_standard(
     generate_embeddings=True,
     calculate_gap_analysis=True,
     db_connection_str: str = "",
+    bulk: bool = False,
 ):
+    """Register one resource's entries; ``bulk`` writes them through
+    register_nodes_bulk (batched upserts, one transaction) instead of
+    register_node per entry."""
     if os.environ.get("CRE_NO_GEN_EMBEDDINGS") == "1":
         generate_embeddings = False
 
@@ -497,13 +557,16 @@ def register_standard(
         f"Registering resource {importing_name} of length {len(standard_entries)}"
     )
     import_phase_t0 = time.perf_counter()
+    if bulk:
+        register_nodes_bulk(standard_entries, collection)
     for node in standard_entries:
         if not node:
             logger.info(
                 f"encountered empty node while importing {standard_entries[0].name}"
             )
             continue
-        register_node(node, collection)
+        if not bulk:
+            register_node(node, collection)
         if node.embeddings:
             logger.debug(
                 f"node has embeddings populated, skipping generation for resource {importing_name}"
@@ -729,16 +792,22 @@ def _missing_ga_pairs(collection: db.Node_collection) -> List[Tuple[str, str]]:
     standards = ga_matrix_standard_names(collection)
     rows = (
         collection.session.query(
-            db.GapAnalysisResults.cache_key, db.GapAnalysisResults.ga_object
+            db.GapAnalysisResults.cache_key,
+            db.GapAnalysisResults.ga_object,
+            db.GapAnalysisResults.content_hash,
         )
         .filter(not_(db.GapAnalysisResults.cache_key.like("% >> %->%")))
         .all()
     )
+    # Compressed rows (content_hash set) are only ever written when material.
     existing = {
         str(key)
-        for key, payload in rows
+        for key, payload, content_hash in rows
         if key
-        and gap_analysis.primary_gap_analysis_payload_is_material(str(payload or ""))
+        and (
+            content_hash is not None
+            or gap_analysis.primary_gap_analysis_payload_is_material(str(payload or ""))
+        )
     }
     missing: List[Tuple[str, str]] = []
     for sa in standards:
@@ -758,6 +827,81 @@ def _compute_pair_direct(collection: db.Node_collection, sa: str, sb: str) -> No
     db.gap_analysis(neo_db=collection.neo_db, node_names=[sa, sb], cache_key=cache_key)
 
 
+def backfill_gap_analysis_storage(
+    db_connection_str: str, *, target: str = "compressed", batch_size: int = 200
+) -> Dict[str, int]:
+    """
+    Rewrite existing gap_analysis_results rows into the ``compressed`` or ``text``
+    storage mode, one committed batch at a time.
+
+    Non-material primary rows are left as text when compressing: compressed rows
+    are assumed material by ``gap_analysis_exists`` without being decoded.
+
+    Material primary rows cached before the per-control index existed (or
+    copied by ``scripts/sync_gap_analysis_table.py``) are indexed as well.
+    """
+    if target not in ("compressed", "text"):
+        raise ValueError(f"unknown gap analysis storage mode {target}")
+    compressed = target == "compressed"
+    collection = db_connect(path=db_connection_str)
+    session = collection.session
+    batch_size = max(1, int(batch_size))
+    counts = {"rewritten": 0, "skipped": 0, "bytes_before": 0, "bytes_after": 0}
+
+    pending = (
+        db.GapAnalysisResults.ga_payload.is_(None)
+        if compressed
+        else db.GapAnalysisResults.ga_payload.isnot(None)
+    )
+    last_key = ""
+    while True:
+        rows = (
+            session.query(db.GapAnalysisResults)
+            .filter(pending, db.GapAnalysisResults.cache_key > last_key)
+            .order_by(db.GapAnalysisResults.cache_key)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row in rows:
+            last_key = row.cache_key
+            text = ga_payload.row_text(row) or ""
+            if (
+                compressed
+                and gap_analysis.gap_analysis_cache_key_is_primary(row.cache_key)
+                and not gap_analysis.primary_gap_analysis_payload_is_material(text)
+            ):
+                counts["skipped"] += 1
+                continue
+            counts["bytes_before"] += len(row.ga_payload or b"") or len(
+                text.encode("utf-8")
+            )
+            ga_payload.store_on_row(row, text, compressed=compressed)
+            counts["bytes_after"] += len(row.ga_payload or b"") or len(
+                text.encode("utf-8")
+            )
+            counts["rewritten"] += 1
+        session.commit()
+        logger.info(
+            "GA storage backfill (%s): rewritten=%s skipped=%s",
+            target,
+            counts["rewritten"],
+            counts["skipped"],
+        )
+    counts["indexed"] = collection.index_unindexed_gap_analysis_controls(batch_size)
+    logger.info(
+        "GA storage backfill (%s) done: %s rows, %s -> %s payload bytes,"
+        " %s pairs indexed",
+        target,
+        counts["rewritten"],
+        counts["bytes_before"],
+        counts["bytes_after"],
+        counts["indexed"],
+    )
+    return counts
+
+
 def backfill_gap_analysis_only(
     db_connection_str: str,
     *,
@@ -765,10 +909,15 @@ def backfill_gap_analysis_only(
     poll_seconds: int = 5,
     max_pairs: int = 0,
     no_queue: bool = False,
+    workers: int = 0,
 ) -> None:
     """
     Backfill only missing directed GA pairs from DB truth.
     This avoids HTTP polling loops and reports progress from SQL state.
+
+    With ``workers`` > 0 the pairs are computed locally on that many processes
+    (see ``ga_backfill``) instead of through the RQ queue, resuming an
+    interrupted run.
     """
     collection = db_connect(path=db_connection_str)
     if os.environ.get("CRE_NO_NEO4J") != "1":
@@ -784,6 +933,14 @@ def backfill_gap_analysis_only(
         logger.info("GA backfill: no missing neo4j pairs")
         return
 
+    if workers > 0:
+        ga_backfill.run(collection, db_connection_str, missing, workers=workers)
+        logger.info(
+            "GA backfill complete: final_missing_pairs=%s",
+            len(_missing_ga_pairs(collection)),
+        )
+        return
+
     logger.info(
         "GA backfill: missing_pairs=%s batch_size=%s mode=%s",
         total,
@@ -892,6 +1049,25 @@ def run(args: argparse.Namespace) -> None:  # pragma: no cover
         logger.info("Exported %s rows to %s", rows, csv_out)
         return
 
+    if getattr(args, "harvest", False):
+        from application.utils import harvester
+
+        db_connect(args.cache_file)
+        config = harvester.load_repo_config(
+            args.harvest_config
+            or os.path.join(os.path.dirname(harvester.__file__), "repos.yaml")
+        )
+        harvester.validate_repositories(config)
+        # no diff consumer yet: without a sink the orchestrator records
+        # baselines but does not advance checkpoints past unconsumed changes
+        results = harvester.HarvestOrchestrator(
+            config.repositories,
+            max_workers=args.harvest_workers,
+            per_host=args.harvest_per_host,
+        ).run()
+        print(harvester.format_timing_table(results))
+        return
+
     if getattr(args, "run_noise_filter", False):
         from application import sqla
         from application.utils.noise_filter.pipeline import run_noise_filter
@@ -1009,6 +1185,10 @@ def run(args: argparse.Namespace) -> None:  # pragma: no cover
         regenerate_embeddings(args.cache_file)
     elif args.generate_embeddings:
         generate_embeddings(args.cache_file)
+    if getattr(args, "export_embeddings", False):
+        export_embeddings(args.cache_file)
+    if getattr(args, "export_tarball", ""):
+        export_tarball(args.cache_file, args.export_tarball)
     if args.populate_neo4j_db:
         populate_neo4j_db(args.cache_file)
     if args.start_worker:
@@ -1021,6 +1201,12 @@ def run(args: argparse.Namespace) -> None:  # pragma: no cover
     if getattr(args, "ga_backfill_opencre_direct", False):
         collection = db_connect(path=args.cache_file)
         gap_analysis.backfill_opencre_direct_pairs(collection, refresh=True)
+    if getattr(args, "ga_storage_backfill", ""):
+        backfill_gap_analysis_storage(
+            args.cache_file,
+            target=args.ga_storage_backfill,
+            batch_size=getattr(args, "ga_backfill_batch_size", 200),
+        )
     if getattr(args, "ga_backfill_missing", False):
         backfill_gap_analysis_only(
             args.cache_file,
@@ -1028,6 +1214,7 @@ def run(args: argparse.Namespace) -> None:  # pragma: no cover
             poll_seconds=getattr(args, "ga_backfill_poll_seconds", 5),
             max_pairs=getattr(args, "ga_backfill_max_pairs", 0),
             no_queue=getattr(args, "ga_backfill_no_queue", False),
+            workers=getattr(args, "ga_backfill_workers", 0),
         )
     if args.upstream_sync:
         download_graph_from_upstream(args.cache_file)
@@ -1099,6 +1286,38 @@ def generate_embeddings(db_url: str) -> None:
     prompt_client.PromptHandler(database, load_all_embeddings=True)
 
 
+def export_embeddings(db_url: str) -> None:
+    """Refresh the memory-mapped embedding store for every doc type.
+
+    Writes to ``CRE_EMBEDDING_STORE_DIR`` (or ``<cache>.embeddings/`` for a
+    SQLite cache); unchanged doc types are left as they are.
+    """
+    database = db_connect(path=db_url)
+    if embedding_store.store_dir(database) is None:
+        logger.error(
+            "no embedding store location for %s, set CRE_EMBEDDING_STORE_DIR", db_url
+        )
+        return
+    for doc_type in defs.Credoctypes:
+        store = embedding_store.refresh(database, doc_type.value)
+        if store is not None:
+            logger.info(
+                "%s: %s x %s vectors (%s)",
+                doc_type.value,
+                len(store),
+                store.dim,
+                store.model_id,
+            )
+
+
+def export_tarball(db_url: str, path: str) -> None:
+    """Write the whole database as one .tar.gz of per-document YAML files,
+    streamed from the database so memory stays flat."""
+    database = db_connect(path=db_url)
+    count = export_stream.write_tarball(database, path)
+    logger.info("wrote %s documents from %s to %s", count, db_url, path)
+
+
 _DEFAULT_LIBRARIAN_SOURCE = os.path.join(
     os.path.dirname(os.path.dirname(__file__)),
     "tests",
@@ -1169,7 +1388,9 @@ def run_librarian(
     # The CRE ids present in the hub are exactly the known ids the explicit
     # resolver may auto-link to (W2 seeded this from the golden set; here it is
     # the real DB-backed registry).
-    cre_embeddings = database.get_embeddings_by_doc_type(defs.Credoctypes.CRE.value)
+    cre_embeddings = embedding_store.embeddings_for(
+        database, defs.Credoctypes.CRE.value
+    )
     known_ids = set(cre_embeddings.keys())
     # in_memory loads the hub matrix; pgvector ranks in the DB over the
     # embedding_vec column (no in-RAM pool). Both honor the same retrieve().
@@ -1335,6 +1556,9 @@ def populate_neo4j_db(cache: str):
     ):
         logger.info("Skipping Neo4j population as per environment variables")
         return
+    if feature_flags.is_inmemory_gap_analysis_enabled():
+        logger.info("Skipping Neo4j population: gap analysis runs in memory")
+        return
     logger.info("Populating neo4j DB: Connecting to SQL DB")
     database = db_connect(path=cache)
     if database.neo_db:
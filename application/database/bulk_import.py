@@ -0,0 +1,273 @@
+"""Bulk write path for registering one resource's nodes and their CRE links.
+
+``Node_collection.add_node`` / ``add_link`` look every row up on its own and
+commit it, so importing a 2,000-control standard costs tens of thousands of
+round trips and transactions. ``BulkNodeWriter`` instead
+
+* preloads the resource's node identities, keyed like the ``uq_node``
+  constraint (``name, section, subsection, version, section_id`` with NULL
+  read as ``""``, as ``object_select`` does), their CRE links and the CREs,
+* stages inserts, updates and link upserts in memory with the same merge rules
+  as ``add_node`` / ``add_link``, and
+* ``flush`` writes them with ``INSERT ... ON CONFLICT`` executemany batches,
+  refreshes the text search index and in-memory graph, and commits once.
+
+Documents it cannot stage exactly (``stage_node`` returns None, or
+``cre_for_name`` cannot resolve a CRE unambiguously) are left to the per-row
+path; callers ``flush`` first and ``reload`` after so ordering is preserved.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from application.database import text_search_index
+from application.defs import cre_defs
+from application.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+NodeKey = Tuple[str, str, str, str, str]
+LinkKey = Tuple[str, str]  # (cre id, node id)
+
+_IDENTITY = ("name", "section", "subsection", "version", "section_id")
+_NODE_COLUMNS = (
+    "id",
+    "name",
+    "section",
+    "subsection",
+    "tags",
+    "version",
+    "description",
+    "ntype",
+    "section_id",
+    "link",
+)
+
+
+def node_key(node: Any) -> NodeKey:
+    return tuple(getattr(node, attr, None) or "" for attr in _IDENTITY)  # type: ignore[return-value]
+
+
+def _batches(rows: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+class BulkNodeWriter:
+    """Stage node upserts and CRE links in memory; write them in one transaction."""
+
+    def __init__(
+        self,
+        collection: Any,
+        names: Iterable[str],
+        batch_size: Optional[int] = None,
+    ) -> None:
+        from application.database import db
+
+        self._db = db
+        self.collection = collection
+        self.session = collection.session
+        self.batch_size = batch_size or env_int(
+            "CRE_BULK_IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE, minimum=1
+        )
+        self._names: Set[str] = set()
+        self.reload(names)
+
+    def reload(self, names: Iterable[str] = ()) -> None:
+        """Drop staged state and re-read identities (after a per-row write)."""
+        db = self._db
+        names = self._names | {n for n in names if n}
+        self._names = set()
+        self._nodes: Dict[NodeKey, Any] = {}
+        self._links: Dict[LinkKey, str] = {}
+        self._new: Dict[NodeKey, Any] = {}
+        self._new_docs: List[Any] = []
+        self._touched: Dict[str, Any] = {}
+        self._link_upserts: Dict[LinkKey, str] = {}
+        self._new_links: List[Tuple[Any, Any, Any]] = []
+        self._cres_by_name: Dict[str, List[Any]] = defaultdict(list)
+        for cre in self.session.query(db.CRE).all():
+            self._cres_by_name[(cre.name or "").lower()].append(cre)
+        self._load_names(names)
+
+    def _load_names(self, names: Iterable[str]) -> None:
+        db = self._db
+        names = [n for n in names if n not in self._names]
+        if not names:
+            return
+        self._names.update(names)
+        for row in self.session.query(db.Node).filter(db.Node.name.in_(names)):
+            self._nodes.setdefault(node_key(row), row)
+        links = (
+            self.session.query(db.Links)
+            .join(db.Node, db.Node.id == db.Links.node)
+            .filter(db.Node.name.in_(names))
+        )
+        for link in links:
+            self._links[(link.cre, link.node)] = link.type
+
+    def cre_for_name(self, name: str) -> Optional[Any]:
+        """The CRE row ``register_node`` would link a CRE document of ``name`` to.
+
+        None when no CRE or several CREs share the (case-insensitive) name;
+        the per-row path decides (and reports) those.
+        """
+        matches = self._cres_by_name.get((name or "").lower(), [])
+        return matches[0] if len(matches) == 1 else None
+
+    def stage_node(self, node: Any) -> Optional[Any]:
+        """Stage ``add_node(node)``; the row links should point at, or None.
+
+        None means the document needs ``add_node`` itself: it does not map
+        to a DB node, has a NULL identity field (``object_select`` treats those
+        as wildcards) or, when new, has no type.
+        """
+        dbnode = self._db.dbNodeFromNode(node)
+        if dbnode is None or any(getattr(dbnode, a) is None for a in _IDENTITY):
+            return None
+        self._load_names([dbnode.name])
+        key = node_key(dbnode)
+        entry = self._new.get(key) or self._nodes.get(key)
+        if entry is None:
+            if not dbnode.ntype:
+                return None
+            dbnode.id = self._db.generate_uuid()
+            self._new[key] = dbnode
+            self._new_docs.append(node)
+            return dbnode
+
+        # Same merge as add_node: identity fields follow the incoming document,
+        # the rest only when it has a value.
+        for attr in _IDENTITY[1:]:
+            if getattr(entry, attr) != getattr(dbnode, attr):
+                setattr(entry, attr, getattr(dbnode, attr))
+        for attr in ("tags", "description", "link", "metadata_json"):
+            if getattr(dbnode, attr):
+                setattr(entry, attr, getattr(dbnode, attr))
+        if key not in self._new:
+            self._touched[entry.id] = entry
+        return entry
+
+    def stage_link(self, cre: Any, node: Any, ltype: Any) -> None:
+        """Stage ``add_link(cre, node, ltype)``: insert, or retype an existing link."""
+        if not ltype:
+            raise ValueError("every link should have a link type")
+        key = (cre.id, node.id)
+        known = self._links.get(key)
+        if known is None:
+            self._new_links.append((cre, node, ltype))
+        if known != ltype.value:
+            self._links[key] = ltype.value
+            self._link_upserts[key] = ltype.value
+
+    def _insert(self, table: Any) -> Any:
+        dialect = self.session.get_bind().dialect.name
+        return (pg_insert if dialect == "postgresql" else sqlite_insert)(table)
+
+    def _insert_nodes(self) -> None:
+        db = self._db
+        new = list(self._new.values())
+        for batch in _batches(new, self.batch_size):
+            rows = [
+                {
+                    **{c: getattr(n, c) for c in _NODE_COLUMNS},
+                    "document_metadata": n.metadata_json,
+                }
+                for n in batch
+            ]
+            self.session.execute(
+                self._insert(db.Node.__table__).on_conflict_do_nothing(), rows
+            )
+            ids = [n.id for n in batch]
+            written = {
+                i for (i,) in self.session.query(db.Node.id).filter(db.Node.id.in_(ids))
+            }
+            for lost in (n for n in batch if n.id not in written):
+                # Another writer inserted the same identity since the preload:
+                # link to that row, as add_node's uq_node recovery does.
+                existing = (
+                    self.session.query(db.Node)
+                    .filter(
+                        *(getattr(db.Node, a) == getattr(lost, a) for a in _IDENTITY)
+                    )
+                    .one()
+                )
+                logger.info(
+                    "bulk import: %s:%s already inserted, linking to it",
+                    lost.name,
+                    lost.section_id,
+                )
+                self._relink(lost.id, existing.id)
+                lost.id = existing.id
+
+    def _relink(self, old_id: str, new_id: str) -> None:
+        for key in [k for k in self._link_upserts if k[1] == old_id]:
+            self._link_upserts[(key[0], new_id)] = self._link_upserts.pop(key)
+
+    def _upsert_links(self) -> None:
+        db = self._db
+        rows = [
+            {"cre": cre_id, "node": node_id, "type": ltype}
+            for (cre_id, node_id), ltype in self._link_upserts.items()
+        ]
+        for batch in _batches(rows, self.batch_size):
+            statement = self._insert(db.Links.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=["cre", "node"],
+                set_={"type": statement.excluded.type},
+            )
+            self.session.execute(statement, batch)
+
+    def flush(self) -> Dict[str, int]:
+        """Write everything staged in one transaction; returns row counts."""
+        db = self._db
+        counts = {
+            "inserted": len(self._new),
+            "updated": 0,
+            "links": len(self._link_upserts),
+        }
+        if not (self._new or self._touched or self._link_upserts):
+            return counts
+        try:
+            modified = [
+                n for n in self._touched.values() if self.session.is_modified(n)
+            ]
+            counts["updated"] = len(modified)
+            self.session.flush()
+            self._insert_nodes()
+            self._upsert_links()
+            text_search_index.index_nodes(
+                self.session, list(self._new.values()) + modified
+            )
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        graph = self.collection.graph
+        if graph:
+            for doc in self._new_docs:
+                graph.add_dbnode(dbnode=doc)
+            for cre, node, ltype in self._new_links:
+                graph.add_link(
+                    doc_from=db.CREfromDB(cre),
+                    link_to=cre_defs.Link(
+                        document=db.nodeFromDB(node), ltype=ltype.value
+                    ),
+                )
+        logger.info(
+            "bulk import wrote %(inserted)s new nodes, %(updated)s updated nodes, "
+            "%(links)s links",
+            counts,
+        )
+        # Rows written through Core are not session objects: start over from
+        # the database if more documents get staged.
+        self.reload()
+        return counts
@@ -0,0 +1,185 @@
+"""Depth, parents and root path of every CRE in the ``Contains`` hierarchy.
+
+Built from ``cre_links`` in one topological pass and shared by every
+``Node_collection`` of the process (``Node_collection.cre_hierarchy``) until
+the database or its dataset generation changes, so per-request collections do
+not rescan the links. A ``Contains`` row
+makes ``group`` the parent of ``cre``; a legacy ``Is Part Of`` row the reverse;
+``Related`` rows are not hierarchy. Roots are the CREs without parents, as in
+``get_root_cres``; a CRE's depth is its distance from the nearest root and its
+root path the CREs along that shortest path. ``add_cre`` and
+``add_internal_link`` drop the shared copy and keep their collection's own copy
+current by re-settling only the descendants of the CRE that changed.
+
+Everything is keyed by CRE database id; ``db_id`` maps external ids.
+"""
+
+import sys
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from application.defs import cre_defs
+
+# Depth of CREs no root reaches (only possible through a cycle).
+UNREACHABLE = sys.maxsize
+
+
+def _edge(group: str, cre: str, ltype: str) -> Optional[Tuple[str, str]]:
+    """(parent, child) for a cre_links row, or None if it is not hierarchy."""
+    if ltype == cre_defs.LinkTypes.Contains:
+        return group, cre
+    if ltype == cre_defs.LinkTypes.PartOf:
+        return cre, group
+    return None
+
+
+class CreHierarchy:
+    def __init__(self) -> None:
+        self.parents: Dict[str, List[str]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.depth: Dict[str, int] = {}
+        self.root_path: Dict[str, Tuple[str, ...]] = {}
+        self._db_ids: Dict[str, str] = {}
+
+    @classmethod
+    def build(
+        cls,
+        cres: Iterable[Tuple[str, str]],
+        links: Iterable[Tuple[str, str, str]],
+    ) -> "CreHierarchy":
+        """From (db id, external id) CRE rows and (group, cre, type) link rows."""
+        hierarchy = cls()
+        for db_id, external_id in cres:
+            hierarchy._add(db_id, external_id)
+        for group, cre, ltype in links:
+            edge = _edge(group, cre, ltype)
+            if edge and edge[0] in hierarchy.parents and edge[1] in hierarchy.parents:
+                hierarchy.parents[edge[1]].append(edge[0])
+                hierarchy.children[edge[0]].append(edge[1])
+        hierarchy._settle(set(hierarchy.parents))
+        return hierarchy
+
+    def copy(self) -> "CreHierarchy":
+        other = CreHierarchy()
+        other.parents = {cre: list(parents) for cre, parents in self.parents.items()}
+        other.children = {
+            cre: list(children) for cre, children in self.children.items()
+        }
+        other.depth = dict(self.depth)
+        other.root_path = dict(self.root_path)
+        other._db_ids = dict(self._db_ids)
+        return other
+
+    def _add(self, db_id: str, external_id: str) -> None:
+        self.parents[db_id] = []
+        self.children[db_id] = []
+        self.depth[db_id] = 0
+        self.root_path[db_id] = (db_id,)
+        self._db_ids.setdefault(external_id, db_id)
+
+    def add_cre(self, db_id: str, external_id: str) -> None:
+        if db_id not in self.parents:
+            self._add(db_id, external_id)
+
+    def add_link(self, group: str, cre: str, ltype: str) -> None:
+        edge = _edge(group, cre, ltype)
+        if not edge or edge[0] not in self.parents or edge[1] not in self.parents:
+            return
+        parent, child = edge
+        if parent in self.parents[child]:
+            return
+        self.parents[child].append(parent)
+        self.children[parent].append(child)
+        self._settle(self.descendants(child))
+
+    def descendants(self, db_id: str) -> Set[str]:
+        """db_id and every CRE below it."""
+        seen = {db_id}
+        stack = [db_id]
+        while stack:
+            for child in self.children[stack.pop()]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
+    def _settle(self, cres: Set[str]) -> None:
+        """Recompute depth and root path of ``cres``, parents before children.
+
+        Parents outside ``cres`` must already be settled.
+        """
+        pending = {
+            cre: sum(1 for parent in self.parents[cre] if parent in cres)
+            for cre in cres
+        }
+        ready = deque(cre for cre, count in pending.items() if count == 0)
+        while ready:
+            cre = ready.popleft()
+            del pending[cre]
+            parents = [p for p in self.parents[cre] if self.depth[p] != UNREACHABLE]
+            if not self.parents[cre]:
+                self.depth[cre], self.root_path[cre] = 0, (cre,)
+            elif not parents:
+                self.depth[cre], self.root_path[cre] = UNREACHABLE, ()
+            else:
+                best = min(parents, key=self.depth.__getitem__)
+                self.depth[cre] = self.depth[best] + 1
+                self.root_path[cre] = self.root_path[best] + (cre,)
+            for child in self.children[cre]:
+                if child in pending:
+                    pending[child] -= 1
+                    if not pending[child]:
+                        ready.append(child)
+        for cre in pending:  # on or below a cycle
+            self.depth[cre], self.root_path[cre] = UNREACHABLE, ()
+
+    def db_id(self, external_id: str) -> Optional[str]:
+        return self._db_ids.get(external_id)
+
+    def roots(self) -> List[str]:
+        return [cre for cre, parents in self.parents.items() if not parents]
+
+    def path(self, ancestor: str, descendant: str) -> List[str]:
+        """Shortest path down the hierarchy from ancestor to descendant, or []."""
+        if ancestor not in self.parents or descendant not in self.parents:
+            return []
+        previous: Dict[str, Optional[str]] = {descendant: None}
+        queue = deque([descendant])
+        while queue:
+            cre = queue.popleft()
+            if cre == ancestor:
+                path = [cre]
+                while previous[path[-1]] is not None:
+                    path.append(previous[path[-1]])
+                return path
+            for parent in self.parents[cre]:
+                if parent not in previous:
+                    previous[parent] = cre
+                    queue.append(parent)
+        return []
+
+
+_shared_lock = threading.Lock()
+_shared: Optional[Tuple[Tuple[Any, ...], CreHierarchy]] = None
+
+
+def shared(key: Tuple[Any, ...], build: Callable[[], CreHierarchy]) -> CreHierarchy:
+    """The process-wide hierarchy for ``key``, from ``build()`` on a miss.
+
+    Callers must not modify it; take a ``copy()`` to keep updating.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is not None and _shared[0] == key:
+            return _shared[1]
+    hierarchy = build()
+    with _shared_lock:
+        _shared = (key, hierarchy)
+    return hierarchy
+
+
+def forget_shared() -> None:
+    global _shared
+    with _shared_lock:
+        _shared = None
@@ -1,6 +1,7 @@
 from sqlalchemy import CheckConstraint
 import networkx as nx
 import uuid
+import hashlib
 import neo4j
 import os
 import logging
@@ -13,7 +14,18 @@ from pprint import pprint
 
 from collections import Counter, defaultdict
 from itertools import permutations
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 from neomodel.exceptions import (
     DoesNotExist,
     FeatureNotSupported,
@@ -22,7 +34,7 @@ from neomodel.exceptions import (
 from flask import json as flask_json
 from sqlalchemy.orm import aliased
 from flask_sqlalchemy.model import DefaultMeta
-from sqlalchemy import func, delete, cast as sql_cast, literal, or_
+from sqlalchemy import event, func, delete, cast as sql_cast, literal, or_
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import OperationalError, IntegrityError, SQLAlchemyError
 
@@ -38,19 +50,31 @@ from neomodel import (
     StructuredRel,
     db,
 )
-from application.database import inmemory_graph
+from application import feature_flags
+from application.database import (
+    cre_hierarchy,
+    inmemory_gap_analysis,
+    inmemory_graph,
+    text_search_index,
+)
 from application.utils import redis
 from application.defs import cre_defs
-from application.utils import file
+from application.utils import ann_index, dataset_generation, file
+from application.utils import ga_payload
 from application.utils.gap_analysis import (
+    GapAnalysisBatchReport,
     gap_analysis_cache_key_is_primary,
-    get_path_score,
+    score_paths,
     make_resources_key,
     make_subresources_key,
     primary_gap_analysis_payload_is_material,
     should_persist_primary_gap_analysis_cache,
 )
 
+if TYPE_CHECKING:
+    # bulk_import imports this module; only needed for annotations
+    from application.database import bulk_import
+
 
 from .. import sqla  # type: ignore
 
@@ -62,7 +86,7 @@ logger.setLevel(logging.INFO)
 BaseModel: DefaultMeta = sqla.Model
 
 
-def generate_uuid():
+def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
@@ -197,13 +221,96 @@ class Embeddings(BaseModel):  # type: ignore
     embedding_vec = sqla.Column(sqla.Text, nullable=False)
 
 
+# create_all cannot express the text search index (an FTS5 virtual table on
+# SQLite); schemas built that way get it alongside the tables. Migrated
+# schemas get it from Alembic 5c1e7a9d2b64.
+@event.listens_for(BaseModel.metadata, "after_create")
+def _create_text_search_index(target: Any, connection: Any, **kw: Any) -> None:
+    text_search_index.create(connection)
+
+
+@event.listens_for(BaseModel.metadata, "after_drop")
+def _drop_text_search_index(target: Any, connection: Any, **kw: Any) -> None:
+    text_search_index.drop(connection)
+
+
 class GapAnalysisResults(BaseModel):
     __tablename__ = "gap_analysis_results"
     cache_key = sqla.Column(sqla.String, primary_key=True)
+    # Plain JSON text; NULL for rows stored in compressed mode (see ga_payload).
     ga_object = sqla.Column(sqla.String)
+    ga_payload = sqla.Column(sqla.LargeBinary, nullable=True)
+    payload_encoding = sqla.Column(sqla.String, nullable=True)
+    content_hash = sqla.Column(sqla.String, nullable=True)
+    schema_version = sqla.Column(sqla.Integer, nullable=True)
     __table_args__ = (sqla.UniqueConstraint(cache_key, name="unique_cache_key_field"),)
 
 
+class GapAnalysisControl(BaseModel):  # type: ignore
+    """One base control of a primary ``gap_analysis_results`` row.
+
+    ``value`` is the JSON of ``result[control_key]``, compressed on its own,
+    and ``position`` its place in ``result``, so a page of controls is read
+    without loading or parsing the whole pair. A pair has rows only if it is
+    material. Writers of GA rows keep it in step
+    (``index_gap_analysis_controls`` / ``drop_gap_analysis_controls``); rows
+    cached before it existed are indexed by ``--ga_storage_backfill``.
+    """
+
+    __tablename__ = "gap_analysis_control"
+    cache_key = sqla.Column(sqla.String, primary_key=True)
+    position = sqla.Column(sqla.Integer, primary_key=True)
+    control_key = sqla.Column(sqla.String, nullable=False)
+    value = sqla.Column(sqla.LargeBinary, nullable=False)
+
+
+def drop_gap_analysis_controls(session: Any, cache_keys: Iterable[str]) -> None:
+    """Remove the control index of the GA rows ``cache_keys``."""
+    cache_keys = list(cache_keys)
+    for start in range(0, len(cache_keys), 500):
+        session.query(GapAnalysisControl).filter(
+            GapAnalysisControl.cache_key.in_(cache_keys[start : start + 500])
+        ).delete(synchronize_session="evaluate")
+
+
+def index_gap_analysis_controls(session: Any, cache_key: str, ga_object: str) -> None:
+    """(Re)build the control index of the primary GA row ``cache_key`` whose
+    text is now ``ga_object``."""
+    drop_gap_analysis_controls(session, [cache_key])
+    session.add_all(
+        GapAnalysisControl(
+            cache_key=cache_key,
+            position=position,
+            control_key=key,
+            value=ga_payload.encode_entry(ga_object[start:end]),
+        )
+        for position, (key, start, end) in enumerate(ga_payload.result_spans(ga_object))
+    )
+
+
+class GapAnalysisBackfillCheckpoint(BaseModel):  # type: ignore
+    """Outcome of one directed pair in an interrupted GA backfill run.
+
+    Written as each pair finishes and cleared when a run completes, so a killed
+    run resumes without redoing pairs that produced no cacheable result. Only
+    rows written at the current dataset generation count: once the data
+    changes, the pairs are computed again.
+    """
+
+    __tablename__ = "ga_backfill_checkpoint"
+    cache_key = sqla.Column(sqla.String, primary_key=True)
+    status = sqla.Column(sqla.String, nullable=False)  # done | empty | failed
+    generation = sqla.Column(sqla.Integer, nullable=False, default=0)
+    attempts = sqla.Column(sqla.Integer, nullable=False, default=0)
+    seconds = sqla.Column(sqla.Float, nullable=True)
+    error = sqla.Column(sqla.String, nullable=True)
+    updated_at = sqla.Column(
+        sqla.DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
 class ImportRun(BaseModel):  # type: ignore
     """Tracks import runs for Module C diff/staging. Step 6."""
 
@@ -258,6 +365,15 @@ class StagedChangeSet(BaseModel):  # type: ignore
     created_at = sqla.Column(sqla.DateTime, nullable=False)
 
 
+class DatasetGeneration(BaseModel):  # type: ignore
+    """Single-row counter bumped whenever an import changes what read endpoints serve."""
+
+    __tablename__ = "dataset_generation"
+    id = sqla.Column(sqla.Integer, primary_key=True)
+    generation = sqla.Column(sqla.Integer, nullable=False, default=0)
+    updated_at = sqla.Column(sqla.DateTime, nullable=False)
+
+
 class User(BaseModel):  # type: ignore
     """Persisted account identity for OIDC login (issue #586, RFC #876 TODO 1).
 
@@ -749,6 +865,52 @@ def list_import_runs(
     )
 
 
+DATASET_GENERATION_ROW_ID = 1
+
+
+def get_dataset_generation() -> Tuple[int, Optional[datetime]]:
+    """Current ``(generation, updated_at)``; ``(0, None)`` before the first bump."""
+    row = (
+        sqla.session.query(DatasetGeneration.generation, DatasetGeneration.updated_at)
+        .filter(DatasetGeneration.id == DATASET_GENERATION_ROW_ID)
+        .first()
+    )
+    if row is None:
+        return 0, None
+    return int(row.generation), row.updated_at
+
+
+def bump_dataset_generation(*, commit: bool = True) -> int:
+    """Increment the dataset generation in the current transaction; returns the new value."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    updated = (
+        sqla.session.query(DatasetGeneration)
+        .filter(DatasetGeneration.id == DATASET_GENERATION_ROW_ID)
+        .update(
+            {
+                DatasetGeneration.generation: DatasetGeneration.generation + 1,
+                DatasetGeneration.updated_at: now,
+            },
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        sqla.session.add(
+            DatasetGeneration(
+                id=DATASET_GENERATION_ROW_ID, generation=1, updated_at=now
+            )
+        )
+    sqla.session.flush()
+    generation = (
+        sqla.session.query(DatasetGeneration.generation)
+        .filter(DatasetGeneration.id == DATASET_GENERATION_ROW_ID)
+        .scalar()
+    )
+    if commit:
+        sqla.session.commit()
+    return int(generation)
+
+
 class RelatedRel(StructuredRel):
     pass
 
@@ -1212,30 +1374,36 @@ class NEO_DB:
 
     @classmethod
     def _format_gap_analysis_response(self, base_standard, path_records):
+        # Paths share most of their nodes; parse each Neo4j node once.
+        parsed_nodes: Dict[str, Optional[cre_defs.Document]] = {}
+
         def safe_parse_node_no_links(node):
+            element_id = node.element_id
+            if element_id is not None and element_id in parsed_nodes:
+                return parsed_nodes[element_id]
             try:
-                return NEO_DB.parse_node_no_links(node)
+                parsed = NEO_DB.parse_node_no_links(node)
             except Exception as e:
                 logger.warning(
                     "Skipping malformed Neo4j node while formatting gap analysis response: %s",
                     e,
                 )
-                return None
+                parsed = None
+            if element_id is not None:
+                parsed_nodes[element_id] = parsed
+            return parsed
+
+        relation_map = {
+            RelatedRel: "RELATED",
+            ContainsRel: "CONTAINS",
+            LinkedToRel: "LINKED_TO",
+            AutoLinkedToRel: "AUTOMATICALLY_LINKED_TO",
+            SameRel: "SAME",
+        }
 
-        def format_segment(seg: StructuredRel, nodes):
-            relation_map = {
-                RelatedRel: "RELATED",
-                ContainsRel: "CONTAINS",
-                LinkedToRel: "LINKED_TO",
-                AutoLinkedToRel: "AUTOMATICALLY_LINKED_TO",
-                SameRel: "SAME",
-            }
-            start_node = [
-                node for node in nodes if node.element_id == seg._start_node_element_id
-            ][0]
-            end_node = [
-                node for node in nodes if node.element_id == seg._end_node_element_id
-            ][0]
+        def format_segment(seg: StructuredRel, nodes_by_id):
+            start_node = nodes_by_id[seg._start_node_element_id]
+            end_node = nodes_by_id[seg._end_node_element_id]
 
             # Default to RELATED if relation unknown (though mostly governed by class type)
             rtype = relation_map.get(type(seg), "RELATED")
@@ -1257,8 +1425,11 @@ class NEO_DB:
             if parsed_start is None or parsed_end is None:
                 return None
             parsed_segments = []
+            nodes_by_id: Dict[str, Any] = {}
+            for node in rec.nodes:  # first node wins, as the old linear scan did
+                nodes_by_id.setdefault(node.element_id, node)
             for seg in rec.relationships:
-                segment = format_segment(seg, rec.nodes)
+                segment = format_segment(seg, nodes_by_id)
                 if segment is None:
                     # Skip malformed segment; keep valid rest of path.
                     continue
@@ -1311,6 +1482,8 @@ class NEO_DB:
 
 class Node_collection:
     graph: inmemory_graph.CRE_Graph = None
+    _cre_hierarchy: Optional[cre_hierarchy.CreHierarchy] = None
+    _cre_hierarchy_shared = False
     neo_db: NEO_DB = None
     session = sqla.session
 
@@ -1693,27 +1866,9 @@ class Node_collection:
         ).paginate(page=int(page), per_page=items_per_page, error_out=False)
         total_pages = dbnodes.pages
         if dbnodes.items:
-            for dbnode in dbnodes.items:
-                node = nodeFromDB(dbnode=dbnode)
-                linked_cres = Links.query.filter(Links.node == dbnode.id).all()
-                for dbcre_link in linked_cres:
-                    dbcre = CRE.query.filter(CRE.id == dbcre_link.cre).first()
-                    if dbcre:
-                        if not include_only or (
-                            include_only
-                            and (
-                                dbcre.external_id in include_only
-                                or dbcre.name in include_only
-                            )
-                        ):
-                            node.add_link(
-                                cre_defs.Link(
-                                    ltype=cre_defs.LinkTypes.from_str(dbcre_link.type),
-                                    document=CREfromDB(dbcre),
-                                )
-                            )
-                nodes.append(node)
-
+            nodes = self._hydrate_nodes_batch(
+                list(dbnodes.items), include_only=include_only
+            )
             return total_pages, nodes, dbnodes
         else:
             logger.warning(f"Node {name} of type {ntype} does not exist in the db")
@@ -1752,32 +1907,9 @@ class Node_collection:
             )
         dbnodes = nodes_query.all()
         if dbnodes:
-            for dbnode in dbnodes:
-                node = nodeFromDB(dbnode=dbnode)
-                linked_cres = Links.query.filter(Links.node == dbnode.id).all()
-                for dbcre_link in linked_cres:
-                    dbcre = CRE.query.filter(CRE.id == dbcre_link.cre).first()
-                    if not dbcre:
-                        logger.fatal(
-                            f"CRE {dbcre_link.cre} exists in the links but not in the cre table, database corrupt?"
-                        )
-                        raise AssertionError(
-                            f"CRE {dbcre_link.cre} exists in the links but not in the cre table, database corrupt?"
-                        )
-                    if not include_only or (
-                        include_only
-                        and (
-                            dbcre.external_id in include_only
-                            or dbcre.name in include_only
-                        )
-                    ):
-                        node.add_link(
-                            cre_defs.Link(
-                                ltype=cre_defs.LinkTypes.from_str(dbcre_link.type),
-                                document=CREfromDB(dbcre),
-                            )
-                        )
-                nodes.append(node)
+            nodes = self._hydrate_nodes_batch(
+                dbnodes, include_only=include_only, strict=True
+            )
             return nodes
         else:
             logger.warning(
@@ -1786,6 +1918,64 @@ class Node_collection:
 
             return []
 
+    def _hydrate_nodes_batch(
+        self,
+        dbnodes: List[Node],
+        include_only: Optional[List[str]] = None,
+        strict: bool = False,
+    ) -> List[cre_defs.Node]:
+        """Node documents with their linked CREs, loaded with one links query
+        and one CRE query for the whole batch.
+
+        include_only: only link CREs whose external id or name is in the list.
+        strict: raise on links to CREs missing from the cre table instead of
+        skipping them.
+        """
+        if not dbnodes:
+            return []
+
+        node_ids = [dbnode.id for dbnode in dbnodes]
+        links_by_node: Dict[str, List[Links]] = defaultdict(list)
+        cre_ids: Set[str] = set()
+        for link in self.session.query(Links).filter(Links.node.in_(node_ids)).all():
+            links_by_node[link.node].append(link)
+            cre_ids.add(link.cre)
+
+        cres_by_id: Dict[str, CRE] = {}
+        if cre_ids:
+            cres_by_id = {
+                cre.id: cre
+                for cre in self.session.query(CRE).filter(CRE.id.in_(cre_ids)).all()
+            }
+
+        nodes: List[cre_defs.Node] = []
+        for dbnode in dbnodes:
+            node = nodeFromDB(dbnode=dbnode)
+            for dbcre_link in links_by_node.get(dbnode.id, []):
+                dbcre = cres_by_id.get(dbcre_link.cre)
+                if not dbcre:
+                    if strict:
+                        logger.fatal(
+                            f"CRE {dbcre_link.cre} exists in the links but not in the cre table, database corrupt?"
+                        )
+                        raise AssertionError(
+                            f"CRE {dbcre_link.cre} exists in the links but not in the cre table, database corrupt?"
+                        )
+                    continue
+                if include_only and (
+                    dbcre.external_id not in include_only
+                    and dbcre.name not in include_only
+                ):
+                    continue
+                node.add_link(
+                    cre_defs.Link(
+                        ltype=cre_defs.LinkTypes.from_str(dbcre_link.type),
+                        document=CREfromDB(dbcre),
+                    )
+                )
+            nodes.append(node)
+        return nodes
+
     def get_cre_by_db_id(self, id: str) -> cre_defs.CRE:
         """internal method, returns a shallow cre (no links) by its database id
 
@@ -1950,7 +2140,7 @@ class Node_collection:
 
         cre_ids = [cre.id for cre in dbcres]
         node_links_by_cre: Dict[str, List[Links]] = defaultdict(list)
-        node_ids: set = set()
+        node_ids: Set[str] = set()
         for link in self.session.query(Links).filter(Links.cre.in_(cre_ids)).all():
             node_links_by_cre[link.cre].append(link)
             node_ids.add(link.node)
@@ -1963,7 +2153,7 @@ class Node_collection:
             }
 
         internal_links_by_cre: Dict[str, List[InternalLinks]] = defaultdict(list)
-        linked_cre_ids: set = set()
+        linked_cre_ids: Set[str] = set()
         for internal_link in (
             self.session.query(InternalLinks)
             .filter(
@@ -1997,7 +2187,7 @@ class Node_collection:
                 nodes_by_id,
                 include_only_nodes,
             )
-            seen_internal: set = set()
+            seen_internal: Set[Tuple[str, str, str]] = set()
             internal_rows = []
             for row in internal_links_by_cre.get(matching_cre.id, []):
                 key = (row.cre, row.group, row.type)
@@ -2069,97 +2259,22 @@ class Node_collection:
                 )
         return links
 
-    def export(self, dir: str = None, dry_run: bool = False) -> List[cre_defs.Document]:
-        """Exports the database to a CRE file collection on disk"""
-        docs: Dict[str, cre_defs.Document] = {}
-        cre, standard = None, None
-
-        # internal links are Group/HigherLevelCRE -> CRE
-        for group, cre, type in self.__get_internal_links():
-            grp = None
-            # when cres link to each other it's a two way link
-            # so handle cre1(group) -> cre2 link first
-            if group.name in docs.keys():
-                grp = docs[group.name]
-            else:
-                grp = CREfromDB(group)
-            grp.add_link(
-                cre_defs.Link(
-                    ltype=cre_defs.LinkTypes.from_str(type), document=CREfromDB(cre)
-                )
-            )
-            docs[group.name] = grp
+    def export(self, dir: str = None, dry_run: bool = False) -> int:
+        """Exports the database to a CRE file collection on disk: one YAML file
+        per CRE (with its links) and per unlinked node, written as the
+        documents stream out of the database. Returns the number of documents."""
+        from application.database import export_stream
 
-            # then handle cre2 -> cre1 link
-            if cre.name in docs.keys():
-                c = docs[cre.name]
-            else:
-                c = CREfromDB(cre)
-            docs[cre.name] = c
-            # this cannot be grp, grp already has a link to cre2
-            c.add_link(
-                cre_defs.Link(
-                    ltype=cre_defs.LinkTypes.from_str(type), document=CREfromDB(group)
-                )
-            )
-
-        # external links are CRE -> standard
-        for internal_doc, standard, type in self.__get_external_links():
-            cr = None
-            grp = None
-            if internal_doc.name in docs.keys():
-                cr = docs[internal_doc.name]
-            else:
-                cr = CREfromDB(internal_doc)
-            if len(standard.name) != 0:
-                docs[cr.name] = cr.add_link(
-                    cre_defs.Link(
-                        ltype=cre_defs.LinkTypes.from_str(type),
-                        document=nodeFromDB(standard),
-                    )
-                )
-        # unlinked cres next
-        for ucre in self.__get_unlinked_cres():
-            docs[ucre.name] = CREfromDB(ucre)
-
-        # unlinked nodes last
-        for unode in self.__get_unlinked_nodes():
-            nde = nodeFromDB(unode)
-            docs["%s-%s:%s:%s" % (nde.name, nde.doctype, nde.id, nde.description)] = nde
-            logger.info(f"{nde.name} is unlinked?")
-
-        if not dry_run:
-            for _, doc in docs.items():
-                title = ""
-                if hasattr(doc, "id"):
-                    title = (
-                        doc.id.replace("/", "-")
-                        .replace(" ", "_")
-                        .replace('"', "")
-                        .replace("'", "")
-                        + ".yaml"
-                    )
-                elif hasattr(doc, "sectionID"):
-                    title = (
-                        doc.name
-                        + "_"
-                        + doc.sectionID.replace("/", "-")
-                        .replace(" ", "_")
-                        .replace('"', "")
-                        .replace("'", "")
-                        + ".yaml"
-                    )
-                else:
-                    logger.fatal(
-                        f"doc does not have neither sectionID nor id, this is a bug! {doc.__dict__}"
-                    )
+        exported = 0
+        for doc in export_stream.iter_documents(self):
+            exported += 1
+            if not dry_run:
                 file.writeToDisk(
-                    file_title=title,
+                    file_title=export_stream.document_filename(doc),
                     file_content=yaml.safe_dump(doc.todict()),
                     cres_loc=dir,
                 )
-
-        return list(docs.values())
+        return exported
 
     def all_cres_with_pagination(
         self, page: int = 1, per_page: int = 10
@@ -2171,39 +2286,66 @@ class Node_collection:
         result = self._hydrate_cres_batch(list(cres.items))
         return result, page, total_pages
 
-    def get_cre_path(self, fromID: str, toID: str) -> List[cre_defs.Document]:
-        if not self.graph:
-            self.with_graph()
-
-        fromDbID = (
-            self.session.query(CRE.id).filter(CRE.external_id == fromID).first()[0]
+    def _build_cre_hierarchy(self) -> cre_hierarchy.CreHierarchy:
+        return cre_hierarchy.CreHierarchy.build(
+            cres=self.session.query(CRE.id, CRE.external_id),
+            links=self.session.query(
+                InternalLinks.group, InternalLinks.cre, InternalLinks.type
+            ),
         )
-        toDbID = self.session.query(CRE.id).filter(CRE.external_id == toID).first()[0]
-
-        forwardPath = self.graph.get_path(f"CRE: {fromDbID}", f"CRE: {toDbID}")
-        backwardsPath = self.graph.get_path(f"CRE: {toDbID}", f"CRE: {fromDbID}")
-        cres = []
-        path = []
-        if forwardPath:  # our graph is directed, so we need to check both paths
-            path = forwardPath
-        else:
-            path = backwardsPath
 
-        for entry in path:
-            entryID = entry.replace("CRE: ", "")
-            shallow_CRE = self.get_cre_by_db_id(entryID)
+    def _written_cre_hierarchy(self) -> Optional[cre_hierarchy.CreHierarchy]:
+        """After a CRE or link write: this collection's hierarchy to update in
+        place (None if not built yet). The process-wide one no longer matches
+        the database until the next generation bump, so it is dropped."""
+        cre_hierarchy.forget_shared()
+        if self._cre_hierarchy is not None and self._cre_hierarchy_shared:
+            self._cre_hierarchy = self._cre_hierarchy.copy()
+            self._cre_hierarchy_shared = False
+        return self._cre_hierarchy
+
+    def cre_hierarchy(self) -> cre_hierarchy.CreHierarchy:
+        """Depth, parents and root path of every CRE.
+
+        Shared by the collections of this process while the database and its
+        dataset generation stay the same; add_cre / add_internal_link drop the
+        shared copy and keep this collection's own copy current.
+        """
+        if self._cre_hierarchy is None:
+            version = dataset_generation.current()
+            if version is None:
+                self._cre_hierarchy = self._build_cre_hierarchy()
+            else:
+                self._cre_hierarchy = cre_hierarchy.shared(
+                    (self.session.get_bind(), version.generation, version.updated_at),
+                    self._build_cre_hierarchy,
+                )
+                self._cre_hierarchy_shared = True
+        return self._cre_hierarchy
 
-            if shallow_CRE:
-                cres.append(self.get_CREs(external_id=shallow_CRE.id)[0])
-        return cres
+    def get_cre_path(self, fromID: str, toID: str) -> List[cre_defs.Document]:
+        """The CREs on the hierarchy path between two CREs (by external id),
+        in either direction, or [] if neither contains the other."""
+        hierarchy = self.cre_hierarchy()
+        fromDbID = hierarchy.db_id(fromID)
+        toDbID = hierarchy.db_id(toID)
+        # the hierarchy is directed, so we need to check both paths
+        path = hierarchy.path(fromDbID, toDbID) or hierarchy.path(toDbID, fromDbID)
+        if not path:
+            return []
+        dbcres = {
+            cre.id: cre
+            for cre in self.session.query(CRE).filter(CRE.id.in_(path)).all()
+        }
+        return self._hydrate_cres_batch([dbcres[entry] for entry in path])
 
     def get_cre_hierarchy(self, cre: cre_defs.CRE) -> int:
-        if not self.graph:
-            self.with_graph()
-        roots = self.get_root_cres()
-
-        root_cre_ids = [r.id for r in roots]
-        return self.graph.get_hierarchy(rootIDs=root_cre_ids, creID=cre.id)
+        """Distance from cre to its nearest root CRE (0 for roots)."""
+        hierarchy = self.cre_hierarchy()
+        db_id = hierarchy.db_id(cre.id)
+        if db_id is None:
+            raise ValueError(f"CRE: {cre.id} isn't in the graph")
+        return hierarchy.depth[db_id]
 
     # def all_nodes_with_pagination(
     #     self, page: int = 1, per_page: int = 10
@@ -2243,9 +2385,10 @@ class Node_collection:
             if embeddings:
                 self.session.delete(embeddings)
             self.session.delete(entry)
+        text_search_index.remove(self.session, [entry.id for entry in entries])
 
+        # commits the node deletes together with the dataset generation bump
         self.delete_gapanalysis_results_for(node_name)
-        self.session.commit()
 
     def delete_gapanalysis_results_for(self, node_name):
         res = (
@@ -2257,6 +2400,8 @@ class Node_collection:
             result = self.session.delete(r)
             if result:
                 logger.info(f"deleted {result.rowcount} objects")
+        drop_gap_analysis_controls(self.session, [r.cache_key for r in res])
+        dataset_generation.bump(commit=False)
         self.session.commit()
         self.session.flush()
         return res
@@ -2273,6 +2418,7 @@ class Node_collection:
 
         if entry is not None:
             logger.info(f"knew of CRE {cre.name} ,updating")
+            reindex = False
             if not entry.external_id:
                 if entry.external_id != cre.id:
                     raise ValueError(
@@ -2280,10 +2426,14 @@ class Node_collection:
                         f"{entry.external_id}:{entry.name} with other ID {cre.id}"
                     )
                 entry.external_id = cre.id
+                reindex = True
             if not entry.description:
                 entry.description = cre.description
+                reindex = reindex or bool(cre.description)
             if not entry.tags:
                 entry.tags = ",".join(cre.tags)
+            if reindex:
+                text_search_index.index_cre(self.session, entry)
             return entry
         else:
             logger.info("did not know of cre %s ,adding" % cre.name)
@@ -2294,9 +2444,14 @@ class Node_collection:
                 tags=",".join([str(t) for t in cre.tags]),
             )
             self.session.add(entry)
+            self.session.flush()
+            text_search_index.index_cre(self.session, entry)
             self.session.commit()
             if self.graph:
                 self.graph.add_cre(cre=cre)
+            hierarchy = self._written_cre_hierarchy()
+            if hierarchy is not None:
+                hierarchy.add_cre(entry.id, entry.external_id)
         return entry
 
     def add_node(
@@ -2377,6 +2532,10 @@ class Node_collection:
                 entry.metadata_json = dbnode.metadata_json
 
             try:
+                reindex = self.session.is_modified(entry)
+                self.session.flush()
+                if reindex:
+                    text_search_index.index_node(self.session, entry)
                 self.session.commit()
             except IntegrityError as exc:
                 self.session.rollback()
@@ -2401,6 +2560,8 @@ class Node_collection:
         logger.info(f"insert node {dbnode.name}:{dbnode.section}:{dbnode.section_id}")
         self.session.add(dbnode)
         try:
+            self.session.flush()
+            text_search_index.index_node(self.session, dbnode)
             self.session.commit()
         except IntegrityError as exc:
             self.session.rollback()
@@ -2418,6 +2579,13 @@ class Node_collection:
             self.graph.add_dbnode(dbnode=node)
         return dbnode
 
+    def bulk_writer(self, names: List[str]) -> "bulk_import.BulkNodeWriter":
+        """A BulkNodeWriter over the nodes named ``names``: staged ``add_node`` /
+        ``add_link`` calls written in batches and one commit."""
+        from application.database import bulk_import
+
+        return bulk_import.BulkNodeWriter(self, names)
+
     def add_internal_link(
         self,
         higher: CRE,
@@ -2534,6 +2702,9 @@ class Node_collection:
                 InternalLinks(type=ltype.value, cre=lower.id, group=higher.id)
             )
             self.session.commit()
+            hierarchy = self._written_cre_hierarchy()
+            if hierarchy is not None:
+                hierarchy.add_link(higher.id, lower.id, ltype.value)
             return cre_defs.Link(document=lower, ltype=ltype)
         except inmemory_graph.CycleDetectedError as cde:
             # cycle detected, do nothing
@@ -2615,7 +2786,8 @@ class Node_collection:
                all entries of <name> and optionally, section/subsection
            '\d\d\d-\d\d\d' (two sets of 3 digits) will first try to match
                 CRE ids before it performs a free text search
-           Anything else will be a case insensitive LIKE query in the database
+           Anything else is a ranked full text search (see text_search_index),
+           or case insensitive LIKE queries where the index is unavailable
         """
         search_terms = self._expand_text_search_aliases(text)
         if not search_terms:
@@ -2672,7 +2844,32 @@ class Node_collection:
             if results:
                 return list(set(results))
         # fuzzy matches second
-        results = {}
+        if text_search_index.ensure(self.session):
+            return self._text_search_indexed(search_terms)
+        return self._text_search_like(search_terms)
+
+    def _text_search_indexed(
+        self, search_terms: List[str]
+    ) -> List[Optional[cre_defs.Document]]:
+        hits = text_search_index.search(self.session, search_terms)
+        node_ids = [doc_id for kind, doc_id in hits if kind == text_search_index.NODE]
+        cre_ids = [doc_id for kind, doc_id in hits if kind == text_search_index.CRE]
+        documents: Dict[str, cre_defs.Document] = {}
+        if node_ids:
+            dbnodes = self.session.query(Node).filter(Node.id.in_(node_ids)).all()
+            for dbnode, node in zip(dbnodes, self._hydrate_nodes_batch(dbnodes)):
+                documents[dbnode.id] = node
+        if cre_ids:
+            dbcres = self.session.query(CRE).filter(CRE.id.in_(cre_ids)).all()
+            for dbcre, cre in zip(dbcres, self._hydrate_cres_batch(dbcres)):
+                documents[dbcre.id] = cre
+        # rows deleted behind the index's back simply drop out here
+        return [documents[doc_id] for _, doc_id in hits if doc_id in documents]
+
+    def _text_search_like(
+        self, search_terms: List[str]
+    ) -> List[Optional[cre_defs.Document]]:
+        results: Dict[str, cre_defs.Document] = {}
         for search_term in search_terms:
             args = [f"%{search_term}%", "", "", "", "", ""]
             s = set([p for p in permutations(args, 6)])
@@ -2749,26 +2946,12 @@ class Node_collection:
 
     def get_root_cres(self):
         """Returns CRES that only have "Contains" links"""
-        # select name  from cre where cre.id not in (select cre from cre_links where type="Contains") and cre.id not in (select "group" from cre_links where type="Is Part OF");
-        cres = (
-            self.session.query(CRE)
-            .filter(
-                ~CRE.id.in_(
-                    self.session.query(InternalLinks.cre).filter(
-                        InternalLinks.type == cre_defs.LinkTypes.Contains,
-                    )
-                )
-            )
-            .filter(
-                ~CRE.id.in_(
-                    self.session.query(InternalLinks.group).filter(
-                        InternalLinks.type == cre_defs.LinkTypes.PartOf,
-                    )
-                )
-            )
-            .all()
-        )
-        return self._hydrate_cres_batch(list(cres))
+        roots = self.cre_hierarchy().roots()
+        if not roots:
+            return []
+        position = {db_id: i for i, db_id in enumerate(roots)}
+        cres = self.session.query(CRE).filter(CRE.id.in_(roots)).all()
+        return self._hydrate_cres_batch(sorted(cres, key=lambda c: position[c.id]))
 
     def health_check(self) -> Dict[str, Any]:
         """Lightweight liveness/readiness probe for the serving database.
@@ -2842,6 +3025,37 @@ class Node_collection:
                     res[entry.node_id] = vec
         return res
 
+    def embeddings_fingerprint(self, doc_type: str) -> str:
+        """Digest of the stored ``doc_type`` vectors (ids, model, vector content).
+
+        Changes whenever an embedding is added, removed or rewritten, including
+        a re-embed that keeps the vector's size; ANN index and embedding_store
+        files are keyed by it. Postgres hashes each vector server side; other
+        databases stream the vector text through the digest.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            vector = func.md5(sql_cast(Embeddings.embedding_vec, sqla.Text))
+        else:
+            vector = Embeddings.embedding_vec
+        rows = (
+            self.session.query(
+                Embeddings.id,
+                Embeddings.embedding_model_id,
+                Embeddings.embedding_dim,
+                vector,
+            )
+            .filter(Embeddings.doc_type == doc_type)
+            .order_by(Embeddings.id)
+            .yield_per(1000)
+        )
+        digest = hashlib.sha256()
+        count = 0
+        for row in rows:
+            digest.update(repr(tuple(row)).encode("utf-8"))
+            count += 1
+        return f"{count}-{digest.hexdigest()[:32]}"
+
     def get_embedding_contents_by_doc_type(self, doc_type: str) -> Dict[str, str]:
         """Return ``{id -> embeddings_content}`` for a doc type.
 
@@ -2937,6 +3151,8 @@ class Node_collection:
         run rebuilds vectors (e.g. after changing smart-extract policy or embedding model).
         """
         n_deleted = self.session.query(Embeddings).delete(synchronize_session=False)
+        if n_deleted:
+            dataset_generation.bump(commit=False)
         self.session.commit()
         return int(n_deleted or 0)
 
@@ -3005,6 +3221,9 @@ class Node_collection:
                 )
             self.session.add(emb)
             self.session.commit()
+            ann_index.AnnIndexRegistry.instance().on_embedding_added(
+                self, emb.doc_type, db_object.id, embeddings
+            )
             return emb
         else:
             logger.debug(f"knew of embedding for object {db_object.id} ,updating")
@@ -3018,6 +3237,9 @@ class Node_collection:
                 elif getattr(existing[0], "embeddings_url", None) is None:
                     existing[0].embeddings_url = db_object.link
             self.session.commit()
+            ann_index.AnnIndexRegistry.instance().on_embedding_added(
+                self, existing[0].doc_type, db_object.id, embeddings
+            )
 
             return existing
 
@@ -3153,6 +3375,10 @@ class Node_collection:
         )
         if row is None:
             return False
+        if ga_payload.row_is_encoded(row):
+            # Non-material primary rows are never written, and the backfill
+            # leaves legacy ones as text, so encoded rows are material.
+            return True
         if gap_analysis_cache_key_is_primary(cache_key):
             return primary_gap_analysis_payload_is_material(row.ga_object)
         return True
@@ -3166,17 +3392,129 @@ class Node_collection:
         )
         if res:
             logger.info(f"found gap analysis with cache key: {cache_key}")
-            return res.ga_object
+            return ga_payload.row_text(res)
         logger.info(f"did not find gap analysis with cache key: {cache_key}")
 
-    def add_gap_analysis_result(self, cache_key: str, ga_object: str):
+    def get_gap_analysis_encoded(
+        self, cache_key: str
+    ) -> Optional[ga_payload.EncodedPayload]:
+        """The stored compressed payload for ``cache_key``, or None if the row is missing or plain text."""
+        res = (
+            self.session.query(GapAnalysisResults)
+            .filter(GapAnalysisResults.cache_key == cache_key)
+            .first()
+        )
+        return ga_payload.row_encoded(res)
+
+    def gap_analysis_controls(
+        self, cache_key: str, offset: int = 0, limit: Optional[int] = None
+    ) -> Optional[Tuple[int, List[Tuple[str, str]]]]:
+        """A page of the base controls of a primary GA row, in ``result`` order:
+        (total controls, [(control key, JSON of its entry)]).
+
+        None if there is no material row for ``cache_key``.
+        """
+        if not gap_analysis_cache_key_is_primary(cache_key):
+            return None
+        controls = self.session.query(GapAnalysisControl).filter(
+            GapAnalysisControl.cache_key == cache_key
+        )
+        total = controls.count()
+        if not total:
+            entries = self._unindexed_gap_analysis_controls(cache_key)
+            if entries is None:
+                return None
+            stop = None if limit is None else offset + limit
+            return len(entries), entries[offset:stop]
+        page = (
+            controls.with_entities(
+                GapAnalysisControl.control_key, GapAnalysisControl.value
+            )
+            .order_by(GapAnalysisControl.position)
+            .offset(offset)
+            .limit(limit)
+        )
+        return total, [(key, ga_payload.decode_entry(value)) for key, value in page]
+
+    def iter_gap_analysis_controls(
+        self, cache_key: str, batch_size: int = 200
+    ) -> Optional[Iterator[Tuple[str, str]]]:
+        """Every (control key, JSON of its entry) of a primary GA row, streamed;
+        None if there is no material row for ``cache_key``."""
+        if not gap_analysis_cache_key_is_primary(cache_key):
+            return None
+        controls = self.session.query(GapAnalysisControl).filter(
+            GapAnalysisControl.cache_key == cache_key
+        )
+        if controls.first() is None:
+            entries = self._unindexed_gap_analysis_controls(cache_key)
+            return None if entries is None else iter(entries)
+        values = (
+            controls.with_entities(
+                GapAnalysisControl.control_key, GapAnalysisControl.value
+            )
+            .order_by(GapAnalysisControl.position)
+            .yield_per(batch_size)
+        )
+        return ((key, ga_payload.decode_entry(value)) for key, value in values)
+
+    def _unindexed_gap_analysis_controls(
+        self, cache_key: str
+    ) -> Optional[List[Tuple[str, str]]]:
+        """The controls of a primary GA row with no index rows, i.e. cached
+        before the index existed and not backfilled yet, parsed from the whole
+        row; None if the row is missing or not material."""
+        text = self.get_gap_analysis_result(cache_key)
+        if not primary_gap_analysis_payload_is_material(text):
+            return None
+        return [
+            (key, text[start:end]) for key, start, end in ga_payload.result_spans(text)
+        ]
+
+    def index_unindexed_gap_analysis_controls(self, batch_size: int = 200) -> int:
+        """Index the controls of material primary GA rows cached before the
+        index existed, one committed batch at a time; returns how many rows
+        were indexed."""
+        indexed = 0
+        last_key = ""
+        while True:
+            keys = [
+                key
+                for (key,) in self.session.query(GapAnalysisResults.cache_key)
+                .filter(
+                    GapAnalysisResults.cache_key > last_key,
+                    ~GapAnalysisResults.cache_key.in_(
+                        self.session.query(GapAnalysisControl.cache_key)
+                    ),
+                )
+                .order_by(GapAnalysisResults.cache_key)
+                .limit(batch_size)
+            ]
+            if not keys:
+                return indexed
+            last_key = keys[-1]
+            primary = [key for key in keys if gap_analysis_cache_key_is_primary(key)]
+            if not primary:
+                continue
+            for row in self.session.query(GapAnalysisResults).filter(
+                GapAnalysisResults.cache_key.in_(primary)
+            ):
+                text = ga_payload.row_text(row)
+                if primary_gap_analysis_payload_is_material(text):
+                    index_gap_analysis_controls(self.session, row.cache_key, text)
+                    indexed += 1
+            self.session.commit()
+
+    def add_gap_analysis_result(
+        self, cache_key: str, ga_object: str, commit: bool = True
+    ):
         existing = (
             self.session.query(GapAnalysisResults)
             .filter(GapAnalysisResults.cache_key == cache_key)
             .first()
         )
         if gap_analysis_cache_key_is_primary(cache_key):
-            existing_payload = existing.ga_object if existing else None
+            existing_payload = ga_payload.row_text(existing)
             if not should_persist_primary_gap_analysis_cache(
                 ga_object, existing_payload
             ):
@@ -3191,14 +3529,18 @@ class Node_collection:
                         cache_key,
                     )
                 return
+        compressed = feature_flags.is_compressed_gap_analysis_storage_enabled()
         if existing:
-            existing.ga_object = ga_object
+            ga_payload.store_on_row(existing, ga_object, compressed=compressed)
             self.session.add(existing)
-            self.session.commit()
         else:
             logger.info(f"adding gap analysis result with cache key: {cache_key}")
-            res = GapAnalysisResults(cache_key=cache_key, ga_object=ga_object)
+            res = GapAnalysisResults(cache_key=cache_key)
+            ga_payload.store_on_row(res, ga_object, compressed=compressed)
             self.session.add(res)
+        if gap_analysis_cache_key_is_primary(cache_key):
+            index_gap_analysis_controls(self.session, cache_key, ga_object)
+        if commit:
             self.session.commit()
 
 
@@ -3345,19 +3687,74 @@ def gap_analysis(
     node_names: List[str],
     cache_key: str = "",
 ):
-    if neo_db is None:
-        neo_db = NEO_DB.instance()
     cre_db = Node_collection()
-    base_standard, paths = neo_db.gap_analysis(node_names[0], node_names[1])
+    path_engine: Any
+    if feature_flags.is_inmemory_gap_analysis_enabled():
+        path_engine = inmemory_gap_analysis.InMemoryGapAnalysis.instance(cre_db.session)
+    else:
+        path_engine = neo_db if neo_db is not None else NEO_DB.instance()
+    base_standard, paths = path_engine.gap_analysis(node_names[0], node_names[1])
     logger.info(f"got db gap analysis for {'>>>'.join(node_names)}, calculating paths")
     if base_standard is None:
         return None
-    grouped_paths = {}
-    extra_paths_dict = {}
+    grouped_paths, extra_paths_dict = _group_gap_analysis_paths(base_standard, paths)
+    if cache_key == "":
+        cache_key = make_resources_key(node_names)
+    _store_gap_analysis(cre_db, node_names, cache_key, grouped_paths, extra_paths_dict)
+    return (node_names, grouped_paths, extra_paths_dict)
+
+
+def gap_analysis_batch(
+    importing_name: str, peer_names: List[str]
+) -> GapAnalysisBatchReport:
+    """
+    Compute ``importing >> peer`` and ``peer >> importing`` for every peer at once.
+
+    Paths come from one multi-target traversal of the in-memory engine and all
+    cache rows are written in a single transaction.
+    """
+    cre_db = Node_collection()
+    report = GapAnalysisBatchReport(importing_name=importing_name)
+    t0 = time.perf_counter()
+    engine = inmemory_gap_analysis.InMemoryGapAnalysis.instance(cre_db.session)
+    results = engine.gap_analysis_many(importing_name, peer_names)
+    report.traversal_seconds = time.perf_counter() - t0
+    try:
+        for (name_a, name_b), (base_standard, paths) in results.items():
+            pair_t0 = time.perf_counter()
+            node_names = [name_a, name_b]
+            grouped_paths, extra_paths_dict = _group_gap_analysis_paths(
+                base_standard, paths
+            )
+            cache_key = make_resources_key(node_names)
+            _store_gap_analysis(
+                cre_db,
+                node_names,
+                cache_key,
+                grouped_paths,
+                extra_paths_dict,
+                commit=False,
+            )
+            report.pair_seconds[cache_key] = time.perf_counter() - pair_t0
+            report.pair_paths[cache_key] = len(paths)
+        cre_db.session.commit()
+    except Exception:
+        cre_db.session.rollback()
+        raise
+    report.log_summary()
+    return report
+
+
+def _group_gap_analysis_paths(
+    base_standard: List[cre_defs.Document], paths: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Score raw paths and split them into strong (grouped) and weak (extra) paths."""
+    grouped_paths: Dict[str, Any] = {}
+    extra_paths_dict: Dict[str, Any] = {}
     GA_STRONG_UPPER_LIMIT = 2
 
     for node in base_standard:
-        key = node.id
+        key = getattr(node, "id", "")
         if not key:
             logger.error(
                 "key is empty, this is a bug and this gap analysis will not progress"
@@ -3381,15 +3778,18 @@ def gap_analysis(
             grouped_paths[key] = {"start": start_doc, "paths": {}, "extra": 0}
             extra_paths_dict[key] = {"paths": {}}
 
+    scorable = []
     for path in paths:
-        key = path["start"].id
-        end_key = path["end"].id
-        if not end_key:
+        if not path["end"].id:
             logger.error(
                 "end_key is empty, this is a bug and this gap analysis will not progress"
             )
             continue
-        path["score"] = get_path_score(path)
+        scorable.append(path)
+    for path, score in zip(scorable, score_paths(scorable)):
+        key = path["start"].id
+        end_key = path["end"].id
+        path["score"] = score
         del path["start"]
         if (
             path["score"] <= GA_STRONG_UPPER_LIMIT
@@ -3414,8 +3814,18 @@ def gap_analysis(
                 extra_paths_dict[key]["paths"][end_key] = path
                 grouped_paths[key]["extra"] += 1
 
-    if cache_key == "":
-        cache_key = make_resources_key(node_names)
+    return grouped_paths, extra_paths_dict
+
+
+def _store_gap_analysis(
+    cre_db: Node_collection,
+    node_names: List[str],
+    cache_key: str,
+    grouped_paths: Dict[str, Any],
+    extra_paths_dict: Dict[str, Any],
+    *,
+    commit: bool = True,
+) -> None:
     if not grouped_paths:
         if gap_analysis_cache_key_is_primary(cache_key):
             stale = (
@@ -3430,7 +3840,8 @@ def gap_analysis(
             )
             for row in stale:
                 cre_db.session.delete(row)
-            if stale:
+            drop_gap_analysis_controls(cre_db.session, [row.cache_key for row in stale])
+            if stale and commit:
                 cre_db.session.commit()
         logger.warning(
             "Not persisting gap analysis for %s: grouped_paths is empty "
@@ -3438,17 +3849,19 @@ def gap_analysis(
             "Re-run after Neo is populated so the pair is not locked in as an empty cache.",
             cache_key,
         )
-        return (node_names, grouped_paths, extra_paths_dict)
+        return
 
     logger.info(f"got gap analysis paths for {'>>>'.join(node_names)}, storing result")
     cre_db.add_gap_analysis_result(
-        cache_key=cache_key, ga_object=flask_json.dumps({"result": grouped_paths})
+        cache_key=cache_key,
+        ga_object=flask_json.dumps({"result": grouped_paths}),
+        commit=commit,
     )
 
     for key in extra_paths_dict:
         cre_db.add_gap_analysis_result(
             cache_key=make_subresources_key(node_names, key),
             ga_object=flask_json.dumps({"result": extra_paths_dict[key]}),
+            commit=commit,
         )
     logger.info(f"stored gapa analysis for {'>>>'.join(node_names)}, successfully")
-    return (node_names, grouped_paths, extra_paths_dict)
@@ -0,0 +1,214 @@
+"""Streaming exports of the whole database.
+
+``Node_collection.export`` used to assemble every document in memory before
+writing any, and ``/rest/v1/cre_csv`` hydrated every CRE with all of its links
+(one ``get_CREs`` per CRE) to build the mapping template. Here:
+
+* ``iter_documents`` walks ``cre`` then ``node`` in primary-key order with
+  server-side cursors (``yield_per``, which streams results) and hydrates one
+  batch at a time, so memory stays flat however many nodes there are. It
+  yields what the YAML export writes: every CRE with its links, then every
+  node no CRE links to.
+* ``iter_jsonl`` / ``write_tarball`` serialise those documents as JSON lines
+  or as one ``.tar.gz`` of the per-document YAML files.
+* ``mapping_template_rows`` builds the ``cre_csv`` template from CRE ids,
+  names and ``cre_links`` alone (memory per CRE, never per node), and
+  ``iter_csv`` writes any rows as CSV chunks for a streamed response.
+"""
+
+import csv
+import io
+import json
+import logging
+import tarfile
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+from application.database import db
+from application.defs import cre_defs
+from application.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+CSV_CHUNK_ROWS = 500
+
+
+def _chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_documents(
+    collection: "db.Node_collection", batch_size: Optional[int] = None
+) -> Iterator[cre_defs.Document]:
+    """Every CRE with its links, then every unlinked node, in id order."""
+    batch_size = batch_size or env_int(
+        "CRE_EXPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE, minimum=1
+    )
+    session = collection.session
+    cres = session.query(db.CRE).order_by(db.CRE.id).yield_per(batch_size)
+    for batch in _chunks(cres, batch_size):
+        yield from collection._hydrate_cres_batch(batch)
+
+    linked = session.query(db.Links.node)
+    nodes = (
+        session.query(db.Node)
+        .filter(db.Node.id.notin_(linked))
+        .order_by(db.Node.id)
+        .yield_per(batch_size)
+    )
+    for node in nodes:
+        yield db.nodeFromDB(node)
+
+
+def _filename_part(value: str) -> str:
+    return value.replace("/", "-").replace(" ", "_").replace('"', "").replace("'", "")
+
+
+def document_filename(doc: cre_defs.Document) -> str:
+    """The YAML file name the export uses for doc."""
+    doc_id = getattr(doc, "id", None)
+    if doc_id:
+        return _filename_part(doc_id) + ".yaml"
+    section_id = getattr(doc, "sectionID", None)
+    if section_id is None:
+        logger.fatal(
+            f"doc does not have neither sectionID nor id, this is a bug! {doc.__dict__}"
+        )
+        section_id = ""
+    return doc.name + "_" + _filename_part(section_id) + ".yaml"
+
+
+def iter_jsonl(
+    collection: "db.Node_collection", batch_size: Optional[int] = None
+) -> Iterator[str]:
+    for doc in iter_documents(collection, batch_size=batch_size):
+        yield json.dumps(doc.todict(), sort_keys=True) + "\n"
+
+
+def write_tarball(
+    collection: "db.Node_collection", path: str, batch_size: Optional[int] = None
+) -> int:
+    """Write the YAML export as one gzipped tarball; returns the document count."""
+    written = 0
+    now = time.time()
+    with tarfile.open(path, "w:gz") as tar:
+        for doc in iter_documents(collection, batch_size=batch_size):
+            content = yaml.safe_dump(doc.todict()).encode("utf-8")
+            info = tarfile.TarInfo(name=document_filename(doc))
+            info.size = len(content)
+            info.mtime = now
+            tar.addfile(info, io.BytesIO(content))
+            written += 1
+    logger.info("exported %s documents to %s", written, path)
+    return written
+
+
+def _template_links(
+    rows: Iterable[Tuple[str, str, str]],
+) -> Dict[str, List[Tuple[str, str]]]:
+    """(link type, other CRE) per CRE, in the order get_CREs lists its links;
+    only the Contains and Related links the template follows."""
+    links: Dict[str, List[Tuple[str, str]]] = {}
+    for group, cre, ltype in rows:
+        if ltype == cre_defs.LinkTypes.Related:
+            links.setdefault(cre, []).append((ltype, group))
+        if ltype in (cre_defs.LinkTypes.Contains, cre_defs.LinkTypes.Related):
+            links.setdefault(group, []).append((ltype, cre))
+    return links
+
+
+def mapping_template_rows(
+    collection: "db.Node_collection", root_ids: Optional[List[str]] = None
+) -> List[Dict[str, str]]:
+    """The CRE mapping template under the given root CREs (external ids),
+    all roots by default: a header row, then one ``CRE <depth>`` row per CRE
+    in depth-first order.
+
+    Raises ValueError if a CRE is only reachable through a Related link.
+    """
+    session = collection.session
+    names: Dict[str, Tuple[str, str]] = {}
+    db_ids: Dict[str, str] = {}
+    for db_id, external_id, name in session.query(
+        db.CRE.id, db.CRE.external_id, db.CRE.name
+    ):
+        names[db_id] = (external_id, name)
+        db_ids.setdefault(external_id, db_id)
+    links = _template_links(
+        session.query(
+            db.InternalLinks.group, db.InternalLinks.cre, db.InternalLinks.type
+        )
+    )
+    if root_ids is None:
+        hierarchy = collection.cre_hierarchy()
+        root_ids = [names[r][0] for r in hierarchy.roots()]
+
+    body: List[Dict[str, str]] = []
+    visited = set()
+    related = set()
+    max_offset = 0
+    for root in root_ids:
+        if root not in db_ids:
+            raise ValueError(f"CRE with id {root} not found in the database")
+        stack: List[Tuple[str, int, Optional[Iterator[Tuple[str, str]]]]] = [
+            (db_ids[root], 0, None)
+        ]
+        while stack:
+            cre, offset, pending = stack.pop()
+            if pending is None:
+                external_id, name = names[cre]
+                max_offset = max(max_offset, offset)
+                body.append(
+                    {
+                        f"CRE {offset}": f"{external_id}{cre_defs.ExportFormat.separator}{name}"
+                    }
+                )
+                visited.add(external_id)
+                # resolve links by external id, as get_CREs would
+                pending = iter(links.get(db_ids[external_id], []))
+            for ltype, other in pending:
+                other_id = names[other][0]
+                if other_id in visited:
+                    continue
+                if ltype == cre_defs.LinkTypes.Contains:
+                    stack.append((cre, offset, pending))
+                    stack.append((db_ids[other_id], offset + 1, None))
+                    break
+                related.add(other_id)
+
+    if related - visited:
+        raise ValueError(
+            "found CREs with only related links not provided in the root_cre list, unless you are really sure for this use case, this is a bug"
+        )
+    header = {f"CRE {offset}": "" for offset in range(0, max_offset + 1)}
+    header["standard|name"] = ""
+    header["standard|id"] = ""
+    header["standard|hyperlink"] = ""
+    return [header] + body
+
+
+def iter_csv(
+    rows: Iterable[Dict[str, str]],
+    fieldnames: List[str],
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[str]:
+    """The header line, then rows as CSV text, chunk_rows rows per chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for chunk in _chunks(rows, chunk_rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
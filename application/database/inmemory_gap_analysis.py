@@ -0,0 +1,518 @@
+"""
+In-process gap analysis path engine over the SQL CRE graph.
+
+Drop-in replacement for ``NEO_DB.gap_analysis``: the adjacency is built once
+from ``cre_links`` / ``cre_node_links`` and the same tiered
+``allShortestPaths`` searches (strong -> CONTAINS -> wildcard) are answered
+with bounded breadth-first searches, so a worker can compute gap analysis
+without a graph database. Documents are shaped exactly as the Neo4j round-trip
+would shape them (see ``NEO_DB.add_cre`` / ``NEO_DB.add_dbnode``) so scoring in
+``db.gap_analysis`` produces the same cache rows.
+
+Selected per deployment with ``CRE_GA_ENGINE=inmemory``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from application.defs import cre_defs
+from application.utils import dataset_generation
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_PATH_LENGTH = 20
+DENYLIST = ("Cross-cutting concerns",)
+
+STRONG_RELATIONSHIPS = frozenset({"LINKED_TO", "AUTOMATICALLY_LINKED_TO", "SAME"})
+MEDIUM_RELATIONSHIPS = STRONG_RELATIONSHIPS | {"CONTAINS"}
+# ``None`` mirrors the untyped ``[*..20]`` wildcard tier.
+GAP_ANALYSIS_TIERS: Tuple[Tuple[str, Optional[FrozenSet[str]]], ...] = (
+    ("strong", STRONG_RELATIONSHIPS),
+    ("medium", MEDIUM_RELATIONSHIPS),
+    ("wildcard", None),
+)
+
+_STANDARD_NTYPES = (
+    cre_defs.Credoctypes.Standard.value,
+    cre_defs.Credoctypes.Tool.value,
+)
+
+
+def _neo_tags(tags: Any) -> Any:
+    """Neo4j stores comma-joined SQL tags as a single-element array."""
+    return [tags] if isinstance(tags, str) else tags
+
+
+def _cre_document(row: Any) -> Optional[cre_defs.Document]:
+    try:
+        return cre_defs.CRE(
+            name=row.name,
+            id=row.external_id or "",
+            description=row.description or "",
+            tags=_neo_tags(row.tags),
+        )
+    except Exception as e:
+        logger.warning("Skipping malformed CRE %s in gap analysis graph: %s", row.id, e)
+        return None
+
+
+def _neo_standard_properties(row: Any) -> Dict[str, Any]:
+    """Properties ``NEO_DB`` persists for a Standard/Tool SQL node."""
+    if row.ntype == cre_defs.Credoctypes.Tool.value:
+        return {
+            "name": row.name,
+            "description": row.description,
+            "tags": _neo_tags(row.tags),
+            "hyperlink": None,
+            "version": row.version or "",
+            "section": None,
+            "sectionID": None,
+            "subsection": None,
+        }
+    return {
+        "name": row.name,
+        "description": row.description or "",
+        "tags": _neo_tags(row.tags),
+        "hyperlink": None,
+        "version": row.version or "",
+        "section": row.section,
+        "sectionID": row.section_id,
+        "subsection": row.subsection or "",
+    }
+
+
+def _standard_document(
+    row: Any, *, as_stored_type: bool = True
+) -> Optional[cre_defs.Document]:
+    """
+    Parse a node like ``to_cre_def(parse_links=False)``.
+
+    Path endpoints are resolved to their concrete class (Tools become ``Tool``),
+    while the base-standard listing inflates everything as ``NeoStandard``.
+    """
+    props = _neo_standard_properties(row)
+    try:
+        if as_stored_type and row.ntype == cre_defs.Credoctypes.Tool.value:
+            return cre_defs.Tool(tooltype=cre_defs.ToolTypes.Unknown, **props)
+        return cre_defs.Standard(**props)
+    except Exception as e:
+        logger.warning(
+            "Skipping malformed node %s in gap analysis graph: %s", row.id, e
+        )
+        return None
+
+
+@dataclass
+class _Edge:
+    start: int
+    end: int
+    relationship: str
+
+
+@dataclass
+class InMemoryGapAnalysis:
+    """Compact CRE/standard adjacency answering tiered shortest-path queries."""
+
+    documents: List[Optional[cre_defs.Document]] = field(default_factory=list)
+    base_documents: Dict[int, Optional[cre_defs.Document]] = field(default_factory=dict)
+    names: List[str] = field(default_factory=list)
+    is_cre: List[bool] = field(default_factory=list)
+    edges: List[_Edge] = field(default_factory=list)
+    # CRE index -> [(neighbour CRE index, edge index)]
+    cre_adjacency: Dict[int, List[Tuple[int, int]]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    # standard node index -> [(CRE index, edge index)]
+    node_adjacency: Dict[int, List[Tuple[int, int]]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    nodes_by_name: Dict[str, List[int]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    # (database, dataset generation, updated_at) the graph was built at
+    version_key: Optional[Tuple[Any, int, Optional[datetime]]] = None
+
+    _instance: ClassVar[Optional["InMemoryGapAnalysis"]] = None
+
+    @classmethod
+    def instance(cls, session: Any) -> "InMemoryGapAnalysis":
+        """Return the process-wide engine, rebuilding it when the dataset
+        generation moved.
+
+        Imports bump the generation once their nodes are registered, before
+        their gap analysis runs. The generation is read uncached, so a worker
+        never computes against a graph one TTL old; without it (migration not
+        applied) the graph is rebuilt on every call.
+        """
+        version = dataset_generation.current(fresh=True)
+        key = (
+            None
+            if version is None
+            else (session.get_bind(), version.generation, version.updated_at)
+        )
+        current = InMemoryGapAnalysis._instance
+        if current is None or key is None or current.version_key != key:
+            logger.info("Building in-memory gap analysis graph from SQL")
+            current = cls.from_session(session)
+            current.version_key = key
+            InMemoryGapAnalysis._instance = current
+        return current
+
+    @classmethod
+    def reset(cls) -> None:
+        InMemoryGapAnalysis._instance = None
+
+    @classmethod
+    def from_session(cls, session: Any) -> "InMemoryGapAnalysis":
+        from application.database import db
+
+        cres = {row.id: row for row in session.query(db.CRE).all()}
+        internal_links = session.query(db.InternalLinks).all()
+        links = session.query(db.Links).all()
+        node_ids = {lnk.node for lnk in links}
+        nodes = {}
+        if node_ids:
+            for row in session.query(db.Node).filter(db.Node.id.in_(node_ids)).all():
+                nodes[row.id] = row
+        return cls.from_rows(
+            cres=cres, nodes=nodes, internal_links=internal_links, links=links
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        *,
+        cres: Dict[str, Any],
+        nodes: Dict[str, Any],
+        internal_links: Iterable[Any],
+        links: Iterable[Any],
+    ) -> "InMemoryGapAnalysis":
+        """Build the adjacency from SQL rows, mirroring ``NEO_DB.populate_DB``."""
+        graph = cls()
+        index: Dict[str, int] = {}
+
+        def cre_index(cre_id: str) -> Optional[int]:
+            if cre_id in index:
+                return index[cre_id]
+            row = cres.get(cre_id)
+            if row is None:
+                logger.error(f"CRE {cre_id} does not exist?")
+                return None
+            index[cre_id] = len(graph.documents)
+            graph.documents.append(_cre_document(row))
+            graph.names.append(row.name)
+            graph.is_cre.append(True)
+            return index[cre_id]
+
+        def node_index(node_id: str) -> Optional[int]:
+            if node_id in index:
+                return index[node_id]
+            row = nodes.get(node_id)
+            if row is None:
+                logger.error(f"Node {node_id} does not exist?")
+                return None
+            idx = len(graph.documents)
+            index[node_id] = idx
+            graph.names.append(row.name)
+            graph.is_cre.append(False)
+            if row.ntype in _STANDARD_NTYPES:
+                graph.documents.append(_standard_document(row))
+                graph.base_documents[idx] = _standard_document(
+                    row, as_stored_type=False
+                )
+                graph.nodes_by_name[row.name].append(idx)
+            else:
+                graph.documents.append(None)
+            return idx
+
+        for il in sorted(internal_links, key=lambda l: (l.group, l.cre)):
+            group, cre = cre_index(il.group), cre_index(il.cre)
+            if group is None or cre is None:
+                continue
+            if il.type == cre_defs.LinkTypes.Contains.value:
+                edge = _Edge(group, cre, "CONTAINS")
+            elif il.type == cre_defs.LinkTypes.Related.value:
+                edge = _Edge(group, cre, "RELATED")
+            elif il.type == cre_defs.LinkTypes.PartOf.value:
+                edge = _Edge(cre, group, "CONTAINS")
+            else:
+                logger.warning(f"Unknown relation type {il.type}, skipping")
+                continue
+            graph.edges.append(edge)
+            graph.cre_adjacency[edge.start].append((edge.end, len(graph.edges) - 1))
+            graph.cre_adjacency[edge.end].append((edge.start, len(graph.edges) - 1))
+
+        for lnk in sorted(links, key=lambda l: (l.cre, l.node)):
+            node = node_index(lnk.node)
+            cre = cre_index(lnk.cre)
+            if node is None or cre is None:
+                continue
+            if lnk.type == cre_defs.LinkTypes.AutomaticallyLinkedTo.value:
+                edge = _Edge(cre, node, "AUTOMATICALLY_LINKED_TO")
+            elif lnk.type == cre_defs.LinkTypes.LinkedTo.value:
+                edge = _Edge(cre, node, "LINKED_TO")
+            else:
+                logger.warning(
+                    f"Unknown relation type {lnk.type} for Nodes to CREs, skipping"
+                )
+                continue
+            graph.edges.append(edge)
+            graph.node_adjacency[node].append((cre, len(graph.edges) - 1))
+        return graph
+
+    def _traversable(self, idx: int) -> bool:
+        return self.is_cre[idx] and self.names[idx] not in DENYLIST
+
+    def _allowed(
+        self, edge_index: int, relationships: Optional[FrozenSet[str]]
+    ) -> bool:
+        return (
+            relationships is None
+            or self.edges[edge_index].relationship in relationships
+        )
+
+    def _standard_nodes(self, name: str) -> List[int]:
+        if name in DENYLIST:
+            return []
+        return sorted(
+            self.nodes_by_name.get(name, []),
+            key=lambda idx: getattr(self.documents[idx], "id", ""),
+        )
+
+    def shortest_paths(
+        self,
+        base: int,
+        targets: Sequence[int],
+        relationships: Optional[FrozenSet[str]],
+        max_length: int = MAX_PATH_LENGTH,
+    ) -> Dict[int, List[List[int]]]:
+        """
+        All shortest paths (as edge-index lists) from ``base`` to each target.
+
+        Only non-denylisted CREs are traversed, matching the Cypher ``WHERE`` on
+        ``NODES(p)``; paths are at most ``max_length`` relationships long.
+        """
+        # Which CREs touch which target, via an allowed relationship.
+        target_edges: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for target in targets:
+            for cre, edge_index in self.node_adjacency.get(target, []):
+                if self._traversable(cre) and self._allowed(edge_index, relationships):
+                    target_edges[cre].append((target, edge_index))
+
+        predecessors: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        depth: Dict[int, int] = {base: 0}
+        frontier: List[int] = []
+        for cre, edge_index in self.node_adjacency.get(base, []):
+            if not self._traversable(cre) or not self._allowed(
+                edge_index, relationships
+            ):
+                continue
+            if cre not in depth:
+                depth[cre] = 1
+                frontier.append(cre)
+            predecessors[cre].append((base, edge_index))
+
+        resolved: Dict[int, int] = {}
+        level = 1
+        unresolved = set(targets) - {base}
+        while frontier and unresolved and level < max_length:
+            for cre in frontier:
+                for target, edge_index in target_edges.get(cre, []):
+                    if target not in unresolved:
+                        continue
+                    resolved.setdefault(target, level + 1)
+                    predecessors[target].append((cre, edge_index))
+            unresolved -= set(resolved)
+            if not unresolved or level + 1 >= max_length:
+                break
+            next_frontier: List[int] = []
+            for cre in frontier:
+                for neighbour, edge_index in self.cre_adjacency.get(cre, []):
+                    if not self._traversable(neighbour) or not self._allowed(
+                        edge_index, relationships
+                    ):
+                        continue
+                    seen = depth.get(neighbour)
+                    if seen is None:
+                        depth[neighbour] = level + 1
+                        next_frontier.append(neighbour)
+                    elif seen != level + 1:
+                        continue
+                    predecessors[neighbour].append((cre, edge_index))
+            frontier = next_frontier
+            level += 1
+
+        paths: Dict[int, List[List[int]]] = {}
+        for target in targets:
+            if target not in resolved or resolved[target] <= 1:
+                continue
+            paths[target] = self._unwind(base, target, predecessors)
+        return paths
+
+    def _unwind(
+        self,
+        base: int,
+        target: int,
+        predecessors: Dict[int, List[Tuple[int, int]]],
+    ) -> List[List[int]]:
+        out: List[List[int]] = []
+        stack: List[Tuple[int, List[int]]] = [(target, [])]
+        while stack:
+            current, suffix = stack.pop()
+            if current == base:
+                out.append(suffix)
+                continue
+            for previous, edge_index in reversed(predecessors.get(current, [])):
+                stack.append((previous, [edge_index] + suffix))
+        return out
+
+    def _format_path(
+        self, base: int, target: int, edge_path: List[int]
+    ) -> Optional[Dict[str, Any]]:
+        start = self.documents[base]
+        end = self.documents[target]
+        if start is None or end is None:
+            return None
+        segments: List[Dict[str, Any]] = []
+        for edge_index in edge_path:
+            edge = self.edges[edge_index]
+            seg_start = self.documents[edge.start]
+            seg_end = self.documents[edge.end]
+            if seg_start is None or seg_end is None:
+                # Same as the Neo formatter: drop malformed segments, keep the path.
+                continue
+            segments.append(
+                {
+                    "start": seg_start,
+                    "end": seg_end,
+                    "relationship": edge.relationship,
+                }
+            )
+        return {"start": start, "end": end, "path": segments}
+
+    def _parsed_base(self, name: str) -> List[cre_defs.Document]:
+        return [
+            self.base_documents[idx]
+            for idx in sorted(self.nodes_by_name.get(name, []))
+            if self.base_documents.get(idx) is not None
+        ]
+
+    def _tiered_paths(
+        self, bases: Sequence[int], targets_by_peer: Dict[str, List[int]]
+    ) -> Dict[str, List[Tuple[int, int, List[int]]]]:
+        """
+        ``(base, target, edge path)`` triples per peer from one traversal per tier.
+
+        Every peer keeps the first tier that yields a parseable path, exactly as
+        if its pair had been queried on its own.
+        """
+        out: Dict[str, List[Tuple[int, int, List[int]]]] = {
+            peer: [] for peer in targets_by_peer
+        }
+        remaining = [peer for peer in targets_by_peer if targets_by_peer[peer]]
+        for tier, relationships in GAP_ANALYSIS_TIERS:
+            if not remaining:
+                break
+            targets = [t for peer in remaining for t in targets_by_peer[peer]]
+            tier_found: Dict[str, List[Tuple[int, int, List[int]]]] = {
+                peer: [] for peer in remaining
+            }
+            for base in bases:
+                found = self.shortest_paths(base, targets, relationships)
+                for peer in remaining:
+                    for target in targets_by_peer[peer]:
+                        for edge_path in found.get(target, []):
+                            tier_found[peer].append((base, target, edge_path))
+            still_remaining = []
+            for peer in remaining:
+                parseable = [
+                    triple
+                    for triple in tier_found[peer]
+                    if self.documents[triple[0]] is not None
+                    and self.documents[triple[1]] is not None
+                ]
+                if parseable:
+                    logger.info(
+                        f"Gap Analysis: tier {tier} found {len(parseable)} paths in memory for {peer}."
+                    )
+                    out[peer] = parseable
+                else:
+                    still_remaining.append(peer)
+            remaining = still_remaining
+        return out
+
+    def gap_analysis(
+        self, name_1: str, name_2: str
+    ) -> Tuple[List[cre_defs.Document], List[Dict[str, Any]]]:
+        """Same contract as ``NEO_DB.gap_analysis``: ``(parsed_base, parsed_paths)``."""
+        logger.info(f"Performing in-memory gap analysis {name_1}>>{name_2}")
+        found = self._tiered_paths(
+            self._standard_nodes(name_1), {name_2: self._standard_nodes(name_2)}
+        )
+        parsed_paths = [
+            self._format_path(base, target, edge_path)
+            for base, target, edge_path in found[name_2]
+        ]
+        return self._parsed_base(name_1), parsed_paths
+
+    def gap_analysis_many(
+        self, name: str, peer_names: Iterable[str]
+    ) -> Dict[Tuple[str, str], Tuple[List[cre_defs.Document], List[Dict[str, Any]]]]:
+        """
+        ``gap_analysis`` results for ``name >> peer`` and ``peer >> name`` of every peer.
+
+        The importing standard's frontier is expanded once per tier for all peers;
+        reverse-direction paths are the same shortest paths walked backwards.
+        """
+        peers = [peer for peer in dict.fromkeys(peer_names) if peer != name]
+        logger.info(
+            f"Performing batched in-memory gap analysis {name} vs {len(peers)} peers"
+        )
+        found = self._tiered_paths(
+            self._standard_nodes(name),
+            {peer: self._standard_nodes(peer) for peer in peers},
+        )
+        parsed_base = self._parsed_base(name)
+        results: Dict[
+            Tuple[str, str], Tuple[List[cre_defs.Document], List[Dict[str, Any]]]
+        ] = {}
+        for peer in peers:
+            triples = found[peer]
+            results[(name, peer)] = (
+                parsed_base,
+                [
+                    self._format_path(base, target, edge_path)
+                    for base, target, edge_path in triples
+                ],
+            )
+            reverse_order = {
+                idx: pos for pos, idx in enumerate(self._standard_nodes(peer))
+            }
+            reverse = sorted(
+                triples, key=lambda triple: reverse_order.get(triple[1], 0)
+            )
+            results[(peer, name)] = (
+                self._parsed_base(peer),
+                [
+                    self._format_path(target, base, list(reversed(edge_path)))
+                    for base, target, edge_path in reverse
+                ],
+            )
+        return results
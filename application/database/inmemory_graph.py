@@ -1,7 +1,7 @@
 import sys
 import logging
 import networkx as nx
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from application.defs import cre_defs as defs
 
 
@@ -28,6 +28,12 @@ class Singleton_Graph_Storage(nx.DiGraph):
         raise ValueError("CRE_Graph is a singleton, please call instance() instead")
 
 
+# graph.graph key holding the topological position of every node with edges.
+# Kept on the networkx graph so every CRE_Graph sharing it sees one order;
+# add_link keeps it in step, anything else adding edges must drop it.
+TOPOLOGICAL_ORDER = "cre_topological_order"
+
+
 class CRE_Graph:
     __graph: nx.Graph = None
     __parent_child_subgraph = None
@@ -41,29 +47,20 @@ class CRE_Graph:
             self.__load_cre_graph(graph_data)
 
     def introduces_cycle(self, doc_from: defs.Document, link_to: defs.Link):
-        try:
-            ex = self.has_cycle()
-            if ex:
-                raise ValueError(
-                    "Existing graph contains cycle,"
-                    "this not a recoverable error,"
-                    f" manual database actions are required {ex}"
-                )
-        except nx.exception.NetworkXNoCycle:
-            pass  # happy path, we don't want cycles
-
-        # TODO: when this becomes too slow (e.g. when we are importing 1000s of CREs at once)
-        # we can instead add the edge find the cycle and then remove the edge
-        new_graph = self.__graph.copy()
+        """Return the cycle linking doc_from to link_to would close, or None.
 
-        # this needs our special add_edge but with the copied graph
-        new_graph = self.__add_graph_edge(
-            doc_from=doc_from, link_to=link_to, graph=new_graph
-        )
-        try:
-            return nx.find_cycle(new_graph)
-        except nx.exception.NetworkXNoCycle:
+        Checks only the new edge against an incrementally maintained
+        topological order (Pearce & Kelly, "A Dynamic Topological Sort
+        Algorithm for Directed Acyclic Graphs"): an edge that already agrees
+        with the order is accepted in O(1); otherwise only the nodes ordered
+        between its endpoints are searched. When the edge is acyclic the order
+        is adjusted to admit it, so add_link can insert it without re-checking.
+        """
+        self.__sync_order()
+        edge = self.__graph_edge(doc_from=doc_from, link_to=link_to, graph=self.__graph)
+        if edge is None:
             return None
+        return self.__admit_edge(edge[0], edge[1])
 
     def has_cycle(self):
         try:
@@ -155,30 +152,104 @@ class CRE_Graph:
         logger.debug(
             f"adding link {doc_from.id}, {link_to.document.id} ltype: {link_to.ltype}"
         )
-        if (
+        cre_to_cre = (
             doc_from.doctype == defs.Credoctypes.CRE
             and link_to.document.doctype == defs.Credoctypes.CRE
-        ):
+        )
+        if cre_to_cre:
             cycle = self.introduces_cycle(doc_from=doc_from, link_to=link_to)
             if cycle:
                 warn = f"A link between CREs {doc_from.id}-{doc_from.name} and {link_to.document.id}-{link_to.document.name} would introduce cycle {cycle}, skipping"
                 logger.warning(warn)
                 raise CycleDetectedError(warn)
 
-        self.__graph = self.__add_graph_edge(
-            doc_from=doc_from, link_to=link_to, graph=self.__graph
-        )
+        edge = self.__graph_edge(doc_from=doc_from, link_to=link_to, graph=self.__graph)
+        if edge is None:
+            return
+        if not cre_to_cre and TOPOLOGICAL_ORDER in self.__graph.graph:
+            if self.__admit_edge(edge[0], edge[1]):
+                # links to standards are not checked, but a cycle through them
+                # voids the order; the next CRE link rebuilds it and reports it
+                del self.__graph.graph[TOPOLOGICAL_ORDER]
+        self.__graph.add_edge(edge[0], edge[1], ltype=edge[2])
+
+    def __sync_order(self) -> None:
+        """Build the topological order if no add_link has kept one yet."""
+        if TOPOLOGICAL_ORDER in self.__graph.graph:
+            return
+        try:
+            order = {
+                node: position
+                for position, node in enumerate(nx.topological_sort(self.__graph))
+            }
+        except nx.NetworkXUnfeasible:
+            raise ValueError(
+                "Existing graph contains cycle,"
+                "this not a recoverable error,"
+                f" manual database actions are required {self.has_cycle()}"
+            )
+        self.__graph.graph[TOPOLOGICAL_ORDER] = order
+
+    def __admit_edge(self, src: str, dst: str) -> Optional[List[Tuple[str, str]]]:
+        """Pearce-Kelly insertion of src -> dst into the topological order.
+
+        Returns the cycle the edge would close (as a list of edges, like
+        nx.find_cycle), or None after reordering the affected nodes.
+        """
+        if src == dst:
+            return [(src, dst)]
+        order = self.__graph.graph[TOPOLOGICAL_ORDER]
+        for node in (src, dst):
+            if node not in order:
+                order[node] = len(order)
+        lower, upper = order[dst], order[src]
+        if lower > upper:
+            return None
+        graph = self.__graph
+
+        # everything reachable from dst that is ordered before src
+        parent: Dict[str, Optional[str]] = {dst: None}
+        stack = [dst]
+        while stack:
+            node = stack.pop()
+            for succ in graph.successors(node) if node in graph else ():
+                if succ == src:
+                    path = [(node, src)]
+                    while parent[node] is not None:
+                        path.append((parent[node], node))
+                        node = parent[node]
+                    return [(src, dst)] + path[::-1]
+                if succ not in parent and order[succ] < upper:
+                    parent[succ] = node
+                    stack.append(succ)
+
+        # everything reaching src that is ordered after dst
+        backward = {src}
+        stack = [src]
+        while stack:
+            node = stack.pop()
+            for pred in graph.predecessors(node) if node in graph else ():
+                if pred not in backward and order[pred] > lower:
+                    backward.add(pred)
+                    stack.append(pred)
+
+        # the two sets are disjoint (no path dst -> src); reuse their positions
+        # with the ancestors of src first
+        affected = sorted(backward, key=order.get) + sorted(parent, key=order.get)
+        positions = sorted(order[node] for node in affected)
+        for node, position in zip(affected, positions):
+            order[node] = position
+        return None
 
-    def __add_graph_edge(
+    def __graph_edge(
         self,
         doc_from: defs.Document,
         link_to: defs.Link,
         graph: nx.DiGraph,
-    ) -> nx.digraph:
+    ) -> Optional[Tuple[str, str, str]]:
         """
-        Adds a directed edge to the graph provided
-        called by both graph population and speculative cycle finding methods
-        hence why it accepts a graph and returns a graph
+        The (from, to, ltype) edge a link maps to in the graph provided,
+        or None if the graph should not change
         """
         if doc_from.name == link_to.document.name:
             raise ValueError(
@@ -187,51 +258,27 @@ class CRE_Graph:
         to_doctype = defs.Credoctypes.CRE.value
         if link_to.document.doctype != defs.Credoctypes.CRE.value:
             to_doctype = "Node"
+        graph_from = f"{doc_from.doctype.value}: {doc_from.id}"
+        graph_to = f"{to_doctype}: {link_to.document.id}"
 
         if doc_from.doctype == defs.Credoctypes.CRE:
             if link_to.ltype == defs.LinkTypes.Contains:
-                graph.add_edge(
-                    f"{doc_from.doctype.value}: {doc_from.id}",
-                    f"{to_doctype}: {link_to.document.id}",
-                    ltype=link_to.ltype.value,
-                )
+                return graph_from, graph_to, link_to.ltype.value
             elif link_to.ltype == defs.LinkTypes.PartOf:
-                graph.add_edge(
-                    f"{to_doctype}: {link_to.document.id}",
-                    f"{doc_from.doctype.value}: {doc_from.id}",
-                    ltype=defs.LinkTypes.Contains.value,
-                )
+                return graph_to, graph_from, defs.LinkTypes.Contains.value
             elif link_to.ltype == defs.LinkTypes.Related:
                 # do nothing if the opposite already exists in the graph, otherwise we introduce a cycle
-                if graph.has_edge(
-                    f"{to_doctype}: {link_to.document.id}",
-                    f"{doc_from.doctype.value}: {doc_from.id}",
-                ):
-                    return graph
-
-                graph.add_edge(
-                    f"{doc_from.doctype.value}: {doc_from.id}",
-                    f"{to_doctype}: {link_to.document.id}",
-                    ltype=defs.LinkTypes.Related.value,
-                )
+                if graph.has_edge(graph_to, graph_from):
+                    return None
+                return graph_from, graph_to, defs.LinkTypes.Related.value
             elif (
                 link_to.ltype == defs.LinkTypes.LinkedTo
                 or link_to.ltype == defs.LinkTypes.AutomaticallyLinkedTo
             ):
-                graph.add_edge(
-                    f"{doc_from.doctype.value}: {doc_from.id}",
-                    f"{to_doctype}: {link_to.document.id}",
-                    ltype=link_to.ltype.value,
-                )
+                return graph_from, graph_to, link_to.ltype.value
             else:
                 raise ValueError(f"link type {link_to.ltype.value} not recognized")
-        else:
-            graph.add_edge(
-                f"{doc_from.doctype.value}: {doc_from.id}",
-                f"{to_doctype}: {link_to.document.id}",
-                ltype=link_to.ltype.value,
-            )
-        return graph
+        return graph_from, graph_to, link_to.ltype.value
 
     def __load_cre_graph(self, documents: List[defs.Document]):
         for doc in documents:
@@ -0,0 +1,304 @@
+"""Full-text index behind ``Node_collection.text_search``.
+
+One row per node / CRE in ``text_search_index``: a ``title`` (name, section id,
+section / CRE name, external id) ranked above a ``body`` (subsection,
+description, link / CRE description).
+
+* Postgres: plain table with a generated, weighted ``tsvector`` column and a GIN
+  index.
+* SQLite: FTS5 virtual table.
+
+Alembic ``5c1e7a9d2b64`` creates and backfills the index. Schemas built with
+``create_all`` (tests, scratch caches) get it from ``create``, which
+``db`` runs after ``create_all``. Nothing creates it while serving requests.
+
+Rows are written by ``add_node`` / ``add_cre``, the bulk import writer and the
+import apply engine.
+When the index is unavailable (SQLite built without FTS5, Postgres before the
+migration) ``ensure`` returns False and callers fall back to LIKE scans; it
+probes again after ``MISSING_RECHECK_SECONDS`` so a worker started before the
+migration picks the index up without a restart.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+TABLE = "text_search_index"
+NODE = "node"
+CRE = "cre"
+# how long a missing index is trusted before probing for it again
+MISSING_RECHECK_SECONDS = 60.0
+
+NODE_TITLE_COLUMNS = ("name", "section_id", "section")
+NODE_BODY_COLUMNS = ("subsection", "description", "link")
+CRE_TITLE_COLUMNS = ("name", "external_id")
+CRE_BODY_COLUMNS = ("description",)
+
+# Title matches rank above body matches (bm25 weights per FTS5 column).
+_FTS5_RANK = f"bm25({TABLE}, 0.0, 0.0, 10.0, 1.0)"
+
+# engine -> (available, probed at)
+_available: "weakref.WeakKeyDictionary[Any, Tuple[bool, float]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _dialect(conn: Any) -> str:
+    bind = conn.get_bind() if hasattr(conn, "get_bind") else conn
+    name: str = bind.dialect.name
+    return name
+
+
+def _engine(conn: Any) -> Any:
+    bind = conn.get_bind() if hasattr(conn, "get_bind") else conn
+    return getattr(bind, "engine", bind)
+
+
+def _joined(columns: Sequence[str]) -> str:
+    return " || ' ' || ".join(f"COALESCE({c}, '')" for c in columns)
+
+
+def _create_postgres(conn: Any) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            " doc_id VARCHAR PRIMARY KEY,"
+            " kind VARCHAR NOT NULL,"
+            " title TEXT NOT NULL DEFAULT '',"
+            " body TEXT NOT NULL DEFAULT '',"
+            " tsv tsvector GENERATED ALWAYS AS ("
+            "  setweight(to_tsvector('simple', title), 'A')"
+            "  || setweight(to_tsvector('simple', body), 'B')"
+            " ) STORED)"
+        )
+    )
+    conn.execute(
+        text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_tsv ON {TABLE} USING GIN (tsv)")
+    )
+
+
+def _create_sqlite(conn: Any) -> None:
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "doc_id UNINDEXED, kind UNINDEXED, title, body,"
+            " tokenize = 'unicode61')"
+        )
+    )
+
+
+def rebuild(conn: Any) -> int:
+    """Re-derive every index row from the node and cre tables."""
+    conn.execute(text(f"DELETE FROM {TABLE}"))
+    for kind, table, title, body in (
+        (NODE, "node", NODE_TITLE_COLUMNS, NODE_BODY_COLUMNS),
+        (CRE, "cre", CRE_TITLE_COLUMNS, CRE_BODY_COLUMNS),
+    ):
+        conn.execute(
+            text(
+                f"INSERT INTO {TABLE} (doc_id, kind, title, body)"
+                f" SELECT id, :kind, {_joined(title)}, {_joined(body)} FROM {table}"
+            ),
+            {"kind": kind},
+        )
+    (count,) = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).one()
+    return int(count)
+
+
+def create(conn: Any) -> bool:
+    """Create and backfill the index if it is missing; False without FTS5."""
+    _available.pop(_engine(conn), None)
+    if _exists(conn):
+        return True
+    try:
+        if _dialect(conn) == "postgresql":
+            _create_postgres(conn)
+        else:
+            _create_sqlite(conn)
+    except OperationalError as exc:
+        logger.warning("FTS5 unavailable, text search uses LIKE scans: %s", exc)
+        return False
+    logger.info("created %s, indexed %s documents", TABLE, rebuild(conn))
+    return True
+
+
+def drop(conn: Any) -> None:
+    _available.pop(_engine(conn), None)
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+def _exists(conn: Any) -> bool:
+    if _dialect(conn) == "sqlite":
+        return (
+            conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": TABLE}
+            ).first()
+            is not None
+        )
+    return bool(inspect(_engine(conn)).has_table(TABLE))
+
+
+def ensure(conn: Any) -> bool:
+    """True when the index can be queried and written through ``conn``."""
+    engine = _engine(conn)
+    now = time.monotonic()
+    if engine in _available:
+        available, probed_at = _available[engine]
+        if available or now - probed_at < MISSING_RECHECK_SECONDS:
+            return available
+    available = _dialect(conn) in ("postgresql", "sqlite") and _exists(conn)
+    if not available:
+        logger.warning(
+            "%s missing (run the Alembic migrations); text search uses LIKE scans",
+            TABLE,
+        )
+    _available[engine] = (available, now)
+    return available
+
+
+def _values(row: Any, columns: Iterable[str]) -> str:
+    return " ".join(str(getattr(row, c, None) or "") for c in columns)
+
+
+def _upsert(conn: Any, doc_id: str, kind: str, title: str, body: str) -> None:
+    _upsert_many(conn, [{"doc_id": doc_id, "kind": kind, "title": title, "body": body}])
+
+
+def _upsert_many(conn: Any, params: List[Dict[str, str]]) -> None:
+    if not params:
+        return
+    if _dialect(conn) == "postgresql":
+        conn.execute(
+            text(
+                f"INSERT INTO {TABLE} (doc_id, kind, title, body)"
+                " VALUES (:doc_id, :kind, :title, :body)"
+                " ON CONFLICT (doc_id) DO UPDATE"
+                " SET kind = EXCLUDED.kind, title = EXCLUDED.title, body = EXCLUDED.body"
+            ),
+            params,
+        )
+        return
+    conn.execute(text(f"DELETE FROM {TABLE} WHERE doc_id = :doc_id"), params)
+    conn.execute(
+        text(
+            f"INSERT INTO {TABLE} (doc_id, kind, title, body)"
+            " VALUES (:doc_id, :kind, :title, :body)"
+        ),
+        params,
+    )
+
+
+def index_node(conn: Any, node: Any) -> None:
+    """Write (or refresh) the index row of a flushed ``db.Node``; no commit."""
+    if node.id and ensure(conn):
+        _upsert(
+            conn,
+            node.id,
+            NODE,
+            _values(node, NODE_TITLE_COLUMNS),
+            _values(node, NODE_BODY_COLUMNS),
+        )
+
+
+def index_nodes(conn: Any, nodes: Iterable[Any]) -> None:
+    """``index_node`` for many flushed nodes in one executemany; no commit."""
+    params = [
+        {
+            "doc_id": node.id,
+            "kind": NODE,
+            "title": _values(node, NODE_TITLE_COLUMNS),
+            "body": _values(node, NODE_BODY_COLUMNS),
+        }
+        for node in nodes
+        if node.id
+    ]
+    if params and ensure(conn):
+        _upsert_many(conn, params)
+
+
+def index_cre(conn: Any, cre: Any) -> None:
+    """Write (or refresh) the index row of a flushed ``db.CRE``; no commit."""
+    if cre.id and ensure(conn):
+        _upsert(
+            conn,
+            cre.id,
+            CRE,
+            _values(cre, CRE_TITLE_COLUMNS),
+            _values(cre, CRE_BODY_COLUMNS),
+        )
+
+
+def remove(conn: Any, doc_ids: Iterable[str]) -> None:
+    ids = [i for i in doc_ids if i]
+    if ids and ensure(conn):
+        for doc_id in ids:
+            conn.execute(
+                text(f"DELETE FROM {TABLE} WHERE doc_id = :doc_id"), {"doc_id": doc_id}
+            )
+
+
+def _tokens(term: str) -> List[str]:
+    return re.findall(r"[^\W_]+", term.lower())
+
+
+def _fts5_query(terms: Iterable[str]) -> str:
+    # Each term is a phrase whose last token may be a prefix: "xml external ent" *
+    phrases = [f'"{" ".join(tokens)}" *' for tokens in map(_tokens, terms) if tokens]
+    return " OR ".join(phrases)
+
+
+def _tsquery(terms: Iterable[str]) -> str:
+    phrases = [
+        "(" + " <-> ".join(tokens[:-1] + [tokens[-1] + ":*"]) + ")"
+        for tokens in map(_tokens, terms)
+        if tokens
+    ]
+    return " | ".join(phrases)
+
+
+def search(
+    conn: Any, terms: Iterable[str], limit: Optional[int] = None
+) -> List[Tuple[str, str]]:
+    """Matches for any of ``terms`` as ``(kind, doc_id)``, best first; all of
+    them unless ``limit`` is given."""
+    terms = list(terms)
+    params: Dict[str, Any] = {}
+    limit_clause = ""
+    if limit is not None:
+        params["limit"] = limit
+        limit_clause = " LIMIT :limit"
+    if _dialect(conn) == "postgresql":
+        query = _tsquery(terms)
+        if not query:
+            return []
+        rows = conn.execute(
+            text(
+                f"SELECT kind, doc_id FROM {TABLE}"
+                " WHERE tsv @@ to_tsquery('simple', :q)"
+                " ORDER BY ts_rank(tsv, to_tsquery('simple', :q)) DESC, doc_id"
+                + limit_clause
+            ),
+            {"q": query, **params},
+        )
+    else:
+        query = _fts5_query(terms)
+        if not query:
+            return []
+        rows = conn.execute(
+            text(
+                f"SELECT kind, doc_id FROM {TABLE} WHERE {TABLE} MATCH :q"
+                f" ORDER BY {_FTS5_RANK}, doc_id" + limit_clause
+            ),
+            {"q": query, **params},
+        )
+    return [(kind, doc_id) for kind, doc_id in rows]
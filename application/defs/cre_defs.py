@@ -1,9 +1,10 @@
 import re
 import json
+from collections import defaultdict
 from copy import copy
 from dataclasses import asdict, dataclass, field
 from enum import Enum, EnumMeta
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
 from application.defs import cre_exceptions
 
 
@@ -260,7 +261,11 @@ class Link:
             self.ltype = LinkTypes.from_str(self.ltype)
 
     def __hash__(self) -> int:
-        return hash(json.dumps(self.todict()))
+        return hash(self._bucket_key())
+
+    def _bucket_key(self) -> Tuple[Hashable, ...]:
+        """Fields every equal Link shares (__eq__ implies equal keys)."""
+        return (self.ltype.value, tuple(self.tags), self.document._identity())
 
     def __repr__(self) -> str:
         return json.dumps(self.todict())
@@ -289,6 +294,27 @@ class Link:
         return res
 
 
+def _same_members(mine: Iterable[Hashable], theirs: Iterable[Hashable]) -> bool:
+    return not mine or not theirs or set(mine) == set(theirs)
+
+
+def _contained(links: Iterable[Link], others: Iterable[Link]) -> bool:
+    candidates: Dict[Tuple[Hashable, ...], List[Link]] = defaultdict(list)
+    for other in others:
+        candidates[other._bucket_key()].append(other)
+    return all(link in candidates.get(link._bucket_key(), ()) for link in links)
+
+
+def _same_links(mine: List[Link], theirs: List[Link]) -> bool:
+    """Every link of either list equals one of the other, linear in the
+    number of links: only links with the same bucket key are compared."""
+    return (
+        len(mine) == len(theirs)
+        and _contained(mine, theirs)
+        and _contained(theirs, mine)
+    )
+
+
 @dataclass(init=True, repr=True, eq=True, order=True)
 class Document:
     name: str
@@ -301,40 +327,31 @@ class Document:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
     def __eq__(self, other: object) -> bool:
+        # links, tags and embeddings compare as sets; an empty list of tags or
+        # embeddings matches any other
         return (
             isinstance(other, type(self))
-            and self.id == other.id
-            and self.name == other.name
-            and self.doctype.value == other.doctype.value
-            and self.description == other.description
-            and len(self.links) == len(other.links)
-            and all(
-                [
-                    a in other.links and b in self.links
-                    for a in self.links
-                    for b in other.links
-                ]
-            )
-            and all(
-                [
-                    a in other.tags and b in self.tags
-                    for a in self.tags
-                    for b in other.tags
-                ]
-            )
-            and self.metadata == other.metadata
-            and all(
-                [
-                    a in other.embeddings and b in self.embeddings
-                    for a in self.embeddings
-                    for b in other.embeddings
-                ]
-            )
+            and self._identity() == other._identity()
             and self.embeddings_text == other.embeddings_text
+            and self.metadata == other.metadata
+            and _same_members(self.tags, other.tags)
+            and _same_members(self.embeddings, other.embeddings)
+            and _same_links(self.links, other.links)
         )
 
     def __hash__(self) -> int:
-        return hash(json.dumps(self.todict()))
+        return hash(self._hash_key())
+
+    def _identity(self) -> Tuple[Hashable, ...]:
+        return (self.id, self.name, self.doctype.value, self.description)
+
+    def _hash_key(self) -> Tuple[Hashable, ...]:
+        """Order-independent key over the fields __eq__ compares strictly."""
+        return (
+            self._identity(),
+            self.embeddings_text,
+            frozenset(link._bucket_key() for link in self.links),
+        )
 
     def shallow_copy(self) -> Any:
         """Returns a copy of itself minus the Links,
@@ -478,7 +495,7 @@ class Standard(Node):
         return res
 
     def __hash__(self) -> int:
-        return hash(json.dumps(self.todict()))
+        return hash(self._hash_key())
 
     def __eq__(self, other: object) -> bool:
         return (
@@ -520,7 +537,7 @@ class Tool(Standard):
         return res
 
     def __hash__(self) -> int:
-        return hash(json.dumps(self.todict()))
+        return hash(self._hash_key())
 
 
 @dataclass(eq=False)
@@ -26,3 +26,40 @@ def is_myopencre_enabled() -> bool:
 def is_login_enabled() -> bool:
     """Return True when auth UI / login is enabled via CRE_ENABLE_LOGIN."""
     return os.getenv("CRE_ENABLE_LOGIN", "").strip().lower() in TRUE_VALUES
+
+
+def is_inmemory_gap_analysis_enabled() -> bool:
+    """Return True when gap analysis paths are computed in-process (CRE_GA_ENGINE=inmemory)."""
+    return os.getenv("CRE_GA_ENGINE", "").strip().lower() == "inmemory"
+
+
+def is_batched_gap_analysis_enabled() -> bool:
+    """Return True when imports compute all peer gap analyses in one batch (CRE_GA_BATCHED)."""
+    return os.getenv("CRE_GA_BATCHED", "").strip().lower() in TRUE_VALUES
+
+
+def is_compressed_gap_analysis_storage_enabled() -> bool:
+    """Return True when new GA results are stored gzip'ed with a content hash (CRE_GA_STORAGE=compressed)."""
+    return os.getenv("CRE_GA_STORAGE", "").strip().lower() == "compressed"
+
+
+def is_response_cache_enabled() -> bool:
+    """Return True when hot read endpoints are served from the response cache (CRE_RESPONSE_CACHE)."""
+    return os.getenv("CRE_RESPONSE_CACHE", "").strip().lower() in TRUE_VALUES
+
+
+def is_response_cache_redis_enabled() -> bool:
+    """Return True when the response cache also uses a shared Redis tier (CRE_RESPONSE_CACHE_REDIS)."""
+    return os.getenv("CRE_RESPONSE_CACHE_REDIS", "").strip().lower() in TRUE_VALUES
+
+
+def is_query_embedding_cache_redis_enabled() -> bool:
+    """Return True when chatbot question embeddings are also cached in Redis (CRE_QUERY_EMBEDDING_CACHE_REDIS)."""
+    return (
+        os.getenv("CRE_QUERY_EMBEDDING_CACHE_REDIS", "").strip().lower() in TRUE_VALUES
+    )
+
+
+def is_bulk_import_enabled() -> bool:
+    """Return True when imports register standards through the batched bulk writer (CRE_BULK_IMPORT)."""
+    return os.getenv("CRE_BULK_IMPORT", "").strip().lower() in TRUE_VALUES
@@ -0,0 +1,305 @@
+"""
+Concurrent page fetching for embedding generation.
+
+``ContentFetcher`` loads node hyperlinks in one shared headless Firefox
+(Playwright's asyncio API on a background event loop thread). At most
+``CRE_EMBED_FETCH_CONCURRENCY`` pages (default 8) are open at once, and at most
+``CRE_EMBED_FETCH_PER_HOST`` (default 2) per host. ``submit`` returns a
+``concurrent.futures.Future``, so ``in_memory_embeddings.generate_embeddings``
+can queue the next batch's pages while it cleans and embeds the current one.
+PDFs are downloaded by ``_fetch_pdf_text_for_embeddings`` on the loop's thread
+pool.
+
+``ContentCache`` keeps fetched pages on disk, with the ETag (or Last-Modified)
+the server sent. The directory is ``CRE_EMBED_CONTENT_CACHE_DIR``, or
+``<cache>.pages/`` beside a file-backed SQLite cache. On a rerun, a HEAD
+request reads the page's current validator. If it matches the stored one, the
+stored page is reused instead of being rendered again. Pages served without a
+validator are always refetched.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from application.utils.env import env_int
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FETCH_ATTEMPTS = 9
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 2
+
+
+@dataclass(frozen=True)
+class FetchedPage:
+    text: Optional[str] = None  # body text, or the extracted text of a PDF
+    html: Optional[str] = None  # rendered document; None for PDFs
+    validator: Optional[str] = None  # ETag, else Last-Modified
+
+
+def _validator(headers: Any) -> Optional[str]:
+    if not headers:
+        return None
+    validator: Optional[str] = (
+        headers.get("etag") or headers.get("last-modified") or None
+    )
+    return validator
+
+
+def _current_validator(url: str) -> Optional[str]:
+    """The validator the server reports for ``url`` now; None if unknown."""
+    try:
+        response = requests.head(
+            url,
+            timeout=(10, 30),
+            allow_redirects=True,
+            headers={
+                "User-Agent": os.environ.get(
+                    "CRE_EMBED_REQUEST_USER_AGENT",
+                    "OpenCRE-embeddings/1.0 (+https://opencre.org)",
+                )
+            },
+        )
+    except requests.RequestException as exc:
+        logger.debug("HEAD %s failed: %s", url, exc)
+        return None
+    if not response.ok:
+        return None
+    return _validator(response.headers)
+
+
+class ContentCache:
+    """Fetched pages on disk, one JSON file per URL."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def for_database(cls, database: Any) -> Optional["ContentCache"]:
+        """The cache for ``database``'s runs, or None for non-file databases."""
+        directory = os.environ.get("CRE_EMBED_CONTENT_CACHE_DIR", "")
+        if not directory:
+            url = database.session.get_bind().url
+            if url.get_backend_name() != "sqlite" or url.database in (
+                None,
+                "",
+                ":memory:",
+            ):
+                return None
+            directory = f"{url.database}.pages"
+        return cls(directory)
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, url: str) -> Optional[FetchedPage]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.pop("url", None) != url:
+            return None
+        return FetchedPage(**entry)
+
+    def put(self, url: str, page: FetchedPage) -> None:
+        if not page.validator:
+            return
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, **asdict(page)}, f)
+        os.replace(tmp, path)
+
+
+class ContentFetcher:
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        per_host: int = DEFAULT_PER_HOST,
+        cache: Optional[ContentCache] = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.cache = cache
+        self.counters: Dict[str, int] = {"fetched": 0, "reused": 0, "failed": 0}
+        self._futures: Dict[str, "concurrent.futures.Future[FetchedPage]"] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # the following are only touched on the loop thread
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._pages: Optional[asyncio.Semaphore] = None
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._context: Any = None
+
+    @classmethod
+    def from_env(cls, cache: Optional[ContentCache] = None) -> "ContentFetcher":
+        return cls(
+            concurrency=env_int("CRE_EMBED_FETCH_CONCURRENCY", DEFAULT_CONCURRENCY),
+            per_host=env_int("CRE_EMBED_FETCH_PER_HOST", DEFAULT_PER_HOST),
+            cache=cache,
+        )
+
+    def start(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="embed-content-fetch", daemon=True
+        )
+        self._thread.start()
+        self._call(self._open())
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._call(self._close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._futures.clear()
+        logger.info("content fetcher closed: %s", self.counters)
+
+    def _call(self, coroutine: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def submit(self, url: str) -> "concurrent.futures.Future[FetchedPage]":
+        """Queue ``url``; a URL already queued or fetched shares its future."""
+        future = self._futures.get(url)
+        if future is None:
+            future = asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop)
+            self._futures[url] = future
+        return future
+
+    def fetch(self, url: str) -> FetchedPage:
+        return self.submit(url).result()
+
+    def release(self, urls: Iterable[str]) -> None:
+        """Forget fetched ``urls`` so their pages can be freed."""
+        for url in urls:
+            self._futures.pop(url, None)
+
+    async def _open(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._pages = asyncio.Semaphore(self.concurrency)
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.firefox.launch()
+        self._context = await self._browser.new_context()
+
+    async def _close(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        # the host's slot first, so waiting on a busy host holds no page
+        host = urlparse(url).netloc
+        limit = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with limit, self._pages:
+            yield
+
+    async def _fetch(self, url: str) -> FetchedPage:
+        loop = asyncio.get_running_loop()
+        cached = self.cache.get(url) if self.cache else None
+        async with self._slot(url):
+            if cached is not None:
+                current = await loop.run_in_executor(None, _current_validator, url)
+                if current is not None and current == cached.validator:
+                    self.counters["reused"] += 1
+                    return cached
+            page = await self._load(url)
+        if page.text or page.html:
+            self.counters["fetched"] += 1
+            if self.cache:
+                await loop.run_in_executor(None, self.cache.put, url, page)
+        else:
+            self.counters["failed"] += 1
+        return page
+
+    async def _load(self, url: str) -> FetchedPage:
+        from playwright.async_api import Error as PlaywrightError
+        from application.prompt_client import prompt_client
+
+        loop = asyncio.get_running_loop()
+
+        async def pdf() -> FetchedPage:
+            validator, text = await asyncio.gather(
+                loop.run_in_executor(None, _current_validator, url),
+                loop.run_in_executor(
+                    None, prompt_client._fetch_pdf_text_for_embeddings, url
+                ),
+            )
+            return FetchedPage(text=text, validator=validator)
+
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            if prompt_client._is_likely_pdf_url(url):
+                page = await pdf()
+                if page.text:
+                    return page
+                logger.warning(
+                    "PDF URL %s: no extractable text after fetch (attempt %s/%s)",
+                    url,
+                    attempt,
+                    FETCH_ATTEMPTS,
+                )
+                continue
+            try:
+                return await self._render(url)
+            except PlaywrightError as pe:
+                if prompt_client._playwright_forced_download_error(pe):
+                    logger.info(
+                        "Navigation triggered a download for %s; using PDF text extraction",
+                        url,
+                    )
+                    page = await pdf()
+                    if page.text:
+                        return page
+                    continue
+                logger.error(
+                    "Playwright error for %s (attempt %s/%s): %s",
+                    url,
+                    attempt,
+                    FETCH_ATTEMPTS,
+                    pe,
+                )
+        return FetchedPage()
+
+    async def _render(self, url: str) -> FetchedPage:
+        page = await self._context.new_page()
+        try:
+            logger.info(f"loading page {url}")
+            response = await page.goto(url)
+            text = await page.locator("body").inner_text()
+            html = await page.content()
+            return FetchedPage(
+                text=text,
+                html=html,
+                validator=_validator(response.headers if response else None),
+            )
+        finally:
+            try:
+                await page.close()
+            except Exception:
+                pass
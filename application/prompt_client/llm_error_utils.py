@@ -1,4 +1,6 @@
-from typing import Any
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
 
 
 def is_rate_limit_error(err: BaseException) -> bool:
@@ -27,3 +29,36 @@ def is_rate_limit_error(err: BaseException) -> bool:
             if code == 429:
                 return True
     return False
+
+
+def retry_after_seconds(err: BaseException) -> Optional[float]:
+    """The delay a rate-limited provider asked for (``Retry-After``), if any.
+
+    Accepts the header as seconds or as an HTTP date; looks at a
+    ``retry_after`` attribute and at the headers of the error's HTTP response.
+    """
+    value: Any = getattr(err, "retry_after", None)
+    if value is None:
+        for holder in (
+            getattr(err, "response", None),
+            getattr(err, "litellm_response_headers", None),
+        ):
+            headers = getattr(holder, "headers", holder)
+            if headers is None or not hasattr(headers, "get"):
+                continue
+            value = headers.get("retry-after") or headers.get("Retry-After")
+            if value is not None:
+                break
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -1,14 +1,14 @@
 from application.database import db
 from application.defs import cre_defs
+import concurrent.futures
 from datetime import datetime
 from multiprocessing import Pool
 from io import BytesIO
 from urllib.parse import urlparse
 
-from application.prompt_client import embed_alignment
+from application.prompt_client import content_fetcher, embed_alignment
+from application.utils import ann_index, dataset_generation, query_embedding_cache
 
-from scipy import sparse
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, List, Any, Tuple, Optional
 from pydantic import ValidationError
 from jinja2 import Environment, FileSystemLoader, StrictUndefined
@@ -18,7 +18,6 @@ try:
     from pypdf import PdfReader
 except ImportError:
     PdfReader = None  # type: ignore[misc, assignment]
-import numpy as np
 import os
 import json
 import re
@@ -107,7 +106,7 @@ def _render_chat_prompt(*, question: str, retrieved_knowledge: Optional[str]) ->
     )
 
 
-def is_valid_url(url):
+def is_valid_url(url: str) -> bool:
     return url.startswith("http://") or url.startswith("https://")
 
 
@@ -217,10 +216,7 @@ def _embedding_text_from_node_resource_fields(node: Any) -> str:
 
 class in_memory_embeddings:
     __instance = None
-    __webkit = None
-    __browser = None
-    __context = None
-    __playwright = None
+    _fetcher: Optional[content_fetcher.ContentFetcher] = None
     ai_client = None
 
     def __init__(cls):
@@ -230,113 +226,14 @@ class in_memory_embeddings:
 
     # Function to get text content from a URL
     def get_content(self, url) -> Optional[str]:
-        for attempts in range(1, 10):
-            if _is_likely_pdf_url(url):
-                text = _fetch_pdf_text_for_embeddings(url)
-                if text:
-                    return text
-                logger.warning(
-                    "PDF URL %s: no extractable text after fetch (attempt %s/9)",
-                    url,
-                    attempts,
-                )
-                continue
-
-            # Playwright is for scrape/import embedding generation only — not chat.
-            # Import after the PDF branch so PDF-only extraction works without Playwright.
-            from playwright.sync_api import Error as PlaywrightError
-            from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
-
-            page = None
-            try:
-                page = self.__context.new_page()
-                logger.info(f"loading page {url}")
-                page.goto(url)
-                text = page.locator("body").inner_text()
-                return text
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    f"Error fetching content for URL: {url} - {str(e)} (attempt {attempts}/9)"
-                )
-                # Retry rather than silently embedding empty content.
-                continue
-            except PlaywrightTimeoutError as te:
-                logger.error(
-                    f"Page: {url}, took too long to load, playwright timeout (attempt {attempts}/9) - {str(te)}"
-                )
-                continue
-            except PlaywrightError as pe:
-                if _playwright_forced_download_error(pe):
-                    logger.info(
-                        "Navigation triggered a download for %s; using PDF text extraction",
-                        url,
-                    )
-                    text = _fetch_pdf_text_for_embeddings(url)
-                    if text:
-                        return text
-                    logger.warning(
-                        "PDF extraction failed for %s after download-style response (attempt %s/9)",
-                        url,
-                        attempts,
-                    )
-                    continue
-                logger.error(
-                    "Playwright error for %s (attempt %s/9): %s",
-                    url,
-                    attempts,
-                    pe,
-                )
-                continue
-            finally:
-                if page:
-                    try:
-                        page.close()
-                    except Exception:
-                        pass
-
-        return None
+        """Body text of ``url`` (extracted text for PDFs), via the content fetcher."""
+        return self._fetcher.fetch(url).text
 
     def get_html(self, url) -> Optional[str]:
         """Return raw HTML document string (for smart excerpt alignment). PDF URLs unsupported."""
-        for attempts in range(1, 10):
-            if _is_likely_pdf_url(url):
-                return None
-            from playwright.sync_api import Error as PlaywrightError
-            from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
-
-            page = None
-            try:
-                page = self.__context.new_page()
-                logger.info(f"loading page HTML {url}")
-                page.goto(url)
-                return page.content()
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    f"Error fetching HTML for URL: {url} - {str(e)} (attempt {attempts}/9)"
-                )
-                continue
-            except PlaywrightTimeoutError as te:
-                logger.error(
-                    f"Page: {url}, took too long to load, playwright timeout (attempt {attempts}/9) - {str(te)}"
-                )
-                continue
-            except PlaywrightError as pe:
-                if _playwright_forced_download_error(pe):
-                    return None
-                logger.error(
-                    "Playwright error for %s (attempt %s/9): %s",
-                    url,
-                    attempts,
-                    pe,
-                )
-                continue
-            finally:
-                if page:
-                    try:
-                        page.close()
-                    except Exception:
-                        pass
-        return None
+        if _is_likely_pdf_url(url):
+            return None
+        return self._fetcher.fetch(url).html
 
     def _ensure_smart_embed_caches(self) -> None:
         if not hasattr(self, "_smart_page_html_cache"):
@@ -366,25 +263,31 @@ class in_memory_embeddings:
         self.ai_client = ai_client
         return self
 
-    def setup_playwright(self):
+    def setup_playwright(self, database: Optional[db.Node_collection] = None):
+        """Start the content fetcher's browser; pages fetched for ``database``'s
+        embeddings are cached on disk (see ``content_fetcher.ContentCache``)."""
         # in case we want to run without connectivity to ai_client or playwright
         import nltk
-        from playwright.sync_api import sync_playwright
 
-        self.__playwright = sync_playwright().start()
         nltk.download("punkt")
         nltk.download("punkt_tab")
         nltk.download("stopwords")
-        self.__firefox = self.__playwright.firefox
-        self.__browser = self.__firefox.launch()  # headless=False, slow_mo=1000)
-        self.__context = self.__browser.new_context()
+        self._fetcher = content_fetcher.ContentFetcher.from_env(
+            cache=(
+                content_fetcher.ContentCache.for_database(database)
+                if database is not None
+                else None
+            )
+        )
+        self._fetcher.start()
 
     def teardown_playwright(self):
         if hasattr(self, "_smart_page_html_cache"):
             self._smart_page_html_cache.clear()
             self._smart_alignment_cache.clear()
-        self.__browser.close()
-        self.__playwright.stop()
+        if self._fetcher is not None:
+            self._fetcher.close()
+            self._fetcher = None
 
     def find_missing_embeddings(self, database: db.Node_collection) -> List[str]:
         """
@@ -455,258 +358,330 @@ class in_memory_embeddings:
 
         batch_size = max(1, get_provider_batch_size())
 
-        for i in range(0, len(missing_embeddings), batch_size):
-            batch_ids = missing_embeddings[i : i + batch_size]
-            batch_contents: List[str] = []
-            # (db_obj, doc_type, embedding_text, embeddings_url_override or None for default link)
-            batch_records: List[Tuple[Any, Any, str, Optional[str]]] = []
-
-            # Collect all batch content first, so embeddings are batched in one provider call.
-            for db_id in batch_ids:
-                # ``missing_embeddings`` mixes CRE primary keys and node primary keys.
-                # Only call ``get_nodes`` when the id exists in ``node``; CRE ids are not
-                # nodes and would otherwise trigger spurious get_nodes "not found" paths.
-                if not database.has_node_with_db_id(db_id):
-                    cre = database.get_cre_by_db_id(db_id)
-                    if cre:
+        batches = [
+            missing_embeddings[i : i + batch_size]
+            for i in range(0, len(missing_embeddings), batch_size)
+        ]
+        # Pipelined: while a batch is being built, the pages of the next one are
+        # fetched and the previous one is embedded.
+        looked_up: Dict[str, Any] = {}
+        queued: List[List[str]] = []
+        if self._fetcher is not None and batches:
+            queued.append(self._prefetch(database, batches[0], looked_up))
+        pending: Optional[Tuple[List[Any], Any]] = None
+        stored = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as embedder:
+            for n, batch_ids in enumerate(batches):
+                if self._fetcher is not None and n + 1 < len(batches):
+                    queued.append(self._prefetch(database, batches[n + 1], looked_up))
+                batch_contents, batch_records = self._collect_batch(
+                    database, batch_ids, looked_up
+                )
+                if self._fetcher is not None:
+                    # the next batch, already queued, may share pages
+                    still_queued = set().union(*queued[n + 1 :])
+                    self._fetcher.release(
+                        [url for url in queued[n] if url not in still_queued]
+                    )
+                if pending is not None:
+                    stored += self._store_embeddings(database, *pending)
+                    pending = None
+                if batch_contents:
+                    pending = (
+                        batch_records,
+                        embedder.submit(self._embed_batch, batch_contents),
+                    )
+            if pending is not None:
+                stored += self._store_embeddings(database, *pending)
+
+        ann_index.AnnIndexRegistry.instance().persist(database)
+        if stored and getattr(database, "session", None) is not None:
+            # similarity and chatbot answers read the new vectors
+            dataset_generation.bump()
+
+    def _collect_batch(
+        self,
+        database: db.Node_collection,
+        batch_ids: List[str],
+        looked_up: Dict[str, Any],
+    ) -> Tuple[List[str], List[Tuple[Any, Any, str, Optional[str]]]]:
+        """The texts to embed for ``batch_ids`` and their records; ids whose
+        stored embedding already has the same content are skipped. Nodes
+        ``_prefetch`` looked up are taken from ``looked_up``."""
+        batch_contents: List[str] = []
+        # (db_obj, doc_type, embedding_text, embeddings_url_override or None for default link)
+        batch_records: List[Tuple[Any, Any, str, Optional[str]]] = []
+
+        # Collect all batch content first, so embeddings are batched in one provider call.
+        for db_id in batch_ids:
+            # ``missing_embeddings`` mixes CRE primary keys and node primary keys.
+            # Only call ``get_nodes`` when the id exists in ``node``; CRE ids are not
+            # nodes and would otherwise trigger spurious get_nodes "not found" paths.
+            if not database.has_node_with_db_id(db_id):
+                cre = database.get_cre_by_db_id(db_id)
+                if cre:
+                    content = normalize_embeddings_content(
+                        f"{cre.doctype}\n name:{cre.name}\n description:{cre.description}\n id:{cre.id}\n "
+                    )
+                    if getattr(cre, "metadata", None):
+                        metadata_json = stable_json(getattr(cre, "metadata", None))
                         content = normalize_embeddings_content(
-                            f"{cre.doctype}\n name:{cre.name}\n description:{cre.description}\n id:{cre.id}\n "
+                            f"{content}\nmetadata:{metadata_json}"
                         )
-                        if getattr(cre, "metadata", None):
-                            metadata_json = stable_json(getattr(cre, "metadata", None))
-                            content = normalize_embeddings_content(
-                                f"{content}\nmetadata:{metadata_json}"
-                            )
-                        logger.info(f"making embedding for {content}")
-                        dbcre = db.dbCREfromCRE(cre)
-                        if not dbcre:
-                            logger.fatal(cre, "cannot be converted to database CRE")
-                            continue
-                        dbcre.id = db_id
-
-                        existing = database.get_embedding(db_id)
-                        if (
-                            existing
-                            and normalize_embeddings_content(
-                                getattr(existing[0], "embeddings_content", None)
-                            )
-                            == content
-                        ):
-                            logger.debug(
-                                f"Skipping embedding for CRE {cre.id} ({db_id}): content unchanged"
-                            )
-                            continue
+                    logger.info(f"making embedding for {content}")
+                    dbcre = db.dbCREfromCRE(cre)
+                    if not dbcre:
+                        logger.fatal(cre, "cannot be converted to database CRE")
+                        continue
+                    dbcre.id = db_id
 
-                        batch_contents.append(content)
-                        batch_records.append(
-                            (dbcre, cre_defs.Credoctypes.CRE, content, None)
+                    existing = database.get_embedding(db_id)
+                    if (
+                        existing
+                        and normalize_embeddings_content(
+                            getattr(existing[0], "embeddings_content", None)
                         )
-                    else:
-                        logger.warning(
-                            f"missing embeddings id={db_id} not found in CRE or Node"
+                        == content
+                    ):
+                        logger.debug(
+                            f"Skipping embedding for CRE {cre.id} ({db_id}): content unchanged"
                         )
-                    continue
+                        continue
+
+                    batch_contents.append(content)
+                    batch_records.append(
+                        (dbcre, cre_defs.Credoctypes.CRE, content, None)
+                    )
+                else:
+                    logger.warning(
+                        f"missing embeddings id={db_id} not found in CRE or Node"
+                    )
+                continue
 
-                nodes = database.get_nodes(db_id=db_id)
+            nodes = looked_up.pop(db_id, None) or database.get_nodes(db_id=db_id)
 
-                if nodes:
-                    node = nodes[0] if isinstance(nodes, list) else nodes
-                    resolved_embeddings_url: Optional[str] = None
-                    if is_valid_url(node.hyperlink):
-                        smart_mode = (
-                            os.environ.get("CRE_EMBED_SMART_EXTRACT", "on")
-                            .lower()
-                            .strip()
-                        )
-                        self._ensure_smart_embed_caches()
-                        use_smart = (
-                            smart_mode in ("on", "shadow")
-                            and not _is_likely_pdf_url(node.hyperlink)
-                            and self.ai_client is not None
-                            and hasattr(self.ai_client, "align_embedding_span_json")
+            if nodes:
+                node = nodes[0] if isinstance(nodes, list) else nodes
+                resolved_embeddings_url: Optional[str] = None
+                if is_valid_url(node.hyperlink):
+                    smart_mode = (
+                        os.environ.get("CRE_EMBED_SMART_EXTRACT", "on").lower().strip()
+                    )
+                    self._ensure_smart_embed_caches()
+                    use_smart = (
+                        smart_mode in ("on", "shadow")
+                        and not _is_likely_pdf_url(node.hyperlink)
+                        and self.ai_client is not None
+                        and hasattr(self.ai_client, "align_embedding_span_json")
+                    )
+                    content = ""
+                    if use_smart:
+                        page_key = embed_alignment.normalize_page_cache_key(
+                            node.hyperlink
                         )
-                        content = ""
-                        if use_smart:
-                            page_key = embed_alignment.normalize_page_cache_key(
-                                node.hyperlink
-                            )
-                            html = self._smart_page_html_cache.get(page_key)
-                            if html is None:
-                                html = self.get_html(node.hyperlink)
-                                if html:
-                                    self._smart_page_html_cache[page_key] = html
+                        html = self._smart_page_html_cache.get(page_key)
+                        if html is None:
+                            html = self.get_html(node.hyperlink)
                             if html:
-                                full_clean = normalize_embeddings_content(
-                                    self.clean_content(
-                                        embed_alignment.html_body_inner_text(html)
-                                    )
+                                self._smart_page_html_cache[page_key] = html
+                        if html:
+                            full_clean = normalize_embeddings_content(
+                                self.clean_content(
+                                    embed_alignment.html_body_inner_text(html)
                                 )
-                                conf_thr = float(
-                                    os.environ.get("CRE_EMBED_SMART_CONFIDENCE", "0.65")
+                            )
+                            conf_thr = float(
+                                os.environ.get("CRE_EMBED_SMART_CONFIDENCE", "0.65")
+                            )
+                            try:
+                                out = embed_alignment.run_smart_extract(
+                                    html=html,
+                                    full_cleaned_body_text=full_clean,
+                                    node=node,
+                                    ai_client=self.ai_client,
+                                    mode=smart_mode,
+                                    page_cache_key=page_key,
+                                    alignment_cache=self._smart_alignment_cache,
+                                    confidence_threshold=conf_thr,
+                                )
+                            except Exception as e:
+                                logger.warning(
+                                    "Smart extract failed; falling back to full page: %s",
+                                    e,
                                 )
-                                try:
-                                    out = embed_alignment.run_smart_extract(
-                                        html=html,
-                                        full_cleaned_body_text=full_clean,
-                                        node=node,
-                                        ai_client=self.ai_client,
-                                        mode=smart_mode,
-                                        page_cache_key=page_key,
-                                        alignment_cache=self._smart_alignment_cache,
-                                        confidence_threshold=conf_thr,
+                                out = None
+                            if out is not None:
+                                if smart_mode == "shadow" or not out.used_excerpt:
+                                    content_base = full_clean
+                                else:
+                                    content_base = normalize_embeddings_content(
+                                        self.clean_content(out.embed_plain_text)
                                     )
-                                except Exception as e:
-                                    logger.warning(
-                                        "Smart extract failed; falling back to full page: %s",
-                                        e,
+                                marker = ""
+                                if (
+                                    smart_mode == "on"
+                                    and out.used_excerpt
+                                    and out.marker_start_bid
+                                ):
+                                    marker = embed_alignment.embedding_cache_marker(
+                                        used_excerpt=True,
+                                        start_bid=out.marker_start_bid,
+                                        end_bid=out.marker_end_bid,
+                                        resolved_url=out.resolved_embeddings_url,
                                     )
-                                    out = None
-                                if out is not None:
-                                    if smart_mode == "shadow" or not out.used_excerpt:
-                                        content_base = full_clean
-                                    else:
-                                        content_base = normalize_embeddings_content(
-                                            self.clean_content(out.embed_plain_text)
-                                        )
-                                    marker = ""
-                                    if (
-                                        smart_mode == "on"
-                                        and out.used_excerpt
-                                        and out.marker_start_bid
-                                    ):
-                                        marker = embed_alignment.embedding_cache_marker(
-                                            used_excerpt=True,
-                                            start_bid=out.marker_start_bid,
-                                            end_bid=out.marker_end_bid,
-                                            resolved_url=out.resolved_embeddings_url,
-                                        )
-                                    if getattr(node, "metadata", None):
-                                        metadata_json = stable_json(
-                                            getattr(node, "metadata", None)
-                                        )
-                                        content = normalize_embeddings_content(
-                                            f"{content_base}\nmetadata:{metadata_json}{marker}"
-                                        )
-                                    else:
-                                        content = normalize_embeddings_content(
-                                            f"{content_base}{marker}"
-                                        )
-                                    if smart_mode == "shadow":
-                                        resolved_embeddings_url = node.hyperlink
-                                    else:
-                                        resolved_embeddings_url = (
-                                            out.resolved_embeddings_url
-                                            or node.hyperlink
-                                        )
-                                    if smart_mode == "shadow":
-                                        logger.info(
-                                            "Smart extract shadow for %s: rationale=%s",
-                                            node.hyperlink,
-                                            out.rationale[:200],
-                                        )
-                        if not content:
-                            raw_content = self.get_content(node.hyperlink)
-                            content_from_remote = ""
-                            if raw_content:
-                                content_from_remote = normalize_embeddings_content(
-                                    self.clean_content(raw_content)
-                                )
                                 if getattr(node, "metadata", None):
                                     metadata_json = stable_json(
                                         getattr(node, "metadata", None)
                                     )
-                                    content_from_remote = normalize_embeddings_content(
-                                        f"{content_from_remote}\nmetadata:{metadata_json}"
+                                    content = normalize_embeddings_content(
+                                        f"{content_base}\nmetadata:{metadata_json}{marker}"
                                     )
-                            if content_from_remote:
-                                content = content_from_remote
-                            else:
-                                content = _embedding_text_from_node_resource_fields(
-                                    node
-                                )
-                                if raw_content:
-                                    logger.info(
-                                        "Remote text for %s cleaned to empty; using stored node fields for embedding",
-                                        node.hyperlink,
+                                else:
+                                    content = normalize_embeddings_content(
+                                        f"{content_base}{marker}"
                                     )
+                                if smart_mode == "shadow":
+                                    resolved_embeddings_url = node.hyperlink
                                 else:
+                                    resolved_embeddings_url = (
+                                        out.resolved_embeddings_url or node.hyperlink
+                                    )
+                                if smart_mode == "shadow":
                                     logger.info(
-                                        "No extractable remote text for %s; using stored node fields for embedding",
+                                        "Smart extract shadow for %s: rationale=%s",
                                         node.hyperlink,
+                                        out.rationale[:200],
                                     )
-                            if not content:
-                                logger.warning(
-                                    "Skipping embedding for %s: no text from remote or stored node fields",
+                    if not content:
+                        raw_content = self.get_content(node.hyperlink)
+                        content_from_remote = ""
+                        if raw_content:
+                            content_from_remote = normalize_embeddings_content(
+                                self.clean_content(raw_content)
+                            )
+                            if getattr(node, "metadata", None):
+                                metadata_json = stable_json(
+                                    getattr(node, "metadata", None)
+                                )
+                                content_from_remote = normalize_embeddings_content(
+                                    f"{content_from_remote}\nmetadata:{metadata_json}"
+                                )
+                        if content_from_remote:
+                            content = content_from_remote
+                        else:
+                            content = _embedding_text_from_node_resource_fields(node)
+                            if raw_content:
+                                logger.info(
+                                    "Remote text for %s cleaned to empty; using stored node fields for embedding",
                                     node.hyperlink,
                                 )
-                                continue
-                            resolved_embeddings_url = None
-                    else:
-                        content = normalize_embeddings_content(node.__repr__())
-
-                    dbnode = db.dbNodeFromNode(node)
-                    if not dbnode:
-                        logger.fatal(node, "cannot be converted to database Node")
-                        continue
+                            else:
+                                logger.info(
+                                    "No extractable remote text for %s; using stored node fields for embedding",
+                                    node.hyperlink,
+                                )
+                        if not content:
+                            logger.warning(
+                                "Skipping embedding for %s: no text from remote or stored node fields",
+                                node.hyperlink,
+                            )
+                            continue
+                        resolved_embeddings_url = None
+                else:
+                    content = normalize_embeddings_content(node.__repr__())
 
-                    dbnode.id = db_id
-                    logger.info(
-                        f"making embedding for {node.hyperlink if node.hyperlink else content}"
-                    )
+                dbnode = db.dbNodeFromNode(node)
+                if not dbnode:
+                    logger.fatal(node, "cannot be converted to database Node")
+                    continue
 
-                    existing = database.get_embedding(db_id)
-                    if (
-                        existing
-                        and normalize_embeddings_content(
-                            getattr(existing[0], "embeddings_content", None)
-                        )
-                        == content
-                    ):
-                        logger.debug(
-                            f"Skipping embedding for {node.name} ({db_id}): content unchanged"
-                        )
-                        continue
+                dbnode.id = db_id
+                logger.info(
+                    f"making embedding for {node.hyperlink if node.hyperlink else content}"
+                )
 
-                    batch_contents.append(content)
-                    batch_records.append(
-                        (dbnode, node.doctype, content, resolved_embeddings_url)
+                existing = database.get_embedding(db_id)
+                if (
+                    existing
+                    and normalize_embeddings_content(
+                        getattr(existing[0], "embeddings_content", None)
+                    )
+                    == content
+                ):
+                    logger.debug(
+                        f"Skipping embedding for {node.name} ({db_id}): content unchanged"
                     )
                     continue
 
-                logger.warning(
-                    f"missing embeddings id={db_id} not found in CRE or Node"
+                batch_contents.append(content)
+                batch_records.append(
+                    (dbnode, node.doctype, content, resolved_embeddings_url)
                 )
+                continue
+
+            logger.warning(f"missing embeddings id={db_id} not found in CRE or Node")
+        return batch_contents, batch_records
 
-            if not batch_contents:
+    def _prefetch(
+        self,
+        database: db.Node_collection,
+        batch_ids: List[str],
+        looked_up: Dict[str, Any],
+    ) -> List[str]:
+        """Look up the nodes of ``batch_ids`` into ``looked_up`` and queue their
+        pages on the content fetcher; returns the URLs queued."""
+        urls = []
+        for db_id in batch_ids:
+            if not database.has_node_with_db_id(db_id):
+                continue
+            nodes = database.get_nodes(db_id=db_id)
+            looked_up[db_id] = nodes
+            if not nodes:
                 continue
+            node = nodes[0] if isinstance(nodes, list) else nodes
+            if is_valid_url(node.hyperlink):
+                self._fetcher.submit(node.hyperlink)
+                urls.append(node.hyperlink)
+        return urls
 
-            embeddings = self.ai_client.get_text_embeddings(batch_contents)  # type: ignore[arg-type]
+    def _embed_batch(self, batch_contents: List[str]) -> List[Any]:
+        embeddings: List[Any] = self.ai_client.get_text_embeddings(batch_contents)  # type: ignore[arg-type]
 
-            # Normalize shape: some providers may return a single vector even for list input.
-            if embeddings and isinstance(embeddings[0], (int, float)):  # type: ignore[index]
-                logger.warning(
-                    "provider returned unexpected embedding shape for batch; falling back to per-item calls"
-                )
-                embeddings = [self.ai_client.get_text_embeddings(t) for t in batch_contents]  # type: ignore[arg-type]
+        # Normalize shape: some providers may return a single vector even for list input.
+        if embeddings and isinstance(embeddings[0], (int, float)):  # type: ignore[index]
+            logger.warning(
+                "provider returned unexpected embedding shape for batch; falling back to per-item calls"
+            )
+            embeddings = [self.ai_client.get_text_embeddings(t) for t in batch_contents]  # type: ignore[arg-type]
 
-            if len(embeddings) != len(batch_records):  # type: ignore[arg-type]
-                logger.warning(
-                    "provider returned embeddings length mismatch; falling back to per-item calls"
-                )
-                embeddings = [
-                    self.ai_client.get_text_embeddings(t)  # type: ignore[arg-type]
-                    for t in batch_contents
-                ]
-
-            for rec, emb in zip(batch_records, embeddings):
-                db_obj, doc_type, embedding_text, emb_url_override = rec
-                database.add_embedding(
-                    db_obj,
-                    doc_type,
-                    emb,
-                    embedding_text,
-                    embeddings_url=emb_url_override,
-                )
+        if len(embeddings) != len(batch_contents):  # type: ignore[arg-type]
+            logger.warning(
+                "provider returned embeddings length mismatch; falling back to per-item calls"
+            )
+            embeddings = [
+                self.ai_client.get_text_embeddings(t)  # type: ignore[arg-type]
+                for t in batch_contents
+            ]
+        return embeddings
+
+    def _store_embeddings(
+        self,
+        database: db.Node_collection,
+        batch_records: List[Tuple[Any, Any, str, Optional[str]]],
+        embedded: "concurrent.futures.Future[List[Any]]",
+    ) -> int:
+        stored = 0
+        for rec, emb in zip(batch_records, embedded.result()):
+            db_obj, doc_type, embedding_text, emb_url_override = rec
+            database.add_embedding(
+                db_obj,
+                doc_type,
+                emb,
+                embedding_text,
+                embeddings_url=emb_url_override,
+            )
+            stored += 1
+        return stored
 
 
 class PromptHandler:
@@ -762,7 +737,7 @@ class PromptHandler:
                 database
             )
             if missing_embeddings:
-                self.embeddings_instance.setup_playwright()
+                self.embeddings_instance.setup_playwright(database)
                 self.embeddings_instance.generate_embeddings(
                     database, missing_embeddings
                 )
@@ -1016,46 +991,21 @@ class PromptHandler:
 
             return
 
-        self.embeddings_instance.setup_playwright()
+        self.embeddings_instance.setup_playwright(self.database)
         self.embeddings_instance.generate_embeddings_for(self.database, item_name)
         self.embeddings_instance.teardown_playwright()
 
-    def __load_cre_embeddings(
-        self, db_embeddings: Dict[str, List[float]]
-    ) -> Tuple[List[List[float]], List[str]]:
-        existing_cre_embeddings = []
-        existing_cre_ids = []
-        for id, e in db_embeddings.items():
-            existing_cre_embeddings.append(e)
-            existing_cre_ids.append(id)
-        return (
-            sparse.csr_matrix(np.array(existing_cre_embeddings).astype(np.float64)),
-            existing_cre_ids,
-        )
-
-    def __load_node_embeddings(
-        self, db_node_embeddings: Dict[str, List[float]]
-    ) -> Tuple[List[List[float]], List[str]]:
-        """
-            given a Dict of [node_id,[embeddings]] returns two lists,
-            one with the keys and one with the values, both in order so we can match values to keys
-            this is because Dict.values() and Dict.keys() does not guarantee the order of the elements
-
-        Args:
-            db_node_embeddings (Dict[str, List[float]]): _description_
-
-        Returns:
-            Tuple[List[List[float]], List[str]]: _description_
-        """
-        existing_node_embeddings = []
-        existing_node_ids = []
-        for id, e in db_node_embeddings.items():
-            existing_node_embeddings.append(e)
-            existing_node_ids.append(id)
-        return (
-            sparse.csr_matrix(np.array(existing_node_embeddings).astype(np.float64)),
-            existing_node_ids,
-        )
+    def _most_similar(
+        self, doc_type: str, embedding: List[float]
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Closest stored ``doc_type`` embedding via the process ANN index."""
+        index = ann_index.AnnIndexRegistry.instance().index_for(self.database, doc_type)
+        if index is None:
+            return None, None
+        matches = index.search(embedding, 1)
+        if not matches:
+            return None, None
+        return matches[0]
 
     def get_id_of_most_similar_cre(self, item_embedding: List[float]) -> Optional[str]:
         """
@@ -1077,31 +1027,21 @@ class PromptHandler:
             )
             return match_id
 
-        if not hasattr(self, "existing_cre_embeddings"):
-            (
-                self.existing_cre_embeddings,
-                self.existing_cre_ids,
-            ) = self.__load_cre_embeddings(
-                self.database.get_embeddings_by_doc_type(cre_defs.Credoctypes.CRE.value)
-            )
-        if not self.existing_cre_embeddings.getnnz() or not len(self.existing_cre_ids):
+        id, similarity = self._most_similar(
+            cre_defs.Credoctypes.CRE.value, item_embedding
+        )
+        if id is None:
             logger.warning(
                 "CRE embeddings empty in DB (e.g. CRE_NO_GEN_EMBEDDINGS=1 checkpoint run); "
                 "cannot match by similarity — skipping CRE link suggestions"
             )
             return None
-        embedding_array = sparse.csr_matrix(
-            np.array(item_embedding).reshape(1, -1)
-        )  # convert embedding into a 1-dimentional numpy array
-        similarities = cosine_similarity(embedding_array, self.existing_cre_embeddings)
-        most_similar_index = np.argmax(similarities)
-        if np.max(similarities) < SIMILARITY_THRESHOLD:
+        if similarity < SIMILARITY_THRESHOLD:
             logger.info(
-                f"there is no good cre candidate for this standard section,closest similarity: {np.max(similarities)} returning nothing"
+                f"there is no good cre candidate for this standard section,closest similarity: {similarity} returning nothing"
             )
             return None
-        id = self.existing_cre_ids[most_similar_index]
-        logger.info(f"found match with similarity {np.max(similarities)}, id {id}")
+        logger.info(f"found match with similarity {similarity}, id {id}")
         return id
 
     def get_id_of_most_similar_node(
@@ -1111,7 +1051,8 @@ class PromptHandler:
         Backend method, used for importing standards, this matches the embedding of the text of a standard section
         to the closest embedding from existing standards using cosine similarity.
 
-        Since this loads all embeddings in memory for performance reasons, its memory footprint is very large
+        Without pgvector this searches the process ANN index (application.utils.ann_index), which holds
+        every Standard embedding in memory as float32
 
         Args:
             standard_text_embedding (List[float]): the embeddings of what we are trying to match
@@ -1128,30 +1069,14 @@ class PromptHandler:
             )
             return match_id
 
-        if not hasattr(self, "existing_node_embeddings"):
-            (
-                self.existing_node_embeddings,
-                self.existing_node_ids,
-            ) = self.__load_node_embeddings(
-                self.database.get_embeddings_by_doc_type(
-                    cre_defs.Credoctypes.Standard.value
-                )
-            )
-        if not self.existing_node_embeddings.getnnz() or not len(
-            self.existing_node_ids
-        ):
+        id, _similarity = self._most_similar(
+            cre_defs.Credoctypes.Standard.value, standard_text_embedding
+        )
+        if id is None:
             logger.warning(
                 "Standard node embeddings empty in DB (e.g. CRE_NO_GEN_EMBEDDINGS=1 "
                 "checkpoint run); cannot match by similarity — skipping standard link suggestions"
             )
-            return None
-
-        embedding_array = sparse.csr_matrix(
-            np.array(standard_text_embedding).reshape(1, -1)
-        )  # convert embedding into a 1-dimentional numpy array
-        similarities = cosine_similarity(embedding_array, self.existing_node_embeddings)
-        most_similar_index = np.argmax(similarities)
-        id = self.existing_node_ids[most_similar_index]
         return id
 
     def get_text_embeddings(self, text):
@@ -1162,8 +1087,9 @@ class PromptHandler:
         item_embedding: List[float],
         similarity_threshold: float = SIMILARITY_THRESHOLD,
     ) -> Optional[Tuple[str, float]]:
-        """this method is meant to be used when CRE runs in a web server with limited memory (e.g. firebase/heroku)
-            instead of loading all our embeddings in memory we take the slower approach of paginating them
+        """this method is meant to be used when CRE runs in a web server (e.g. the chatbot)
+            without pgvector it queries the process ANN index (application.utils.ann_index),
+            built once per process instead of re-reading the embeddings table per question
 
         Args:
             item_embedding (List[float]): embeddings of the item we want to match against CREs
@@ -1179,36 +1105,11 @@ class PromptHandler:
                 similarity_threshold=similarity_threshold,
             )
 
-        embedding_array = sparse.csr_matrix(
-            np.array(item_embedding).reshape(1, -1)
-        )  # convert embedding into a 1-dimentional numpy array
-
-        (
-            embeddings,
-            total_pages,
-            starting_page,
-        ) = self.database.get_embeddings_by_doc_type_paginated(
-            cre_defs.Credoctypes.CRE.value
+        most_similar_id, max_similarity = self._most_similar(
+            cre_defs.Credoctypes.CRE.value, item_embedding
         )
-        max_similarity = -1
-        most_similar_index = 0
-        most_similar_id = ""
-        for page in range(starting_page, total_pages):
-            existing_cres, existing_cre_ids = self.__load_cre_embeddings(embeddings)
-
-            similarities = cosine_similarity(embedding_array, existing_cres)
-            if np.max(similarities) > max_similarity:
-                max_similarity = np.max(similarities)
-                most_similar_index = np.argmax(similarities)
-                most_similar_id = existing_cre_ids[most_similar_index]
-            (
-                embeddings,
-                total_pages,
-                _,
-            ) = self.database.get_embeddings_by_doc_type_paginated(
-                cre_defs.Credoctypes.CRE.value, page=page
-            )
-
+        if most_similar_id is None:
+            return None, None
         if max_similarity < similarity_threshold:
             logger.info(
                 "there is no good cre candidate for this standard section, returning nothing"
@@ -1223,8 +1124,9 @@ class PromptHandler:
     ) -> Optional[Tuple[str, float]]:
         """
             this method performs cosine similarity against all nodes found in our database and returns the DB ID of the most similar node
-            this method is meant to be used when CRE runs in a web server with limited memory (e.g. firebase/heroku)
-            instead of loading all our embeddings in memory we take the slower approach of paginating them
+            this method is meant to be used when CRE runs in a web server (e.g. the chatbot)
+            without pgvector it queries the process ANN index (application.utils.ann_index),
+            built once per process instead of re-reading the embeddings table per question
         Args:
             question_embedding (List[float]): embedding of the incoming question or node to be matched against what exists in the database
 
@@ -1239,34 +1141,11 @@ class PromptHandler:
                 similarity_threshold=similarity_threshold,
             )
 
-        embedding_array = sparse.csr_matrix(
-            np.array(question_embedding).reshape(1, -1)
-        )  # convert embedding into a 1-dimentional numpy array
-        (
-            embeddings,
-            total_pages,
-            starting_page,
-        ) = self.database.get_embeddings_by_doc_type_paginated(
-            doc_type=cre_defs.Credoctypes.Standard.value,
-            page=1,
+        most_similar_id, max_similarity = self._most_similar(
+            cre_defs.Credoctypes.Standard.value, question_embedding
         )
-
-        max_similarity = -1
-        most_similar_index = 0
-        most_similar_id = ""
-        for page in range(starting_page, total_pages + 1):
-            existing_standards, existing_standard_ids = self.__load_node_embeddings(
-                embeddings
-            )
-            similarities = cosine_similarity(embedding_array, existing_standards)
-            if np.max(similarities) > max_similarity:
-                max_similarity = np.max(similarities)
-                most_similar_index = int(np.argmax(similarities))
-                most_similar_id = existing_standard_ids[most_similar_index]
-
-            embeddings, _, _ = self.database.get_embeddings_by_doc_type_paginated(
-                doc_type=cre_defs.Credoctypes.Standard.value, page=page
-            )
+        if most_similar_id is None:
+            return None, None
         if max_similarity < similarity_threshold:
             logger.info(
                 f"there is no good standard candidate for this other standard section, returning nothing, max similarity was {max_similarity}"
@@ -1289,15 +1168,32 @@ class PromptHandler:
         timestamp = datetime.now().strftime("%I:%M:%S %p")
         if not prompt:
             return {"response": "", "table": "", "timestamp": timestamp}
-        logger.debug(f"getting embeddings for {prompt}")
-        question_embedding = self.ai_client.get_text_embeddings(prompt)
-        logger.debug(f"retrieved embeddings for {prompt}")
+        cache = query_embedding_cache.QueryEmbeddingCache.instance()
+        contract = query_embedding_cache.contract_key(
+            self.embed_model, self._expected_embed_dim
+        )
+        question_embedding = cache.get_embedding(contract, prompt)
+        if question_embedding is None:
+            logger.debug(f"getting embeddings for {prompt}")
+            question_embedding = self.ai_client.get_text_embeddings(prompt)
+            logger.debug(f"retrieved embeddings for {prompt}")
+            cache.put_embedding(contract, prompt, question_embedding)
 
         # Find the closest area in the existing embeddings
-        closest_id, similarity = self.get_id_of_most_similar_node_paginated(
-            question_embedding,
-            similarity_threshold=SIMILARITY_THRESHOLD,
+        version = dataset_generation.current()
+        neighbour = (
+            cache.get_neighbour(contract, version.generation, prompt)
+            if version is not None
+            else None
         )
+        if neighbour is None:
+            neighbour = self.get_id_of_most_similar_node_paginated(
+                question_embedding,
+                similarity_threshold=SIMILARITY_THRESHOLD,
+            )
+            if version is not None:
+                cache.put_neighbour(contract, version.generation, prompt, neighbour)
+        closest_id, similarity = neighbour
         closest_object = None
         if closest_id:
             closest_object = self.database.get_nodes(db_id=closest_id)
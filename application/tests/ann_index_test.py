@@ -0,0 +1,172 @@
+import os
+import tempfile
+import threading
+import unittest
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils import ann_index, dataset_generation
+
+
+def _clustered(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    return centres[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+
+
+class TestAnnIndex(unittest.TestCase):
+    def test_ivf_recall_against_exact(self) -> None:
+        vectors = _clustered(4000, 32, 40)
+        ids = [f"id{i}" for i in range(len(vectors))]
+        exact = ann_index.build_index(ids, vectors, backend="exact")
+        ivf = ann_index.build_index(ids, vectors, backend="ivf")
+        assert isinstance(ivf, ann_index.IVFIndex)
+        self.assertEqual(ivf.nlist, 63)
+
+        queries = _clustered(100, 32, 40, seed=1)
+        hits = sum(ivf.search(q, 1)[0][0] == exact.search(q, 1)[0][0] for q in queries)
+        self.assertGreaterEqual(hits / len(queries), 0.9)
+
+        best_id, score = exact.search(vectors[7], 1)[0]
+        self.assertEqual(best_id, "id7")
+        self.assertAlmostEqual(score, 1.0, places=5)
+
+    def test_upsert_and_persistence(self) -> None:
+        vectors = _clustered(300, 8, 5)
+        ids = [f"id{i}" for i in range(len(vectors))]
+        index = ann_index.build_index(ids, vectors, backend="ivf")
+        index.upsert("new", [0.0] * 7 + [1.0])
+        index.upsert("id3", [1.0] + [0.0] * 7)
+        self.assertEqual(index.search([0.0] * 7 + [2.0], 1)[0][0], "new")
+        self.assertEqual(index.search([3.0] + [0.0] * 7, 1)[0][0], "id3")
+        with self.assertRaises(ann_index.AnnIndexError):
+            index.search([1.0, 2.0], 1)
+
+        index.fingerprint = "fp-1"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "CRE.npz")
+            index.save(path)
+            self.assertIsNone(ann_index.load_index(path, "fp-2"))
+            loaded = ann_index.load_index(path, "fp-1")
+        self.assertEqual(loaded.backend, "ivf")
+        self.assertEqual(len(loaded), 301)
+        self.assertEqual(loaded.search([0.0] * 7 + [2.0], 1)[0][0], "new")
+
+
+class TestAnnIndexRegistry(unittest.TestCase):
+    def tearDown(self) -> None:
+        ann_index.AnnIndexRegistry.reset()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        ann_index.AnnIndexRegistry.reset()
+        dataset_generation.reset_cache()
+        self.collection = db.Node_collection()
+
+    def test_built_once_then_updated_from_add_embedding(self) -> None:
+        first = self.collection.add_cre(defs.CRE(id="111-111", name="first"))
+        second = self.collection.add_cre(defs.CRE(id="222-222", name="second"))
+        self.collection.add_embedding(first, defs.Credoctypes.CRE, [1.0, 0.0], "a")
+        registry = ann_index.AnnIndexRegistry.instance()
+        cre = defs.Credoctypes.CRE.value
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            os.environ, {"CRE_ANN_INDEX_DIR": tmp}
+        ):
+            index = registry.index_for(self.collection, cre)
+            self.assertEqual(index.search([0.0, 1.0], 1)[0][0], first.id)
+            with patch.object(
+                self.collection, "get_embeddings_by_doc_type"
+            ) as load_mock:
+                self.assertIs(registry.index_for(self.collection, cre), index)
+                load_mock.assert_not_called()
+
+            self.collection.add_embedding(second, defs.Credoctypes.CRE, [0.0, 1.0], "b")
+            self.assertEqual(index.search([0.0, 1.0], 1)[0][0], second.id)
+
+            registry.persist(self.collection)
+            reloaded = ann_index.load_index(
+                os.path.join(tmp, f"{cre}.npz"),
+                self.collection.embeddings_fingerprint(cre),
+            )
+            self.assertEqual(len(reloaded), 2)
+
+    def test_rebuilt_when_vectors_change_elsewhere(self) -> None:
+        first = self.collection.add_cre(defs.CRE(id="111-111", name="first"))
+        second = self.collection.add_cre(defs.CRE(id="222-222", name="second"))
+        self.collection.add_embedding(first, defs.Credoctypes.CRE, [1.0, 0.0], "a")
+        self.collection.add_embedding(second, defs.Credoctypes.CRE, [0.0, 1.0], "b")
+        registry = ann_index.AnnIndexRegistry.instance()
+        cre = defs.Credoctypes.CRE.value
+        index = registry.index_for(self.collection, cre)
+        fingerprint = self.collection.embeddings_fingerprint(cre)
+
+        # another process deletes one vector and re-embeds the other with a
+        # vector of the same size
+        session = self.collection.session
+        session.query(db.Embeddings).filter(db.Embeddings.cre_id == second.id).delete()
+        session.query(db.Embeddings).filter(db.Embeddings.cre_id == first.id).update(
+            {db.Embeddings.embedding_vec: "[0.0,1.0]"}
+        )
+        session.commit()
+        self.assertIs(registry.index_for(self.collection, cre), index)
+
+        dataset_generation.bump()
+        rebuilt = registry.index_for(self.collection, cre)
+        self.assertIsNot(rebuilt, index)
+        self.assertNotEqual(rebuilt.fingerprint, fingerprint)
+        self.assertEqual(rebuilt.ids, [first.id])
+        best_id, score = rebuilt.search([0.0, 1.0], 1)[0]
+        self.assertEqual(best_id, first.id)
+        self.assertAlmostEqual(score, 1.0, places=5)
+
+        # unchanged vectors survive a generation bump
+        dataset_generation.bump()
+        self.assertIs(registry.index_for(self.collection, cre), rebuilt)
+
+    def test_fingerprint_is_taken_outside_the_lock(self) -> None:
+        first = self.collection.add_cre(defs.CRE(id="111-111", name="first"))
+        self.collection.add_embedding(first, defs.Credoctypes.CRE, [1.0, 0.0], "a")
+        registry = ann_index.AnnIndexRegistry.instance()
+        cre = defs.Credoctypes.CRE.value
+        index = registry.index_for(self.collection, cre)
+        fingerprint = self.collection.embeddings_fingerprint
+        lock_free: List[bool] = []
+
+        def fingerprint_probe(doc_type: str) -> str:
+            def try_lock() -> None:
+                if registry._lock.acquire(blocking=False):
+                    registry._lock.release()
+                    lock_free.append(True)
+
+            probe = threading.Thread(target=try_lock)
+            probe.start()
+            probe.join()
+            return fingerprint(doc_type)
+
+        with patch.object(
+            self.collection, "embeddings_fingerprint", side_effect=fingerprint_probe
+        ) as fingerprint_mock:
+            dataset_generation.bump()
+            self.assertIs(registry.index_for(self.collection, cre), index)
+            self.assertEqual(lock_free, [True])
+
+            # without a generation the loaded index is reused as is
+            with patch.object(dataset_generation, "current", return_value=None):
+                self.assertIs(registry.index_for(self.collection, cre), index)
+            self.assertEqual(fingerprint_mock.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from typing import Any, List, Tuple
+
+from sqlalchemy import event, text
+
+from application import create_app, sqla  # type: ignore
+from application.cmd import cre_main
+from application.database import db, text_search_index
+from application.defs import cre_defs as defs
+
+
+def _standard(section_id: str, *cres: defs.CRE, **kwargs: Any) -> defs.Standard:
+    standard = defs.Standard(
+        name="ASVS",
+        section=f"Section {section_id}",
+        sectionID=section_id,
+        hyperlink=f"https://example.com/{section_id}",
+        **kwargs,
+    )
+    for cre in cres:
+        standard.add_link(defs.Link(document=cre, ltype=defs.LinkTypes.LinkedTo))
+    return standard
+
+
+class TestBulkImport(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection()
+
+    def _seed(self) -> List[defs.Standard]:
+        cres = [
+            defs.CRE(id=f"{i:03d}-{i:03d}", name=f"CRE {i}", description="d")
+            for i in range(1, 6)
+        ]
+        for cre in cres:
+            self.collection.add_cre(cre)
+        # An earlier import: one control to be updated, one link to be retyped.
+        existing = self.collection.add_node(
+            defs.Standard(name="ASVS", section="Section V1", sectionID="V1")
+        )
+        self.collection.add_link(
+            db.dbCREfromCRE(cres[0]), existing, defs.LinkTypes.PartOf
+        )
+        other = defs.Standard(name="CWE", sectionID="79", section="XSS")
+        other.add_link(defs.Link(document=cres[4], ltype=defs.LinkTypes.LinkedTo))
+        # node-to-node link: registered per row, in its position
+        linked = _standard("V4", cres[1])
+        linked.add_link(defs.Link(document=other, ltype=defs.LinkTypes.LinkedTo))
+        entries = [
+            _standard("V1", cres[0], cres[1], description="updated"),
+            _standard("V2", cres[2], tags=["family:standard"]),
+            _standard("V3"),
+            _standard("V2", cres[3]),  # repeated control in the same import
+            linked,
+            _standard("V5", cres[2]),
+        ]
+        return entries
+
+    def _state(self) -> Tuple[List[Any], List[Any], List[Any]]:
+        nodes = sorted(
+            (n.name, n.section, n.subsection, n.version, n.section_id, n.tags)
+            + (n.description, n.link, n.ntype)
+            for n in self.collection.session.query(db.Node)
+        )
+        links = sorted(
+            (c.external_id, n.section_id, l.type)
+            for l, c, n in self.collection.session.query(db.Links, db.CRE, db.Node)
+            .filter(db.Links.cre == db.CRE.id)
+            .filter(db.Links.node == db.Node.id)
+        )
+        index = sorted(
+            tuple(row)
+            for row in self.collection.session.execute(
+                text(f"SELECT kind, title, body FROM {text_search_index.TABLE}")
+            )
+        )
+        return nodes, links, index
+
+    def _reset(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        sqla.session.execute(text(f"DROP TABLE IF EXISTS {text_search_index.TABLE}"))
+        text_search_index._available.clear()
+        sqla.create_all()
+
+    def test_bulk_path_matches_per_row_path(self) -> None:
+        for entry in self._seed():
+            cre_main.register_node(entry, self.collection)
+        per_row = self._state()
+
+        self._reset()
+        entries = self._seed()
+        statements = []
+        engine = sqla.session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            cre_main.register_nodes_bulk(entries, self.collection)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        self.assertEqual(self._state(), per_row)
+        self.assertIn(("001-001", "V1", defs.LinkTypes.LinkedTo.value), per_row[1])
+        self.assertEqual(
+            len(
+                [s for s in statements if "ON CONFLICT" in s and "cre_node_links" in s]
+            ),
+            2,  # one batch before the per-row entry, one after
+        )
+
+    def test_unresolvable_cre_takes_the_per_row_path(self) -> None:
+        entries = [_standard("V9", defs.CRE(id="999-999", name="Missing"))]
+        with self.assertRaises(IndexError):
+            cre_main.register_nodes_bulk(entries, self.collection)
+
+
+if __name__ == "__main__":
+    unittest.main()
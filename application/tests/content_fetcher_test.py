@@ -0,0 +1,124 @@
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from typing import Any, Dict, List
+
+from application.defs import cre_defs
+from application.prompt_client import content_fetcher, prompt_client
+
+
+class _FakeFetcher(content_fetcher.ContentFetcher):
+    """Renders pages without a browser, recording how many were open at once."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.rendered: List[str] = []
+        self.open_pages: Dict[str, int] = {}
+        self.max_open: Dict[str, int] = {}
+
+    async def _open(self) -> None:
+        self._pages = asyncio.Semaphore(self.concurrency)
+
+    async def _close(self) -> None:
+        pass
+
+    async def _render(self, url: str) -> content_fetcher.FetchedPage:
+        host = url.split("/")[2]
+        self.rendered.append(url)
+        self.open_pages[host] = self.open_pages.get(host, 0) + 1
+        self.max_open[host] = max(self.max_open.get(host, 0), self.open_pages[host])
+        await asyncio.sleep(0.01)
+        self.open_pages[host] -= 1
+        return content_fetcher.FetchedPage(
+            text=f"text of {url}", html="<html/>", validator='"v1"'
+        )
+
+
+class TestContentFetcher(unittest.TestCase):
+    def test_limits_pages_per_host_and_shares_duplicate_urls(self) -> None:
+        fetcher = _FakeFetcher(concurrency=8, per_host=2)
+        fetcher.start()
+        try:
+            urls = [f"https://a.example/{i}" for i in range(6)]
+            urls += [f"https://b.example/{i}" for i in range(3)]
+            futures = [fetcher.submit(url) for url in urls + urls[:2]]
+            pages = [future.result() for future in futures]
+        finally:
+            fetcher.close()
+        self.assertEqual(pages[0].text, "text of https://a.example/0")
+        self.assertEqual(sorted(fetcher.rendered), sorted(urls))
+        self.assertEqual(fetcher.max_open, {"a.example": 2, "b.example": 2})
+
+    def test_disk_cache_is_reused_while_the_validator_matches(self) -> None:
+        url = "https://a.example/page"
+        with tempfile.TemporaryDirectory() as directory:
+            cache = content_fetcher.ContentCache(directory)
+            first = _FakeFetcher(cache=cache)
+            first.start()
+            first.fetch(url)
+            first.close()
+            self.assertEqual(cache.get(url).validator, '"v1"')
+
+            for current, renders in (('"v1"', 0), ('"v2"', 1), (None, 1)):
+                rerun = _FakeFetcher(cache=cache)
+                rerun.start()
+                with patch.object(
+                    content_fetcher, "_current_validator", return_value=current
+                ):
+                    self.assertEqual(rerun.fetch(url).text, f"text of {url}")
+                rerun.close()
+                self.assertEqual(len(rerun.rendered), renders, current)
+
+
+class TestPipelinedGenerateEmbeddings(unittest.TestCase):
+    def test_pages_are_queued_a_batch_ahead_and_nodes_looked_up_once(self) -> None:
+        nodes = {
+            f"n{i}": cre_defs.Standard(
+                name="ASVS",
+                section=f"s{i}",
+                sectionID=str(i),
+                # the last node shares the second one's page
+                hyperlink=f"https://a.example/{min(i, 1)}",
+            )
+            for i in range(3)
+        }
+        database = Mock(session=None)
+        database.has_node_with_db_id.side_effect = nodes.__contains__
+        database.get_nodes.side_effect = lambda db_id: [nodes[db_id]]
+        database.get_embedding.return_value = []
+
+        emb = prompt_client.in_memory_embeddings.__new__(
+            prompt_client.in_memory_embeddings
+        )
+        emb.ai_client = Mock(spec=["get_max_batch_size", "get_text_embeddings"])
+        emb.ai_client.get_max_batch_size.return_value = 2
+        emb.ai_client.get_text_embeddings.side_effect = lambda texts: [
+            [float(len(t))] for t in texts
+        ]
+        emb.clean_content = Mock(side_effect=lambda c: c)  # type: ignore[method-assign]
+        emb._fetcher = Mock()
+        submitted: List[str] = []
+        emb._fetcher.submit.side_effect = submitted.append
+        emb._fetcher.fetch.side_effect = lambda url: SimpleNamespace(
+            text=f"page {url} after {len(submitted)} queued", html=None
+        )
+
+        with patch.dict("os.environ", {"CRE_EMBED_SMART_EXTRACT": "off"}):
+            emb.generate_embeddings(database, ["n0", "n1", "n2"])
+
+        self.assertEqual(database.get_nodes.call_count, 3)
+        # the first page was read with the second batch already queued
+        texts = [call.args[3] for call in database.add_embedding.call_args_list]
+        self.assertEqual(len(texts), 3)
+        self.assertIn("page https://a.example/0 after 3 queued", texts[0])
+        # a page the next batch still needs is released with that batch
+        self.assertEqual(
+            [call.args[0] for call in emb._fetcher.release.call_args_list],
+            [["https://a.example/0"], ["https://a.example/1"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
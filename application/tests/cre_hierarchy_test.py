@@ -0,0 +1,119 @@
+import unittest
+
+from application import create_app, sqla  # type: ignore
+from application.database import cre_hierarchy, db
+from application.database.cre_hierarchy import UNREACHABLE, CreHierarchy
+from application.defs import cre_defs as defs
+from application.utils import dataset_generation
+
+CONTAINS = defs.LinkTypes.Contains.value
+PART_OF = defs.LinkTypes.PartOf.value
+RELATED = defs.LinkTypes.Related.value
+
+
+class TestCreHierarchy(unittest.TestCase):
+    def test_build_matches_incremental_updates(self) -> None:
+        cres = [(f"db{i}", f"00{i}-00{i}") for i in range(7)]
+        links = [
+            ("db0", "db1", CONTAINS),
+            ("db1", "db2", CONTAINS),
+            ("db2", "db3", CONTAINS),
+            ("db5", "db4", PART_OF),  # legacy row: db4 contains db5
+            ("db0", "db3", CONTAINS),  # shortcut: db3 is at depth 1
+            ("db4", "db6", RELATED),
+        ]
+        built = CreHierarchy.build(cres, links)
+        self.assertEqual(built.roots(), ["db0", "db4", "db6"])
+        self.assertEqual(built.depth["db3"], 1)
+        self.assertEqual(built.root_path["db2"], ("db0", "db1", "db2"))
+        self.assertEqual(built.path("db0", "db2"), ["db0", "db1", "db2"])
+        self.assertEqual(built.path("db2", "db0"), [])
+        self.assertEqual(built.db_id("005-005"), "db5")
+
+        # links arriving one by one, deepest first, end in the same state
+        incremental = CreHierarchy.build(cres, [])
+        for link in reversed(links):
+            incremental.add_link(*link)
+        self.assertEqual(incremental.depth, built.depth)
+        self.assertEqual(incremental.root_path, built.root_path)
+
+        # a root that gains a parent moves its whole subtree down
+        incremental.add_link("db6", "db0", CONTAINS)
+        self.assertEqual(incremental.depth["db2"], 3)
+        self.assertEqual(incremental.root_path["db3"], ("db6", "db0", "db3"))
+
+        cyclic = CreHierarchy.build(
+            cres[:2], [("db0", "db1", CONTAINS), ("db1", "db0", CONTAINS)]
+        )
+        self.assertEqual(cyclic.depth, {"db0": UNREACHABLE, "db1": UNREACHABLE})
+
+
+class TestCollectionHierarchy(unittest.TestCase):
+    def tearDown(self) -> None:
+        cre_hierarchy.forget_shared()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        dataset_generation.reset_cache()
+        self.collection = db.Node_collection().with_graph()
+
+    def test_collection_keeps_hierarchy_current(self) -> None:
+        collection = self.collection
+        top = collection.add_cre(defs.CRE(id="111-111", name="top"))
+        mid = collection.add_cre(defs.CRE(id="222-222", name="mid"))
+        collection.add_internal_link(top, mid, defs.LinkTypes.Contains)
+        self.assertEqual(
+            [c.id for c in collection.get_root_cres()], ["111-111"]
+        )  # builds the index
+
+        low = collection.add_cre(defs.CRE(id="333-333", name="low"))
+        self.assertEqual(collection.get_cre_hierarchy(db.CREfromDB(low)), 0)
+        collection.add_internal_link(mid, low, defs.LinkTypes.Contains)
+        self.assertEqual(collection.get_cre_hierarchy(db.CREfromDB(low)), 2)
+
+        path = collection.get_cre_path(fromID="333-333", toID="111-111")
+        self.assertEqual([c.id for c in path], ["111-111", "222-222", "333-333"])
+        self.assertEqual(path[0], collection.get_CREs(external_id="111-111")[0])
+        self.assertEqual(collection.get_cre_path("333-333", "999-999"), [])
+        with self.assertRaises(ValueError):
+            collection.get_cre_hierarchy(defs.CRE(id="999-999", name="missing"))
+
+    def test_hierarchy_is_shared_until_the_generation_moves(self) -> None:
+        collection = self.collection
+        top = collection.add_cre(defs.CRE(id="111-111", name="top"))
+        mid = collection.add_cre(defs.CRE(id="222-222", name="mid"))
+        low = collection.add_cre(defs.CRE(id="333-333", name="low"))
+        collection.add_internal_link(top, mid, defs.LinkTypes.Contains)
+
+        shared = db.Node_collection().cre_hierarchy()
+        self.assertIs(db.Node_collection().cre_hierarchy(), shared)
+
+        # another process links low under mid and bumps the generation later
+        sqla.session.add(
+            db.InternalLinks(
+                type=defs.LinkTypes.Contains.value, group=mid.id, cre=low.id
+            )
+        )
+        sqla.session.commit()
+        self.assertEqual(db.Node_collection().get_cre_hierarchy(db.CREfromDB(low)), 0)
+        dataset_generation.bump()
+        rebuilt = db.Node_collection().with_graph()
+        self.assertEqual(rebuilt.get_cre_hierarchy(db.CREfromDB(low)), 2)
+        shared = rebuilt.cre_hierarchy()
+
+        # a write here updates a private copy and drops the shared one
+        leaf = rebuilt.add_cre(defs.CRE(id="444-444", name="leaf"))
+        rebuilt.add_internal_link(low, leaf, defs.LinkTypes.Contains)
+        self.assertEqual(rebuilt.get_cre_hierarchy(db.CREfromDB(leaf)), 3)
+        self.assertNotIn(leaf.id, shared.depth)
+        self.assertEqual(db.Node_collection().get_cre_hierarchy(db.CREfromDB(leaf)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
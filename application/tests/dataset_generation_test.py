@@ -0,0 +1,131 @@
+import os
+import unittest
+from unittest.mock import patch
+from typing import List
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils import dataset_generation, import_apply, import_diff
+
+
+class TestDatasetGeneration(unittest.TestCase):
+    def tearDown(self) -> None:
+        dataset_generation.reset_cache()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        dataset_generation.reset_cache()
+        self.collection = db.Node_collection()
+        self.collection.add_cre(defs.CRE(id="111-111", name="shared"))
+
+    def test_bump_and_process_cache(self) -> None:
+        self.assertEqual(db.get_dataset_generation(), (0, None))
+        self.assertEqual(dataset_generation.bump(), 1)
+        self.assertEqual(dataset_generation.bump(), 2)
+        self.assertEqual(db.get_dataset_generation()[0], 2)
+
+        with patch.object(
+            db, "get_dataset_generation", wraps=db.get_dataset_generation
+        ) as get_mock:
+            first = dataset_generation.current()
+            second = dataset_generation.current()
+            self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first.generation, 2)
+        self.assertEqual(first.etag("/a"), first.etag("/a"))
+        self.assertNotEqual(first.etag("/a"), first.etag("/b"))
+
+    @patch.dict(os.environ, {"INSECURE_REQUESTS": "1"})
+    def test_read_endpoint_revalidates_without_touching_the_database(self) -> None:
+        dataset_generation.bump()
+        with self.app.test_client() as client:
+            first = client.get("/rest/v1/all_cres")
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["ETag"]
+            self.assertIn("Last-Modified", first.headers)
+
+            with patch.object(db, "Node_collection") as collection_mock, patch.object(
+                db, "get_dataset_generation"
+            ) as generation_mock:
+                cached = client.get(
+                    "/rest/v1/all_cres", headers={"If-None-Match": etag}
+                )
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached.headers["ETag"], etag)
+                collection_mock.assert_not_called()
+                generation_mock.assert_not_called()
+
+                since = client.get(
+                    "/rest/v1/all_cres",
+                    headers={"If-Modified-Since": first.headers["Last-Modified"]},
+                )
+                self.assertEqual(since.status_code, 304)
+
+            other_page = client.get(
+                "/rest/v1/all_cres?page=1", headers={"If-None-Match": etag}
+            )
+            self.assertEqual(other_page.status_code, 200)
+
+    @patch.dict(os.environ, {"INSECURE_REQUESTS": "1"})
+    def test_apply_changeset_bumps_generation(self) -> None:
+        self.collection.add_node(
+            defs.Standard(name="ASVS", section="1.1", sectionID="V1.1.1")
+        )
+        run = db.create_import_run(source="dataset_generation_test", version="r1")
+        ops: List[import_diff.ChangeSetOp] = [
+            import_diff.RemoveControl(
+                key=("ASVS", "1.1", "V1.1.1"),
+                document={
+                    "name": "ASVS",
+                    "section": "1.1",
+                    "subsection": "",
+                    "sectionID": "V1.1.1",
+                    "description": "",
+                },
+            )
+        ]
+        db.persist_staged_change_set(
+            run_id=run.id,
+            changeset_json=import_diff.change_set_to_json(ops),
+            has_conflicts=False,
+            staging_status="accepted",
+        )
+        with self.app.test_client() as client:
+            etag = client.get("/rest/v1/root_cres").headers["ETag"]
+
+            import_apply.apply_changeset(run_id=run.id, dry_run=True)
+            self.assertEqual(db.get_dataset_generation()[0], 0)
+            import_apply.apply_changeset(run_id=run.id)
+            self.assertEqual(db.get_dataset_generation()[0], 1)
+
+            fresh = client.get("/rest/v1/root_cres", headers={"If-None-Match": etag})
+            self.assertEqual(fresh.status_code, 200)
+            self.assertNotEqual(fresh.headers["ETag"], etag)
+
+    def test_deletes_and_embedding_wipes_bump_generation(self) -> None:
+        node = self.collection.add_node(defs.Standard(name="ASVS", sectionID="1"))
+        self.collection.add_gap_analysis_result(
+            cache_key="ASVS >> CWE", ga_object='{"result": {"a": 1}}'
+        )
+        self.collection.add_embedding(
+            node, defs.Credoctypes.Standard, [0.1, 0.2], "asvs"
+        )
+
+        self.collection.delete_gapanalysis_results_for("ASVS")
+        self.assertEqual(db.get_dataset_generation()[0], 1)
+        self.collection.delete_all_embeddings()
+        self.assertEqual(db.get_dataset_generation()[0], 2)
+        self.collection.delete_nodes("ASVS")
+        self.assertEqual(db.get_dataset_generation()[0], 3)
+        self.assertEqual(self.collection.session.query(db.Node).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
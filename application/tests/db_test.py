@@ -937,6 +937,43 @@ class TestDB(unittest.TestCase):
             (None, None, None),
         )
 
+    def test_get_nodes_hydrates_links_in_constant_queries(self) -> None:
+        """Given: a standard with many sections, each linked to its own CRE
+        get_nodes issues the same number of queries however many sections match
+        """
+        from sqlalchemy import event
+
+        collection = db.Node_collection()
+        for i in range(30):
+            dbcre = collection.add_cre(
+                defs.CRE(id=f"900-{i:03d}", name=f"batch cre {i}")
+            )
+            dbnode = collection.add_node(
+                defs.Standard(name="BatchStd", section=f"s{i}", sectionID=str(i))
+            )
+            collection.add_link(cre=dbcre, node=dbnode, ltype=defs.LinkTypes.LinkedTo)
+
+        statements: List[str] = []
+
+        def count(*args: Any) -> None:
+            statements.append(args[2])
+
+        engine = collection.session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            nodes = collection.get_nodes(name="BatchStd")
+            one = len(statements)
+            statements.clear()
+            collection.get_nodes(name="BatchStd", section="s7")
+            self.assertEqual(len(statements), one)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        self.assertEqual(one, 3)
+        self.assertEqual(len(nodes), 30)
+        by_section = {n.section: n for n in nodes}
+        self.assertEqual([l.document.id for l in by_section["s7"].links], ["900-007"])
+
     def test_add_internal_link(self) -> None:
         """test that internal links are added successfully,
         edge cases:
@@ -370,6 +370,37 @@ class TestCreDefs(unittest.TestCase):
         expected["toolType"] = "Defensive"
         self.assertNotEqual(expected, t0.todict())
 
+    def test_equality_and_hash_ignore_link_order(self) -> None:
+        links = [
+            defs.Link(
+                document=defs.Standard(name="ASVS", sectionID=f"V{i}", tags=["t"]),
+                ltype=defs.LinkTypes.LinkedTo,
+            )
+            for i in range(50)
+        ]
+        cre = defs.CRE(id="111-111", name="c1", links=links, embeddings=[0.1, 0.2])
+        shuffled = copy.deepcopy(cre)
+        shuffled.links.reverse()
+        shuffled.embeddings.reverse()
+        self.assertEqual(cre, shuffled)
+        self.assertEqual(hash(cre), hash(shuffled))
+        self.assertEqual(len({cre, shuffled}), 1)
+
+        # as before, an empty tag or embedding list matches any other
+        untagged = copy.deepcopy(cre)
+        untagged.embeddings = []
+        untagged.links[0].document.tags = []
+        self.assertEqual(cre, untagged)
+        self.assertEqual(hash(cre), hash(untagged))
+
+        # a repeated link does not stand in for a missing one
+        repeated = copy.deepcopy(cre)
+        repeated.links[1] = copy.deepcopy(repeated.links[0])
+        self.assertNotEqual(cre, repeated)
+        retyped = copy.deepcopy(cre)
+        retyped.links[7].ltype = defs.LinkTypes.Related
+        self.assertNotEqual(cre, retyped)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils import ann_index, embedding_store
+from application.utils.librarian.candidate_retriever import CandidatePool
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def tearDown(self) -> None:
+        ann_index.AnnIndexRegistry.reset()
+        self.env.stop()
+        self.tmp.cleanup()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        ann_index.AnnIndexRegistry.reset()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(
+            os.environ,
+            {"CRE_EMBEDDING_STORE_DIR": self.tmp.name, "CRE_EMBED_MODEL": "m1"},
+        )
+        self.env.start()
+        self.collection = db.Node_collection()
+        self.first = self.collection.add_cre(defs.CRE(id="111-111", name="first"))
+        self.second = self.collection.add_cre(defs.CRE(id="222-222", name="second"))
+        self.collection.add_embedding(self.first, defs.Credoctypes.CRE, [3.0, 4.0], "a")
+
+    def test_export_is_normalised_mmap_and_refreshed_when_stale(self) -> None:
+        cre = defs.Credoctypes.CRE.value
+        store = embedding_store.refresh(self.collection, cre)
+        self.assertIsInstance(store.vectors, np.memmap)
+        self.assertEqual(store.vectors.dtype, np.float32)
+        self.assertFalse(store.vectors.flags.writeable)
+        self.assertEqual(store.model_id, "m1")
+        self.assertEqual(list(store), [self.first.id])
+        np.testing.assert_allclose(store[self.first.id], [0.6, 0.8], rtol=1e-6)
+        self.assertIsNone(embedding_store.refresh(self.collection, "Standard"))
+
+        with patch.object(embedding_store, "export") as export_mock:
+            self.assertEqual(
+                embedding_store.refresh(self.collection, cre).fingerprint,
+                store.fingerprint,
+            )
+            export_mock.assert_not_called()
+
+        self.collection.add_embedding(
+            self.second, defs.Credoctypes.CRE, [0.0, 2.0], "b"
+        )
+        fresh = embedding_store.refresh(self.collection, cre)
+        self.assertNotEqual(fresh.fingerprint, store.fingerprint)
+        self.assertEqual(sorted(fresh), sorted([self.first.id, self.second.id]))
+        # the superseded matrix file is dropped once the new header is live
+        self.assertEqual(
+            sorted(f for f in os.listdir(self.tmp.name) if f.endswith(".npy")),
+            [f"{cre}.{fresh.fingerprint}.npy"],
+        )
+
+    def test_consumers_share_the_mapped_matrix(self) -> None:
+        cre = defs.Credoctypes.CRE.value
+        store = embedding_store.embeddings_for(self.collection, cre)
+        assert isinstance(store, embedding_store.EmbeddingMatrix)
+        pool = CandidatePool.from_mapping(store)
+        self.assertTrue(pool.normalized)
+        self.assertTrue(np.shares_memory(pool.matrix, store.vectors))
+
+        index = ann_index.AnnIndexRegistry.instance().index_for(self.collection, cre)
+        self.assertFalse(index._vectors.flags.writeable)  # mapped, not copied
+        # updates copy the mapped rows rather than writing through them
+        self.collection.add_embedding(self.first, defs.Credoctypes.CRE, [0.0, 1.0], "c")
+        self.assertEqual(index.search([0.0, 1.0], 1)[0][0], self.first.id)
+        np.testing.assert_allclose(store[self.first.id], [0.6, 0.8], rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from unittest.mock import patch
+
+from application.utils.env import env_int
+
+
+class TestEnvInt(unittest.TestCase):
+    def test_defaults_and_minimum(self) -> None:
+        with patch.dict("os.environ", {"CRE_TEST_INT": ""}):
+            self.assertEqual(env_int("CRE_TEST_INT", 7), 7)
+        with patch.dict("os.environ", {"CRE_TEST_INT": " 12 "}):
+            self.assertEqual(env_int("CRE_TEST_INT", 7), 12)
+        with patch.dict("os.environ", {"CRE_TEST_INT": "lots"}):
+            self.assertEqual(env_int("CRE_TEST_INT", 7), 7)
+        with patch.dict("os.environ", {"CRE_TEST_INT": "0"}):
+            self.assertEqual(env_int("CRE_TEST_INT", 7), 0)
+            self.assertEqual(env_int("CRE_TEST_INT", 7, minimum=1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import yaml
+
+from application import create_app, sqla  # type: ignore
+from application.database import db, export_stream
+from application.defs import cre_defs as defs
+
+
+class TestExportStream(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection().with_graph()
+        collection = self.collection
+        self.top = collection.add_cre(defs.CRE(id="111-111", name="top"))
+        self.low = collection.add_cre(defs.CRE(id="222-222", name="low"))
+        self.side = collection.add_cre(defs.CRE(id="333-333", name="side"))
+        collection.add_internal_link(self.top, self.low, defs.LinkTypes.Contains)
+        collection.add_internal_link(self.low, self.side, defs.LinkTypes.Related)
+        asvs = collection.add_node(defs.Standard(name="ASVS", sectionID="V1"))
+        collection.add_link(self.low, asvs, defs.LinkTypes.LinkedTo)
+        collection.add_node(defs.Standard(name="Unlinked", sectionID="1"))
+
+    def test_documents_stream_in_batches(self) -> None:
+        docs = list(export_stream.iter_documents(self.collection, batch_size=1))
+        self.assertEqual(
+            docs, list(export_stream.iter_documents(self.collection, batch_size=100))
+        )
+        cres = [d for d in docs if d.doctype == defs.Credoctypes.CRE]
+        self.assertEqual(
+            [c.id for c in cres],
+            [
+                db.CREfromDB(c).id
+                for c in sorted([self.top, self.low, self.side], key=lambda c: c.id)
+            ],
+        )
+        self.assertEqual(
+            cres, [self.collection.get_CREs(external_id=c.id)[0] for c in cres]
+        )
+        self.assertEqual([d.name for d in docs[3:]], ["Unlinked"])
+
+        lines = list(export_stream.iter_jsonl(self.collection))
+        self.assertEqual(
+            [json.loads(line) for line in lines], [d.todict() for d in docs]
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.tar.gz")
+            self.assertEqual(export_stream.write_tarball(self.collection, path), 4)
+            with tarfile.open(path) as tar:
+                member = tar.extractfile("Unlinked:1.yaml")
+                self.assertEqual(yaml.safe_load(member), docs[3].todict())
+
+    def test_mapping_template(self) -> None:
+        rows = export_stream.mapping_template_rows(self.collection)
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "CRE 0": "",
+                    "CRE 1": "",
+                    "standard|name": "",
+                    "standard|id": "",
+                    "standard|hyperlink": "",
+                },
+                {"CRE 0": "111-111|top"},
+                {"CRE 1": "222-222|low"},
+                {"CRE 0": "333-333|side"},
+            ],
+        )
+        with self.assertRaises(ValueError):  # side is only reachable as Related
+            export_stream.mapping_template_rows(self.collection, root_ids=["111-111"])
+
+        chunks = list(
+            export_stream.iter_csv(rows[1:], fieldnames=list(rows[0]), chunk_rows=2)
+        )
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(
+            "".join(chunks).splitlines()[0],
+            "CRE 0,CRE 1,standard|name,standard|id,standard|hyperlink",
+        )
+
+        with patch.dict(os.environ, {"INSECURE_REQUESTS": "True"}):
+            with self.app.test_client() as client:
+                response = client.get("/rest/v1/export_jsonl")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(len(response.data.decode().splitlines()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+from typing import Any, Collection, List, Tuple
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils import dataset_generation, ga_backfill, gap_analysis
+
+
+class TestGaBackfill(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection()
+        for name, sections in (("ASVS", 3), ("Top10", 1), ("CWE", 2)):
+            for i in range(sections):
+                self.collection.add_node(defs.Standard(name=name, sectionID=str(i)))
+
+    def _fake_gap_analysis(
+        self, fail: Collection[Tuple[str, ...]] = ()
+    ) -> Tuple[List[Tuple[str, ...]], Any]:
+        calls: List[Tuple[str, ...]] = []
+
+        def fake(neo_db: Any, node_names: List[str], cache_key: str) -> None:
+            calls.append(tuple(node_names))
+            if tuple(node_names) in fail:
+                raise RuntimeError("neo4j unavailable")
+            if "Top10" not in node_names:  # pairs with Top10 find no paths
+                self.collection.add_gap_analysis_result(
+                    cache_key=cache_key, ga_object='{"result": {"a": 1}}'
+                )
+
+        return calls, patch.object(db, "gap_analysis", side_effect=fake)
+
+    def test_runs_most_expensive_first_and_resumes(self) -> None:
+        pairs = [
+            ("Top10", "CWE"),
+            ("ASVS", "Top10"),
+            ("CWE", "ASVS"),
+            ("ASVS", "CWE"),
+        ]
+        sizes = ga_backfill.standard_sizes(self.collection)
+        self.assertEqual(sizes["ASVS"], 3)
+        self.assertEqual(
+            ga_backfill.order_by_cost(pairs, sizes),
+            [("CWE", "ASVS"), ("ASVS", "CWE"), ("ASVS", "Top10"), ("Top10", "CWE")],
+        )
+
+        # the first run is "killed" after a failure: its checkpoints stay
+        calls, fake = self._fake_gap_analysis(fail={("ASVS", "CWE")})
+        with fake:
+            progress = ga_backfill.run(self.collection, "", pairs, workers=1)
+        self.assertEqual(
+            progress.finished,
+            {ga_backfill.DONE: 1, ga_backfill.EMPTY: 2, ga_backfill.FAILED: 1},
+        )
+        self.assertEqual(calls[0], ("CWE", "ASVS"))
+        checkpoints = ga_backfill.checkpointed(self.collection)
+        self.assertEqual(checkpoints["ASVS >> Top10"], ga_backfill.EMPTY)
+        self.assertEqual(checkpoints["ASVS >> CWE"], ga_backfill.FAILED)
+        # the pair it did compute is served, so the generation moved
+        self.assertEqual(db.get_dataset_generation()[0], 1)
+
+        # the next run only retries the failed pair, then clears the checkpoints
+        calls, fake = self._fake_gap_analysis()
+        with fake:
+            progress = ga_backfill.run(self.collection, "", pairs, workers=1)
+        self.assertEqual(calls, [("ASVS", "CWE")])
+        self.assertEqual(progress.total, 1)
+        self.assertEqual(ga_backfill.checkpointed(self.collection), {})
+        self.assertTrue(
+            self.collection.gap_analysis_exists(
+                gap_analysis.make_resources_key(["ASVS", "CWE"])
+            )
+        )
+
+    def test_checkpoints_expire_when_the_dataset_changes(self) -> None:
+        pairs = [("ASVS", "Top10"), ("ASVS", "CWE"), ("CWE", "ASVS")]
+        calls, fake = self._fake_gap_analysis(fail={("ASVS", "CWE")})
+        with fake:
+            ga_backfill.run(self.collection, "", pairs, workers=1)
+        # the run's own bump keeps its checkpoints current
+        self.assertEqual(
+            ga_backfill.checkpointed(self.collection, 1),
+            {
+                "ASVS >> Top10": ga_backfill.EMPTY,
+                "ASVS >> CWE": ga_backfill.FAILED,
+                "CWE >> ASVS": ga_backfill.DONE,
+            },
+        )
+
+        dataset_generation.bump()  # an import changes the data
+        calls, fake = self._fake_gap_analysis()
+        with fake:
+            progress = ga_backfill.run(self.collection, "", pairs, workers=1)
+        # the empty pair is tried again; the done one is still cached
+        self.assertEqual(progress.total, 3)
+        self.assertEqual(calls, [("ASVS", "CWE"), ("ASVS", "Top10")])
+        self.assertEqual(ga_backfill.checkpointed(self.collection), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from typing import Any, List, Optional, Tuple
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.utils import ga_payload, gap_analysis
+
+KEY = gap_analysis.make_resources_key(["ASVS", "CWE"])
+RESULT = {f"control-{i}": {"start": {"id": i}, "paths": {}} for i in range(5)}
+
+
+class TestGapAnalysisControls(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection()
+
+    def _page(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> Tuple[int, List[Tuple[str, Any]]]:
+        total, controls = self.collection.gap_analysis_controls(KEY, offset, limit)
+        return total, [(key, json.loads(value)) for key, value in controls]
+
+    def test_pages_follow_result_order_and_track_writes(self) -> None:
+        text = json.dumps({"result": RESULT})
+        self.collection.add_gap_analysis_result(KEY, text)
+        row = self.collection.session.query(db.GapAnalysisControl).first()
+        self.assertEqual(
+            ga_payload.decode_entry(row.value), json.dumps(RESULT["control-0"])
+        )
+        # pages are read from the index alone
+        with patch.object(
+            self.collection, "get_gap_analysis_result", side_effect=AssertionError
+        ):
+            self.assertEqual(
+                self._page(1, 2),
+                (
+                    5,
+                    [
+                        ("control-1", RESULT["control-1"]),
+                        ("control-2", RESULT["control-2"]),
+                    ],
+                ),
+            )
+            self.assertEqual(
+                [key for key, _ in self.collection.iter_gap_analysis_controls(KEY)],
+                list(RESULT),
+            )
+
+        self.collection.add_gap_analysis_result(
+            KEY, json.dumps({"result": {"other": {}}})
+        )
+        self.assertEqual(self._page(), (1, [("other", {})]))
+
+        self.collection.delete_gapanalysis_results_for("ASVS")
+        self.assertIsNone(self.collection.gap_analysis_controls(KEY))
+        self.assertEqual(
+            self.collection.session.query(db.GapAnalysisControl).count(), 0
+        )
+
+    @patch.dict(os.environ, {"CRE_GA_STORAGE": "compressed"})
+    def test_compressed_rows_are_paged_without_decoding_the_row(self) -> None:
+        self.collection.add_gap_analysis_result(KEY, json.dumps({"result": RESULT}))
+        self.assertIsNone(
+            self.collection.session.query(db.GapAnalysisResults).one().ga_object
+        )
+        with patch.object(ga_payload, "decode", wraps=ga_payload.decode) as decode:
+            self.assertEqual(
+                self._page(3, 1), (5, [("control-3", RESULT["control-3"])])
+            )
+        self.assertEqual(decode.call_count, 1)
+
+    def test_rows_written_before_the_index_are_read_then_backfilled(self) -> None:
+        self.collection.add_gap_analysis_result(KEY, json.dumps({"result": RESULT}))
+        self.collection.session.query(db.GapAnalysisControl).delete()
+        # drill-down rows and empty placeholders are not indexed
+        self.collection.add_gap_analysis_result(f"{KEY}->x", '{"result": {"a": 1}}')
+        self.collection.session.add(
+            db.GapAnalysisResults(cache_key="CWE >> ASVS", ga_object='{"result": {}}')
+        )
+        self.collection.session.commit()
+
+        # served from the row without writing to the database
+        self.assertEqual(self._page(4), (5, [("control-4", RESULT["control-4"])]))
+        self.assertEqual(
+            [key for key, _ in self.collection.iter_gap_analysis_controls(KEY)],
+            list(RESULT),
+        )
+        self.assertEqual(
+            self.collection.session.query(db.GapAnalysisControl).count(), 0
+        )
+        self.assertIsNone(self.collection.gap_analysis_controls(f"{KEY}->x"))
+        self.assertIsNone(self.collection.gap_analysis_controls("CWE >> ASVS"))
+
+        self.assertEqual(
+            self.collection.index_unindexed_gap_analysis_controls(batch_size=1), 1
+        )
+        self.assertEqual(
+            self.collection.session.query(db.GapAnalysisControl).count(), 5
+        )
+        self.assertEqual(self.collection.index_unindexed_gap_analysis_controls(), 0)
+
+    def test_web_pages_and_ndjson(self) -> None:
+        self.collection.add_gap_analysis_result(KEY, json.dumps({"result": RESULT}))
+        url = "/rest/v1/map_analysis_controls?standard=ASVS&standard=CWE"
+        with patch.dict(os.environ, {"INSECURE_REQUESTS": "True"}):
+            with self.app.test_client() as client:
+                response = client.get(url + "&page=2&per_page=2")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json,
+                    {
+                        "result": {k: RESULT[k] for k in ("control-2", "control-3")},
+                        "page": 2,
+                        "per_page": 2,
+                        "total": 5,
+                        "total_pages": 3,
+                    },
+                )
+
+                for bad in ("&page=abc", "&page=-1&per_page=x"):
+                    response = client.get(url + bad)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json["page"], 1)
+                    self.assertEqual(len(response.json["result"]), 5)
+
+                response = client.get(url + "&format=ndjson")
+                self.assertEqual(response.mimetype, "application/x-ndjson")
+                self.assertEqual(
+                    [json.loads(line) for line in response.data.splitlines()],
+                    [{"key": k, "result": v} for k, v in RESULT.items()],
+                )
+
+                self.assertEqual(
+                    client.get(url.replace("CWE", "Top10")).status_code, 404
+                )
+                self.assertEqual(
+                    client.get(
+                        "/rest/v1/map_analysis_controls?standard=ASVS"
+                    ).status_code,
+                    400,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
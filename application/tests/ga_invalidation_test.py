@@ -0,0 +1,179 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from typing import Any, Dict, List
+
+import networkx as nx
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.database.inmemory_gap_analysis import InMemoryGapAnalysis
+from application.defs import cre_defs as defs
+from application.utils import ga_invalidation, import_apply, import_diff
+
+
+def _control(
+    name: str, section: str, description: str = "", **extra: Any
+) -> Dict[str, Any]:
+    doc = {
+        "name": name,
+        "section": section,
+        "subsection": "",
+        "sectionID": section,
+        "description": description,
+    }
+    doc.update(extra)
+    return doc
+
+
+class TestGapAnalysisInvalidation(unittest.TestCase):
+    def tearDown(self) -> None:
+        InMemoryGapAnalysis.reset()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        InMemoryGapAnalysis.reset()
+        self.collection = db.Node_collection().with_graph()
+        self.collection.graph.with_graph(graph=nx.DiGraph(), graph_data=[])
+
+        left = self.collection.add_cre(defs.CRE(id="111-111", name="left"))
+        right = self.collection.add_cre(defs.CRE(id="222-222", name="right"))
+        for name, section, cre in (
+            ("StdA", "a1", left),
+            ("StdA", "a2", right),
+            ("StdB", "b1", left),
+            ("StdC", "c1", right),
+        ):
+            node = self.collection.add_node(
+                defs.Standard(
+                    name=name, section=section, sectionID=section, description="old"
+                )
+            )
+            self.collection.add_link(cre=cre, node=node, ltype=defs.LinkTypes.LinkedTo)
+
+        with patch.dict(os.environ, {"CRE_GA_ENGINE": "inmemory"}):
+            for pair in (["StdA", "StdB"], ["StdB", "StdA"], ["StdA", "StdC"]):
+                db.gap_analysis(neo_db=None, node_names=pair)
+
+    def _cache_keys(self) -> List[str]:
+        return sorted(
+            r.cache_key
+            for r in self.collection.session.query(db.GapAnalysisResults).all()
+        )
+
+    def test_description_change_patches_rows_in_place(self) -> None:
+        ops: List[import_diff.ChangeSetOp] = [
+            import_diff.ModifyControl(
+                key=("StdB", "b1", "b1"),
+                before=_control("StdB", "b1", "old"),
+                after=_control("StdB", "b1", "new"),
+            )
+        ]
+        keys_before = self._cache_keys()
+
+        report = ga_invalidation.invalidate_gap_analysis_for_change_set(
+            self.collection.session, ops
+        )
+
+        self.assertEqual(report.invalidated_pairs, [])
+        self.assertEqual(report.patched_pairs, ["StdA >> StdB", "StdB >> StdA"])
+        self.assertEqual(report.kept_pairs, ["StdA >> StdC"])
+        self.assertEqual(self._cache_keys(), keys_before)
+        stored = json.loads(self.collection.get_gap_analysis_result("StdB >> StdA"))
+        self.assertEqual(stored["result"]["StdB:b1:b1"]["start"]["description"], "new")
+        # the per-control index follows the rewritten text
+        _, controls = self.collection.gap_analysis_controls("StdB >> StdA")
+        self.assertEqual(
+            [(key, json.loads(value)) for key, value in controls],
+            list(stored["result"].items()),
+        )
+
+    def test_removed_control_invalidates_only_pairs_that_reference_it(self) -> None:
+        ops: List[import_diff.ChangeSetOp] = [
+            import_diff.RemoveControl(
+                key=("StdA", "a2", "a2"), document=_control("StdA", "a2", "old")
+            )
+        ]
+
+        report = ga_invalidation.invalidate_gap_analysis_for_change_set(
+            self.collection.session, ops
+        )
+
+        # a2 is a base row of every StdA >> * pair but no path from b1 reaches it.
+        self.assertEqual(report.invalidated_pairs, ["StdA >> StdB", "StdA >> StdC"])
+        self.assertEqual(report.kept_pairs, ["StdB >> StdA"])
+        self.assertEqual(
+            self._cache_keys(), ["StdB >> StdA", "StdB >> StdA->StdB:b1:b1"]
+        )
+        self.assertEqual(
+            {
+                key
+                for (key,) in self.collection.session.query(
+                    db.GapAnalysisControl.cache_key
+                )
+            },
+            {"StdB >> StdA"},
+        )
+
+    def test_link_change_and_add_invalidate_whole_standard(self) -> None:
+        ops: List[import_diff.ChangeSetOp] = [
+            import_diff.ModifyControl(
+                key=("StdB", "b1", "b1"),
+                before=_control("StdB", "b1", linked_cres=[{"id": "111-111"}]),
+                after=_control("StdB", "b1", linked_cres=[{"id": "222-222"}]),
+            ),
+            import_diff.AddControl(
+                key=("StdC", "c2", "c2"), document=_control("StdC", "c2")
+            ),
+        ]
+        keys_before = self._cache_keys()
+
+        report = ga_invalidation.invalidate_gap_analysis_for_change_set(
+            self.collection.session, ops, dry_run=True
+        )
+
+        self.assertTrue(report.dry_run)
+        self.assertEqual(
+            report.invalidated_pairs,
+            ["StdA >> StdB", "StdA >> StdC", "StdB >> StdA"],
+        )
+        self.assertEqual(report.deleted_rows, len(keys_before))
+        self.assertEqual(self._cache_keys(), keys_before)
+
+    def test_apply_changeset_invalidates_with_the_apply(self) -> None:
+        run = db.create_import_run(source="ga_invalidation_test", version="r1")
+        ops: List[import_diff.ChangeSetOp] = [
+            import_diff.RemoveControl(
+                key=("StdA", "a2", "a2"), document=_control("StdA", "a2", "old")
+            )
+        ]
+        db.persist_staged_change_set(
+            run_id=run.id,
+            changeset_json=import_diff.change_set_to_json(ops),
+            has_conflicts=False,
+            staging_status="accepted",
+        )
+
+        dry = import_apply.apply_changeset(run_id=run.id, dry_run=True)
+        self.assertEqual(
+            dry.ga_invalidation_report.invalidated_pairs,
+            ["StdA >> StdB", "StdA >> StdC"],
+        )
+        self.assertIn("StdA >> StdC", self._cache_keys())
+
+        res = import_apply.apply_changeset(run_id=run.id)
+        self.assertEqual(res.ga_invalidation_report.kept_pairs, ["StdB >> StdA"])
+        self.assertEqual(
+            self._cache_keys(), ["StdB >> StdA", "StdB >> StdA->StdB:b1:b1"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
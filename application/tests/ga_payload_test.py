@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from application import create_app, sqla  # type: ignore
+from application.cmd import cre_main
+from application.database import db
+from application.utils import ga_payload
+
+RESULT = {"result": {"StdA:a1:a1": {"paths": {"StdB:b1:b1": {"score": 0}}}}}
+
+
+class TestGapAnalysisPayloadStorage(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection()
+
+    def _row(self, cache_key: str) -> db.GapAnalysisResults:
+        row: db.GapAnalysisResults = (
+            self.collection.session.query(db.GapAnalysisResults)
+            .filter(db.GapAnalysisResults.cache_key == cache_key)
+            .one()
+        )
+        return row
+
+    def test_result_spans_locate_entries_in_the_text(self) -> None:
+        text = json.dumps(
+            {"x": {"result": 1}, "result": {'a"}': {"b": "}"}, "c": [1, 2]}},
+            indent=2,
+        )
+        spans = ga_payload.result_spans(text)
+        self.assertEqual([key for key, _, _ in spans], ['a"}', "c"])
+        self.assertEqual(
+            {key: json.loads(text[start:end]) for key, start, end in spans},
+            json.loads(text)["result"],
+        )
+        # repeated keys keep their first position and last value, as json.loads
+        spans = ga_payload.result_spans('{"result": {"a": 1, "b": 2, "a": 3}}')
+        self.assertEqual(
+            [(key, end - start) for key, start, end in spans], [("a", 1), ("b", 1)]
+        )
+        self.assertEqual(ga_payload.result_spans('{"result": []}'), [])
+        with self.assertRaises(ValueError):
+            ga_payload.result_spans('{"result": {"a": 1')
+
+    @patch.dict(os.environ, {"CRE_GA_STORAGE": "compressed"})
+    def test_compressed_rows_round_trip(self) -> None:
+        text = json.dumps(RESULT)
+        self.collection.add_gap_analysis_result("StdA >> StdB", text)
+
+        row = self._row("StdA >> StdB")
+        self.assertIsNone(row.ga_object)
+        self.assertEqual(row.payload_encoding, "gzip")
+        self.assertEqual(row.schema_version, ga_payload.GA_PAYLOAD_SCHEMA_VERSION)
+        self.assertEqual(gzip.decompress(row.ga_payload).decode(), text)
+        self.assertEqual(self.collection.get_gap_analysis_result("StdA >> StdB"), text)
+        self.assertTrue(self.collection.gap_analysis_exists("StdA >> StdB"))
+
+        # Non-material primary updates are still refused for compressed rows.
+        self.collection.add_gap_analysis_result("StdA >> StdB", '{"result": {}}')
+        self.assertEqual(self.collection.get_gap_analysis_result("StdA >> StdB"), text)
+
+    @patch.dict(
+        os.environ,
+        {"CRE_GA_STORAGE": "compressed", "DYNO": "web.1", "INSECURE_REQUESTS": "1"},
+    )
+    def test_map_analysis_streams_stored_bytes(self) -> None:
+        self.collection.add_gap_analysis_result("StdA >> StdB", json.dumps(RESULT))
+        stored = self.collection.get_gap_analysis_encoded("StdA >> StdB")
+        url = "/rest/v1/map_analysis?standard=StdA&standard=StdB"
+
+        with self.app.test_client() as client:
+            gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(gz.status_code, 200)
+            self.assertEqual(gz.headers["Content-Encoding"], "gzip")
+            self.assertEqual(gz.get_data(), stored.body)
+            self.assertEqual(gz.headers["ETag"], f'"{stored.etag}"')
+
+            plain = client.get(url, headers={"Accept-Encoding": "identity"})
+            self.assertNotIn("Content-Encoding", plain.headers)
+            self.assertEqual(json.loads(plain.data), RESULT)
+
+            not_modified = client.get(
+                url, headers={"If-None-Match": gz.headers["ETag"]}
+            )
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified.get_data(), b"")
+
+    def test_backfill_rewrites_rows_between_modes(self) -> None:
+        self.collection.add_gap_analysis_result("StdA >> StdB", json.dumps(RESULT))
+        self.collection.add_gap_analysis_result(
+            "StdA >> StdB->StdA:a1:a1", '{"result": {"paths": {}}}'
+        )
+        # Legacy non-material primary row, as written before the guard existed.
+        self.collection.session.add(
+            db.GapAnalysisResults(cache_key="StdB >> StdA", ga_object='{"result": {}}')
+        )
+        self.collection.session.commit()
+
+        with patch.object(cre_main, "db_connect", return_value=self.collection):
+            counts = cre_main.backfill_gap_analysis_storage(
+                "unused", target="compressed", batch_size=1
+            )
+            self.assertEqual((counts["rewritten"], counts["skipped"]), (2, 1))
+            self.assertIsNotNone(self._row("StdA >> StdB").ga_payload)
+            self.assertIsNone(self._row("StdB >> StdA").ga_payload)
+            self.assertFalse(self.collection.gap_analysis_exists("StdB >> StdA"))
+
+            counts = cre_main.backfill_gap_analysis_storage("unused", target="text")
+            self.assertEqual(counts["rewritten"], 2)
+        row = self._row("StdA >> StdB")
+        self.assertIsNone(row.ga_payload)
+        self.assertEqual(json.loads(row.ga_object), RESULT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+from types import SimpleNamespace
+from typing import Any, List
 from unittest.mock import MagicMock, patch
 from application.database import db
 from application.defs import cre_defs as defs
@@ -63,5 +65,96 @@ class TestGapAnalysisPruning(unittest.TestCase):
         )
 
 
+class TestFormatGapAnalysisResponse(unittest.TestCase):
+    @staticmethod
+    def _node(element_id: str, **props: Any) -> Any:
+        if "external_id" in props:
+            node = db.NeoCRE(description="", tags=[], **props)
+        else:
+            node = db.NeoStandard(
+                description="",
+                tags=[],
+                version="",
+                hyperlink="https://example.com",
+                section="",
+                subsection="",
+                **props,
+            )
+        node.element_id_property = element_id
+        return node
+
+    @staticmethod
+    def _rel(model: Any, start: Any, end: Any) -> Any:
+        rel = model()
+        rel._start_node_element_id_property = start.element_id
+        rel._end_node_element_id_property = end.element_id
+        return rel
+
+    def _record(self, end_section: str) -> List[SimpleNamespace]:
+        # every record resolves its own node objects, as cypher_query does
+        base = self._node("4:a", name="ASVS", section_id="1")
+        cre = self._node("4:c", name="cre", external_id="111-111")
+        end = self._node(f"4:{end_section}", name="NIST", section_id=end_section)
+        return [
+            SimpleNamespace(
+                start_node=base,
+                end_node=end,
+                nodes=[end, cre, base],
+                relationships=[
+                    self._rel(db.LinkedToRel, cre, base),
+                    self._rel(db.ContainsRel, cre, end),
+                ],
+            )
+        ]
+
+    def test_segments_resolve_nodes_by_element_id_and_parse_each_once(self) -> None:
+        base = self._node("4:a", name="ASVS", section_id="1")
+        records = [self._record("2"), self._record("3")]
+        with patch.object(
+            db.NEO_DB,
+            "parse_node_no_links",
+            side_effect=db.NEO_DB.parse_node_no_links,
+        ) as parse:
+            parsed_base, paths = db.NEO_DB._format_gap_analysis_response(
+                [base], records
+            )
+        self.assertEqual(parse.call_count, 4)  # ASVS, cre, NIST 2, NIST 3
+
+        standard = defs.Standard(
+            name="ASVS", sectionID="1", hyperlink="https://example.com"
+        )
+        cre = defs.CRE(name="cre", id="111-111")
+        self.assertEqual(parsed_base, [standard])
+        self.assertEqual(
+            [
+                (
+                    p["start"],
+                    p["end"].sectionID,
+                    [(s["start"], s["end"], s["relationship"]) for s in p["path"]],
+                )
+                for p in paths
+            ],
+            [
+                (
+                    standard,
+                    section,
+                    [
+                        (cre, standard, "LINKED_TO"),
+                        (
+                            cre,
+                            defs.Standard(
+                                name="NIST",
+                                sectionID=section,
+                                hyperlink="https://example.com",
+                            ),
+                            "CONTAINS",
+                        ),
+                    ],
+                )
+                for section in ("2", "3")
+            ],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
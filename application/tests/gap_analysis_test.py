@@ -1,8 +1,12 @@
+import copy
+import random
 import unittest
+from typing import Any, Dict, List
 from application.defs import cre_defs
 
 from application.utils.gap_analysis import (
     get_path_score,
+    score_paths,
     get_relation_direction,
     get_next_id,
     PENALTIES,
@@ -179,3 +183,35 @@ class TestGapAnalysis(unittest.TestCase):
         self.assertEqual(path["path"][1]["score"], PENALTIES["CONTAINS_DOWN"])
         self.assertEqual(path["path"][2]["score"], PENALTIES["RELATED"])
         self.assertEqual(path["path"][3]["score"], PENALTIES["CONTAINS_UP"])
+
+    def test_score_paths_matches_get_path_score(self) -> None:
+        rng = random.Random(16)
+        cres = [cre_defs.CRE(name="bob", id=f"{i:03}-{i:03}") for i in range(8)]
+        paths: List[Dict[str, Any]] = []
+        for _ in range(300):
+            path: Dict[str, Any] = {
+                "start": rng.choice(cres),
+                "end": rng.choice(cres),
+                "path": [],
+            }
+            for _ in range(rng.randrange(0, 6)):
+                path["path"].append(
+                    {
+                        "start": rng.choice(cres),
+                        "end": rng.choice(cres),
+                        "relationship": rng.choice(
+                            ["CONTAINS", "CONTAINS", "RELATED", "LINKED_TO", "SAME"]
+                        ),
+                    }
+                )
+            paths.append(path)
+        expected = copy.deepcopy(paths)
+        scores = [get_path_score(path) for path in expected]
+
+        self.assertEqual(score_paths(paths), scores)
+        self.assertEqual(paths, expected)  # same per-step scores
+        self.assertEqual(score_paths([]), [])
+        unknown = copy.deepcopy(next(p for p in paths if p["path"]))
+        unknown["path"][0]["relationship"] = "UNKNOWN"
+        with self.assertRaises(KeyError):
+            score_paths([unknown])
@@ -1,12 +1,19 @@
 from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
 import subprocess
+import tempfile
 import time
 import unittest
 import os
+from typing import Any, Dict, List
 
 from application.utils.harvester.diff_normalizer import DiffNormalizer
 from application.utils.harvester.diff_parser import DiffParser
+from application.utils.harvester.diff_pipeline import DiffPipeline
 from application.utils.harvester.diff_retriever import DiffRetriever
+from application.utils.harvester.file_filter import FileFilter
+from application.utils.harvester.filtering_metrics import FilteringMetricsCollector
 from application.utils.harvester.git_repository_client import GitRepositoryClient
 
 
@@ -18,7 +25,7 @@ class DiffPipelineBenchmark(unittest.TestCase):
     regression guard against accidental slowdowns.
     """
 
-    def test_pipeline_benchmark(self):
+    def test_pipeline_benchmark(self) -> None:
 
         if os.getenv("OPENCRE_RUN_NETWORK_TESTS") != "1":
             self.skipTest("Network benchmark disabled")
@@ -71,3 +78,94 @@ class DiffPipelineBenchmark(unittest.TestCase):
         print(f"\nPipeline took {elapsed:.3f}s")
 
         self.assertLess(elapsed, 5)
+
+
+def git(*args: Any, cwd: Path) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+class StreamingDiffPipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.repo = Path(self.tempdir.name)
+
+        git("init", "-q", cwd=self.repo)
+        git("config", "user.name", "Test User", cwd=self.repo)
+        git("config", "user.email", "test@example.com", cwd=self.repo)
+        (self.repo / "README.md").write_text("v1\n")
+        git("add", ".", cwd=self.repo)
+        git("commit", "-q", "-m", "base", cwd=self.repo)
+        self.base = git("rev-parse", "HEAD", cwd=self.repo)
+
+        (self.repo / "README.md").write_text("v1\n  Added\t\tline  \r\n\n")
+        (self.repo / "docs").mkdir()
+        (self.repo / "docs" / "guide.md").write_text("one\ntwo\n")
+        (self.repo / "node_modules").mkdir()
+        (self.repo / "node_modules" / "dep.md").write_text("vendored\n")
+        (self.repo / "script.py").write_text("print(1)\n")
+        git("add", ".", cwd=self.repo)
+        git("commit", "-q", "-m", "change", cwd=self.repo)
+        self.head = git("rev-parse", "HEAD", cwd=self.repo)
+
+        client = MagicMock()
+        client.get_local_path.return_value = self.repo
+        self.retriever = DiffRetriever(client)
+
+    def test_streaming_chain_matches_list_chain(self) -> None:
+        file_filter = FileFilter()
+        metadata: Dict[str, Any] = {
+            "repository": "OWASP/ASVS",
+            "commit_sha": self.head,
+            "committed_at": datetime(2026, 1, 1, tzinfo=UTC),
+        }
+        blocks = DiffParser().parse(
+            self.retriever.get_diff(self.base, self.head), **metadata
+        )
+        expected = DiffNormalizer().normalize(
+            [block for block in blocks if file_filter.is_retained(block.file_path)]
+        )
+
+        metrics = FilteringMetricsCollector()
+        streamed = list(
+            DiffPipeline(self.retriever, file_filter).iter_blocks(
+                self.base, self.head, metrics=metrics, **metadata
+            )
+        )
+
+        self.assertEqual(streamed, expected)
+        self.assertEqual(
+            [(b.file_path, b.added_lines) for b in streamed],
+            [("README.md", ["Added line"]), ("docs/guide.md", ["one", "two"])],
+        )
+        self.assertEqual(
+            (metrics.retained_files, metrics.filtered_files),
+            (2, 2),
+        )
+
+    def test_iter_diff_stops_git_when_closed_and_reports_failures(self) -> None:
+        lines = self.retriever.iter_diff(self.base, self.head)
+        self.assertTrue(next(lines).startswith("diff --git"))
+        lines.close()
+
+        lines = self.retriever.iter_diff(self.base, self.head)
+        self.retriever._resolve_commit = lambda commit: "no-such-commit"  # type: ignore[method-assign]
+        with self.assertRaises(subprocess.CalledProcessError):
+            list(lines)
+
+    def test_iter_diff_timeout_ignores_time_spent_by_the_consumer(self) -> None:
+        self.retriever.DIFF_TIMEOUT_SECONDS = 0.5
+        self.retriever.READ_CHUNK_BYTES = 16
+        lines: List[str] = []
+        for line in self.retriever.iter_diff(self.base, self.head):
+            lines.append(line)
+            time.sleep(0.1)
+        self.assertEqual(
+            lines, self.retriever.get_diff(self.base, self.head).splitlines()
+        )
@@ -116,6 +116,27 @@ class FileFilterTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             FileFilter(allowed_extensions={""})
 
+    def test_repository_path_rules(self) -> None:
+        file_filter = FileFilter.for_paths(
+            include=["4.0/en/**/*.md"],
+            exclude=["**/archive/**"],
+        )
+
+        result = file_filter.filter_files(
+            [
+                "4.0/en/0x10-V1-Architecture.md",
+                "4.0/en/archive/old.md",
+                "4.0/en/node_modules/dep/README.md",
+                "5.0/en/0x10-V1-Architecture.md",
+                "4.0/en/notes.json",
+            ]
+        )
+
+        self.assertEqual(
+            result,
+            ["4.0/en/0x10-V1-Architecture.md"],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
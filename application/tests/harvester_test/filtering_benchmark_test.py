@@ -25,6 +25,18 @@ class FilteringBenchmarkTests(unittest.TestCase):
         self.assertEqual(result.retention_rate, 0.5)
         self.assertEqual(result.filtering_rate, 0.5)
 
+    def test_filtering_benchmark_reports_throughput(self) -> None:
+        files = ["docs/guide.md", "node_modules/dep/README.md", "app.js"]
+
+        result = FilteringBenchmark(file_filter=FileFilter()).run(files, repeat=50)
+
+        self.assertEqual(result.total_files, 3)
+        self.assertEqual(result.retained_files, 1)
+        self.assertGreater(result.elapsed_seconds, 0.0)
+        self.assertAlmostEqual(
+            result.files_per_second, 150 / result.elapsed_seconds, places=3
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,11 +3,14 @@ import tempfile
 import unittest
 from pathlib import Path
 import threading
+from typing import Any, List, Optional
 
 from application.utils.harvester.git_repository_client import (
     GitRepositoryClient,
 )
 from application.utils.harvester.change_detector import ChangeDetector
+from application.utils.harvester.diff_retriever import DiffRetriever
+from application.utils.harvester.file_filter import FileFilter
 
 
 class IntegrationGitRepositoryClient(GitRepositoryClient):
@@ -20,7 +23,7 @@ class IntegrationGitRepositoryClient(GitRepositoryClient):
         return self._repository_url
 
 
-def git(*args, cwd=None):
+def git(*args: Any, cwd: Optional[Path] = None) -> None:
     subprocess.run(
         ["git", *args],
         cwd=cwd,
@@ -30,7 +33,7 @@ def git(*args, cwd=None):
     )
 
 
-def git_output(*args, cwd=None):
+def git_output(*args: Any, cwd: Optional[Path] = None) -> str:
     return subprocess.run(
         ["git", *args],
         cwd=cwd,
@@ -268,5 +271,101 @@ class GitRepositoryClientIntegrationTests(unittest.TestCase):
         )
 
 
+class PartialCloneIntegrationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+
+        self.remote = self.root / "remote.git"
+        self.work = self.root / "work"
+        self.cache = self.root / "cache"
+
+        git("init", "--bare", self.remote)
+        git("config", "uploadpack.allowFilter", "true", cwd=self.remote)
+        git("clone", self.remote, self.work)
+        git("config", "user.name", "Test User", cwd=self.work)
+        git("config", "user.email", "test@example.com", cwd=self.work)
+        git("checkout", "-b", "main", cwd=self.work)
+
+        self.commits: List[str] = []
+        for i in range(6):
+            (self.work / "docs").mkdir(exist_ok=True)
+            (self.work / "src").mkdir(exist_ok=True)
+            (self.work / "docs" / f"page-{i}.md").write_text(f"page {i}\n")
+            (self.work / "src" / f"module_{i}.py").write_text(f"x = {i}\n")
+            git("add", ".", cwd=self.work)
+            git("commit", "-m", f"commit {i}", cwd=self.work)
+            self.commits.append(git_output("rev-parse", "HEAD", cwd=self.work))
+        git("push", "origin", "main", cwd=self.work)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def create_client(self, **kwargs: Any) -> IntegrationGitRepositoryClient:
+        # a file:// URL, as git ignores --depth and --filter for local paths
+        return IntegrationGitRepositoryClient(
+            owner="OWASP",
+            repository="ASVS",
+            local_path=self.cache,
+            repository_url=self.remote.as_uri(),
+            **kwargs,
+        )
+
+    def history_length(self) -> int:
+        return int(git_output("rev-list", "--count", "HEAD", cwd=self.cache))
+
+    def test_sparse_partial_shallow_clone(self) -> None:
+        client = self.create_client(
+            blob_filter=True,
+            depth=1,
+            sparse_patterns=FileFilter.for_paths(
+                ["docs/**/*.md"], []
+            ).sparse_checkout_patterns(),
+        )
+
+        client.clone()
+
+        self.assertTrue(client.is_shallow())
+        self.assertEqual(self.history_length(), 1)
+        self.assertEqual(
+            git_output("config", "remote.origin.partialclonefilter", cwd=self.cache),
+            "blob:none",
+        )
+        self.assertTrue((self.cache / "docs" / "page-5.md").exists())
+        self.assertFalse((self.cache / "src").exists())
+        self.assertEqual(client.get_current_commit_sha(), self.commits[-1])
+
+    def test_clone_is_anchored_at_the_checkpoint_commit(self) -> None:
+        client = self.create_client(blob_filter=True, depth=1)
+
+        client.clone(since_commit=self.commits[3])
+
+        self.assertTrue(client.is_shallow())
+        self.assertGreaterEqual(self.history_length(), 3)
+        self.assertLess(self.history_length(), 6)
+
+    def test_history_is_deepened_to_reach_an_older_checkpoint(self) -> None:
+        client = self.create_client(blob_filter=True, depth=1)
+        client.clone()
+
+        commits = ChangeDetector(client).get_commits_since(
+            self.commits[0], self.commits[-1]
+        )
+        diff = DiffRetriever(client).get_diff(self.commits[1], self.commits[-1])
+
+        self.assertEqual(commits, self.commits[1:])
+        self.assertIn("+page 5", diff)
+        self.assertNotIn("page-1.md", diff)
+
+    def test_full_clone_is_left_alone(self) -> None:
+        client = self.create_client()
+        client.clone(since_commit=self.commits[0])
+
+        self.assertFalse(client.is_shallow())
+        self.assertEqual(self.history_length(), 6)
+        with self.assertRaises(subprocess.CalledProcessError):
+            DiffRetriever(client).get_diff("0" * 40)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,262 @@
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from application.utils.harvester.checkpoint_store import CheckpointStore
+from application.utils.harvester.git_repository_client import GitRepositoryClient
+from application.utils.harvester.harvest_orchestrator import (
+    HarvestOrchestrator,
+    format_timing_table,
+)
+from application.utils.harvester.models import DiffBlock, RepositoryCheckpoint
+from application.utils.harvester.schemas import RepositoryConfig
+
+
+def git(*args: Any, cwd: Optional[Path] = None) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def repository_config(
+    repository_id: str, repo: str, include: Iterable[str] = ("docs/**/*.md",)
+) -> RepositoryConfig:
+    return RepositoryConfig.model_validate(
+        {
+            "id": repository_id,
+            "type": "github",
+            "owner": "OWASP",
+            "repo": repo,
+            "paths": {"include": list(include)},
+            "chunking": {"strategy": "markdown_heading", "max_tokens": 100},
+            "polling": {"mode": "incremental", "interval_minutes": 60},
+        }
+    )
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.checkpoints: Dict[str, RepositoryCheckpoint] = {}
+
+    def load(self, repository_id: str) -> Optional[RepositoryCheckpoint]:
+        return self.checkpoints.get(repository_id)
+
+    def save(self, checkpoint: RepositoryCheckpoint) -> None:
+        self.checkpoints[checkpoint.repository_id] = checkpoint
+
+
+class LocalRemoteClient(GitRepositoryClient):
+    def __init__(self, *args: Any, repository_url: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._repository_url = repository_url
+
+    @property
+    def repository_url(self) -> str:
+        return self._repository_url
+
+
+class HarvestOrchestratorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.root = Path(self.tempdir.name)
+        self.store = InMemoryCheckpointStore()
+
+    def create_remote(self, name: str) -> Tuple[Path, Path]:
+        remote = self.root / f"{name}.git"
+        work = self.root / f"{name}-work"
+        git("init", "--bare", remote)
+        git("clone", remote, work)
+        git("config", "user.name", "Test User", cwd=work)
+        git("config", "user.email", "test@example.com", cwd=work)
+        git("checkout", "-b", "main", cwd=work)
+        self.commit(work, {"docs/intro.md": "intro\n"})
+        return remote, work
+
+    def commit(self, work: Path, files: Mapping[str, str]) -> str:
+        for path, content in files.items():
+            (work / path).parent.mkdir(parents=True, exist_ok=True)
+            (work / path).write_text(content)
+        git("add", ".", cwd=work)
+        git("commit", "-m", "change", cwd=work)
+        git("push", "origin", "main", cwd=work)
+        return git("rev-parse", "HEAD", cwd=work)
+
+    def client_factory(
+        self, remotes: Mapping[str, Path]
+    ) -> Callable[[RepositoryConfig], GitRepositoryClient]:
+        def create(config: RepositoryConfig) -> GitRepositoryClient:
+            return LocalRemoteClient(
+                owner=config.owner,
+                repository=config.repo,
+                local_path=self.root / "cache" / config.repo,
+                repository_url=str(remotes[config.id]),
+            )
+
+        return create
+
+    def test_repositories_are_diffed_since_their_checkpoints(self) -> None:
+        asvs_remote, asvs_work = self.create_remote("asvs")
+        wstg_remote, wstg_work = self.create_remote("wstg")
+        configs = [
+            repository_config("owasp-asvs", "ASVS"),
+            repository_config("owasp-wstg", "WSTG"),
+            repository_config("disabled", "Disabled").model_copy(
+                update={"enabled": False}
+            ),
+        ]
+        received: List[Tuple[str, str, List[str]]] = []
+        lock = threading.Lock()
+
+        def sink(config: RepositoryConfig, block: DiffBlock) -> None:
+            with lock:
+                received.append((config.id, block.file_path, block.added_lines))
+
+        orchestrator = HarvestOrchestrator(
+            configs,
+            checkpoint_store=self.store,
+            max_workers=2,
+            sink=sink,
+            client_factory=self.client_factory(
+                {"owasp-asvs": asvs_remote, "owasp-wstg": wstg_remote}
+            ),
+        )
+
+        baseline = orchestrator.run()
+        self.assertEqual(
+            [result.repository_id for result in baseline],
+            ["owasp-asvs", "owasp-wstg"],
+        )
+        self.assertEqual([result.blocks for result in baseline], [0, 0])
+        self.assertEqual(received, [])
+
+        asvs_head = self.commit(
+            asvs_work,
+            {
+                "docs/v5/access.md": "Verify access control.\n",
+                "README.md": "outside the include rules\n",
+                "docs/tool.py": "print('not a document')\n",
+            },
+        )
+        wstg_head = self.commit(wstg_work, {"docs/intro.md": "intro\nmore\n"})
+
+        results = orchestrator.run()
+
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual(
+            sorted(received),
+            [
+                ("owasp-asvs", "docs/v5/access.md", ["Verify access control."]),
+                ("owasp-wstg", "docs/intro.md", ["more"]),
+            ],
+        )
+        self.assertEqual(self.store.load("owasp-asvs").last_processed_commit, asvs_head)
+        self.assertEqual(self.store.load("owasp-wstg").last_processed_commit, wstg_head)
+        self.assertIsNone(self.store.load("disabled"))
+
+        table = format_timing_table(results).splitlines()
+        self.assertEqual(
+            table[0].split(),
+            ["repository", "status", "wait", "sync"]
+            + ["diff", "total", "blocks", "lines"],
+        )
+        self.assertEqual(table[1].split()[:2], ["owasp-asvs", "ok"])
+        self.assertEqual(table[1].split()[-2:], ["1", "1"])
+
+    def test_a_failing_repository_keeps_its_checkpoint(self) -> None:
+        asvs_remote, _ = self.create_remote("asvs")
+        orchestrator = HarvestOrchestrator(
+            [
+                repository_config("owasp-asvs", "ASVS"),
+                repository_config("missing", "Missing"),
+            ],
+            checkpoint_store=self.store,
+            client_factory=self.client_factory(
+                {"owasp-asvs": asvs_remote, "missing": self.root / "nope.git"}
+            ),
+        )
+
+        asvs, missing = orchestrator.run()
+
+        self.assertIsNone(asvs.error)
+        self.assertIn("CalledProcessError", missing.error)
+        self.assertIsNotNone(self.store.load("owasp-asvs"))
+        self.assertIsNone(self.store.load("missing"))
+        self.assertIn("failed", format_timing_table([asvs, missing]))
+
+    def test_a_run_without_a_sink_only_records_baselines(self) -> None:
+        asvs_remote, asvs_work = self.create_remote("asvs")
+        configs = [repository_config("owasp-asvs", "ASVS")]
+        orchestrator = HarvestOrchestrator(
+            configs,
+            checkpoint_store=self.store,
+            client_factory=self.client_factory({"owasp-asvs": asvs_remote}),
+        )
+        orchestrator.run()
+        baseline = self.store.load("owasp-asvs")
+        self.assertIsNotNone(baseline)
+
+        head = self.commit(asvs_work, {"docs/intro.md": "intro\nmore\n"})
+        (result,) = orchestrator.run()
+
+        self.assertIsNone(result.error)
+        self.assertEqual(result.blocks, 1)
+        self.assertEqual(result.head_commit, head)
+        self.assertIs(self.store.load("owasp-asvs"), baseline)
+
+    def test_fetches_are_bounded_per_host(self) -> None:
+        running: Dict[str, int] = {}
+        peak: Dict[str, int] = {}
+        lock = threading.Lock()
+        root = self.root
+
+        class SlowClient:
+            def __init__(self, config: RepositoryConfig) -> None:
+                self.host = config.owner.lower()
+                self.repository_url = f"https://{self.host}.example/{config.repo}"
+                self.path = root / config.repo
+
+            def get_local_path(self) -> Path:
+                return self.path
+
+            def refresh(self, since_commit: Optional[str] = None) -> None:
+                with lock:
+                    running[self.host] = running.get(self.host, 0) + 1
+                    peak[self.host] = max(peak.get(self.host, 0), running[self.host])
+                time.sleep(0.05)
+                with lock:
+                    running[self.host] -= 1
+
+            def get_current_commit_sha(self) -> str:
+                return "abc"
+
+        configs = [
+            repository_config(f"{owner}-{i}", f"Repo{i}").model_copy(
+                update={"owner": owner}
+            )
+            for owner in ("a", "b")
+            for i in range(3)
+        ]
+        HarvestOrchestrator(
+            configs,
+            checkpoint_store=self.store,
+            max_workers=6,
+            per_host=1,
+            client_factory=SlowClient,  # type: ignore[arg-type]
+        ).run()
+
+        self.assertEqual(peak, {"a": 1, "b": 1})
+        self.assertEqual(len(self.store.checkpoints), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
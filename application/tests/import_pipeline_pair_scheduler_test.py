@@ -14,6 +14,13 @@ def _ga_eligible_standard_doc(**kwargs: object) -> Mock:
 
 
 class TestImportPipelinePairScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        # These tests drive the pipeline with a mocked collection and no app
+        # context; the end-of-import dataset generation bump needs a real DB.
+        bump_patcher = patch("application.utils.dataset_generation.bump")
+        self.bump_mock = bump_patcher.start()
+        self.addCleanup(bump_patcher.stop)
+
     @patch("application.cmd.cre_main.schedule_gap_analysis_pairs_with_rq")
     @patch("application.cmd.cre_main.resolve_ga_peer_standard_names")
     @patch("application.cmd.cre_main.db_connect")
@@ -99,6 +106,9 @@ class TestImportPipelinePairScheduler(unittest.TestCase):
             2, wait_for_jobs_mock.call_count
         )  # one for import jobs, one for GA pair jobs
         emit_import_event_mock.assert_not_called()
+        # once before the GA pair jobs (so the GA engine sees the new nodes)
+        # and once when the import is done
+        self.assertEqual(self.bump_mock.call_count, 2)
 
     @patch("application.cmd.cre_main.schedule_gap_analysis_pairs_with_rq")
     @patch("application.cmd.cre_main.db_connect")
@@ -0,0 +1,208 @@
+import json
+import os
+import unittest
+from unittest.mock import Mock, patch
+from typing import Any, Dict
+
+import networkx as nx
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.database.inmemory_gap_analysis import InMemoryGapAnalysis
+from application.defs import cre_defs as defs
+from application.utils import dataset_generation
+
+
+class TestInMemoryGapAnalysis(unittest.TestCase):
+    def tearDown(self) -> None:
+        InMemoryGapAnalysis.reset()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        InMemoryGapAnalysis.reset()
+        self.collection = db.Node_collection().with_graph()
+        self.collection.graph.with_graph(graph=nx.DiGraph(), graph_data=[])
+
+    def _cre(self, cre_id: str, name: str) -> db.CRE:
+        return self.collection.add_cre(defs.CRE(id=cre_id, name=name))
+
+    def _standard(self, name: str, section: str) -> db.Node:
+        return self.collection.add_node(
+            defs.Standard(name=name, section=section, sectionID=section)
+        )
+
+    def _link(
+        self,
+        cre: db.CRE,
+        node: db.Node,
+        ltype: defs.LinkTypes = defs.LinkTypes.LinkedTo,
+    ) -> None:
+        self.collection.add_link(cre=cre, node=node, ltype=ltype)
+
+    def test_strong_tier_prunes_weaker_paths(self) -> None:
+        shared = self._cre("111-111", "shared")
+        parent = self._cre("222-222", "parent")
+        a1 = self._standard("StdA", "a1")
+        b1 = self._standard("StdB", "b1")
+        b2 = self._standard("StdB", "b2")
+        self._link(shared, a1)
+        self._link(shared, b1, defs.LinkTypes.AutomaticallyLinkedTo)
+        self._link(parent, b2)
+        self.collection.add_internal_link(
+            higher=parent, lower=shared, ltype=defs.LinkTypes.Contains
+        )
+
+        engine = InMemoryGapAnalysis.instance(self.collection.session)
+        base, paths = engine.gap_analysis("StdA", "StdB")
+
+        self.assertEqual([b.id for b in base], ["StdA:a1:a1"])
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(paths[0]["end"].id, "StdB:b1:b1")
+        self.assertEqual(
+            [seg["relationship"] for seg in paths[0]["path"]],
+            ["LINKED_TO", "AUTOMATICALLY_LINKED_TO"],
+        )
+        # Segments keep the stored relationship direction, not traversal order.
+        self.assertEqual(paths[0]["path"][0]["start"].id, "111-111")
+        self.assertEqual(paths[0]["path"][0]["end"].id, "StdA:a1:a1")
+
+    def test_contains_tier_and_all_shortest_paths(self) -> None:
+        root = self._cre("111-111", "root")
+        left = self._cre("222-222", "left")
+        right = self._cre("333-333", "right")
+        a1 = self._standard("StdA", "a1")
+        b1 = self._standard("StdB", "b1")
+        self._link(root, a1)
+        self._link(left, b1)
+        self._link(right, b1)
+        for child in (left, right):
+            self.collection.add_internal_link(
+                higher=root, lower=child, ltype=defs.LinkTypes.Contains
+            )
+
+        engine = InMemoryGapAnalysis.instance(self.collection.session)
+        _, paths = engine.gap_analysis("StdA", "StdB")
+
+        self.assertEqual(len(paths), 2)
+        middles = sorted(p["path"][1]["end"].id for p in paths)
+        self.assertEqual(middles, ["222-222", "333-333"])
+        for p in paths:
+            self.assertEqual(p["path"][1]["relationship"], "CONTAINS")
+            self.assertEqual(p["path"][1]["start"].id, "111-111")
+
+    def test_denylisted_cres_are_not_traversed(self) -> None:
+        hub = self._cre("111-111", "Cross-cutting concerns")
+        a1 = self._standard("StdA", "a1")
+        b1 = self._standard("StdB", "b1")
+        self._link(hub, a1)
+        self._link(hub, b1)
+
+        engine = InMemoryGapAnalysis.instance(self.collection.session)
+        base, paths = engine.gap_analysis("StdA", "StdB")
+
+        self.assertEqual(len(base), 1)
+        self.assertEqual(paths, [])
+
+    def test_engine_rebuilds_when_the_generation_moves(self) -> None:
+        shared = self._cre("111-111", "shared")
+        a1 = self._standard("StdA", "a1")
+        b1 = self._standard("StdB", "b1")
+        self._link(shared, a1)
+        first = InMemoryGapAnalysis.instance(self.collection.session)
+        self.assertEqual(first.gap_analysis("StdA", "StdB")[1], [])
+
+        self._link(shared, b1)
+        self.assertIs(first, InMemoryGapAnalysis.instance(self.collection.session))
+
+        dataset_generation.bump()
+        second = InMemoryGapAnalysis.instance(self.collection.session)
+        self.assertIsNot(first, second)
+        self.assertEqual(len(second.gap_analysis("StdA", "StdB")[1]), 1)
+        self.assertIs(second, InMemoryGapAnalysis.instance(self.collection.session))
+
+    @patch.object(db.NEO_DB, "gap_analysis")
+    def test_db_gap_analysis_uses_inmemory_engine(self, neo_mock: Mock) -> None:
+        shared = self._cre("111-111", "shared")
+        related = self._cre("222-222", "related")
+        a1 = self._standard("StdA", "a1")
+        b1 = self._standard("StdB", "b1")
+        self._link(shared, a1)
+        self._link(related, b1)
+        self.collection.add_internal_link(
+            higher=shared, lower=related, ltype=defs.LinkTypes.Related
+        )
+
+        with patch.dict(os.environ, {"CRE_GA_ENGINE": "inmemory"}):
+            db.gap_analysis(
+                neo_db=None, node_names=["StdA", "StdB"], cache_key="StdA >> StdB"
+            )
+
+        neo_mock.assert_not_called()
+        stored = json.loads(self.collection.get_gap_analysis_result("StdA >> StdB"))
+        grouped = stored["result"]["StdA:a1:a1"]
+        self.assertEqual(grouped["extra"], 0)
+        path = grouped["paths"]["StdB:b1:b1"]
+        self.assertEqual(path["score"], 2)
+        self.assertEqual(
+            [seg["relationship"] for seg in path["path"]],
+            ["LINKED_TO", "RELATED", "LINKED_TO"],
+        )
+
+    def _ga_rows(self) -> Dict[str, Any]:
+        return {
+            row.cache_key: json.loads(row.ga_object)
+            for row in self.collection.session.query(db.GapAnalysisResults).all()
+        }
+
+    def test_batch_matches_per_pair_results(self) -> None:
+        root = self._cre("111-111", "root")
+        left = self._cre("222-222", "left")
+        right = self._cre("333-333", "right")
+        other = self._cre("444-444", "other")
+        a1 = self._standard("StdA", "a1")
+        a2 = self._standard("StdA", "a2")
+        b1 = self._standard("StdB", "b1")
+        c1 = self._standard("StdC", "c1")
+        self._link(root, a1)
+        self._link(left, a2)
+        self._link(left, b1)
+        self._link(right, b1)
+        self._link(other, c1)
+        self.collection.add_internal_link(
+            higher=root, lower=right, ltype=defs.LinkTypes.Contains
+        )
+        self.collection.add_internal_link(
+            higher=root, lower=other, ltype=defs.LinkTypes.Related
+        )
+
+        with patch.dict(os.environ, {"CRE_GA_ENGINE": "inmemory"}):
+            for pair in (
+                ["StdA", "StdB"],
+                ["StdB", "StdA"],
+                ["StdA", "StdC"],
+                ["StdC", "StdA"],
+            ):
+                db.gap_analysis(neo_db=None, node_names=pair)
+        per_pair = self._ga_rows()
+        self.collection.session.query(db.GapAnalysisResults).delete()
+        self.collection.session.commit()
+
+        report = db.gap_analysis_batch("StdA", ["StdB", "StdC", "StdA"])
+
+        self.assertEqual(self._ga_rows(), per_pair)
+        self.assertEqual(
+            sorted(report.pair_seconds),
+            ["StdA >> StdB", "StdA >> StdC", "StdB >> StdA", "StdC >> StdA"],
+        )
+        self.assertEqual(report.pair_paths["StdA >> StdB"], 1)
+        self.assertEqual(len(report.amortized_pair_seconds()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,12 @@
+import random
 import unittest
 import networkx as nx
 from application.defs import cre_defs as defs
-from application.database.inmemory_graph import CRE_Graph
+from application.database.inmemory_graph import (
+    CRE_Graph,
+    CycleDetectedError,
+    TOPOLOGICAL_ORDER,
+)
 
 
 class TestCreDefs(unittest.TestCase):
@@ -154,3 +159,55 @@ class TestCreDefs(unittest.TestCase):
                 defs.Link(document=node1, ltype=defs.LinkTypes.AutomaticallyLinkedTo),
             )
         )
+
+    def test_add_link_matches_full_cycle_search(self) -> None:
+        rng = random.Random(7)
+        cres = [defs.CRE(name=f"c{i}", id=f"111-{i:03d}") for i in range(40)]
+        ltypes = [
+            defs.LinkTypes.Contains,
+            defs.LinkTypes.PartOf,
+            defs.LinkTypes.Related,
+        ]
+        g = CRE_Graph()
+        g.with_graph(graph=nx.DiGraph(), graph_data=[])
+        rejected = 0
+        for _ in range(400):
+            doc_from, to = rng.sample(cres, 2)
+            link = defs.Link(document=to, ltype=rng.choice(ltypes))
+            speculative = g.get_raw_graph().copy()
+            before = nx.to_dict_of_dicts(g.get_raw_graph())
+            try:
+                g.add_link(doc_from, link)
+            except CycleDetectedError:
+                rejected += 1
+                last_rejected = (doc_from, link)
+                self.assertEqual(nx.to_dict_of_dicts(g.get_raw_graph()), before)
+                src, dst = (
+                    (to, doc_from)
+                    if link.ltype == defs.LinkTypes.PartOf
+                    else (doc_from, to)
+                )
+                speculative.add_edge(f"CRE: {src.id}", f"CRE: {dst.id}")
+                self.assertTrue(nx.find_cycle(speculative))
+            self.assertIsNone(g.has_cycle())
+        self.assertGreater(rejected, 0)
+
+        # another CRE_Graph over the same networkx graph shares the order
+        shared = CRE_Graph()
+        shared.with_graph(graph=g.get_raw_graph(), graph_data=[])
+        order = g.get_raw_graph().graph[TOPOLOGICAL_ORDER]
+        self.assertTrue(shared.introduces_cycle(*last_rejected))
+        self.assertIs(shared.get_raw_graph().graph[TOPOLOGICAL_ORDER], order)
+
+    def test_existing_cycle_is_reported(self) -> None:
+        cre1 = defs.CRE(name="c1", id="111-111")
+        cre2 = defs.CRE(name="c2", id="111-112")
+        graph = nx.DiGraph()
+        graph.add_edge("CRE: 111-111", "Node: n1", ltype="Linked To")
+        graph.add_edge("Node: n1", "CRE: 111-111", ltype="Linked To")
+        g = CRE_Graph()
+        g.with_graph(graph=graph, graph_data=[])
+        with self.assertRaises(ValueError):
+            g.introduces_cycle(
+                cre1, defs.Link(document=cre2, ltype=defs.LinkTypes.Contains)
+            )
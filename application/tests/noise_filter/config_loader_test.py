@@ -14,6 +14,7 @@ from unittest.mock import patch
 
 from application.utils.noise_filter.config_loader import (
     DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
     DEFAULT_CONFIDENCE_THRESHOLD,
     DEFAULT_LLM_MODEL,
     DEFAULT_MAX_CHARS,
@@ -26,6 +27,9 @@ _ENV_KEYS = (
     "CRE_NOISE_FILTER_BATCH_SIZE",
     "CRE_NOISE_FILTER_MAX_CHARS",
     "CRE_NOISE_FILTER_CONFIDENCE_THRESHOLD",
+    "CRE_NOISE_FILTER_CONCURRENCY",
+    "CRE_NOISE_FILTER_RPM",
+    "CRE_NOISE_FILTER_TPM",
 )
 
 
@@ -40,6 +44,8 @@ class LoadConfigTests(unittest.TestCase):
         self.assertEqual(cfg.batch_size, DEFAULT_BATCH_SIZE)
         self.assertEqual(cfg.max_chars, DEFAULT_MAX_CHARS)
         self.assertEqual(cfg.confidence_threshold, DEFAULT_CONFIDENCE_THRESHOLD)
+        self.assertEqual(cfg.concurrency, DEFAULT_CONCURRENCY)
+        self.assertEqual((cfg.rpm, cfg.tpm), (0, 0))
 
     def test_env_overrides_applied(self) -> None:
         overrides = {
@@ -47,9 +53,13 @@ class LoadConfigTests(unittest.TestCase):
             "CRE_NOISE_FILTER_BATCH_SIZE": "5",
             "CRE_NOISE_FILTER_MAX_CHARS": "800",
             "CRE_NOISE_FILTER_CONFIDENCE_THRESHOLD": "0.6",
+            "CRE_NOISE_FILTER_CONCURRENCY": "8",
+            "CRE_NOISE_FILTER_RPM": "60",
+            "CRE_NOISE_FILTER_TPM": "100000",
         }
         with patch.dict(os.environ, overrides):
             cfg = load_config()
+        self.assertEqual((cfg.concurrency, cfg.rpm, cfg.tpm), (8, 60, 100000))
         self.assertEqual(cfg.llm_model, "openai/gpt-4o-mini")
         self.assertEqual(cfg.batch_size, 5)
         self.assertEqual(cfg.max_chars, 800)
@@ -78,6 +88,14 @@ class InvariantTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             NoiseFilterConfig(confidence_threshold=-0.1)
 
+    def test_concurrency_below_one_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            NoiseFilterConfig(concurrency=0)
+
+    def test_negative_rate_limit_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            NoiseFilterConfig(rpm=-1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,12 +8,19 @@ the messages it receives and how responses are parsed back into verdicts.
 from __future__ import annotations
 
 import json
+import threading
+import time
 import unittest
 from types import SimpleNamespace
+from typing import Any
 from unittest.mock import Mock, patch
 
 from application.utils.noise_filter.config_loader import NoiseFilterConfig
-from application.utils.noise_filter.llm_classifier import LLMClassifier
+from application.utils.noise_filter.llm_classifier import (
+    MAX_BACKOFF_SECONDS,
+    LLMClassifier,
+    _estimate_tokens,
+)
 from application.utils.noise_filter.prompts import (
     FEW_SHOT_EXAMPLES,
     SYSTEM_PROMPT_WITH_EXAMPLES,
@@ -145,10 +152,22 @@ class BatchOrderingTests(unittest.TestCase):
             )
 
         clf._litellm = Mock(completion=completion)
+        clf._limiter = Mock()
+        clf._limiter.acquire.return_value = 0.0
         out = clf.classify_batch([_record() for _ in range(5)])
         self.assertEqual(len(out), 5)
         self.assertEqual(len(calls), 3)  # 2 + 2 + 1
         self.assertTrue(all(v.label == "KNOWLEDGE" for v in out))
+        # the short last batch is charged for its own records only
+        self.assertEqual(
+            sorted(c.args[0] for c in clf._limiter.acquire.call_args_list),
+            sorted(
+                _estimate_tokens(
+                    kw["messages"], kw["messages"][1]["content"].count('"index"')
+                )
+                for kw in calls
+            ),
+        )
 
 
 # --- Malformed output -----------------------------------------------------
@@ -287,6 +306,79 @@ class RetryTests(unittest.TestCase):
         )
 
 
+# --- Concurrent dispatch ---------------------------------------------------
+
+
+class DispatchTests(unittest.TestCase):
+
+    def test_concurrent_batches_keep_input_order(self) -> None:
+        clf = LLMClassifier(NoiseFilterConfig(batch_size=1, concurrency=4))
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, peak
+
+        def completion(**kw: Any) -> Any:
+            user = kw["messages"][1]["content"]
+            n = int(user.split("record-")[1].split('"')[0])
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.02 * (8 - n))  # early batches finish last
+            with lock:
+                in_flight[0] -= 1
+            return _resp(
+                {
+                    "results": [
+                        {
+                            "index": 0,
+                            "label": "KNOWLEDGE",
+                            "confidence": 0.9,
+                            "reasoning": f"record-{n}",
+                        }
+                    ]
+                }
+            )
+
+        clf._litellm = Mock(completion=completion)
+        out = clf.classify_batch([_record(text=f"record-{n}") for n in range(8)])
+
+        self.assertEqual([v.reasoning for v in out], [f"record-{n}" for n in range(8)])
+        self.assertEqual(in_flight[1], 4)
+        self.assertEqual((clf.stats.calls, clf.stats.batches), (8, 8))
+        self.assertGreater(clf.stats.records_per_second, 0)
+
+    def test_retry_after_defers_and_is_counted(self) -> None:
+        clf = _classifier()
+        clf._max_retries = 2
+        ok = _resp(
+            {
+                "results": [
+                    {"index": 0, "label": "NOISE", "confidence": 0.9, "reasoning": "x"}
+                ]
+            }
+        )
+        limited = Exception("HTTP 429 too many requests")
+        limited.retry_after = 7  # type: ignore[attr-defined]
+        clf._litellm = Mock(completion=Mock(side_effect=[limited, ok]))
+        clf._limiter = Mock()
+        clf._limiter.acquire.return_value = 0.0
+
+        out = clf.classify_batch([_record()])
+
+        self.assertEqual(out[0].label, "NOISE")
+        clf._limiter.defer.assert_called_once_with(7.0)
+        self.assertEqual((clf.stats.calls, clf.stats.retries), (2, 1))
+
+    def test_backoff_is_exponential_with_jitter(self) -> None:
+        clf = _classifier()
+        clf._retry_sleep_seconds = 10
+        err = Exception("HTTP 429")
+        for attempt, (low, high) in enumerate([(5, 10), (10, 20), (20, 40)]):
+            for _ in range(20):
+                delay = clf._backoff_seconds(attempt, err)
+                self.assertTrue(low <= delay <= high, (attempt, delay))
+        self.assertLessEqual(clf._backoff_seconds(20, err), MAX_BACKOFF_SECONDS)
+
+
 # --- Truncation -----------------------------------------------------------
 
 
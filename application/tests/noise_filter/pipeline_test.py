@@ -6,16 +6,21 @@ classifier injected into run_noise_filter, so no real API calls.
 
 from __future__ import annotations
 
+import json
 import unittest
+from typing import Any, Dict, List
 
 from application import create_app, sqla
 from application.database.db import HarvestInput, KnowledgeQueueItem
 from application.utils.noise_filter.hashing import compute_content_hash
+from application.utils.noise_filter.llm_classifier import DispatchStats
 from application.utils.noise_filter.pipeline import run_noise_filter
 from application.utils.noise_filter.schemas import ClassifyResult
 
 
-def _payload(path="document/auth.md", text="security testing content"):
+def _payload(
+    path: str = "document/auth.md", text: str = "security testing content"
+) -> Dict[str, Any]:
     return {
         "schema_version": "0.2.0",
         "chunk_id": f"chk:{path}",
@@ -36,15 +41,16 @@ def _payload(path="document/auth.md", text="security testing content"):
 class _FakeClassifier:
     """Returns preset verdicts; asserts they align with the survivor count."""
 
-    def __init__(self, verdicts):
+    def __init__(self, verdicts: List[ClassifyResult]) -> None:
         self.verdicts = verdicts
+        self.stats = DispatchStats()
 
-    def classify_batch(self, records):
+    def classify_batch(self, records: List[Any]) -> List[ClassifyResult]:
         assert len(records) == len(self.verdicts), (len(records), len(self.verdicts))
         return list(self.verdicts)
 
 
-def _v(label, conf=0.9):
+def _v(label: str, conf: float = 0.9) -> ClassifyResult:
     return ClassifyResult(label=label, confidence=conf, reasoning="r")
 
 
@@ -61,7 +67,9 @@ class PipelineTests(unittest.TestCase):
         sqla.drop_all()
         self.ctx.pop()
 
-    def _add(self, payload, status="pending", run_id="run1"):
+    def _add(
+        self, payload: Dict[str, Any], status: str = "pending", run_id: str = "run1"
+    ) -> None:
         sqla.session.add(
             HarvestInput(pipeline_run_id=run_id, status=status, payload=payload)
         )
@@ -83,6 +91,19 @@ class PipelineTests(unittest.TestCase):
         # all input rows marked processed
         self.assertEqual(HarvestInput.query.filter_by(status="pending").count(), 0)
 
+    def test_summary_reports_llm_dispatch_stats(self) -> None:
+        self._add(_payload("document/auth.md"))
+        clf: Any = _FakeClassifier([_v("KNOWLEDGE")])
+        clf.stats = DispatchStats(
+            records=1, calls=3, retries=2, throttled_seconds=1.5, elapsed_seconds=0.5
+        )
+
+        s = json.loads(run_noise_filter(sqla.session, "run1", classifier=clf).to_json())
+
+        self.assertEqual((s["llm_calls"], s["llm_retries"]), (3, 2))
+        self.assertEqual(s["llm_throttled_seconds"], 1.5)
+        self.assertEqual(s["llm_records_per_second"], 2.0)
+
     def test_parse_error_marks_row_error(self) -> None:
         bad = _payload()
         del bad["text"]  # violates ChangeRecord (text required)
@@ -0,0 +1,105 @@
+"""Tests for application.utils.noise_filter.rate_limiter and Retry-After parsing.
+
+A fake clock stands in for time.monotonic and time.sleep, so the tests
+check exact waits without sleeping.
+"""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+from typing import Any
+
+from application.prompt_client.llm_error_utils import retry_after_seconds
+from application.utils.noise_filter.rate_limiter import RateLimiter
+
+
+def _error(**attrs: Any) -> Exception:
+    err = Exception("HTTP 429")
+    for name, value in attrs.items():
+        setattr(err, name, value)
+    return err
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock: _FakeClock, **limits: int) -> RateLimiter:
+    return RateLimiter(clock=clock, sleep=clock.sleep, **limits)
+
+
+class RateLimiterTests(unittest.TestCase):
+
+    def test_unlimited_never_waits(self) -> None:
+        clock = _FakeClock()
+        limiter = _limiter(clock)
+        for _ in range(100):
+            self.assertEqual(limiter.acquire(10_000), 0.0)
+        self.assertEqual(clock.sleeps, [])
+
+    def test_requests_per_minute(self) -> None:
+        clock = _FakeClock()
+        limiter = _limiter(clock, rpm=2)
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 0.0)
+        # the bucket is empty; one request refills every 30s
+        self.assertAlmostEqual(limiter.acquire(), 30.0)
+        clock.now += 60
+        self.assertEqual(limiter.acquire(), 0.0)
+
+    def test_tokens_per_minute(self) -> None:
+        clock = _FakeClock()
+        limiter = _limiter(clock, tpm=1000)
+        self.assertEqual(limiter.acquire(800), 0.0)
+        self.assertAlmostEqual(limiter.acquire(500), 18.0)  # 300 more at 1000/min
+        # a call larger than the whole budget waits for a full bucket, not forever
+        self.assertAlmostEqual(limiter.acquire(5000), 60.0)
+
+    def test_defer_holds_back_every_caller(self) -> None:
+        clock = _FakeClock()
+        limiter = _limiter(clock)
+        limiter.defer(12.5)
+        self.assertAlmostEqual(limiter.acquire(), 12.5)
+        limiter.defer(1.0)
+        limiter.defer(0.5)  # a shorter deferral never shortens a longer one
+        self.assertAlmostEqual(limiter.acquire(), 1.0)
+
+
+class RetryAfterTests(unittest.TestCase):
+
+    def test_seconds_from_attribute_or_response_headers(self) -> None:
+        self.assertEqual(retry_after_seconds(_error(retry_after=3)), 3.0)
+        err = _error(response=SimpleNamespace(headers={"retry-after": "7"}))
+        self.assertEqual(retry_after_seconds(err), 7.0)
+        err = _error(litellm_response_headers={"Retry-After": "2.5"})
+        self.assertEqual(retry_after_seconds(err), 2.5)
+
+    def test_http_date(self) -> None:
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        err = _error(
+            response=SimpleNamespace(
+                headers={"retry-after": format_datetime(when, usegmt=True)}
+            )
+        )
+        self.assertAlmostEqual(retry_after_seconds(err), 30, delta=2)
+
+    def test_missing_or_unparseable(self) -> None:
+        self.assertIsNone(retry_after_seconds(Exception("HTTP 429")))
+        err = _error(response=SimpleNamespace(headers={"retry-after": "soon"}))
+        self.assertIsNone(retry_after_seconds(err))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import os
+import random
+import tempfile
+import unittest
+from collections.abc import Callable
+from fnmatch import fnmatch
+from pathlib import Path
+
+import pathspec
+
+from application.utils.harvester.file_filter import FileFilter
+from application.utils.noise_filter.regex_filter import RegexFilter
+from application.utils.path_matcher import PatternMatcher, SuffixMatcher
+
+DIRECTORIES = [
+    "docs",
+    "tests",
+    "test",
+    "node_modules",
+    ".github",
+    ".claude",
+    "archive",
+    "4.0",
+    "en",
+    "build",
+    "dist",
+    "src",
+    "Website",
+    "a.b",
+]
+NAMES = [
+    "README",
+    "index",
+    "package-lock",
+    "CNAME",
+    "_config",
+    "style",
+    "app",
+    "Test",
+    ".gitignore",
+    "CODEOWNERS",
+    "mkdocs",
+]
+EXTENSIONS = [
+    "",
+    ".md",
+    ".MD",
+    ".css",
+    ".min.css",
+    ".min.js",
+    ".js",
+    ".png",
+    ".woff2",
+    ".lock",
+    ".yml",
+    ".json",
+    ".rst",
+    ".txt",
+    ".mdx",
+]
+
+
+def random_paths(count: int, seed: int = 2026) -> list[str]:
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        directories = rng.choices(DIRECTORIES, k=rng.randint(0, 4))
+        name = rng.choice(NAMES) + rng.choice(EXTENSIONS)
+        paths.append("/".join([*directories, name]))
+    return paths
+
+
+def reference_is_noise_path(filt: RegexFilter, path: str) -> tuple[bool, str]:
+    """RegexFilter.is_noise_path as it was, one rule at a time."""
+    for pattern in filt.allow_overrides:
+        if fnmatch(path, pattern):
+            return (False, "")
+    for ext in filt.deny_extensions:
+        if path.endswith(ext):
+            return (True, f"deny_extension: {ext}")
+    basename = path.rsplit("/", 1)[-1]
+    if basename in filt.deny_filenames:
+        return (True, f"deny_filename: {basename}")
+    for pattern in filt.deny_paths:
+        if fnmatch(path, pattern):
+            return (True, f"deny_path: {pattern}")
+    return (False, "")
+
+
+def reference_is_retained(file_filter: FileFilter) -> Callable[[str], bool]:
+    """FileFilter.is_retained as it was, matched by pathspec directly."""
+    exclude = pathspec.PathSpec.from_lines("gitignore", file_filter.exclude_patterns)
+    include = (
+        None
+        if file_filter.include_patterns is None
+        else pathspec.PathSpec.from_lines("gitignore", file_filter.include_patterns)
+    )
+
+    def is_retained(path: str) -> bool:
+        normalized = Path(path).as_posix()
+        if exclude.match_file(normalized):
+            return False
+        if include is not None and not include.match_file(normalized):
+            return False
+        return any(
+            path.endswith(extension) for extension in file_filter.allowed_extensions
+        )
+
+    return is_retained
+
+
+class SuffixMatcherTests(unittest.TestCase):
+    def test_reports_the_first_suffix_in_declaration_order(self) -> None:
+        matcher = SuffixMatcher([".css", ".min.css", ".min.js", ".js", "~"])
+
+        self.assertEqual(matcher.first_match("a/b.min.css"), ".css")
+        self.assertEqual(matcher.first_match("a/b.min.js"), ".min.js")
+        self.assertEqual(matcher.first_match("a.b/c.js"), ".js")
+        self.assertEqual(matcher.first_match("notes.md~"), "~")
+        self.assertIsNone(matcher.first_match("a/css"))
+        self.assertFalse(matcher.matches("a/b.md"))
+
+
+class PatternMatcherTests(unittest.TestCase):
+    def test_reports_the_first_matching_glob(self) -> None:
+        matcher = PatternMatcher.from_globs(["docs/**", "**/test/**", "*.yml"])
+
+        self.assertEqual(matcher.first_match("docs/test/a.yml"), 0)
+        self.assertEqual(matcher.first_match("src/test/a.yml"), 1)
+        self.assertEqual(matcher.first_match("ci.yml"), 2)
+        self.assertIsNone(matcher.first_match("src/a.md"))
+        self.assertIsNone(PatternMatcher([]).first_match("anything"))
+
+    def test_rejects_capturing_groups(self) -> None:
+        with self.assertRaises(ValueError):
+            PatternMatcher(["^(a|b)$"])
+
+
+class DifferentialTests(unittest.TestCase):
+    """The compiled matchers decide every path exactly as the rule loops did."""
+
+    paths = random_paths(5000) + [
+        "./docs/guide.md",
+        "/docs/guide.md",
+        "docs//guide.md",
+        "docs/./guide.md",
+        "docs/.hidden/guide.md",
+        "docs/guide.md/",
+        ".",
+        "",
+        "4.0/en/0x10-V1-Architecture.md",
+        "4.0/en/archive/old.md",
+        "node_modules/keep.md",
+    ]
+
+    def test_regex_filter(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            custom = os.path.join(directory, "patterns.yaml")
+            Path(custom).write_text(
+                "deny_extensions: ['.css', '.min.css', '.js', '.min.js', '.lock']\n"
+                "deny_filenames: ['CNAME', 'mkdocs.yml']\n"
+                "deny_paths: ['**/test/**', 'docs/**', '*/build/*', '[ab]*']\n"
+                "allow_overrides: ['docs/*.md', '**/README*']\n"
+            )
+            for filt in (RegexFilter(), RegexFilter(Path(custom))):
+                for path in self.paths:
+                    self.assertEqual(
+                        filt.is_noise_path(path),
+                        reference_is_noise_path(filt, path),
+                        path,
+                    )
+
+    def test_file_filter(self) -> None:
+        filters = [
+            FileFilter(),
+            FileFilter.for_paths(["4.0/en/**/*.md"], ["**/archive/**"]),
+            FileFilter.for_paths(["docs/", "*.rst"], ["!node_modules/keep.md"]),
+            FileFilter(
+                exclude_patterns=["build", "/dist/", "**/tests/**", "!tests/a.md"],
+                allowed_extensions={".md", ".min.js", "E"},
+            ),
+        ]
+        for file_filter in filters:
+            # the merged regex is used, not the pathspec fallback
+            self.assertIsNotNone(file_filter._exclude_spec._matcher)
+            reference = reference_is_retained(file_filter)
+            for path in self.paths:
+                self.assertEqual(file_filter.is_retained(path), reference(path), path)
+
+
+if __name__ == "__main__":
+    unittest.main()
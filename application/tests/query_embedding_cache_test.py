@@ -0,0 +1,101 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from typing import Any, Dict
+
+from application.prompt_client import prompt_client
+from application.utils import dataset_generation, query_embedding_cache
+
+CONTRACT = query_embedding_cache.contract_key("model", 3)
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def test_lru_is_keyed_by_normalized_prompt_and_contract(self) -> None:
+        cache = query_embedding_cache.QueryEmbeddingCache(max_entries=2)
+        cache.put_embedding(CONTRACT, "What is XSS?", [0.1, 0.2, 0.3])
+        self.assertEqual(
+            cache.get_embedding(CONTRACT, "  what is\txss "), [0.1, 0.2, 0.3]
+        )
+        cache.put_embedding(CONTRACT, "b", [1.0])
+        cache.put_embedding(CONTRACT, "c", [2.0])
+        self.assertIsNone(cache.get_embedding(CONTRACT, "what is xss"))  # evicted
+        self.assertEqual(cache.get_embedding(CONTRACT, "c"), [2.0])
+
+        other = query_embedding_cache.contract_key("other-model", 3)
+        self.assertIsNone(cache.get_embedding(other, "c"))
+        self.assertIsNone(cache.get_embedding(CONTRACT, "c"))  # dropped
+
+        stats = cache.stats()
+        self.assertEqual((stats["embedding_hits"], stats["embedding_misses"]), (2, 3))
+        self.assertEqual(stats["embedding_hit_rate"], 0.4)
+        self.assertEqual((stats["evictions"], stats["invalidations"]), (1, 2))
+
+    def test_neighbours_follow_the_dataset_generation(self) -> None:
+        cache = query_embedding_cache.QueryEmbeddingCache()
+        cache.put_neighbour(CONTRACT, 1, "q", ("node", 0.9))
+        cache.put_neighbour(CONTRACT, 1, "nothing close", (None, None))
+        self.assertEqual(cache.get_neighbour(CONTRACT, 1, "q"), ("node", 0.9))
+        self.assertEqual(
+            cache.get_neighbour(CONTRACT, 1, "nothing close"), (None, None)
+        )
+        self.assertIsNone(cache.get_neighbour(CONTRACT, 2, "q"))
+
+    def test_redis_tier_is_shared_between_processes(self) -> None:
+        store: Dict[str, Any] = {}
+        client = MagicMock()
+        client.get.side_effect = store.get
+        client.set.side_effect = lambda key, value, ex: store.__setitem__(key, value)
+
+        first = query_embedding_cache.QueryEmbeddingCache(redis_client=client)
+        first.put_embedding(CONTRACT, "q", [0.5, 0.25, 1.0])
+        first.put_neighbour(CONTRACT, 4, "q", ("node", 0.8))
+        other = query_embedding_cache.QueryEmbeddingCache(redis_client=client)
+        self.assertEqual(other.get_embedding(CONTRACT, "q"), [0.5, 0.25, 1.0])
+        self.assertEqual(other.get_neighbour(CONTRACT, 4, "q"), ("node", 0.8))
+        self.assertEqual(other.get_embedding(CONTRACT, "q"), [0.5, 0.25, 1.0])
+        stats = other.stats()
+        self.assertEqual(
+            (stats["embedding_redis_hits"], stats["embedding_hits"]), (1, 1)
+        )
+
+    def test_disabled_when_size_is_zero(self) -> None:
+        cache = query_embedding_cache.QueryEmbeddingCache(max_entries=0)
+        cache.put_embedding(CONTRACT, "q", [1.0])
+        self.assertIsNone(cache.get_embedding(CONTRACT, "q"))
+
+
+class TestGenerateTextUsesCache(unittest.TestCase):
+    def setUp(self) -> None:
+        query_embedding_cache.QueryEmbeddingCache.reset()
+        self.addCleanup(query_embedding_cache.QueryEmbeddingCache.reset)
+
+    def test_repeated_question_skips_embedding_and_search(self) -> None:
+        handler = prompt_client.PromptHandler.__new__(prompt_client.PromptHandler)
+        handler.embed_model = "model"
+        handler._expected_embed_dim = None
+        handler.ai_client = MagicMock()
+        handler.ai_client.get_text_embeddings.return_value = [0.1, 0.2]
+        handler.ai_client.query_llm.return_value = "answer"
+        handler.ai_client.get_model_name.return_value = "chat"
+        handler.database = MagicMock()
+        version = dataset_generation.DatasetVersion(generation=7, updated_at=None)
+
+        with patch.object(
+            dataset_generation, "current", return_value=version
+        ), patch.object(
+            handler,
+            "get_id_of_most_similar_node_paginated",
+            return_value=(None, None),
+        ) as search:
+            handler.generate_text("What is XSS?")
+            handler.generate_text("what is xss")
+
+        handler.ai_client.get_text_embeddings.assert_called_once_with("What is XSS?")
+        search.assert_called_once_with([0.1, 0.2], similarity_threshold=0.7)
+        self.assertEqual(handler.ai_client.query_llm.call_count, 2)
+        stats = query_embedding_cache.QueryEmbeddingCache.instance().stats()
+        self.assertEqual(json.loads(json.dumps(stats))["neighbour_hit_rate"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from typing import Any, Dict
+
+from application.utils import redis_tier
+
+
+class _Cache(redis_tier.ProcessCache):
+    built = 0
+
+    @classmethod
+    def from_env(cls) -> "_Cache":
+        cls.built += 1
+        return cls()
+
+
+class TestRedisTier(unittest.TestCase):
+    def test_failures_fall_back_until_the_retry_delay(self) -> None:
+        store: Dict[str, Any] = {}
+        client = MagicMock()
+        client.get.side_effect = store.get
+        client.set.side_effect = lambda key, value, ex: store.__setitem__(key, value)
+        tier = redis_tier.RedisTier(client, "test cache")
+        tier.set("k", b"v", 60)
+        self.assertEqual(tier.get("k"), b"v")
+        self.assertIsNone(tier.get("missing"))
+
+        client.get.side_effect = ConnectionError("down")
+        with patch.object(redis_tier.time, "monotonic", return_value=1000.0):
+            self.assertIsNone(tier.get("k"))
+            self.assertIsNone(tier.get("k"))
+            tier.set("k", b"w", 60)
+        self.assertEqual(client.get.call_count, 3)  # skipped while backing off
+        self.assertEqual(client.set.call_count, 1)
+        self.assertEqual(tier.errors, 1)
+
+        client.get.side_effect = store.get
+        later = 1000.0 + redis_tier.REDIS_RETRY_SECONDS
+        with patch.object(redis_tier.time, "monotonic", return_value=later):
+            self.assertEqual(tier.get("k"), b"v")
+
+        self.assertFalse(redis_tier.RedisTier().enabled)
+        self.assertIsNone(redis_tier.RedisTier().get("k"))
+
+    def test_process_cache_is_built_once(self) -> None:
+        self.addCleanup(_Cache.reset)
+        self.assertIsNone(_Cache.existing())
+        cache = _Cache.instance()
+        self.assertIs(_Cache.instance(), cache)
+        self.assertIs(_Cache.existing(), cache)
+        self.assertEqual(_Cache.built, 1)
+        self.assertIsNone(redis_tier.ProcessCache.existing())
+        _Cache.reset()
+        self.assertIsNone(_Cache.existing())
+
+        class Incomplete(redis_tier.ProcessCache):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()  # type: ignore[abstract]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+from typing import Any, Dict
+
+from werkzeug.datastructures import MultiDict
+
+from application import create_app, sqla  # type: ignore
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils import (
+    dataset_generation,
+    query_embedding_cache,
+    response_cache,
+)
+from application.web import web_main
+
+
+class TestResponseCacheTiers(unittest.TestCase):
+    def test_lru_is_bounded_by_bytes(self) -> None:
+        entry = response_cache.CachedResponse(body=b"x" * 100, mimetype="text/plain")
+        size = len("k0") + 100 + len("text/plain")
+        cache = response_cache.ResponseCache(max_bytes=2 * size)
+
+        cache.put("k0", 1, entry)
+        cache.put("k1", 1, entry)
+        self.assertIsNotNone(cache.get("k0", 1))  # k1 becomes least recent
+        cache.put("k2", 1, entry)
+
+        self.assertIsNone(cache.get("k1", 1))
+        self.assertIsNotNone(cache.get("k2", 1))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["bytes"], 2 * size)
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+        # A newer dataset generation drops everything.
+        self.assertIsNone(cache.get("k0", 2))
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_redis_tier_is_shared_between_processes(self) -> None:
+        store: Dict[str, Any] = {}
+        client = MagicMock()
+        client.get.side_effect = store.get
+        client.set.side_effect = lambda key, value, ex: store.__setitem__(key, value)
+        entry = response_cache.CachedResponse(body=b"{}", mimetype="application/json")
+
+        response_cache.ResponseCache(redis_client=client).put("k", 3, entry)
+        other = response_cache.ResponseCache(redis_client=client)
+        self.assertEqual(other.get("k", 3), entry)
+        self.assertIsNone(other.get("k", 4))
+        self.assertEqual(other.stats()["redis_hits"], 1)
+
+    def test_request_key_normalizes_arg_order(self) -> None:
+        self.assertEqual(
+            response_cache.request_key("/p", MultiDict([("b", "2"), ("a", "1")])),
+            response_cache.request_key("/p", MultiDict([("a", "1"), ("b", "2")])),
+        )
+
+
+class TestResponseCacheEndpoints(unittest.TestCase):
+    def tearDown(self) -> None:
+        response_cache.ResponseCache.reset()
+        dataset_generation.reset_cache()
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        response_cache.ResponseCache.reset()
+        dataset_generation.reset_cache()
+        collection = db.Node_collection()
+        collection.add_cre(defs.CRE(id="111-111", name="shared", tags=["t1"]))
+
+    @patch.dict(
+        os.environ,
+        {
+            "INSECURE_REQUESTS": "1",
+            "CRE_RESPONSE_CACHE": "1",
+            "CRE_ENABLE_HEALTH": "1",
+        },
+    )
+    def test_hits_skip_the_view_until_an_import_bumps_the_generation(self) -> None:
+        with self.app.test_client() as client:
+            first = client.get("/rest/v1/id/111-111")
+            self.assertEqual(first.status_code, 200)
+
+            with patch.object(db, "Node_collection") as collection_mock:
+                cached = client.get("/rest/v1/id/111-111")
+                collection_mock.assert_not_called()
+            self.assertEqual(cached.status_code, 200)
+            self.assertEqual(cached.json, first.json)
+
+            dataset_generation.bump()
+            with patch.object(
+                db, "Node_collection", wraps=db.Node_collection
+            ) as collection_mock:
+                self.assertEqual(client.get("/rest/v1/id/111-111").status_code, 200)
+                collection_mock.assert_called()
+
+            self.assertEqual(client.get("/rest/v1/id/999-999").status_code, 404)
+
+            query_embedding_cache.QueryEmbeddingCache.reset()
+            health = json.loads(client.get("/rest/v1/health").data)
+            # the probe reports caches in use but never builds one
+            self.assertNotIn("query_embedding_cache", health)
+            self.assertIsNone(query_embedding_cache.QueryEmbeddingCache.existing())
+            stats = health["response_cache"]
+            self.assertEqual(stats["hits"], 1)
+            self.assertEqual(stats["misses"], 3)
+            self.assertEqual(stats["invalidations"], 1)
+            self.assertEqual(stats["entries"], 1)  # the 404 is not cached
+
+    @patch.dict(os.environ, {"INSECURE_REQUESTS": "1", "CRE_RESPONSE_CACHE": "1"})
+    def test_cache_hits_are_still_captured(self) -> None:
+        posthog = MagicMock()
+        with patch.object(web_main, "posthog", posthog):
+            with self.app.test_client() as client:
+                client.get("/rest/v1/id/111-111?source=Chrome Ext")
+                client.get("/rest/v1/id/111-111?source=Chrome Ext")
+                client.get("/rest/v1/root_cres")
+                client.get("/rest/v1/root_cres")
+
+        self.assertEqual(
+            [c.args for c in posthog.capture.call_args_list],
+            [
+                ("find_cre", "id:111-111;nameNone;source:chrome-ext"),
+                ("find_cre", "id:111-111;nameNone;source:chrome-ext"),
+                ("find_root_cres", ""),
+                ("find_root_cres", ""),
+            ],
+        )
+        stats = response_cache.ResponseCache.instance().stats()
+        self.assertEqual(stats["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Unit tests for the gap_analysis_results sync helpers."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import tempfile
+import unittest
+from typing import Any, List, Tuple
+from pathlib import Path
+
+from application.utils import ga_payload
+from scripts.sync_gap_analysis_table import (
+    GaRow,
+    _fetch_sqlite_rows,
+    _may_overwrite_primary,
+)
+
+MATERIAL = json.dumps({"result": {"A:1": {"paths": {}}}})
+EMPTY = json.dumps({"result": {}})
+
+
+def _compressed(cache_key: str, text: str) -> GaRow:
+    encoded = ga_payload.encode(text)
+    return GaRow(
+        cache_key,
+        None,
+        encoded.body,
+        encoded.encoding,
+        encoded.content_hash,
+        encoded.schema_version,
+    )
+
+
+class SyncSqliteFetchTest(unittest.TestCase):
+    def _write(
+        self, path: Path, rows: List[Tuple[Any, ...]], *, payload_columns: bool = True
+    ) -> None:
+        conn = sqlite3.connect(path)
+        extra = (
+            ", ga_payload BLOB, payload_encoding TEXT, content_hash TEXT,"
+            " schema_version INTEGER"
+            if payload_columns
+            else ""
+        )
+        conn.execute(
+            f"CREATE TABLE gap_analysis_results (cache_key TEXT, ga_object TEXT{extra})"
+        )
+        for row in rows:
+            values = tuple(row) if payload_columns else tuple(row)[:2]
+            conn.execute(
+                f"INSERT INTO gap_analysis_results VALUES "
+                f"({', '.join('?' * len(values))})",
+                values,
+            )
+        conn.commit()
+        conn.close()
+
+    def test_compressed_rows_are_material(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "ga.sqlite"
+            self._write(
+                path,
+                [
+                    _compressed("A >> B", MATERIAL),
+                    _compressed("A >> C", EMPTY),
+                    GaRow("B >> A", MATERIAL),
+                ],
+            )
+
+            rows = _fetch_sqlite_rows(str(path), material_only=True)
+
+        self.assertEqual(sorted(r.cache_key for r in rows), ["A >> B", "B >> A"])
+        compressed = next(r for r in rows if r.cache_key == "A >> B")
+        self.assertIsNone(compressed.ga_object)
+        self.assertEqual(ga_payload.row_text(compressed), MATERIAL)
+
+    def test_schema_without_payload_columns(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "ga.sqlite"
+            self._write(
+                path,
+                [GaRow("A >> B", MATERIAL), GaRow("A >> C", EMPTY)],
+                payload_columns=False,
+            )
+
+            rows = _fetch_sqlite_rows(str(path), material_only=True)
+
+        self.assertEqual(rows, [GaRow("A >> B", MATERIAL)])
+
+
+class MayOverwritePrimaryTest(unittest.TestCase):
+    def test_materiality_reads_either_storage_form(self) -> None:
+        stale = GaRow("A >> B", MATERIAL)
+        self.assertTrue(_may_overwrite_primary(_compressed("A >> B", MATERIAL), stale))
+        self.assertFalse(_may_overwrite_primary(_compressed("A >> B", EMPTY), stale))
+        self.assertFalse(
+            _may_overwrite_primary(
+                GaRow("A >> B", EMPTY), _compressed("A >> B", MATERIAL)
+            )
+        )
+        self.assertTrue(
+            _may_overwrite_primary(GaRow("A >> B", EMPTY), _compressed("A >> B", EMPTY))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from application.utils import telemetry
+
+
+class TestImportTelemetry(unittest.TestCase):
+    def _emit(self) -> None:
+        telemetry.emit_import_event(
+            import_run_id="run-1",
+            source="telemetry_test",
+            version=None,
+            status="success",
+            start_time=10.0,
+            end_time=12.5,
+        )
+
+    def test_event_is_appended_to_telemetry_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            path = os.path.join(tmp_path, "events.json")
+            with patch.dict(os.environ, {"TELEMETRY_FILE": path}):
+                os.environ.pop("TELEMETRY_ENDPOINT", None)
+                self._emit()
+                self._emit()
+
+            with open(path) as f:
+                events = [json.loads(line) for line in f]
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["source"], "telemetry_test")
+        self.assertEqual(events[0]["duration_seconds"], 2.5)
+
+    def test_default_file_is_outside_the_working_tree(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            with patch.object(tempfile, "tempdir", tmp_path):
+                with patch.dict(os.environ):
+                    os.environ.pop("TELEMETRY_FILE", None)
+                    os.environ.pop("TELEMETRY_ENDPOINT", None)
+                    self._emit()
+                self.assertTrue(
+                    os.path.exists(os.path.join(tmp_path, "import_telemetry.json"))
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
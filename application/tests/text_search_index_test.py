@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+from typing import Set
+
+from sqlalchemy import text
+
+from application import create_app, sqla  # type: ignore
+from application.database import db, text_search_index
+from application.defs import cre_defs as defs
+
+
+class TestTextSearchIndex(unittest.TestCase):
+    def tearDown(self) -> None:
+        sqla.session.remove()
+        sqla.drop_all()
+        self.app_context.pop()
+
+    def setUp(self) -> None:
+        self.app = create_app(mode="test")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        sqla.create_all()
+        self.collection = db.Node_collection()
+
+    def _indexed_ids(self) -> Set[str]:
+        return {
+            doc_id
+            for (doc_id,) in self.collection.session.execute(
+                text(f"SELECT doc_id FROM {text_search_index.TABLE}")
+            )
+        }
+
+    def test_ranked_search_follows_writes(self) -> None:
+        self.collection.add_cre(
+            defs.CRE(id="111-111", name="Logging", description="audit trails")
+        )
+        title_hit = self.collection.add_node(
+            defs.Standard(name="ASVS", section="Audit logging", sectionID="V7.1")
+        )
+        self.collection.add_node(
+            defs.Standard(
+                name="ASVS",
+                section="Errors",
+                sectionID="V7.4",
+                description="never leak an audit id",
+            )
+        )
+
+        results = self.collection.text_search("audit")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0].section, "Audit logging")
+
+        # description updates through add_node are searchable immediately
+        self.collection.add_node(
+            defs.Standard(
+                name="ASVS",
+                section="Audit logging",
+                sectionID="V7.1",
+                description="tamper evident",
+            )
+        )
+        self.assertEqual(
+            [d.sectionID for d in self.collection.text_search("tamper")], ["V7.1"]
+        )
+        self.assertIn(title_hit.id, self._indexed_ids())
+
+        self.collection.delete_nodes("ASVS")
+        self.assertEqual(
+            [d.id for d in self.collection.text_search("audit")], ["111-111"]
+        )
+        self.assertNotIn(title_hit.id, self._indexed_ids())
+
+    def test_index_backfills_existing_rows_and_falls_back_to_like(self) -> None:
+        # Rows written without the index (e.g. a cache from before the
+        # migration) are picked up when the index is created.
+        text_search_index.drop(self.collection.session)
+        self.collection.session.add(
+            db.Node(name="CWE", section="Injection", ntype=defs.Standard.__name__)
+        )
+        self.collection.session.commit()
+        self.assertFalse(text_search_index.ensure(self.collection.session))
+        self.assertEqual([d.name for d in self.collection.text_search("ject")], ["CWE"])
+
+        self.assertTrue(text_search_index.create(self.collection.session))
+        self.collection.session.commit()
+        self.assertEqual(
+            [d.name for d in self.collection.text_search("inject")], ["CWE"]
+        )
+
+        with patch.object(text_search_index, "ensure", return_value=False):
+            # LIKE scans match infixes the token index does not.
+            self.assertEqual(
+                [d.name for d in self.collection.text_search("ject")], ["CWE"]
+            )
+        self.assertEqual(self.collection.text_search("ject"), [])
+
+    def test_search_returns_every_match(self) -> None:
+        for i in range(120):
+            self.collection.add_node(
+                defs.Standard(name="ASVS", section=f"Audit {i}", sectionID=f"V{i}")
+            )
+        self.assertEqual(len(self.collection.text_search("audit")), 120)
+        self.assertEqual(
+            len(text_search_index.search(self.collection.session, ["audit"], 5)), 5
+        )
+
+    def test_missing_index_is_probed_again(self) -> None:
+        text_search_index.drop(self.collection.session)
+        self.assertFalse(text_search_index.ensure(self.collection.session))
+
+        # e.g. the migration ran while this worker was serving
+        text_search_index._create_sqlite(self.collection.session)
+        self.assertFalse(text_search_index.ensure(self.collection.session))
+        with patch.object(text_search_index, "MISSING_RECHECK_SECONDS", 0.0):
+            self.assertTrue(text_search_index.ensure(self.collection.session))
+        self.assertTrue(text_search_index.ensure(self.collection.session))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,487 @@
+"""
+Approximate nearest-neighbour (cosine) search over embedding hubs, for the
+paths that cannot push similarity into pgvector (SQLite caches, CI, the
+librarian ``in_memory`` retriever).
+
+Backends, selected by ``CRE_ANN_BACKEND``:
+
+  - ``exact`` — one matrix-vector product over L2-normalised float32 rows.
+  - ``ivf`` — NumPy inverted file: spherical k-means into ~sqrt(n) lists,
+    queries score only the ``CRE_ANN_NPROBE`` closest lists.
+  - ``hnswlib`` — HNSW graph via the optional ``hnswlib`` package.
+  - unset — ``ivf`` for hubs of at least ``CRE_ANN_MIN_SIZE`` (default 5000)
+    vectors, ``exact`` below that where brute force is already cheap.
+
+``AnnIndexRegistry`` builds one index per (database, doc type) over the
+memory-mapped ``embedding_store`` matrix (``get_embeddings_by_doc_type`` when
+there is no store), persists it next to a file-backed SQLite cache
+(``<cache>.ann/``, or ``CRE_ANN_INDEX_DIR``) keyed by
+``embeddings_fingerprint`` so a stale file is rebuilt rather than trusted, and
+takes incremental updates from ``Node_collection.add_embedding``. A loaded index
+is rechecked against the fingerprint whenever the dataset generation moves, so
+vectors written, re-embedded or deleted by another process replace it.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import weakref
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from application.utils import dataset_generation, embedding_store
+from application.utils.env import env_int
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_MIN_SIZE = 5000
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20000
+_CHUNK = 4096
+
+
+class AnnIndexError(ValueError):
+    pass
+
+
+def _grown(array: np.ndarray, size: int) -> np.ndarray:
+    """``array`` with room for at least ``size`` rows (capacity doubles)."""
+    if size <= array.shape[0]:
+        return array
+    grown = np.empty((max(size, 2 * array.shape[0]),) + array.shape[1:], array.dtype)
+    grown[: array.shape[0]] = array
+    return grown
+
+
+def _normalize(vectors: Any) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = matrix / norms
+    return normalized
+
+
+class ExactIndex:
+    """Brute-force cosine over normalised rows; the baseline every backend shares."""
+
+    backend = "exact"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.ids: List[str] = []
+        self.fingerprint = ""
+        # dataset generation at which ``fingerprint`` was last confirmed
+        self.generation: Optional[int] = None
+        self._row_of: Dict[str, int] = {}
+        # Row buffer with spare capacity; the live rows are _vectors.
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._buffer[: len(self.ids)]
+
+    @classmethod
+    def build(
+        cls, ids: Sequence[str], vectors: Any, normalized: bool = False, **kwargs: Any
+    ) -> "ExactIndex":
+        # Already-normalised float32 input (an embedding_store memmap) is
+        # indexed in place rather than copied.
+        matrix = (
+            np.asarray(vectors, dtype=np.float32) if normalized else _normalize(vectors)
+        )
+        if len(ids) != matrix.shape[0]:
+            raise AnnIndexError(f"{len(ids)} ids for {matrix.shape[0]} vectors")
+        index = cls(matrix.shape[1], **kwargs)
+        index.ids = list(ids)
+        index._row_of = {object_id: row for row, object_id in enumerate(index.ids)}
+        index._buffer = matrix
+        index._train()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _train(self) -> None:
+        pass
+
+    def _check_dim(self, vector: np.ndarray) -> None:
+        if vector.shape[-1] != self.dim:
+            raise AnnIndexError(
+                f"vector width {vector.shape[-1]} != index width {self.dim}"
+            )
+
+    def upsert(self, object_id: str, vector: Sequence[float]) -> None:
+        row_vector = _normalize(vector)[0]
+        self._check_dim(row_vector)
+        row = self._row_of.get(object_id)
+        if not self._buffer.flags.writeable:
+            self._buffer = np.array(self._buffer)  # copy-on-write off a memmap
+        if row is None:
+            row = len(self.ids)
+            self._buffer = _grown(self._buffer, row + 1)
+            self.ids.append(object_id)
+            self._row_of[object_id] = row
+        self._buffer[row] = row_vector
+        self._on_upsert(row)
+
+    def _on_upsert(self, row: int) -> None:
+        pass
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        return None  # all rows
+
+    def search(
+        self, query: Union[Sequence[float], np.ndarray], k: int
+    ) -> List[Tuple[str, float]]:
+        """Top ``k`` ``(id, cosine)`` pairs, best first (ties keep insertion order)."""
+        if not self.ids or k <= 0:
+            return []
+        q = _normalize(query)[0]
+        self._check_dim(q)
+        rows = self._candidate_rows(q)
+        vectors = self._vectors if rows is None else self._vectors[rows]
+        scores = vectors @ q
+        top = np.argsort(-scores, kind="stable")[:k]
+        if rows is not None:
+            return [(self.ids[rows[i]], float(scores[i])) for i in top]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {
+            "backend": np.array(self.backend),
+            "fingerprint": np.array(self.fingerprint),
+            "ids": np.array(self.ids, dtype=str),
+            "vectors": self._vectors,
+        }
+
+    def _load_state(self, state: Any, vectors: Optional[np.ndarray] = None) -> None:
+        self.ids = [str(i) for i in state["ids"]]
+        self._row_of = {object_id: row for row, object_id in enumerate(self.ids)}
+        self._buffer = np.asarray(
+            state["vectors"] if vectors is None else vectors, dtype=np.float32
+        )
+        self.fingerprint = str(state["fingerprint"])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        arrays: Dict[str, Any] = self.state()
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+
+class IVFIndex(ExactIndex):
+    """Inverted-file index: score the ``nprobe`` nearest k-means lists only."""
+
+    backend = "ivf"
+
+    def __init__(
+        self, dim: int, nlist: Optional[int] = None, nprobe: Optional[int] = None
+    ) -> None:
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._centroids = np.empty((0, dim), dtype=np.float32)
+        self._assign_buffer = np.empty((0,), dtype=np.int32)
+
+    @property
+    def _assign(self) -> np.ndarray:
+        return self._assign_buffer[: len(self.ids)]
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], _CHUNK):
+            block = vectors[start : start + _CHUNK] @ self._centroids.T
+            out[start : start + _CHUNK] = np.argmax(block, axis=1)
+        return out
+
+    def _train(self) -> None:
+        n = len(self.ids)
+        if not n:
+            return
+        nlist = max(1, min(n, self.nlist or int(round(math.sqrt(n)))))
+        self.nlist = nlist
+        if self.nprobe is None:
+            self.nprobe = env_int("CRE_ANN_NPROBE", max(1, int(math.ceil(nlist / 10))))
+        rng = np.random.default_rng(0)
+        sample = self._vectors
+        if n > KMEANS_SAMPLE:
+            sample = self._vectors[rng.choice(n, KMEANS_SAMPLE, replace=False)]
+        self._centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assign = self._nearest_centroid(sample)
+            sums = np.zeros_like(self._centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            # Re-seed empty lists from random points so every list stays used.
+            sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()))]
+            self._centroids = _normalize(sums)
+        self._assign_buffer = self._nearest_centroid(self._vectors)
+
+    def _on_upsert(self, row: int) -> None:
+        # New vectors join their nearest existing list; lists are not
+        # retrained until the index is rebuilt.
+        if not len(self._centroids):
+            self._centroids = self._vectors[row : row + 1].copy()
+        self._assign_buffer = _grown(self._assign_buffer, row + 1)
+        self._assign_buffer[row] = self._nearest_centroid(self._vectors[row : row + 1])[
+            0
+        ]
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if self.nprobe >= len(self._centroids):
+            return None
+        probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+        return np.flatnonzero(np.isin(self._assign, probe))
+
+    def state(self) -> Dict[str, np.ndarray]:
+        state = super().state()
+        state["centroids"] = self._centroids
+        state["assign"] = self._assign
+        state["nprobe"] = np.array(self.nprobe)
+        return state
+
+    def _load_state(self, state: Any, vectors: Optional[np.ndarray] = None) -> None:
+        super()._load_state(state, vectors)
+        self._centroids = np.asarray(state["centroids"], dtype=np.float32)
+        self._assign_buffer = np.asarray(state["assign"], dtype=np.int32)
+        self.nlist = len(self._centroids)
+        self.nprobe = env_int("CRE_ANN_NPROBE", int(state["nprobe"]))
+
+
+class HnswIndex(ExactIndex):
+    """HNSW graph from the optional ``hnswlib`` package (``pip install hnswlib``).
+
+    Normalised vectors are kept too, so ``state`` can persist ids and vectors
+    alongside the graph and exact rescoring stays possible.
+    """
+
+    backend = "hnswlib"
+
+    def __init__(self, dim: int, ef: Optional[int] = None) -> None:
+        super().__init__(dim)
+        import hnswlib
+
+        self._hnswlib = hnswlib
+        self.ef = ef or env_int("CRE_ANN_HNSW_EF", 64)
+        self._graph: Any = None
+
+    def _new_graph(self, capacity: int) -> Any:
+        graph = self._hnswlib.Index(space="ip", dim=self.dim)
+        graph.init_index(max_elements=max(capacity, 16), ef_construction=200, M=16)
+        graph.set_ef(self.ef)
+        return graph
+
+    def _train(self) -> None:
+        self._graph = self._new_graph(len(self.ids))
+        if self.ids:
+            self._graph.add_items(self._vectors, np.arange(len(self.ids)))
+
+    def _on_upsert(self, row: int) -> None:
+        if self._graph is None:
+            self._graph = self._new_graph(16)
+        if row >= self._graph.get_max_elements():
+            self._graph.resize_index(2 * self._graph.get_max_elements())
+        self._graph.add_items(self._vectors[row : row + 1], np.array([row]))
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        k = min(len(self.ids), max(self.ef, 1))
+        labels, _ = self._graph.knn_query(query, k=k)
+        rows: np.ndarray = np.sort(labels[0].astype(np.int64))
+        return rows
+
+    def _load_state(self, state: Any, vectors: Optional[np.ndarray] = None) -> None:
+        super()._load_state(state, vectors)
+        self._train()
+
+
+BACKENDS = {cls.backend: cls for cls in (ExactIndex, IVFIndex, HnswIndex)}
+
+
+def backend_for(size: int) -> str:
+    configured = os.environ.get("CRE_ANN_BACKEND", "").strip().lower()
+    if configured:
+        if configured not in BACKENDS:
+            raise AnnIndexError(f"unknown CRE_ANN_BACKEND {configured!r}")
+        return configured
+    return "ivf" if size >= env_int("CRE_ANN_MIN_SIZE", DEFAULT_MIN_SIZE) else "exact"
+
+
+def build_index(
+    ids: Sequence[str],
+    vectors: Any,
+    backend: Optional[str] = None,
+    normalized: bool = False,
+) -> ExactIndex:
+    """Index ``vectors`` (row-aligned with ``ids``) with the configured backend."""
+    return BACKENDS[backend or backend_for(len(ids))].build(
+        ids, vectors, normalized=normalized
+    )
+
+
+def load_index(
+    path: str, fingerprint: str, vectors: Optional[np.ndarray] = None
+) -> Optional[ExactIndex]:
+    """The index saved at ``path`` if it was built from ``fingerprint``; else None.
+
+    ``vectors`` (the same rows, e.g. an embedding_store memmap) replaces the
+    copy saved in the file, which is then never read.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as state:
+            if str(state["fingerprint"]) != fingerprint:
+                return None
+            backend = str(state["backend"])
+            if vectors is None or len(vectors) != len(state["ids"]):
+                vectors = state["vectors"]
+            index = BACKENDS[backend](vectors.shape[1])
+            index._load_state(state, vectors)
+    except (OSError, KeyError, ValueError, ImportError) as exc:
+        logger.warning("ignoring unreadable ANN index %s: %s", path, exc)
+        return None
+    return index
+
+
+def index_path(database: Any, doc_type: str) -> Optional[str]:
+    """Where the index for ``doc_type`` persists, or None for non-file databases."""
+    directory = os.environ.get("CRE_ANN_INDEX_DIR", "")
+    if not directory:
+        url = database.session.get_bind().url
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            return None
+        directory = f"{url.database}.ann"
+    return os.path.join(directory, f"{doc_type}.npz")
+
+
+class AnnIndexRegistry:
+    """Process-wide indexes, one per (database engine, doc type)."""
+
+    _instance: ClassVar[Optional["AnnIndexRegistry"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._indexes: "weakref.WeakKeyDictionary[Any, Dict[str, ExactIndex]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._dirty: "weakref.WeakKeyDictionary[Any, Set[str]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def instance(cls) -> "AnnIndexRegistry":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._instance_lock:
+            cls._instance = None
+
+    @staticmethod
+    def _engine(database: Any) -> Any:
+        bind = database.session.get_bind()
+        return getattr(bind, "engine", bind)
+
+    def index_for(self, database: Any, doc_type: str) -> Optional[ExactIndex]:
+        """The index over ``doc_type`` embeddings; None when there are none.
+
+        A loaded index is returned as is while the dataset generation has not
+        moved, or when there is no generation to compare (migration not
+        applied). Otherwise it is kept only if the stored vectors still match
+        its fingerprint, and rebuilt (dropping deleted vectors) if not. The
+        fingerprint scans every stored vector, so it is taken outside the
+        lock and other queries keep being served meanwhile.
+        """
+        engine = self._engine(database)
+        version = dataset_generation.current()
+        generation = None if version is None else version.generation
+        with self._lock:
+            index = self._indexes.get(engine, {}).get(doc_type)
+            if index is not None and generation in (None, index.generation):
+                return index
+        fingerprint = database.embeddings_fingerprint(doc_type)
+        with self._lock:
+            indexes = self._indexes.setdefault(engine, {})
+            index = indexes.get(doc_type)
+            if index is not None:
+                if index.generation == generation or index.fingerprint == fingerprint:
+                    # up to date, or refreshed by another thread meanwhile
+                    index.generation = generation
+                    return index
+                logger.info("%s embeddings changed; rebuilding ANN index", doc_type)
+                del indexes[doc_type]
+            store = embedding_store.refresh(database, doc_type, fingerprint)
+            path = index_path(database, doc_type)
+            index = (
+                load_index(path, fingerprint, store.vectors if store else None)
+                if path
+                else None
+            )
+            if index is None and store is not None:
+                index = build_index(store.ids, store.vectors, normalized=True)
+            elif index is None:
+                embeddings = database.get_embeddings_by_doc_type(doc_type)
+                if not embeddings:
+                    return None
+                index = build_index(list(embeddings), list(embeddings.values()))
+            if not index.fingerprint:
+                index.fingerprint = fingerprint
+                logger.info(
+                    "built %s ANN index over %s %s embeddings",
+                    index.backend,
+                    len(index),
+                    doc_type,
+                )
+                # An exact index over the store has nothing trained to save.
+                if path and (store is None or index.backend != ExactIndex.backend):
+                    index.save(path)
+            index.generation = generation
+            indexes[doc_type] = index
+            return index
+
+    def on_embedding_added(
+        self, database: Any, doc_type: str, object_id: str, vector: Sequence[float]
+    ) -> None:
+        """Fold a new or re-embedded vector into an already loaded index."""
+        engine = self._engine(database)
+        with self._lock:
+            indexes = self._indexes.get(engine, {})
+            index = indexes.get(doc_type)
+            if index is None:
+                return
+            try:
+                index.upsert(object_id, vector)
+            except AnnIndexError as exc:
+                logger.warning("dropping %s ANN index: %s", doc_type, exc)
+                del indexes[doc_type]
+                return
+            self._dirty.setdefault(engine, set()).add(doc_type)
+
+    def persist(self, database: Any) -> None:
+        """Save indexes changed by ``on_embedding_added`` since they were loaded,
+        and re-export their embedding_store matrices."""
+        if getattr(database, "session", None) is None:
+            return  # stand-in collections (tests, dry runs) never hold indexes
+        engine = self._engine(database)
+        with self._lock:
+            for doc_type in sorted(self._dirty.pop(engine, set())):
+                index = self._indexes.get(engine, {}).get(doc_type)
+                path = index_path(database, doc_type)
+                fingerprint = database.embeddings_fingerprint(doc_type)
+                embedding_store.refresh(database, doc_type, fingerprint)
+                if index is not None:
+                    # the upserts are now what the database holds
+                    index.fingerprint = fingerprint
+                    if path:
+                        index.save(path)
@@ -0,0 +1,104 @@
+"""
+Dataset generation: a counter bumped whenever the data read endpoints serve
+changes, used to derive strong ETags for those endpoints. Imports, resource and
+gap analysis deletes, the GA backfill and embedding (re)generation all bump it.
+
+Web processes cache the counter for ``CRE_DATASET_GENERATION_TTL_SECONDS``
+(default 10s) so a revalidation that ends in ``304 Not Modified`` does not touch
+the database. Bumps made by this process are visible immediately; bumps from
+other processes (import workers, CLI) within one TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from application import sqla  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class DatasetVersion:
+    generation: int
+    updated_at: Optional[datetime]
+
+    def etag(self, key: str) -> str:
+        """Strong ETag for the representation identified by ``key`` (path + query)."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return f"g{self.generation}-{digest}"
+
+    @property
+    def last_modified(self) -> Optional[datetime]:
+        if self.updated_at is None:
+            return None
+        # HTTP dates have one-second resolution; If-Modified-Since compares to this.
+        updated = self.updated_at.replace(microsecond=0)
+        if updated.tzinfo is None:
+            return updated.replace(tzinfo=timezone.utc)
+        return updated
+
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[float, DatasetVersion]] = None
+
+
+def _ttl_seconds() -> float:
+    raw = os.environ.get("CRE_DATASET_GENERATION_TTL_SECONDS", "")
+    try:
+        return float(raw) if raw else DEFAULT_TTL_SECONDS
+    except ValueError:
+        return DEFAULT_TTL_SECONDS
+
+
+def reset_cache() -> None:
+    global _cached
+    with _lock:
+        _cached = None
+
+
+def current(*, fresh: bool = False) -> Optional[DatasetVersion]:
+    """The dataset version, from the process cache when fresh; None if unavailable.
+
+    ``fresh`` skips the cache, for callers that must not act on a version up
+    to one TTL old (e.g. gap analysis workers about to write results).
+    """
+    global _cached
+    now = time.monotonic()
+    with _lock:
+        if not fresh and _cached is not None and now - _cached[0] < _ttl_seconds():
+            return _cached[1]
+    from application.database import db
+
+    try:
+        version = DatasetVersion(*db.get_dataset_generation())
+    except SQLAlchemyError as exc:
+        # e.g. the dataset_generation migration has not run yet: serve
+        # without validators rather than failing the request.
+        logger.warning("dataset generation unavailable: %s", exc)
+        sqla.session.rollback()
+        return None
+    with _lock:
+        _cached = (now, version)
+    return version
+
+
+def bump(*, commit: bool = True) -> int:
+    """Bump the generation and refresh this process's cached value."""
+    from application.database import db
+
+    generation = db.bump_dataset_generation(commit=commit)
+    reset_cache()
+    logger.info("dataset generation bumped to %s", generation)
+    return generation
@@ -0,0 +1,256 @@
+"""
+Memory-mapped embedding matrices, one per doc type.
+
+Parsing every ``embedding_vec`` literal into Python lists on startup costs
+seconds and a private float64 copy per process. ``refresh`` exports all
+vectors of a doc type once to
+
+  - ``<doc_type>.<fingerprint>.npy`` — ``(n, dim)`` L2-normalised float32
+    rows, and
+  - ``<doc_type>.json`` — header (format, doc type, model id, dim, count,
+    ``embeddings_fingerprint``, matrix file name) plus the row-aligned id
+    index; replacing it is the single atomic commit of an export,
+
+under ``CRE_EMBEDDING_STORE_DIR`` or next to a file-backed SQLite cache
+(``<cache>.embeddings/``). Readers ``np.load(..., mmap_mode="r")`` the matrix,
+so every gunicorn worker shares the same page-cache pages. A store whose
+fingerprint no longer matches the database is re-exported, never trusted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Mapping
+from typing import Any, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FORMAT_VERSION = 1
+_BATCH = 1000
+
+
+class EmbeddingMatrix(Mapping[str, np.ndarray]):
+    """Read-only ``{id -> normalised vector}`` view over a memory-mapped matrix.
+
+    Behaves like ``get_embeddings_by_doc_type`` output, but ``ids`` and
+    ``vectors`` expose the row-aligned arrays for zero-copy consumers.
+    """
+
+    def __init__(
+        self,
+        doc_type: str,
+        model_id: str,
+        fingerprint: str,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+    ) -> None:
+        self.doc_type = doc_type
+        self.model_id = model_id
+        self.fingerprint = fingerprint
+        self.ids = tuple(ids)
+        self.vectors = vectors
+        self._row_of = {object_id: row for row, object_id in enumerate(self.ids)}
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    def __getitem__(self, object_id: str) -> np.ndarray:
+        row: np.ndarray = self.vectors[self._row_of[object_id]]
+        return row
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def store_dir(database: Any) -> Optional[str]:
+    """Directory holding the store for ``database``, or None when it has none."""
+    directory = os.environ.get("CRE_EMBEDDING_STORE_DIR", "")
+    if directory:
+        return directory
+    if getattr(database, "session", None) is None:
+        return None
+    url = database.session.get_bind().url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return f"{url.database}.embeddings"
+
+
+def _header_path(directory: str, doc_type: str) -> str:
+    return os.path.join(directory, f"{doc_type}.json")
+
+
+def load(
+    directory: str, doc_type: str, fingerprint: Optional[str] = None
+) -> Optional[EmbeddingMatrix]:
+    """The stored ``doc_type`` matrix, memory-mapped; None if missing or stale."""
+    matrix_path = _header_path(directory, doc_type)
+    try:
+        with open(matrix_path, encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != FORMAT_VERSION:
+            return None
+        if fingerprint is not None and header.get("fingerprint") != fingerprint:
+            return None
+        matrix_path = os.path.join(directory, header["matrix"])
+        vectors = np.load(matrix_path, mmap_mode="r", allow_pickle=False)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("ignoring unreadable embedding store %s: %s", matrix_path, exc)
+        return None
+    ids = header.get("ids", [])
+    if vectors.dtype != np.float32 or vectors.shape != (len(ids), header.get("dim")):
+        logger.warning("ignoring embedding store %s: header mismatch", matrix_path)
+        return None
+    return EmbeddingMatrix(
+        doc_type, header.get("model_id", ""), header["fingerprint"], ids, vectors
+    )
+
+
+def export(
+    database: Any, doc_type: str, directory: str, fingerprint: Optional[str] = None
+) -> Optional[EmbeddingMatrix]:
+    """Write every ``doc_type`` vector in ``database`` to the store; None if none.
+
+    Rows are streamed and normalised straight into a float32 memmap, so the
+    export never holds the parsed hub in Python lists. Rows whose width differs
+    from the first vector (a mixed-model table) are skipped with a warning.
+    """
+    from application.database import db
+    from application.database.pgvector_utils import (
+        parse_stored_embedding_vec,
+        require_embedding_vec_store,
+    )
+    from application.defs import cre_defs
+
+    require_embedding_vec_store(
+        database.session.get_bind(), context="embedding_store.export"
+    )
+    if fingerprint is None:
+        fingerprint = database.embeddings_fingerprint(doc_type)
+    id_column = (
+        db.Embeddings.cre_id
+        if doc_type == cre_defs.Credoctypes.CRE.value
+        else db.Embeddings.node_id
+    )
+    query = (
+        database.session.query(
+            id_column, db.Embeddings.embedding_model_id, db.Embeddings.embedding_vec
+        )
+        .filter(db.Embeddings.doc_type == doc_type)
+        .order_by(db.Embeddings.id)
+    )
+    total = query.count()
+    header_path = _header_path(directory, doc_type)
+    matrix_name = f"{doc_type}.{fingerprint}.npy"
+    matrix_path = os.path.join(directory, matrix_name)
+    tmp_matrix = f"{matrix_path}.{os.getpid()}.tmp"
+    tmp_header = f"{header_path}.{os.getpid()}.tmp"
+    os.makedirs(directory, exist_ok=True)
+
+    ids: List[str] = []
+    model_id, skipped = "", 0
+    out: Optional[np.memmap[Any, Any]] = None
+    for object_id, row_model, raw in query.yield_per(_BATCH):
+        vec = parse_stored_embedding_vec(raw)
+        if not vec:
+            continue
+        if out is None:
+            out = np.lib.format.open_memmap(
+                tmp_matrix, mode="w+", dtype=np.float32, shape=(total, len(vec))
+            )
+            model_id = row_model or ""
+        if len(vec) != out.shape[1]:
+            skipped += 1
+            continue
+        row = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(row)
+        out[len(ids)] = row / norm if norm else row
+        ids.append(object_id)
+    if out is None:
+        return None
+    if skipped:
+        logger.warning(
+            "embedding store %s: skipped %s vectors not %s wide",
+            doc_type,
+            skipped,
+            out.shape[1],
+        )
+    out.flush()
+    if len(ids) < total:
+        # Rows without vectors left unused capacity; rewrite at the real size.
+        trimmed = np.array(out[: len(ids)])
+        del out
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, trimmed)
+        dim = trimmed.shape[1]
+    else:
+        dim = out.shape[1]
+        del out
+    with open(tmp_header, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": FORMAT_VERSION,
+                "doc_type": doc_type,
+                "model_id": model_id,
+                "dim": dim,
+                "count": len(ids),
+                "fingerprint": fingerprint,
+                "matrix": matrix_name,
+                "ids": ids,
+            },
+            f,
+        )
+    os.replace(tmp_matrix, matrix_path)
+    previous = load(directory, doc_type)
+    os.replace(tmp_header, header_path)
+    if previous is not None and previous.fingerprint != fingerprint:
+        # Processes still mapping the old matrix keep their pages until unmap.
+        _remove_quietly(
+            os.path.join(directory, f"{doc_type}.{previous.fingerprint}.npy")
+        )
+    logger.info("exported %s %s embeddings to %s", len(ids), doc_type, matrix_path)
+    return load(directory, doc_type, fingerprint)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def refresh(
+    database: Any, doc_type: str, fingerprint: Optional[str] = None
+) -> Optional[EmbeddingMatrix]:
+    """The up-to-date store for ``doc_type``, re-exporting it when stale.
+
+    None when ``database`` has no store directory or no ``doc_type`` vectors.
+    """
+    directory = store_dir(database)
+    if directory is None:
+        return None
+    if fingerprint is None:
+        fingerprint = database.embeddings_fingerprint(doc_type)
+    return load(directory, doc_type, fingerprint) or export(
+        database, doc_type, directory, fingerprint
+    )
+
+
+def embeddings_for(
+    database: Any, doc_type: str
+) -> Union[EmbeddingMatrix, Mapping[str, Sequence[float]]]:
+    """``{id -> vector}`` for ``doc_type``: the mmap store when available,
+    ``get_embeddings_by_doc_type`` otherwise (Postgres without a store
+    directory, in-memory databases, test doubles)."""
+    return refresh(database, doc_type) or database.get_embeddings_by_doc_type(doc_type)
@@ -0,0 +1,15 @@
+import os
+from typing import Optional
+
+
+def env_int(name: str, default: int, minimum: Optional[int] = None) -> int:
+    """Read an int from an environment variable; unset or invalid values give
+    ``default``, and values below ``minimum`` are raised to it."""
+    raw = os.environ.get(name, "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        return default
+    if minimum is not None:
+        return max(minimum, value)
+    return value
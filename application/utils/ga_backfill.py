@@ -0,0 +1,259 @@
+"""
+Local, parallel backfill of missing directed gap analysis pairs.
+
+``run`` computes the pairs ``cre_main._missing_ga_pairs`` reports on a process
+pool, each worker holding its own database session and Neo4j driver (see
+``_init_worker``). Pairs are handed out one at a time, most expensive first
+(node count of one standard times the other's), so a worker that finishes a
+cheap pair picks up the next pending one and long pairs do not end up queued
+behind each other at the end of the run.
+
+Every finished pair is checkpointed in ``ga_backfill_checkpoint`` by the
+parent process, stamped with the dataset generation the run started from. A
+run that is killed leaves its checkpoints behind and the next run skips those
+pairs, including the ones that produced no cacheable result (which
+``gap_analysis_results`` never records), as long as the data has not changed
+since; a run that completes clears them. The run's own generation bump carries
+its checkpoints over. Progress, throughput and ETA are logged as pairs finish.
+"""
+
+import logging
+import multiprocessing
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from application.database import db
+from application.utils import dataset_generation, gap_analysis
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DONE = "done"
+EMPTY = "empty"
+FAILED = "failed"
+
+Pair = Tuple[str, str]
+
+# Set by _init_worker in every pool process.
+_worker_collection: Optional[db.Node_collection] = None
+
+
+@dataclass
+class BackfillProgress:
+    total: int
+    started: float = field(default_factory=time.monotonic)
+    finished: Dict[str, int] = field(
+        default_factory=lambda: {DONE: 0, EMPTY: 0, FAILED: 0}
+    )
+
+    @property
+    def done(self) -> int:
+        return sum(self.finished.values())
+
+    def record(self, status: str) -> None:
+        self.finished[status] += 1
+
+    def pairs_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done * 60 / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.pairs_per_minute()
+        if not rate:
+            return None
+        return (self.total - self.done) * 60 / rate
+
+    def summary(self) -> str:
+        eta = self.eta_seconds()
+        return "%s/%s pairs (done=%s empty=%s failed=%s) %.1f pairs/min ETA %s" % (
+            self.done,
+            self.total,
+            self.finished[DONE],
+            self.finished[EMPTY],
+            self.finished[FAILED],
+            self.pairs_per_minute(),
+            "-" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta)),
+        )
+
+
+def standard_sizes(collection: db.Node_collection) -> Dict[str, int]:
+    """Node count per standard name; OpenCRE counts its CREs."""
+    sizes = {
+        name: count
+        for name, count in collection.session.query(
+            db.Node.name, func.count(db.Node.id)
+        ).group_by(db.Node.name)
+    }
+    sizes[gap_analysis.OPENCRE_STANDARD_NAME] = collection.session.query(
+        func.count(db.CRE.id)
+    ).scalar()
+    return sizes
+
+
+def order_by_cost(pairs: Iterable[Pair], sizes: Dict[str, int]) -> List[Pair]:
+    """Most expensive pair first; ties keep their input order."""
+    return sorted(
+        pairs, key=lambda pair: -(sizes.get(pair[0], 1) * sizes.get(pair[1], 1))
+    )
+
+
+def checkpointed(
+    collection: db.Node_collection, generation: Optional[int] = None
+) -> Dict[str, str]:
+    """cache_key -> status for pairs an interrupted run already finished, at
+    dataset ``generation`` (any generation when None)."""
+    query = collection.session.query(
+        db.GapAnalysisBackfillCheckpoint.cache_key,
+        db.GapAnalysisBackfillCheckpoint.status,
+    )
+    if generation is not None:
+        query = query.filter(db.GapAnalysisBackfillCheckpoint.generation == generation)
+    return dict(query)
+
+
+def _checkpoint(
+    collection: db.Node_collection,
+    cache_key: str,
+    status: str,
+    seconds: float,
+    error: Optional[str],
+    generation: int,
+) -> None:
+    row = collection.session.get(db.GapAnalysisBackfillCheckpoint, cache_key)
+    if row is None:
+        row = db.GapAnalysisBackfillCheckpoint(cache_key=cache_key, attempts=0)
+        collection.session.add(row)
+    row.status = status
+    row.generation = generation
+    row.attempts += 1
+    row.seconds = seconds
+    row.error = error
+    row.updated_at = datetime.now(timezone.utc)
+    collection.session.commit()
+
+
+def compute_pair(collection: db.Node_collection, pair: Pair) -> Tuple[str, str]:
+    """Run gap analysis for one pair; (status, error)."""
+    cache_key = gap_analysis.make_resources_key(list(pair))
+    try:
+        if not collection.gap_analysis_exists(cache_key):
+            db.gap_analysis(
+                neo_db=collection.neo_db, node_names=list(pair), cache_key=cache_key
+            )
+        status = DONE if collection.gap_analysis_exists(cache_key) else EMPTY
+        return status, ""
+    except Exception:
+        collection.session.rollback()
+        return FAILED, traceback.format_exc(limit=5)
+
+
+def _timed(collection: db.Node_collection, pair: Pair) -> Tuple[Pair, str, str, float]:
+    start = time.monotonic()
+    status, error = compute_pair(collection, pair)
+    return pair, status, error, time.monotonic() - start
+
+
+def _init_worker(db_connection_str: str) -> None:
+    global _worker_collection
+    from application.cmd import cre_main
+
+    _worker_collection = cre_main.db_connect(path=db_connection_str)
+
+
+def _run_pair(pair: Pair) -> Tuple[Pair, str, str, float]:
+    return _timed(_worker_collection, pair)
+
+
+def run(
+    collection: db.Node_collection,
+    db_connection_str: str,
+    pairs: List[Pair],
+    *,
+    workers: int = 1,
+) -> BackfillProgress:
+    """Compute ``pairs`` on ``workers`` processes, resuming an interrupted run.
+
+    ``workers=1`` computes in this process with ``collection``.
+    """
+    generation = db.get_dataset_generation()[0]
+    resumed = checkpointed(collection, generation)
+    todo = [
+        pair
+        for pair in pairs
+        if resumed.get(gap_analysis.make_resources_key(list(pair))) in (None, FAILED)
+    ]
+    if len(todo) < len(pairs):
+        logger.info(
+            "GA backfill: resuming, %s pairs already checkpointed",
+            len(pairs) - len(todo),
+        )
+    todo = order_by_cost(todo, standard_sizes(collection))
+    progress = BackfillProgress(total=len(todo))
+    workers = max(1, min(int(workers), len(todo) or 1))
+    logger.info("GA backfill: %s pairs on %s workers", len(todo), workers)
+
+    if workers == 1:
+        results: Iterable[Tuple[Pair, str, str, float]] = (
+            _timed(collection, pair) for pair in todo
+        )
+        _consume(collection, results, progress, generation)
+    else:
+        # spawn: workers must not inherit the parent's DB connections or Neo4j
+        # driver threads
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            workers, initializer=_init_worker, initargs=(db_connection_str,)
+        ) as pool:
+            _consume(
+                collection,
+                pool.imap_unordered(_run_pair, todo, chunksize=1),
+                progress,
+                generation,
+            )
+
+    if progress.finished[DONE] or DONE in resumed.values():
+        # map_analysis serves the new results, including those of a killed run
+        _bump_generation(collection, generation)
+    if not progress.finished[FAILED]:
+        collection.session.query(db.GapAnalysisBackfillCheckpoint).delete()
+        collection.session.commit()
+    logger.info("GA backfill finished: %s", progress.summary())
+    return progress
+
+
+def _bump_generation(collection: db.Node_collection, generation: int) -> None:
+    """Bump the dataset generation for this run's results. Its checkpoints move
+    to the new generation unless something else changed the data meanwhile."""
+    unchanged = db.get_dataset_generation()[0] == generation
+    bumped = dataset_generation.bump(commit=False)
+    if unchanged:
+        collection.session.query(db.GapAnalysisBackfillCheckpoint).filter(
+            db.GapAnalysisBackfillCheckpoint.generation == generation
+        ).update(
+            {db.GapAnalysisBackfillCheckpoint.generation: bumped},
+            synchronize_session=False,
+        )
+    collection.session.commit()
+
+
+def _consume(
+    collection: db.Node_collection,
+    results: Iterable[Tuple[Pair, str, str, float]],
+    progress: BackfillProgress,
+    generation: int,
+) -> None:
+    for pair, status, error, seconds in results:
+        cache_key = gap_analysis.make_resources_key(list(pair))
+        _checkpoint(collection, cache_key, status, seconds, error or None, generation)
+        progress.record(status)
+        if status == FAILED:
+            logger.warning("GA backfill: %s failed: %s", cache_key, error)
+        logger.info(
+            "GA backfill: %s in %.1fs; %s", cache_key, seconds, progress.summary()
+        )
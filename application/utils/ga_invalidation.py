@@ -0,0 +1,254 @@
+"""
+Phase 3 (v3) — gap analysis cache invalidation scoped by a change set.
+
+Instead of dropping every cached GA row for a re-imported standard, only the
+directed pairs whose stored paths actually involve a changed control are
+invalidated. A pair (primary ``A >> B`` row plus its ``A >> B->...`` drill-down
+rows) is the unit of recomputation, since tier pruning is decided per pair.
+
+Rules, given that GA paths only traverse CREs and standard controls are always
+path endpoints:
+
+- removed control: pairs whose rows reference it are invalidated;
+- modified control whose only change is its description: rows referencing it
+  are patched in place;
+- any other modification: pairs whose rows reference it are invalidated, and if
+  its CRE links changed every pair of its standard is invalidated (new links can
+  open paths the cache never saw);
+- added control: every pair of its standard is invalidated.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+
+from application.defs import cre_defs as defs
+from application.utils import ga_payload, import_diff
+from application.utils.gap_analysis import make_resources_key
+
+logger = logging.getLogger(__name__)
+
+ControlKey = Tuple[str, str, str]
+
+_STANDARD_DOCTYPES = (defs.Credoctypes.Standard.value, defs.Credoctypes.Tool.value)
+
+
+@dataclass
+class GapAnalysisInvalidationReport:
+    """Which cached GA pairs a change set invalidates, patches or keeps."""
+
+    dry_run: bool
+    invalidated_pairs: List[str] = field(default_factory=list)
+    patched_pairs: List[str] = field(default_factory=list)
+    kept_pairs: List[str] = field(default_factory=list)
+    deleted_rows: int = 0
+    patched_rows: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _ChangeScope:
+    """Controls touched by a change set, split by how cached rows must react."""
+
+    # standard name -> reason every pair of that standard is invalidated
+    whole_standards: Dict[str, str] = field(default_factory=dict)
+    invalidating_keys: Set[ControlKey] = field(default_factory=set)
+    # control key -> new description
+    description_patches: Dict[ControlKey, str] = field(default_factory=dict)
+
+    @property
+    def standard_names(self) -> Set[str]:
+        names = set(self.whole_standards)
+        names |= {k[0] for k in self.invalidating_keys}
+        names |= {k[0] for k in self.description_patches}
+        return names
+
+
+def _linked_cre_ids(document: Dict[str, Any]) -> Set[str]:
+    return {
+        str(c.get("id") or "")
+        for c in (document.get("linked_cres") or [])
+        if isinstance(c, dict)
+    }
+
+
+def _non_description_fields(document: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        k: (document.get(k) or "")
+        for k in ("name", "section", "subsection", "sectionID")
+    }
+
+
+def change_scope(ops: List[import_diff.ChangeSetOp]) -> _ChangeScope:
+    scope = _ChangeScope()
+    for op in ops:
+        key: ControlKey = tuple(op.key)  # type: ignore[assignment]
+        if isinstance(op, import_diff.AddControl):
+            scope.whole_standards.setdefault(key[0], "control added")
+        elif isinstance(op, import_diff.RemoveControl):
+            scope.invalidating_keys.add(key)
+        elif isinstance(op, import_diff.ModifyControl):
+            before, after = op.before or {}, op.after or {}
+            if _linked_cre_ids(before) != _linked_cre_ids(after):
+                scope.whole_standards.setdefault(key[0], "control links changed")
+                scope.invalidating_keys.add(key)
+            elif _non_description_fields(before) != _non_description_fields(after):
+                scope.invalidating_keys.add(key)
+            else:
+                scope.description_patches[key] = after.get("description") or ""
+    # A control that is both patched and invalidated only needs invalidation.
+    for key in scope.invalidating_keys:
+        scope.description_patches.pop(key, None)
+    return scope
+
+
+def pair_of_cache_key(cache_key: str) -> Optional[Tuple[str, str]]:
+    """``("A", "B")`` for ``A >> B`` and ``A >> B->sub`` cache keys."""
+    marker = " >> "
+    idx = cache_key.find(marker)
+    if idx < 0:
+        return None
+    peer = cache_key[idx + len(marker) :].split("->", 1)[0]
+    return cache_key[:idx], peer
+
+
+def _iter_documents(value: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(value, dict):
+        if "doctype" in value and "name" in value:
+            yield value
+        for child in value.values():
+            yield from _iter_documents(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _iter_documents(child)
+
+
+def _control_key(document: Dict[str, Any]) -> Optional[ControlKey]:
+    if document.get("doctype") not in _STANDARD_DOCTYPES:
+        return None
+    return (
+        str(document.get("name") or ""),
+        str(document.get("section") or ""),
+        str(document.get("sectionID") or ""),
+    )
+
+
+def _row_references(payload: Any, keys: Set[ControlKey]) -> bool:
+    return any(_control_key(doc) in keys for doc in _iter_documents(payload))
+
+
+def _patch_descriptions(payload: Any, patches: Dict[ControlKey, str]) -> bool:
+    changed = False
+    for doc in _iter_documents(payload):
+        key = _control_key(doc)
+        if key in patches and doc.get("description") != patches[key]:
+            doc["description"] = patches[key]
+            changed = True
+    return changed
+
+
+def invalidate_gap_analysis_for_change_set(
+    session: Any,
+    ops: List[import_diff.ChangeSetOp],
+    *,
+    dry_run: bool = False,
+    commit: bool = True,
+) -> GapAnalysisInvalidationReport:
+    """
+    Drop (or, for description-only edits, patch) the GA rows a change set affects.
+
+    With ``dry_run`` nothing is written and the report lists the pairs that
+    would be invalidated, patched and kept.
+    """
+    from application.database import db
+
+    report = GapAnalysisInvalidationReport(dry_run=dry_run)
+    scope = change_scope(ops)
+    names = scope.standard_names
+    if not names:
+        return report
+
+    # Pairs are listed from the primary rows' cache keys alone; payloads and
+    # drill-down keys are loaded only for pairs that name a changed standard.
+    Results = db.GapAnalysisResults
+    pairs = set()
+    primary_keys = session.query(Results.cache_key).filter(
+        ~Results.cache_key.contains("->", autoescape=True)
+    )
+    for (cache_key,) in primary_keys:
+        pair = pair_of_cache_key(cache_key or "")
+        if pair is not None:
+            pairs.add(pair)
+
+    for pair in sorted(pairs):
+        pair_key = make_resources_key(list(pair))
+        if not (set(pair) & names):
+            report.kept_pairs.append(pair_key)
+            continue
+
+        in_pair = or_(
+            Results.cache_key == pair_key,
+            Results.cache_key.startswith(f"{pair_key}->", autoescape=True),
+        )
+        keys = [key for (key,) in session.query(Results.cache_key).filter(in_pair)]
+        rows: List[Any] = []
+        invalidated = bool(set(pair) & set(scope.whole_standards))
+        if not invalidated:
+            rows = session.query(Results).filter(in_pair).all()
+            payloads = {}
+            for row in rows:
+                try:
+                    payloads[row.cache_key] = json.loads(
+                        ga_payload.row_text(row) or "{}"
+                    )
+                except json.JSONDecodeError:
+                    payloads[row.cache_key] = None
+            invalidated = any(
+                payload is None or _row_references(payload, scope.invalidating_keys)
+                for payload in payloads.values()
+            )
+        if invalidated:
+            report.invalidated_pairs.append(pair_key)
+            report.deleted_rows += len(keys)
+            if not dry_run:
+                session.query(Results).filter(in_pair).delete(synchronize_session=False)
+                db.drop_gap_analysis_controls(session, keys)
+            continue
+
+        patched = 0
+        for row in rows:
+            payload = payloads[row.cache_key]
+            if not _patch_descriptions(payload, scope.description_patches):
+                continue
+            patched += 1
+            if not dry_run:
+                text = json.dumps(payload, sort_keys=True)
+                ga_payload.store_on_row(
+                    row, text, compressed=ga_payload.row_is_encoded(row)
+                )
+                session.add(row)
+                if row.cache_key == pair_key:
+                    db.index_gap_analysis_controls(session, pair_key, text)
+        if patched:
+            report.patched_pairs.append(pair_key)
+            report.patched_rows += patched
+        else:
+            report.kept_pairs.append(pair_key)
+
+    if not dry_run and commit:
+        session.commit()
+    logger.info(
+        "GA invalidation%s: invalidated_pairs=%s patched_pairs=%s kept_pairs=%s",
+        " (dry run)" if dry_run else "",
+        len(report.invalidated_pairs),
+        len(report.patched_pairs),
+        len(report.kept_pairs),
+    )
+    return report
@@ -41,12 +41,15 @@ def count_empty_primary_gap_rows(session: Any, gap_model: Any) -> int:
     from application.utils.gap_analysis import primary_gap_analysis_payload_is_material
 
     rows = (
-        session.query(gap_model.ga_object)
+        session.query(gap_model.ga_object, gap_model.content_hash)
         .filter(not_(gap_model.cache_key.like("% >> %->%")))
         .all()
     )
     n = 0
-    for (payload,) in rows:
+    for payload, content_hash in rows:
+        # Compressed rows (content_hash set) are only ever written when material.
+        if content_hash is not None:
+            continue
         if not primary_gap_analysis_payload_is_material(str(payload or "")):
             n += 1
     return n
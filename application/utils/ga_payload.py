@@ -0,0 +1,169 @@
+"""
+Compressed, versioned encoding of ``gap_analysis_results`` payloads.
+
+A stored GA row is already the exact JSON body ``/rest/v1/map_analysis`` and
+``/rest/v1/map_analysis_weak_links`` return (``{"result": ...}``), so rows
+written in compressed mode keep that body gzip'ed in ``ga_payload`` together
+with its SHA-256 (used as the HTTP ETag) and a schema version. The web layer can
+then hand the bytes to the client with ``Content-Encoding: gzip`` without ever
+decoding them.
+
+gzip is used rather than zstd because every browser and HTTP client accepts it
+as a ``Content-Encoding``; the stored bytes are sent as-is.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+GA_PAYLOAD_SCHEMA_VERSION = 1
+GA_PAYLOAD_ENCODING = "gzip"
+# Rows are written once and read many times; favour ratio over write speed.
+GA_PAYLOAD_COMPRESSLEVEL = 9
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    body: bytes
+    encoding: str
+    content_hash: str
+    schema_version: int = GA_PAYLOAD_SCHEMA_VERSION
+
+    @property
+    def etag(self) -> str:
+        return f"ga-{self.schema_version}-{self.content_hash}"
+
+
+def encode(ga_object: str) -> EncodedPayload:
+    raw = ga_object.encode("utf-8")
+    return EncodedPayload(
+        # mtime=0 keeps the bytes (and so the stored payload) deterministic.
+        body=gzip.compress(raw, compresslevel=GA_PAYLOAD_COMPRESSLEVEL, mtime=0),
+        encoding=GA_PAYLOAD_ENCODING,
+        content_hash=hashlib.sha256(raw).hexdigest(),
+    )
+
+
+def decode(body: bytes, encoding: Optional[str]) -> str:
+    if encoding == GA_PAYLOAD_ENCODING:
+        return gzip.decompress(body).decode("utf-8")
+    raise ValueError(f"unsupported gap analysis payload encoding: {encoding!r}")
+
+
+def encode_entry(entry: str) -> bytes:
+    """One ``result`` entry of a GA body, compressed for the per-control index."""
+    return gzip.compress(
+        entry.encode("utf-8"), compresslevel=GA_PAYLOAD_COMPRESSLEVEL, mtime=0
+    )
+
+
+def decode_entry(body: bytes) -> str:
+    return decode(body, GA_PAYLOAD_ENCODING)
+
+
+def row_is_encoded(row: Any) -> bool:
+    return getattr(row, "ga_payload", None) is not None
+
+
+def row_text(row: Any) -> Optional[str]:
+    """The JSON text of a ``GapAnalysisResults`` row, whichever way it is stored."""
+    if row is None:
+        return None
+    if row_is_encoded(row):
+        return decode(row.ga_payload, row.payload_encoding)
+    text: Optional[str] = row.ga_object
+    return text
+
+
+def row_encoded(row: Any) -> Optional[EncodedPayload]:
+    if not row_is_encoded(row):
+        return None
+    return EncodedPayload(
+        body=row.ga_payload,
+        encoding=row.payload_encoding,
+        content_hash=row.content_hash,
+        schema_version=row.schema_version or GA_PAYLOAD_SCHEMA_VERSION,
+    )
+
+
+def store_on_row(row: Any, ga_object: str, *, compressed: bool) -> None:
+    """Write ``ga_object`` onto ``row`` as plain text or as an encoded payload."""
+    if not compressed:
+        row.ga_object = ga_object
+        row.ga_payload = None
+        row.payload_encoding = None
+        row.content_hash = None
+        row.schema_version = None
+        return
+    encoded = encode(ga_object)
+    row.ga_object = None
+    row.ga_payload = encoded.body
+    row.payload_encoding = encoded.encoding
+    row.content_hash = encoded.content_hash
+    row.schema_version = encoded.schema_version
+
+
+def _skip(text: str, index: int) -> int:
+    return _JSON_WHITESPACE.match(text, index).end()
+
+
+def _member_key(text: str, index: int, decoder: json.JSONDecoder) -> Tuple[str, int]:
+    """The key of the object member at ``index`` and where its value starts."""
+    key, index = decoder.raw_decode(text, index)
+    index = _skip(text, index)
+    if not text.startswith(":", index):
+        raise ValueError(f"expected ':' at {index}")
+    return key, _skip(text, index + 1)
+
+
+def _next_member(text: str, index: int) -> int:
+    index = _skip(text, index)
+    if text.startswith(",", index):
+        return _skip(text, index + 1)
+    return index
+
+
+def _members(
+    text: str, index: int, decoder: json.JSONDecoder
+) -> Tuple[List[Tuple[str, int, int]], int]:
+    """(key, value start, value end) of each member of the object at
+    ``index``, and the index just past the object."""
+    members = []
+    index = _skip(text, index + 1)
+    while not text.startswith("}", index):
+        key, start = _member_key(text, index, decoder)
+        _, index = decoder.raw_decode(text, start)
+        members.append((key, start, index))
+        index = _next_member(text, index)
+    return members, index + 1
+
+
+def result_spans(ga_object: str) -> List[Tuple[str, int, int]]:
+    """(key, start, end) of every entry of the top-level ``result`` object of a
+    GA body, in order, so ``ga_object[start:end]`` is the JSON of that entry.
+
+    Repeated keys resolve as in ``json.loads`` (first position, last value).
+    [] if ``result`` is missing or not an object; ValueError on invalid JSON.
+    """
+    decoder = json.JSONDecoder()
+    index = _skip(ga_object, 0)
+    if not ga_object.startswith("{", index):
+        return []
+    spans: Dict[str, Tuple[int, int]] = {}
+    index = _skip(ga_object, index + 1)
+    while not ga_object.startswith("}", index):
+        key, index = _member_key(ga_object, index, decoder)
+        if key == "result" and ga_object.startswith("{", index):
+            entries, index = _members(ga_object, index, decoder)
+            spans = {entry: (start, end) for entry, start, end in entries}
+        else:
+            _, index = decoder.raw_decode(ga_object, index)
+        index = _next_member(ga_object, index)
+    return [(key, start, end) for key, (start, end) in spans.items()]
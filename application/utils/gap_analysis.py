@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional
 from application.utils import redis
 from flask import json as flask_json
 import json
+from dataclasses import dataclass, field
 from application.defs import cre_defs as defs
 
 logging.basicConfig()
@@ -21,6 +22,16 @@ PENALTIES = {
     "SAME": 0,
 }
 
+# PENALTIES by (relationship, whether the step walks from its start node),
+# which is how get_path_score tells CONTAINS_UP from CONTAINS_DOWN.
+_STEP_PENALTIES = {
+    (relationship, up): PENALTIES[relationship]
+    for relationship in PENALTIES
+    for up in (True, False)
+}
+_STEP_PENALTIES["CONTAINS", True] = PENALTIES["CONTAINS_UP"]
+_STEP_PENALTIES["CONTAINS", False] = PENALTIES["CONTAINS_DOWN"]
+
 GAP_ANALYSIS_TIMEOUT = "129600s"  # 36 hours
 OPENCRE_STANDARD_NAME = "OpenCRE"
 OPENCRE_OVERLAP_LINK_TYPES = (
@@ -29,6 +40,40 @@ OPENCRE_OVERLAP_LINK_TYPES = (
 )
 
 
+@dataclass
+class GapAnalysisBatchReport:
+    """Timings for one batched ``importing >> peers`` gap analysis run."""
+
+    importing_name: str
+    traversal_seconds: float = 0.0
+    pair_seconds: Dict[str, float] = field(default_factory=dict)
+    pair_paths: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.traversal_seconds + sum(self.pair_seconds.values())
+
+    def amortized_pair_seconds(self) -> Dict[str, float]:
+        """Per-pair wall time with the shared traversal split evenly across pairs."""
+        if not self.pair_seconds:
+            return {}
+        share = self.traversal_seconds / len(self.pair_seconds)
+        return {key: share + spent for key, spent in self.pair_seconds.items()}
+
+    def log_summary(self) -> None:
+        logger.info(
+            "Batched GA for %s: pairs=%s traversal_s=%.3f total_s=%.3f",
+            self.importing_name,
+            len(self.pair_seconds),
+            self.traversal_seconds,
+            self.total_seconds,
+        )
+        for key, seconds in sorted(self.amortized_pair_seconds().items()):
+            logger.info(
+                "  %s: %.3fs (%s paths)", key, seconds, self.pair_paths.get(key, 0)
+            )
+
+
 def make_resources_key(array: List[str]):
     return " >> ".join(array)
 
@@ -104,6 +149,27 @@ def get_path_score(path):
     return score
 
 
+def score_paths(paths: List[Dict[str, Any]]) -> List[int]:
+    """get_path_score for many paths at once; sets every step's ``score`` too.
+
+    Penalties come from a table keyed by (relationship, walked from start), so
+    there is no per-step key formatting or helper calls.
+    """
+    scores = []
+    for path in paths:
+        previous_id = path["start"].id
+        score = 0
+        for step in path["path"]:
+            start_id = step["start"].id
+            up = start_id == previous_id
+            previous_id = step["end"].id if up else start_id
+            penalty = _STEP_PENALTIES[step["relationship"], up]
+            step["score"] = penalty
+            score += penalty
+        scores.append(score)
+    return scores
+
+
 def get_relation_direction(step, previous_id):
     if step["start"].id == previous_id:
         return "UP"
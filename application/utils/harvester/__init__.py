@@ -8,6 +8,7 @@ from .repos_validator import (
 )
 from .schemas import (
     ChunkingConfig,
+    CloneConfig,
     PathRules,
     PollingConfig,
     RepositoryConfig,
@@ -20,6 +21,8 @@ from .repository_cache import build_repository_cache_path
 from .file_filter import FileFilter
 from .filtering_metrics import FilteringMetricsCollector
 from .diff_retriever import DiffRetriever
+from .diff_pipeline import DiffPipeline
+from .harvest_orchestrator import HarvestOrchestrator, format_timing_table
 
 from .filtering_benchmark import (
     FilteringBenchmark,
@@ -29,13 +32,17 @@ from .filtering_benchmark import (
 __all__ = [
     "build_repository_cache_path",
     "ChunkingConfig",
+    "CloneConfig",
     "ConfigLoaderError",
+    "DiffPipeline",
     "DiffRetriever",
     "GitRepositoryClient",
     "FileFilter",
     "FilteringMetricsCollector",
     "FilteringBenchmark",
     "FilteringBenchmarkResult",
+    "format_timing_table",
+    "HarvestOrchestrator",
     "PathRules",
     "PollingConfig",
     "RepositoryClient",
@@ -11,6 +11,9 @@ class ChangeDetector:
         self.repository_client = repository_client
 
     def _resolve_commit(self, commit_sha: str) -> str:
+        # a checkpoint commit may be older than a shallow clone's history
+        self.repository_client.ensure_commit(commit_sha)
+
         try:
             result = subprocess.run(
                 [
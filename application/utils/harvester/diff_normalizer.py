@@ -1,8 +1,11 @@
+from collections.abc import Iterable, Iterator
 import re
 import unicodedata
 
 from .models import DiffBlock
 
+_WHITESPACE = re.compile(r"\s+")
+
 
 class DiffNormalizer:
     """
@@ -14,15 +17,19 @@ class DiffNormalizer:
 
     def normalize_line(self, line: str) -> str:
         line = unicodedata.normalize("NFKC", line)
-        line = re.sub(r"\s+", " ", line)
+        line = _WHITESPACE.sub(" ", line)
         return line.strip()
 
     def normalize(self, blocks: list[DiffBlock]) -> list[DiffBlock]:
         """
         Normalize every added line in each DiffBlock.
         """
-        normalized: list[DiffBlock] = []
+        return list(self.iter_normalize(blocks))
 
+    def iter_normalize(self, blocks: Iterable[DiffBlock]) -> Iterator[DiffBlock]:
+        """
+        Lazily normalize each DiffBlock as it is pulled from ``blocks``.
+        """
         for block in blocks:
             cleaned_lines: list[str] = []
 
@@ -34,14 +41,10 @@ class DiffNormalizer:
 
                 cleaned_lines.append(line)
 
-            normalized.append(
-                DiffBlock(
-                    file_path=block.file_path,
-                    added_lines=cleaned_lines,
-                    repository=block.repository,
-                    commit_sha=block.commit_sha,
-                    committed_at=block.committed_at,
-                )
+            yield DiffBlock(
+                file_path=block.file_path,
+                added_lines=cleaned_lines,
+                repository=block.repository,
+                commit_sha=block.commit_sha,
+                committed_at=block.committed_at,
             )
-
-        return normalized
@@ -1,8 +1,13 @@
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 import re
 
+from .file_filter import FileFilter
+from .filtering_metrics import FilteringMetricsCollector
 from .models import DiffBlock
 
+_FILE_HEADER = re.compile(r"diff --git a/(.+?) b/")
+
 
 class DiffParser:
     """
@@ -18,52 +23,74 @@ class DiffParser:
         """
         Convert a unified git diff into DiffBlock objects.
         """
-        blocks: list[DiffBlock] = []
+        return list(
+            self.iter_blocks(
+                diff.splitlines(),
+                repository=repository,
+                commit_sha=commit_sha,
+                committed_at=committed_at,
+            )
+        )
+
+    def iter_blocks(
+        self,
+        lines: Iterable[str],
+        repository: str,
+        commit_sha: str,
+        committed_at: datetime | None,
+        file_filter: FileFilter | None = None,
+        metrics: FilteringMetricsCollector | None = None,
+    ) -> Iterator[DiffBlock]:
+        """
+        Yield one DiffBlock per file as soon as its last diff line is read.
 
+        Files rejected by ``file_filter`` are skipped without collecting
+        their added lines; ``metrics`` records every file either way.
+        """
         current_file: str | None = None
+        keep = False
         added_lines: list[str] = []
 
-        for line in diff.splitlines():
+        for line in lines:
             if line.startswith("diff --git"):
-                if current_file is not None:
-                    blocks.append(
-                        DiffBlock(
-                            file_path=current_file,
-                            added_lines=added_lines,
-                            repository=repository,
-                            commit_sha=commit_sha,
-                            committed_at=committed_at,
-                        )
+                if current_file is not None and keep:
+                    yield DiffBlock(
+                        file_path=current_file,
+                        added_lines=added_lines,
+                        repository=repository,
+                        commit_sha=commit_sha,
+                        committed_at=committed_at,
                     )
 
-                match = re.match(r"diff --git a/(.+?) b/", line)
+                match = _FILE_HEADER.match(line)
 
                 current_file = match.group(1) if match else None
+                keep = current_file is not None and (
+                    file_filter is None or file_filter.is_retained(current_file)
+                )
+                if metrics is not None and current_file is not None:
+                    if keep:
+                        metrics.record_retained()
+                    else:
+                        metrics.record_filtered()
                 added_lines = []
 
                 continue
 
-            if line.startswith("+++ b/") or line.startswith("+++ /dev/null"):
+            if not keep:
                 continue
 
-            if line.startswith("--- a/") or line.startswith("--- /dev/null"):
-                continue
-
-            if line.startswith("@@"):
+            if line.startswith("+++ b/") or line.startswith("+++ /dev/null"):
                 continue
 
             if line.startswith("+"):
                 added_lines.append(line[1:])
 
-        if current_file is not None:
-            blocks.append(
-                DiffBlock(
-                    file_path=current_file,
-                    added_lines=added_lines,
-                    repository=repository,
-                    commit_sha=commit_sha,
-                    committed_at=committed_at,
-                )
+        if current_file is not None and keep:
+            yield DiffBlock(
+                file_path=current_file,
+                added_lines=added_lines,
+                repository=repository,
+                commit_sha=commit_sha,
+                committed_at=committed_at,
             )
-
-        return blocks
@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+from datetime import datetime
+
+from .diff_normalizer import DiffNormalizer
+from .diff_parser import DiffParser
+from .diff_retriever import DiffRetriever
+from .file_filter import FileFilter
+from .filtering_metrics import FilteringMetricsCollector
+from .models import DiffBlock
+
+
+class DiffPipeline:
+    """
+    Streams the normalized additions between two commits, one file at a time.
+
+    git diff output is read through a pipe (``DiffRetriever.iter_diff``),
+    split into per-file blocks as each file ends, filtered before any of a
+    rejected file's lines are kept, and normalized as blocks are consumed.
+    Memory stays bounded by the largest retained file and there is no total
+    diff size limit.
+    """
+
+    def __init__(
+        self,
+        retriever: DiffRetriever,
+        file_filter: FileFilter | None = None,
+        parser: DiffParser | None = None,
+        normalizer: DiffNormalizer | None = None,
+    ) -> None:
+        self.retriever = retriever
+        self.file_filter = file_filter
+        self.parser = parser or DiffParser()
+        self.normalizer = normalizer or DiffNormalizer()
+
+    def iter_blocks(
+        self,
+        base_commit: str,
+        target_commit: str,
+        repository: str,
+        commit_sha: str,
+        committed_at: datetime | None = None,
+        metrics: FilteringMetricsCollector | None = None,
+    ) -> Iterator[DiffBlock]:
+        lines = self.retriever.iter_diff(base_commit, target_commit)
+        blocks = self.parser.iter_blocks(
+            lines,
+            repository=repository,
+            commit_sha=commit_sha,
+            committed_at=committed_at,
+            file_filter=self.file_filter,
+            metrics=metrics,
+        )
+        return self.normalizer.iter_normalize(blocks)
@@ -1,5 +1,10 @@
+import codecs
 import logging
 import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator
 
 from .git_repository_client import GitRepositoryClient
 
@@ -15,9 +20,15 @@ class DiffRetriever:
 
     Parsing and normalization are handled by downstream components.
 
+    ``get_diff`` returns the whole diff and is capped at
+    ``MAX_DIFF_SIZE_BYTES``; ``iter_diff`` streams it line by line with no
+    size limit.
+
     """
 
     MAX_DIFF_SIZE_BYTES = 50 * 1024 * 1024
+    DIFF_TIMEOUT_SECONDS: float = 300
+    READ_CHUNK_BYTES = 1024 * 1024
 
     def __init__(self, repository_client: GitRepositoryClient) -> None:
         self.repository_client = repository_client
@@ -60,7 +71,7 @@ class DiffRetriever:
                 ],
                 check=True,
                 capture_output=True,
-                timeout=300,
+                timeout=self.DIFF_TIMEOUT_SECONDS,
             )
         except subprocess.CalledProcessError as exc:
             logger.error(
@@ -81,7 +92,107 @@ class DiffRetriever:
 
         return diff_bytes.decode("utf-8", errors="replace")
 
+    def iter_diff(
+        self, base_commit: str, target_commit: str = "HEAD"
+    ) -> Generator[str, None, None]:
+        """
+        Yield the lines of the unified git diff between two commits, without
+        their line endings, as git writes them.
+
+        Only the line being read is held in memory. Closing the iterator
+        early stops git.
+
+        The timeout counts only time spent waiting on git, not time the
+        caller spends between lines.
+
+        Raises:
+            subprocess.CalledProcessError:
+                If git diff fails.
+
+            subprocess.TimeoutExpired:
+                If waiting on git diff takes longer than
+                ``DIFF_TIMEOUT_SECONDS`` in total.
+        """
+        logger.info(
+            "Streaming diff between %s and %s",
+            base_commit,
+            target_commit,
+        )
+
+        base_commit = self._resolve_commit(base_commit)
+        target_commit = self._resolve_commit(target_commit)
+        command = [
+            "git",
+            "-C",
+            str(self.repository_client.get_local_path()),
+            "diff",
+            base_commit,
+            target_commit,
+        ]
+
+        # stderr goes to a file so a chatty git cannot block on a full pipe
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            timed_out = threading.Event()
+            remaining = float(self.DIFF_TIMEOUT_SECONDS)
+
+            def kill() -> None:
+                timed_out.set()
+                process.kill()
+
+            def read(size: int) -> bytes:
+                # a timer per read, so a slow consumer does not use up the budget
+                nonlocal remaining
+                timer = threading.Timer(max(remaining, 0.0), kill)
+                started = time.monotonic()
+                timer.start()
+                try:
+                    return process.stdout.read(size)
+                finally:
+                    timer.cancel()
+                    remaining -= time.monotonic() - started
+
+            try:
+                yield from self._read_lines(read)
+                returncode = process.wait()
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait()
+
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(command, self.DIFF_TIMEOUT_SECONDS)
+            if returncode != 0:
+                stderr.seek(0)
+                error = stderr.read()
+                logger.error(
+                    "Failed to retrieve diff: %s",
+                    error.decode("utf-8", errors="replace"),
+                )
+                raise subprocess.CalledProcessError(returncode, command, stderr=error)
+
+    def _read_lines(self, read: Callable[[int], bytes]) -> Iterator[str]:
+        # Splitting a chunk at a time keeps the per-line work in C; only the
+        # unterminated tail of a chunk is carried over to the next.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        tail = ""
+        while True:
+            chunk = read(self.READ_CHUNK_BYTES)
+            text = tail + decoder.decode(chunk, final=not chunk)
+            if not chunk:
+                if text:
+                    yield text.removesuffix("\r")
+                return
+            lines = text.split("\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line.removesuffix("\r")
+
     def _resolve_commit(self, commit: str) -> str:
+        # a checkpoint commit may be older than a shallow clone's history
+        self.repository_client.ensure_commit(commit)
+
         result = subprocess.run(
             [
                 "git",
@@ -1,6 +1,11 @@
+import re
+from typing import Any
 from pathlib import PurePosixPath
 from pathlib import Path
 import pathspec
+from pathspec.util import normalize_file
+
+from application.utils.path_matcher import PatternMatcher, SuffixMatcher
 
 DEFAULT_ALLOWED_EXTENSIONS = {
     ".md",
@@ -22,11 +27,50 @@ DEFAULT_EXCLUDE_PATTERNS = tuple(
 )
 
 
+class _CompiledSpec:
+    """
+    A gitignore-style ``PathSpec`` matched with one regex alternation.
+
+    The patterns are merged last first, so the first alternative that
+    matches is the pattern that decides, as in gitignore. Specs whose regexes
+    cannot be merged are matched by pathspec itself.
+    """
+
+    def __init__(self, spec: pathspec.PathSpec[Any]) -> None:
+        self.spec = spec
+        patterns = [
+            pattern
+            for pattern in reversed(spec.patterns)
+            if pattern.include is not None
+        ]
+        self._includes = tuple(pattern.include for pattern in patterns)
+        self._matcher: PatternMatcher | None = None
+        plain_flags = re.compile("").flags
+        if all(
+            isinstance(getattr(pattern, "regex", None), re.Pattern)
+            and isinstance(pattern.regex.pattern, str)
+            and pattern.regex.pattern.startswith("^")
+            and pattern.regex.flags == plain_flags
+            and pattern.regex.groups == 0
+            for pattern in patterns
+        ):
+            self._matcher = PatternMatcher(
+                [pattern.regex.pattern for pattern in patterns]
+            )
+
+    def match_file(self, file_path: str) -> bool:
+        if self._matcher is None:
+            return self.spec.match_file(file_path)
+        index = self._matcher.first_match(normalize_file(file_path))
+        return index is not None and self._includes[index]
+
+
 class FileFilter:
     def __init__(
         self,
         exclude_patterns: list[str] | None = None,
         allowed_extensions: set[str] | None = None,
+        include_patterns: list[str] | None = None,
     ):
         self.exclude_patterns: list[str] = (
             list(DEFAULT_EXCLUDE_PATTERNS)
@@ -40,16 +84,65 @@ class FileFilter:
             else set(allowed_extensions)
         )
 
+        # when given, a path must also match one of these (a repository's
+        # ``paths.include`` in repos.yaml)
+        self.include_patterns: list[str] | None = (
+            None if include_patterns is None else list(include_patterns)
+        )
+
         self._validate_patterns()
 
         try:
-            self._exclude_spec = pathspec.PathSpec.from_lines(
-                "gitignore",
-                self.exclude_patterns,
+            self._exclude_spec = _CompiledSpec(
+                pathspec.PathSpec.from_lines(
+                    "gitignore",
+                    self.exclude_patterns,
+                )
             )
         except Exception as exc:
             raise ValueError("Invalid exclude glob") from exc
 
+        self._include_spec = None
+        if self.include_patterns is not None:
+            try:
+                self._include_spec = _CompiledSpec(
+                    pathspec.PathSpec.from_lines(
+                        "gitignore",
+                        self.include_patterns,
+                    )
+                )
+            except Exception as exc:
+                raise ValueError("Invalid include glob") from exc
+
+        self._extensions = SuffixMatcher(sorted(self.allowed_extensions))
+
+    @classmethod
+    def for_paths(cls, include: list[str], exclude: list[str]) -> "FileFilter":
+        """A filter for a repository's ``PathRules``, on top of the defaults."""
+        return cls(
+            exclude_patterns=[*DEFAULT_EXCLUDE_PATTERNS, *exclude],
+            include_patterns=include,
+        )
+
+    def sparse_checkout_patterns(self) -> list[str]:
+        """
+        Non-cone sparse-checkout patterns for at least the retained files.
+        """
+        if self.include_patterns is not None:
+            patterns = list(self.include_patterns)
+        else:
+            patterns = [
+                f"*{extension}" for extension in sorted(self.allowed_extensions)
+            ]
+
+        for pattern in self.exclude_patterns:
+            if pattern.startswith("!"):
+                patterns.append(pattern[1:])
+            else:
+                patterns.append(f"!{pattern}")
+
+        return patterns
+
     def _validate_patterns(self) -> None:
         if any(not pattern for pattern in self.exclude_patterns):
             raise ValueError("Exclude pattern cannot be empty")
@@ -57,28 +150,44 @@ class FileFilter:
         if any(not extension for extension in self.allowed_extensions):
             raise ValueError("Allowed extension cannot be empty")
 
+        if self.include_patterns is not None and any(
+            not pattern for pattern in self.include_patterns
+        ):
+            raise ValueError("Include pattern cannot be empty")
+
     def _normalize_path(self, file_path: str) -> str:
+        # git reports paths that are already normal; skip building a path
+        # object for them
+        if (
+            "//" not in file_path
+            and "/." not in file_path
+            and not file_path.startswith("./")
+            and not file_path.endswith("/")
+            and file_path not in ("", ".")
+        ):
+            return file_path
         return PurePosixPath(file_path).as_posix()
 
     def is_excluded_by_pattern(self, file_path: str) -> bool:
         normalized = self._normalize_path(file_path)
         return self._exclude_spec.match_file(normalized)
 
-    def is_allowed_extension(self, file_path: str) -> bool:
-        return any(
-            file_path.endswith(extension) for extension in self.allowed_extensions
-        )
+    def is_included_by_pattern(self, file_path: str) -> bool:
+        if self._include_spec is None:
+            return True
+        return self._include_spec.match_file(self._normalize_path(file_path))
 
-    def filter_files(self, files: list[str]) -> list[str]:
-        filtered = []
+    def is_allowed_extension(self, file_path: str) -> bool:
+        return self._extensions.matches(file_path)
 
-        for file_path in files:
-            if self.is_excluded_by_pattern(file_path):
-                continue
+    def is_retained(self, file_path: str) -> bool:
+        if self.is_excluded_by_pattern(file_path):
+            return False
 
-            if not self.is_allowed_extension(file_path):
-                continue
+        if not self.is_included_by_pattern(file_path):
+            return False
 
-            filtered.append(file_path)
+        return self.is_allowed_extension(file_path)
 
-        return filtered
+    def filter_files(self, files: list[str]) -> list[str]:
+        return [file_path for file_path in files if self.is_retained(file_path)]
@@ -1,3 +1,4 @@
+import re
 import subprocess
 from pathlib import Path
 
@@ -11,20 +12,43 @@ import tempfile
 
 logger = logging.getLogger(__name__)
 
+_ABBREVIATED_SHA = re.compile(r"^[0-9a-fA-F]{4,64}$")
+
 
 class GitRepositoryClient(RepositoryClient):
+    """
+    Keeps a local clone of one branch of a GitHub repository.
+
+    By default the clone is full. ``blob_filter`` makes it a partial clone
+    (``--filter=blob:none``) whose file contents are fetched when first
+    diffed or checked out. ``depth`` makes it shallow; ``ensure_commit``
+    deepens the history until a given commit is in it. ``sparse_patterns``
+    (see ``FileFilter.sparse_checkout_patterns``) limits the worktree to the
+    matching files; diffs between commits are unaffected.
+    """
+
+    DEEPEN_ROUNDS = 8
+
     def __init__(
         self,
         owner: str,
         repository: str,
         branch: str = "main",
         local_path: Path | None = None,
+        blob_filter: bool = False,
+        depth: int | None = None,
+        sparse_patterns: list[str] | None = None,
     ) -> None:
         if branch.startswith("-"):
             raise ValueError("Invalid git branch")
+        if depth is not None and depth < 1:
+            raise ValueError("Invalid clone depth")
         self.owner = owner
         self.repository = repository
         self.branch = branch
+        self.blob_filter = blob_filter
+        self.depth = depth
+        self.sparse_patterns = sparse_patterns
 
         self.local_path = (
             local_path
@@ -36,7 +60,7 @@ class GitRepositoryClient(RepositoryClient):
     def repository_url(self) -> str:
         return f"https://github.com/{self.owner}/{self.repository}.git"
 
-    def clone(self) -> None:
+    def clone(self, since_commit: str | None = None) -> None:
 
         logger.info(
             "Cloning repository %s/%s",
@@ -51,6 +75,9 @@ class GitRepositoryClient(RepositoryClient):
 
         self._clone_atomically()
 
+        if since_commit is not None:
+            self.ensure_commit(since_commit)
+
     def _clone_atomically(self) -> None:
         temp_path = Path(
             tempfile.mkdtemp(
@@ -59,22 +86,26 @@ class GitRepositoryClient(RepositoryClient):
             )
         )
 
+        command = ["git", "clone", "--branch", self.branch]
+        if self.blob_filter:
+            command.append("--filter=blob:none")
+        if self.depth is not None:
+            command += ["--depth", str(self.depth)]
+        if self.sparse_patterns is not None:
+            command.append("--no-checkout")
+
         try:
             subprocess.run(
-                [
-                    "git",
-                    "clone",
-                    "--branch",
-                    self.branch,
-                    self.repository_url,
-                    str(temp_path),
-                ],
+                [*command, self.repository_url, str(temp_path)],
                 check=True,
                 capture_output=True,
                 text=True,
                 timeout=300,
             )
 
+            if self.sparse_patterns is not None:
+                self._sparse_checkout(temp_path)
+
             if not self.is_valid_repository(temp_path):
                 raise RuntimeError("Temporary clone failed integrity verification")
 
@@ -97,6 +128,38 @@ class GitRepositoryClient(RepositoryClient):
             if temp_path.exists():
                 shutil.rmtree(temp_path, ignore_errors=True)
 
+    def _sparse_checkout(self, repository_path: Path) -> None:
+        subprocess.run(
+            [
+                "git",
+                "-C",
+                str(repository_path),
+                "sparse-checkout",
+                "set",
+                "--no-cone",
+                "--stdin",
+            ],
+            input="\n".join(self.sparse_patterns) + "\n",
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
+        subprocess.run(
+            [
+                "git",
+                "-C",
+                str(repository_path),
+                "checkout",
+                self.branch,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
     def fetch(self) -> None:
         logger.info(
             "Fetching repository %s/%s",
@@ -194,10 +257,119 @@ class GitRepositoryClient(RepositoryClient):
         )
 
         with repository_lock(self.local_path):
-            if self.verify_repository_integrity():
-                self.fetch()
-            else:
-                self.clone()
+            self.refresh()
+
+    def refresh(self, since_commit: str | None = None) -> None:
+        """
+        Fetch the cached repository, or clone it if the cache is missing or
+        broken. The caller must hold ``repository_lock`` for the cache path.
+
+        A shallow clone is deepened to include ``since_commit``.
+        """
+        if self.verify_repository_integrity():
+            self.fetch()
+            if since_commit is not None:
+                self.ensure_commit(since_commit)
+        else:
+            self.clone(since_commit)
+
+    def is_shallow(self) -> bool:
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(self.local_path),
+                "rev-parse",
+                "--is-shallow-repository",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        return result.stdout.strip() == "true"
+
+    def _has_commit_in_history(self, commit: str) -> bool:
+        # Walks the local history only: resolving a missing commit by hash in
+        # a partial clone would fetch that one commit from the remote,
+        # leaving it disconnected from the shallow history.
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(self.local_path),
+                "rev-list",
+                "--all",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        prefix = commit.lower()
+        return any(sha.startswith(prefix) for sha in result.stdout.split())
+
+    def _fetch_history(self, option: str) -> None:
+        try:
+            subprocess.run(
+                [
+                    "git",
+                    "-C",
+                    str(self.local_path),
+                    "fetch",
+                    option,
+                    "origin",
+                    self.branch,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=300,
+            )
+        except subprocess.CalledProcessError as exc:
+            logger.error(
+                "Failed to deepen repository %s/%s: %s",
+                self.owner,
+                self.repository,
+                exc.stderr,
+            )
+            raise
+
+    def ensure_commit(self, commit: str) -> None:
+        """
+        Deepen a shallow clone until ``commit`` is in its history.
+
+        Each round fetches twice as many more commits as the last, starting
+        from ``depth``; after ``DEEPEN_ROUNDS`` the rest of the history is
+        fetched. References and full clones are left alone.
+        """
+        if not _ABBREVIATED_SHA.fullmatch(commit) or not self.is_shallow():
+            return
+
+        step = self.depth or 1
+        for _ in range(self.DEEPEN_ROUNDS):
+            if self._has_commit_in_history(commit):
+                return
+            logger.info(
+                "Deepening %s/%s by %s commits to reach %s",
+                self.owner,
+                self.repository,
+                step,
+                commit,
+            )
+            self._fetch_history(f"--deepen={step}")
+            if not self.is_shallow():
+                return
+            step *= 2
+
+        if not self._has_commit_in_history(commit):
+            logger.info(
+                "Unshallowing %s/%s to reach %s",
+                self.owner,
+                self.repository,
+                commit,
+            )
+            self._fetch_history("--unshallow")
 
     def get_current_commit_sha(self) -> str:
         try:
@@ -0,0 +1,267 @@
+import contextlib
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from .checkpoint_store import CheckpointStore
+from .diff_pipeline import DiffPipeline
+from .diff_retriever import DiffRetriever
+from .file_filter import FileFilter
+from .git_repository_client import GitRepositoryClient
+from .models import DiffBlock, RepositoryCheckpoint, RepositoryHarvestResult
+from .repository_lock import repository_lock
+from .schemas import RepositoryConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PER_HOST = 2
+
+
+class _HostLimiter:
+    """
+    Bounds the git network operations running against each host, and
+    optionally spaces out their starts by ``min_interval`` seconds.
+    """
+
+    def __init__(self, per_host: int, min_interval: float = 0.0) -> None:
+        self.per_host = max(1, per_host)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def slot(self, host: str) -> Iterator[None]:
+        with self._lock:
+            semaphore = self._slots.setdefault(
+                host, threading.BoundedSemaphore(self.per_host)
+            )
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class HarvestOrchestrator:
+    """
+    Synchronizes and diffs the configured repositories concurrently.
+
+    Each enabled repository runs on a worker thread, up to ``max_workers`` at
+    a time: it takes the repository's ``repository_lock``, fetches (or
+    clones) it while holding one of its host's ``per_host`` slots, then
+    streams the diff since its checkpoint through a ``DiffPipeline`` filtered
+    by its ``paths`` rules, handing each block to ``sink``. Diffing does not
+    hold a host slot, though a shallow or partial clone (``clone`` in
+    repos.yaml) may fetch history or file contents while it runs.
+
+    Checkpoints are loaded up front and saved on the calling thread as each
+    repository finishes, so the database session is never shared between
+    threads. A repository that fails keeps its checkpoint and does not stop
+    the others. A repository without a checkpoint records its current head
+    as the baseline for the next run. Without a ``sink`` the run is a dry run:
+    baselines are still recorded, but an existing checkpoint does not move
+    since nothing consumed the diffs.
+    """
+
+    def __init__(
+        self,
+        repositories: Iterable[RepositoryConfig],
+        checkpoint_store: CheckpointStore | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_host: int = DEFAULT_PER_HOST,
+        min_host_interval: float = 0.0,
+        sink: Callable[[RepositoryConfig, DiffBlock], None] | None = None,
+        client_factory: Callable[[RepositoryConfig], GitRepositoryClient] | None = None,
+    ) -> None:
+        self.repositories = [repository for repository in repositories]
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.max_workers = max(1, max_workers)
+        self.sink = sink
+        self.client_factory = client_factory or self._default_client
+        self._hosts = _HostLimiter(per_host, min_host_interval)
+
+    @staticmethod
+    def _default_client(config: RepositoryConfig) -> GitRepositoryClient:
+        sparse_patterns = None
+        if config.clone.sparse:
+            sparse_patterns = FileFilter.for_paths(
+                config.paths.include, config.paths.exclude
+            ).sparse_checkout_patterns()
+
+        return GitRepositoryClient(
+            owner=config.owner,
+            repository=config.repo,
+            branch=config.branch,
+            blob_filter=config.clone.blob_filter,
+            depth=config.clone.depth,
+            sparse_patterns=sparse_patterns,
+        )
+
+    def run(self) -> list[RepositoryHarvestResult]:
+        """
+        Harvest every enabled repository; results are in configuration order.
+        """
+        repositories = [config for config in self.repositories if config.enabled]
+        checkpoints = {
+            config.id: self.checkpoint_store.load(config.id) for config in repositories
+        }
+        results: dict[str, RepositoryHarvestResult] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="harvest"
+        ) as pool:
+            futures = {
+                pool.submit(
+                    self._harvest,
+                    config,
+                    (
+                        checkpoints[config.id].last_processed_commit
+                        if checkpoints[config.id] is not None
+                        else None
+                    ),
+                ): config
+                for config in repositories
+            }
+            for future in as_completed(futures):
+                config = futures[future]
+                result = future.result()
+                if result.error is None and (
+                    self.sink is not None or result.base_commit is None
+                ):
+                    self._save_checkpoint(config, result)
+                results[config.id] = result
+                logger.info(
+                    "Harvested %s: %s blocks in %.2fs%s",
+                    config.id,
+                    result.blocks,
+                    result.wait_seconds + result.sync_seconds + result.diff_seconds,
+                    f" (failed: {result.error})" if result.error else "",
+                )
+
+        ordered = [results[config.id] for config in repositories]
+        logger.info(
+            "Harvested %s repositories in %.2fs\n%s",
+            len(ordered),
+            time.perf_counter() - started,
+            format_timing_table(ordered),
+        )
+        return ordered
+
+    def _harvest(
+        self, config: RepositoryConfig, last_commit: str | None
+    ) -> RepositoryHarvestResult:
+        result = RepositoryHarvestResult(
+            repository_id=config.id, base_commit=last_commit
+        )
+        started = time.perf_counter()
+
+        try:
+            client = self.client_factory(config)
+            host = urlparse(client.repository_url).netloc or "local"
+
+            with repository_lock(client.get_local_path()):
+                with self._hosts.slot(host):
+                    slotted = time.perf_counter()
+                    result.wait_seconds = slotted - started
+                    client.refresh(last_commit)
+                synced = time.perf_counter()
+                result.sync_seconds = synced - slotted
+
+                head = client.get_current_commit_sha()
+                result.head_commit = head
+
+                if last_commit is not None and last_commit != head:
+                    pipeline = DiffPipeline(
+                        DiffRetriever(client),
+                        FileFilter.for_paths(
+                            config.paths.include, config.paths.exclude
+                        ),
+                    )
+                    for block in pipeline.iter_blocks(
+                        last_commit,
+                        head,
+                        repository=f"{config.owner}/{config.repo}",
+                        commit_sha=head,
+                    ):
+                        result.blocks += 1
+                        result.added_lines += len(block.added_lines)
+                        if self.sink is not None:
+                            self.sink(config, block)
+                result.diff_seconds = time.perf_counter() - synced
+
+        except Exception as exc:
+            logger.exception("Failed to harvest repository %s", config.id)
+            result.error = f"{type(exc).__name__}: {exc}"
+
+        return result
+
+    def _save_checkpoint(
+        self, config: RepositoryConfig, result: RepositoryHarvestResult
+    ) -> None:
+        if result.head_commit is None or result.head_commit == result.base_commit:
+            return
+
+        try:
+            self.checkpoint_store.save(
+                RepositoryCheckpoint(
+                    repository_id=config.id,
+                    last_processed_commit=result.head_commit,
+                    updated_at=datetime.now(timezone.utc),
+                    provider=config.type,
+                    owner=config.owner,
+                    repository=config.repo,
+                    branch=config.branch,
+                )
+            )
+        except Exception as exc:
+            logger.exception("Failed to save checkpoint for %s", config.id)
+            result.error = f"{type(exc).__name__}: {exc}"
+
+
+def format_timing_table(results: list[RepositoryHarvestResult]) -> str:
+    """
+    Render one row per repository: status, seconds spent waiting for the
+    lock and a host slot, syncing and diffing, and the blocks and added
+    lines harvested.
+    """
+    header = (
+        "repository",
+        "status",
+        "wait",
+        "sync",
+        "diff",
+        "total",
+        "blocks",
+        "lines",
+    )
+    rows = [
+        (
+            result.repository_id,
+            "failed" if result.error else "ok",
+            f"{result.wait_seconds:.2f}",
+            f"{result.sync_seconds:.2f}",
+            f"{result.diff_seconds:.2f}",
+            f"{result.wait_seconds + result.sync_seconds + result.diff_seconds:.2f}",
+            str(result.blocks),
+            str(result.added_lines),
+        )
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+
+    def line(row: tuple[str, ...]) -> str:
+        cells = [row[0].ljust(widths[0]), row[1].ljust(widths[1])]
+        cells += [cell.rjust(width) for cell, width in zip(row[2:], widths[2:])]
+        return "  ".join(cells).rstrip()
+
+    return "\n".join(line(row) for row in [header, *rows])
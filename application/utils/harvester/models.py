@@ -39,3 +39,20 @@ class DiffBlock:
     repository: str
     commit_sha: str
     committed_at: datetime | None = None
+
+
+@dataclass(slots=True)
+class RepositoryHarvestResult:
+    """
+    Outcome and timings of one repository in a harvest run.
+    """
+
+    repository_id: str
+    base_commit: str | None = None
+    head_commit: str | None = None
+    blocks: int = 0
+    added_lines: int = 0
+    wait_seconds: float = 0.0
+    sync_seconds: float = 0.0
+    diff_seconds: float = 0.0
+    error: str | None = None
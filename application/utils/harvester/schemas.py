@@ -54,6 +54,25 @@ class PollingConfig(BaseModel):
     interval_minutes: int = Field(..., gt=0, description="polling interval in minutes")
 
 
+# this one defines how much of the repository the local cache holds
+class CloneConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    blob_filter: bool = Field(
+        default=False,
+        description="partial clone without file contents (--filter=blob:none)",
+    )
+    depth: int | None = Field(
+        default=None,
+        gt=0,
+        description="shallow clone depth, deepened to reach the checkpoint commit",
+    )
+    sparse: bool = Field(
+        default=False,
+        description="check out only the files the path rules retain",
+    )
+
+
 # top level repository ingestion configuration
 class RepositoryConfig(BaseModel):
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
@@ -91,6 +110,7 @@ class RepositoryConfig(BaseModel):
     paths: PathRules
     chunking: ChunkingConfig
     polling: PollingConfig
+    clone: CloneConfig = Field(default_factory=CloneConfig)
 
 
 # Root configuration object loaded from repos.yaml.
@@ -5,12 +5,12 @@ Phase 3 (v3) apply engine for staged change sets.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from application import sqla
-from application.database import db
+from application.database import db, text_search_index
 from application.defs import cre_defs as defs
-from application.utils import import_diff
+from application.utils import dataset_generation, ga_invalidation, import_diff
 
 
 class ApplyError(Exception):
@@ -30,6 +30,9 @@ class ApplyResult:
     applied_ops: int
     skipped_ops: int
     already_applied: bool = False
+    ga_invalidation_report: Optional[ga_invalidation.GapAnalysisInvalidationReport] = (
+        None
+    )
 
 
 def _doc_from_node(n: db.Node) -> Dict[str, Any]:
@@ -91,6 +94,9 @@ def apply_changeset(
 
     ops = import_diff.change_set_from_json(cs.changeset_json or "[]")
     touched: List[Tuple[str, str, str]] = []
+    applied_change_ops: List[import_diff.ChangeSetOp] = []
+    reindex_nodes: List[db.Node] = []
+    removed_node_ids: List[str] = []
     applied = 0
     skipped = 0
 
@@ -110,21 +116,22 @@ def apply_changeset(
                         f"Add conflict for key={key}: node already exists"
                     )
                 if not dry_run:
-                    sqla.session.add(
-                        db.Node(
-                            name=(incoming.get("name") or key[0]),
-                            section=(incoming.get("section") or ""),
-                            subsection=(incoming.get("subsection") or ""),
-                            section_id=(incoming.get("sectionID") or ""),
-                            description=(incoming.get("description") or ""),
-                            ntype=defs.Credoctypes.Standard.value,
-                            tags="",
-                            version="",
-                            link="",
-                            metadata_json={},
-                        )
+                    added = db.Node(
+                        name=(incoming.get("name") or key[0]),
+                        section=(incoming.get("section") or ""),
+                        subsection=(incoming.get("subsection") or ""),
+                        section_id=(incoming.get("sectionID") or ""),
+                        description=(incoming.get("description") or ""),
+                        ntype=defs.Credoctypes.Standard.value,
+                        tags="",
+                        version="",
+                        link="",
+                        metadata_json={},
                     )
+                    sqla.session.add(added)
+                    reindex_nodes.append(added)
                 applied += 1
+                applied_change_ops.append(op)
 
             elif isinstance(op, import_diff.RemoveControl):
                 expected = op.document or {}
@@ -133,8 +140,10 @@ def apply_changeset(
                 if not _same_doc(_doc_from_node(current), expected):
                     raise ApplyConflict(f"Remove conflict for key={key}: node changed")
                 if not dry_run:
+                    removed_node_ids.append(current.id)
                     sqla.session.delete(current)
                 applied += 1
+                applied_change_ops.append(op)
 
             elif isinstance(op, import_diff.ModifyControl):
                 before = op.before or {}
@@ -153,7 +162,21 @@ def apply_changeset(
                     current.section_id = after.get("sectionID") or ""
                     current.description = after.get("description") or ""
                     sqla.session.add(current)
+                    reindex_nodes.append(current)
                 applied += 1
+                applied_change_ops.append(op)
+
+        if reindex_nodes or removed_node_ids:
+            sqla.session.flush()
+            text_search_index.remove(sqla.session, removed_node_ids)
+            for node in reindex_nodes:
+                text_search_index.index_node(sqla.session, node)
+
+        # Cached GA rows are invalidated in the same transaction as the apply so
+        # a failed apply never leaves the cache out of step with the graph.
+        ga_report = ga_invalidation.invalidate_gap_analysis_for_change_set(
+            sqla.session, applied_change_ops, dry_run=dry_run, commit=False
+        )
 
         if dry_run:
             sqla.session.rollback()
@@ -164,11 +187,13 @@ def apply_changeset(
                 touched_keys=touched,
                 applied_ops=applied,
                 skipped_ops=skipped,
+                ga_invalidation_report=ga_report,
             )
 
         cs.staging_status = "applied"
         cs.apply_error = None
         sqla.session.add(cs)
+        dataset_generation.bump(commit=False)
         sqla.session.commit()
         if run_post_apply_effects and db_connection_str and touched:
             from application.utils import import_post_apply
@@ -184,6 +209,7 @@ def apply_changeset(
             touched_keys=touched,
             applied_ops=applied,
             skipped_ops=skipped,
+            ga_invalidation_report=ga_report,
         )
     except Exception as ex:
         sqla.session.rollback()
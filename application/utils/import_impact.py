@@ -7,7 +7,7 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from application.database import db
-from application.utils import import_diff
+from application.utils import ga_invalidation, import_diff
 
 
 def impact_summary_for_run(
@@ -41,6 +41,11 @@ def impact_summary_from_changeset_json(
         "operation_count": len(ops),
         "impacted_standard_names": names,
         "impacted_cre_external_ids": cre_ids,
+        # Dry run: which cached GA pairs applying this change set would
+        # invalidate, patch in place, or keep.
+        "gap_analysis": ga_invalidation.invalidate_gap_analysis_for_change_set(
+            collection.session, ops, dry_run=True
+        ).to_dict(),
     }
     if run_id is not None:
         out["run_id"] = run_id
@@ -10,12 +10,15 @@ Step 9 contract (docs/importing-next-steps.md):
 from __future__ import annotations
 
 import logging
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from application.database import db as db_mod
 from application.prompt_client import prompt_client
 from application.utils.external_project_parsers import base_parser_defs
 
+if TYPE_CHECKING:
+    from application.utils import import_diff
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,7 +73,7 @@ def _phase2_snapshots_and_staging(
     parse_result: base_parser_defs.ParseResult,
     import_run_id: str,
     import_source: str,
-) -> None:
+) -> List["import_diff.ChangeSetOp"]:
     from application.defs import cre_defs as defs
     from application.database import db as db_api
     from application.utils import import_diff
@@ -133,6 +136,7 @@ def _phase2_snapshots_and_staging(
         has_conflicts=staging_has_conflicts,
         staging_status="pending_review",
     )
+    return change_ops
 
 
 def stage_parse_result_only(
@@ -174,21 +178,25 @@ def apply_parse_result(
     Apply a ParseResult to the DB.
 
     - CREs first (so standard links can resolve)
-    - Then each resource group via cre_main.register_standard
+    - Then each resource group via cre_main.register_standard, through the
+      batched bulk writer when CRE_BULK_IMPORT is set
     """
     import os
     import time
+    from application import feature_flags
     from application.cmd import cre_main
     from application.defs import cre_defs as defs
     from alive_progress import alive_bar
     from rq import Queue
     from application.utils import db_backend
-    from application.utils import gap_analysis, redis
+    from application.utils import dataset_generation
+    from application.utils import ga_invalidation, gap_analysis, redis
     from application.utils import telemetry
 
     start_time = time.time()
     status = "success"
     error_msg = None
+    registered = False
 
     try:
         if not parse_result or not parse_result.results:
@@ -197,8 +205,9 @@ def apply_parse_result(
         if validate_classification_tags:
             base_parser_defs.validate_classification_tags(parse_result.results)
 
+        change_ops = []
         if import_run_id and import_source:
-            _phase2_snapshots_and_staging(
+            change_ops = _phase2_snapshots_and_staging(
                 collection, parse_result, import_run_id, import_source
             )
 
@@ -222,17 +231,24 @@ def apply_parse_result(
                 generate_embeddings=parse_result.calculate_embeddings,
                 calculate_gap_analysis=False,
                 db_connection_str=db_connection_str,
+                bulk=feature_flags.is_bulk_import_enabled(),
+            )
+
+        registered = True
+
+        if change_ops:
+            # Only the GA pairs this import actually affects get recomputed below;
+            # run_gap_pair returns the surviving cached rows without traversal.
+            ga_invalidation.invalidate_gap_analysis_for_change_set(
+                collection.session, change_ops
             )
 
         if (
             parse_result.calculate_gap_analysis
             and os.environ.get("CRE_NO_CALCULATE_GAP_ANALYSIS") != "1"
         ):
-            caps = db_backend.detect_backend(db_connection_str)
-            if not caps.is_postgres:
-                raise RuntimeError(
-                    f"Pair-level GA scheduling requires Postgres; detected backend={caps.backend}"
-                )
+            # the in-memory GA engine rebuilds its graph on a generation move
+            dataset_generation.bump()
             imported_standard_names = []
             for k in parse_result.results.keys():
                 if k == cre_key:
@@ -247,6 +263,17 @@ def apply_parse_result(
                         "Skipping GA pair scheduling for resource group %s (not GA-eligible)",
                         k,
                     )
+            if feature_flags.is_batched_gap_analysis_enabled():
+                for importing_name in imported_standard_names:
+                    cre_main.compute_gap_analysis_importing_vs_peers_batched(
+                        collection=collection, importing_name=importing_name
+                    )
+                return
+            caps = db_backend.detect_backend(db_connection_str)
+            if not caps.is_postgres:
+                raise RuntimeError(
+                    f"Pair-level GA scheduling requires Postgres; detected backend={caps.backend}"
+                )
             if imported_standard_names:
                 cre_main.populate_neo4j_db(db_connection_str)
             conn = redis.connect()
@@ -323,6 +350,10 @@ def apply_parse_result(
         error_msg = str(e)
         raise e
     finally:
+        if registered:
+            # Bumped again once the import (and its GA) is done, so read
+            # endpoints revalidate against the GA results too.
+            dataset_generation.bump()
         if import_run_id and import_source:
             telemetry.emit_import_event(
                 import_run_id=import_run_id,
@@ -361,11 +392,13 @@ def apply_parse_result_with_rq(
     from application.cmd import cre_main
     from application.defs import cre_defs as defs
     from application.utils import db_backend
+    from application.utils import dataset_generation
     from application.utils import gap_analysis, redis, telemetry
 
     start_time = time.time()
     status = "success"
     error_msg = None
+    registered = False
     op_counts = {
         "ga_pairs_planned": 0,
         "ga_pairs_enqueued": 0,
@@ -408,6 +441,7 @@ def apply_parse_result_with_rq(
         cres = docs.pop(cre_key, []) or []
 
         logger.info("Importing %s CREs", len(cres))
+        registered = True
         with alive_bar(len(cres)) as bar:
             for cre in cres:
                 cre_main.register_cre(cre=cre, collection=collection)
@@ -522,6 +556,8 @@ def apply_parse_result_with_rq(
         logger.info("Imported %s groups in %.2fs", total, time.perf_counter() - t0)
 
         if use_pair_ga_scheduler and imported_standard_names:
+            # the in-memory GA engine rebuilds its graph on a generation move
+            dataset_generation.bump()
             logger.info(
                 "Scheduling GA pair jobs in dedicated queue for %s imported standards (planned_pairs=%s)",
                 len(imported_standard_names),
@@ -632,6 +668,8 @@ def apply_parse_result_with_rq(
         error_msg = str(e)
         raise e
     finally:
+        if registered:
+            dataset_generation.bump()
         if import_run_id and import_source:
             telemetry.emit_import_event(
                 import_run_id=import_run_id,
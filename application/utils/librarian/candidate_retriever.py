@@ -15,15 +15,19 @@ The retriever is a thin, dependency-injected seam over two collaborators:
     and hermetically testable (mirrors W2's resolver taking an injected
     known-id set).
   - a ``CandidatePool`` — the ``{cre_id -> vector}`` hub for every CRE node.
-    Prod loads ``db.get_embeddings_by_doc_type(CRE)``; the pool is prevalidated
-    to one common width so the dim gate below is meaningful.
+    Prod loads ``embedding_store.embeddings_for(db, CRE)`` — the memory-mapped
+    float32 matrix shared by every worker, or ``db.get_embeddings_by_doc_type``
+    where there is no store; the pool is prevalidated to one common width so
+    the dim gate below is meaningful.
 
 Two interchangeable backends behind one ``retrieve()`` seam, selected by
 ``CRE_LIBRARIAN_RETRIEVER_BACKEND``:
 
   - ``in_memory`` — sklearn cosine over an in-RAM matrix. Works on SQLite
     (CI / harness) by reading stored ``embedding_vec`` Text literals into a
-    hub matrix. Does not use the pgvector ``<=>`` operator.
+    hub matrix. Does not use the pgvector ``<=>`` operator. The top-K is
+    shortlisted through ``application.utils.ann_index`` (exact below
+    ``CRE_ANN_MIN_SIZE`` vectors, IVF/HNSW above) and rescored exactly.
   - ``pgvector`` — pushes the cosine into Postgres via the ``<=>`` operator
     over an ``embedding_vec vector(dim)`` column; never loads the hub into
     RAM. Requires the ``vector`` extension + that column (Alembic
@@ -43,12 +47,13 @@ the fixed-width ``vector(dim)`` column.)
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
 from application.database.pgvector_utils import to_pgvector_literal
+from application.utils import ann_index, embedding_store
 from application.utils.librarian.schemas import CreCandidate, RetrievalAudit
 
 # A function that turns one piece of text into a single dense vector.
@@ -58,6 +63,7 @@ EmbedFn = Callable[[str], Sequence[float]]
 # Bumped when the matching algorithm changes so a stored proposal is traceable
 # to the code that produced it.
 RETRIEVER_NAME = "in-memory-cosine/0.1.0"
+ANN_RETRIEVER_NAME = "in-memory-ann-cosine/0.1.0"
 PGVECTOR_RETRIEVER_NAME = "pgvector-cosine/0.1.0"
 
 
@@ -86,22 +92,34 @@ class CandidatePool:
     """An immutable ``{cre_id -> vector}`` hub, prevalidated to one width.
 
     ``matrix`` is ``(n_cre, dim)`` row-aligned with ``cre_ids`` so a single
-    cosine call scores the whole hub at once.
+    cosine call scores the whole hub at once. ``normalized`` marks an
+    L2-normalised float32 matrix (the mmap store) the ANN index can use as-is.
     """
 
     cre_ids: Tuple[str, ...]
     matrix: np.ndarray
     dim: int
+    normalized: bool = False
 
     @classmethod
-    def from_mapping(cls, embeddings: Mapping[str, Sequence[float]]) -> "CandidatePool":
+    def from_mapping(
+        cls, embeddings: Mapping[str, Union[Sequence[float], np.ndarray]]
+    ) -> "CandidatePool":
         """Build a pool from ``db.get_embeddings_by_doc_type``-shaped data.
 
         Rejects an empty hub and any ragged vector — both are silent-failure
-        traps if they reach the cosine step.
+        traps if they reach the cosine step. An ``embedding_store``
+        ``EmbeddingMatrix`` is already one width and is wrapped without a copy.
         """
         if not embeddings:
             raise EmptyPoolError("candidate pool is empty; no CRE vectors to search")
+        if isinstance(embeddings, embedding_store.EmbeddingMatrix):
+            return cls(
+                cre_ids=embeddings.ids,
+                matrix=embeddings.vectors,
+                dim=embeddings.dim,
+                normalized=True,
+            )
         cre_ids = tuple(embeddings.keys())
         rows = [list(embeddings[cre_id]) for cre_id in cre_ids]
         widths = {len(r) for r in rows}
@@ -141,6 +159,10 @@ class CandidateRetriever:
         self._top_k = top_k
         self._threshold = threshold
         self._cre_names = dict(cre_names or {})
+        self._index = ann_index.build_index(
+            pool.cre_ids, pool.matrix, normalized=pool.normalized
+        )
+        self._row_of = {cre_id: i for i, cre_id in enumerate(pool.cre_ids)}
 
     def retrieve(self, text: str) -> RetrievalAudit:
         """Return the top-K CRE candidates for ``text`` as a RetrievalAudit.
@@ -155,24 +177,30 @@ class CandidateRetriever:
                 f"{self._pool.dim}; check the embedding model matches the hub"
             )
 
-        scores = cosine_similarity(query.reshape(1, -1), self._pool.matrix)[0]
-        # Top-K by descending score. argsort is ascending, so take the tail
-        # and reverse; cap at pool size when the hub is smaller than K.
+        # Shortlist through the ANN index (capped at pool size when the hub is
+        # smaller than K), then rescore the shortlist with the exact cosine.
         k = min(self._top_k, len(self._pool.cre_ids))
+        rows = np.array(
+            sorted(self._row_of[cre_id] for cre_id, _ in self._index.search(query, k))
+        )
+        scores = cosine_similarity(query.reshape(1, -1), self._pool.matrix[rows])[0]
         # Stable descending sort so tied cosine scores keep hub (index) order —
         # deterministic across runs. argsort(-scores) descends; kind="stable".
-        top_idx = np.argsort(-scores, kind="stable")[:k]
+        top_idx = rows[np.argsort(-scores, kind="stable")]
+        score_of = dict(zip(rows.tolist(), scores.tolist()))
 
         candidates: List[CreCandidate] = [
             CreCandidate(
                 cre_id=self._pool.cre_ids[i],
                 cre_name=self._cre_names.get(self._pool.cre_ids[i]),
-                score_vector=float(scores[i]),
+                score_vector=float(score_of[i]),
             )
             for i in top_idx
         ]
         return RetrievalAudit(
-            retriever=RETRIEVER_NAME,
+            retriever=(
+                RETRIEVER_NAME if self._index.backend == "exact" else ANN_RETRIEVER_NAME
+            ),
             candidates=candidates,
             reranked=[],
             threshold=self._threshold,
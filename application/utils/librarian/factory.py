@@ -83,6 +83,7 @@ def build_components(
     retrieval path and producing silently different rankings.
     """
     from application.defs import cre_defs as defs
+    from application.utils import embedding_store
     from application.utils.librarian.candidate_retriever import (
         CandidatePool,
         RetrieverBackend,
@@ -109,7 +110,9 @@ def build_components(
 
         embed_fn = prompt_client.PromptHandler(database=database).get_text_embeddings
 
-    cre_embeddings = database.get_embeddings_by_doc_type(defs.Credoctypes.CRE.value)
+    cre_embeddings = embedding_store.embeddings_for(
+        database, defs.Credoctypes.CRE.value
+    )
     # in_memory holds the hub matrix in RAM; pgvector ranks in the DB over the
     # embedding_vec column and needs no pool. Both satisfy the same retrieve().
     pool = (
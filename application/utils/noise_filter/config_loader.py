@@ -9,7 +9,8 @@ does not depend on the Flask app config object.
 Retry tuning is intentionally NOT a Module B concern: the Stage 2 classifier
 reuses the upstream CRE_LLM_MAX_RETRIES / CRE_LLM_RETRY_SLEEP_SECONDS vars
 (read in llm_classifier.py) so noise filtering and the chatbot share one
-retry policy.
+retry policy. Dispatch pacing is: how many batches are in flight at once,
+and the provider's per-minute request/token limits the classifier keeps to.
 """
 
 from __future__ import annotations
@@ -24,6 +25,7 @@ DEFAULT_LLM_MODEL = "gemini/gemini-2.5-flash-lite"
 DEFAULT_BATCH_SIZE = 10
 DEFAULT_MAX_CHARS = 1500
 DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+DEFAULT_CONCURRENCY = 4
 
 
 @dataclass(frozen=True)
@@ -34,6 +36,9 @@ class NoiseFilterConfig:
     batch_size: int = DEFAULT_BATCH_SIZE
     max_chars: int = DEFAULT_MAX_CHARS
     confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD
+    concurrency: int = DEFAULT_CONCURRENCY  # batches in flight at once
+    rpm: int = 0  # provider requests/minute limit; 0 = unlimited
+    tpm: int = 0  # provider tokens/minute limit; 0 = unlimited
 
     def __post_init__(self) -> None:
         """Fail fast on invalid settings, regardless of construction path.
@@ -51,6 +56,13 @@ class NoiseFilterConfig:
                 f"confidence_threshold must be in [0.0, 1.0], got "
                 f"{self.confidence_threshold}"
             )
+        if self.concurrency < 1:
+            raise ValueError(f"concurrency must be >= 1, got {self.concurrency}")
+        if self.rpm < 0 or self.tpm < 0:
+            raise ValueError(
+                f"rpm and tpm must be >= 0 (0 = unlimited), got "
+                f"rpm={self.rpm} tpm={self.tpm}"
+            )
 
 
 def load_config() -> NoiseFilterConfig:
@@ -69,11 +81,17 @@ def load_config() -> NoiseFilterConfig:
                 str(DEFAULT_CONFIDENCE_THRESHOLD),
             )
         ),
+        concurrency=int(
+            os.environ.get("CRE_NOISE_FILTER_CONCURRENCY", str(DEFAULT_CONCURRENCY))
+        ),
+        rpm=int(os.environ.get("CRE_NOISE_FILTER_RPM", "0")),
+        tpm=int(os.environ.get("CRE_NOISE_FILTER_TPM", "0")),
     )
 
 
 __all__ = [
     "DEFAULT_BATCH_SIZE",
+    "DEFAULT_CONCURRENCY",
     "DEFAULT_CONFIDENCE_THRESHOLD",
     "DEFAULT_LLM_MODEL",
     "DEFAULT_MAX_CHARS",
@@ -10,6 +10,13 @@ vars, so noise filtering and the chatbot share one retry policy.
 The classifier uses a dedicated cheap model (config.llm_model, default
 gemini/gemini-2.5-flash-lite) and never falls back to CRE_LLM_CHAT_MODEL:
 Module B is the cheap gate and must stay decoupled from the chatbot's model.
+
+Batches are dispatched config.concurrency at a time from a thread pool,
+paced by a RateLimiter over the provider's RPM/TPM limits. A rate-limited
+call backs off exponentially from CRE_LLM_RETRY_SLEEP_SECONDS, with jitter,
+or for as long as the provider's Retry-After asks, and the backoff holds
+back every in-flight batch. Verdicts still come back in input order, and
+`stats` counts the calls, retries and throughput of the last run.
 """
 
 from __future__ import annotations
@@ -17,13 +24,21 @@ from __future__ import annotations
 import json
 import logging
 import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Any, Iterator
 
 from pydantic import ValidationError
 
-from application.prompt_client.llm_error_utils import is_rate_limit_error
+from application.prompt_client.llm_error_utils import (
+    is_rate_limit_error,
+    retry_after_seconds,
+)
 from application.utils.noise_filter.config_loader import NoiseFilterConfig
+from application.utils.noise_filter.rate_limiter import RateLimiter
 from application.utils.noise_filter.prompts import (
     SYSTEM_PROMPT_WITH_EXAMPLES,
     build_user_prompt,
@@ -63,6 +78,35 @@ CLASSIFY_RESPONSE_SCHEMA = {
 
 _TRUNCATION_NOTE = " …[truncated]"
 
+# Longest single backoff, whatever the attempt number or Retry-After says.
+MAX_BACKOFF_SECONDS = 120.0
+# Rough token budget per call for the TPM limit: ~4 characters per prompt
+# token, plus room for each record's verdict in the response.
+_CHARS_PER_TOKEN = 4
+_RESPONSE_TOKENS_PER_RECORD = 60
+
+
+@dataclass
+class DispatchStats:
+    """LLM traffic of one classify_batch run."""
+
+    records: int = 0
+    batches: int = 0
+    calls: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+    throttled_seconds: float = 0.0  # waiting on RPM/TPM budgets and backoff
+    elapsed_seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.records / self.elapsed_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "records_per_second": self.records_per_second}
+
 
 def _uncertain(reason: str) -> ClassifyResult:
     """Build the fallback verdict used when the LLM output can't be trusted."""
@@ -75,6 +119,12 @@ def _batches(seq: list[Any], size: int) -> Iterator[list[Any]]:
         yield seq[i : i + size]
 
 
+def _estimate_tokens(messages: list[dict[str, Any]], records: int) -> int:
+    """Rough prompt + response token count of one classification call."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // _CHARS_PER_TOKEN + _RESPONSE_TOKENS_PER_RECORD * records
+
+
 def _extract_text(resp: Any) -> str:
     """Pull message content from a LiteLLM response (object or dict shaped)."""
     try:
@@ -139,16 +189,32 @@ class LLMClassifier:
         self._retry_sleep_seconds = int(
             os.environ.get("CRE_LLM_RETRY_SLEEP_SECONDS", "15")
         )
+        self._limiter = RateLimiter(rpm=config.rpm, tpm=config.tpm)
+        self._stats_lock = threading.Lock()
+        self.stats = DispatchStats()
 
     def classify_batch(self, records: list[ChangeRecord]) -> list[ClassifyResult]:
         """Classify records, one verdict per record in input order.
 
-        Splits into config.batch_size groups; each group is one LLM call.
+        Splits into config.batch_size groups; each group is one LLM call, with
+        up to config.concurrency calls in flight.
         """
-        verdicts: list[ClassifyResult] = []
-        for batch in _batches(records, self.config.batch_size):
-            verdicts.extend(self._classify_one_batch(batch))
-        return verdicts
+        batches = list(_batches(records, self.config.batch_size))
+        self.stats = DispatchStats(records=len(records), batches=len(batches))
+        started = time.perf_counter()
+        workers = min(self.config.concurrency, len(batches))
+        if workers <= 1:
+            results = [self._classify_one_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="noise-filter-llm"
+            ) as pool:
+                # map() yields in submission order, whatever order calls finish in
+                results = list(pool.map(self._classify_one_batch, batches))
+        self.stats.elapsed_seconds = time.perf_counter() - started
+        if batches:
+            logger.info("LLM classification: %s", self.stats.to_dict())
+        return [verdict for result in results for verdict in result]
 
     # --- internals --------------------------------------------------------
 
@@ -165,17 +231,23 @@ class LLMClassifier:
             {"role": "user", "content": build_user_prompt(items)},
         ]
         try:
-            text = self._call_llm(messages)
+            text = self._call_llm(messages, len(batch))
         except Exception as e:  # noqa: BLE001 -- a bad batch must not kill the run
             logger.warning(
                 "LLM classification failed for batch of %s: %s; marking UNCERTAIN",
                 len(batch),
                 e,
             )
+            self._count(failed_batches=1)
             return [_uncertain("llm_call_failed") for _ in batch]
         return self._parse(text, len(batch))
 
-    def _call_llm(self, messages: list[dict]) -> str:
+    def _count(self, **amounts: float) -> None:
+        with self._stats_lock:
+            for field, amount in amounts.items():
+                setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+    def _call_llm(self, messages: list[dict[str, Any]], records: int) -> str:
         strict_format = {
             "type": "json_schema",
             "json_schema": {
@@ -186,7 +258,7 @@ class LLMClassifier:
         }
         try:
             resp = self._completion_with_retry(
-                messages=messages, response_format=strict_format
+                records, messages=messages, response_format=strict_format
             )
         except (
             Exception
@@ -202,12 +274,16 @@ class LLMClassifier:
                 e,
             )
             resp = self._completion_with_retry(
-                messages=messages, response_format={"type": "json_object"}
+                records, messages=messages, response_format={"type": "json_object"}
             )
         return _extract_text(resp)
 
-    def _completion_with_retry(self, **kwargs: Any) -> Any:
+    def _completion_with_retry(self, records: int, **kwargs: Any) -> Any:
+        """``litellm.completion`` through the rate limiter, charged for the
+        prompt and the responses of ``records`` records."""
+        tokens = _estimate_tokens(kwargs.get("messages") or [], records)
         for attempt in range(self._max_retries + 1):
+            self._count(throttled_seconds=self._limiter.acquire(tokens), calls=1)
             try:
                 return self._litellm.completion(
                     model=self.config.llm_model, temperature=0.0, **kwargs
@@ -215,15 +291,26 @@ class LLMClassifier:
             except Exception as e:
                 if not is_rate_limit_error(e) or attempt >= self._max_retries:
                     raise
+                delay = self._backoff_seconds(attempt, e)
                 logger.info(
-                    "rate/quota limited; sleeping %ss (attempt %s/%s)",
-                    self._retry_sleep_seconds,
+                    "rate/quota limited; backing off %.1fs (attempt %s/%s)",
+                    delay,
                     attempt + 1,
                     self._max_retries + 1,
                 )
-                time.sleep(self._retry_sleep_seconds)
+                self._count(retries=1)
+                # every in-flight batch waits, not just this one
+                self._limiter.defer(delay)
         raise RuntimeError("unreachable: retry loop exited unexpectedly")
 
+    def _backoff_seconds(self, attempt: int, err: Exception) -> float:
+        """Retry-After when the provider sent one, else jittered exponential."""
+        retry_after = retry_after_seconds(err)
+        if retry_after is not None:
+            return min(retry_after, MAX_BACKOFF_SECONDS)
+        ceiling = min(MAX_BACKOFF_SECONDS, self._retry_sleep_seconds * 2**attempt)
+        return random.uniform(ceiling / 2, ceiling)
+
     def _parse(self, text: str, n: int) -> list[ClassifyResult]:
         verdicts = [_uncertain("malformed_output") for _ in range(n)]
         try:
@@ -254,5 +341,6 @@ class LLMClassifier:
 
 __all__ = [
     "CLASSIFY_RESPONSE_SCHEMA",
+    "DispatchStats",
     "LLMClassifier",
 ]
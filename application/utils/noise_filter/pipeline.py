@@ -45,6 +45,13 @@ class RunSummary:
     deduped: int = 0
     dry_run: bool = False
     status: str = "ok"
+    # Stage 2 LLM traffic (see llm_classifier.DispatchStats)
+    llm_calls: int = 0
+    llm_retries: int = 0
+    llm_failed_batches: int = 0
+    llm_throttled_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    llm_records_per_second: float = 0.0
 
     def to_json(self) -> str:
         return json.dumps(asdict(self))
@@ -128,6 +135,15 @@ def run_noise_filter(
             f"{len(survivors)} chunks; refusing to write a partial batch"
         )
 
+    stats = getattr(classifier, "stats", None)
+    if stats is not None:
+        summary.llm_calls = stats.calls
+        summary.llm_retries = stats.retries
+        summary.llm_failed_batches = stats.failed_batches
+        summary.llm_throttled_seconds = round(stats.throttled_seconds, 3)
+        summary.llm_seconds = round(stats.elapsed_seconds, 3)
+        summary.llm_records_per_second = round(stats.records_per_second, 3)
+
     triples = [
         (rec, v, compute_content_hash(rec.text)) for rec, v in zip(survivors, verdicts)
     ]
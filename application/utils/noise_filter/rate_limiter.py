@@ -0,0 +1,96 @@
+"""Module B Stage 2: client-side rate limiting for classifier LLM calls.
+
+The classifier dispatches batches from several threads at once. Before each
+call a thread asks the shared RateLimiter for one request and the call's
+estimated tokens. Token buckets fed by the provider's requests-per-minute
+(CRE_NOISE_FILTER_RPM) and tokens-per-minute (CRE_NOISE_FILTER_TPM) limits
+make it wait until both budgets allow the call, so a run paces itself
+instead of bouncing off 429s. A limit of 0 means unlimited.
+
+When the provider does rate-limit a call, `defer` holds back every thread,
+not just the one that was refused, until the backoff has passed.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """`capacity` units, refilled continuously at `capacity` per `period` s."""
+
+    def __init__(self, capacity: float, period: float = 60.0, now: float = 0.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(
+                self.capacity, self.level + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (capped at a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Paces calls against requests/min and tokens/min budgets (0 = unlimited)."""
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._requests: Optional[TokenBucket] = (
+            TokenBucket(rpm, now=now) if rpm > 0 else None
+        )
+        self._tokens: Optional[TokenBucket] = (
+            TokenBucket(tpm, now=now) if tpm > 0 else None
+        )
+        self._not_before = now
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one call of `tokens` tokens may start; return the wait."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._not_before - now
+                if self._requests is not None:
+                    wait = max(wait, self._requests.wait_time(1, now))
+                if self._tokens is not None:
+                    wait = max(wait, self._tokens.wait_time(tokens, now))
+                if wait <= 0:
+                    if self._requests is not None:
+                        self._requests.take(1, now)
+                    if self._tokens is not None:
+                        self._tokens.take(tokens, now)
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every call for `seconds` (a rate-limit response)."""
+        with self._lock:
+            self._not_before = max(self._not_before, self._clock() + seconds)
+
+
+__all__ = ["RateLimiter", "TokenBucket"]
@@ -26,13 +26,14 @@ Or via the convenience generator:
 
 from __future__ import annotations
 
-from fnmatch import fnmatch
+import os
 from pathlib import Path
 from typing import Iterable, Iterator, Optional
 
 import yaml
 
 from application.utils.noise_filter.schemas import ChangeRecord
+from application.utils.path_matcher import PatternMatcher, SuffixMatcher
 
 DEFAULT_PATTERNS_PATH = Path(__file__).parent / "noise_patterns.yaml"
 
@@ -40,9 +41,12 @@ DEFAULT_PATTERNS_PATH = Path(__file__).parent / "noise_patterns.yaml"
 class RegexFilter:
     """Path-based noise filter driven by `noise_patterns.yaml`.
 
-    The instance compiles patterns once at construction; `is_noise_*` calls
-    are O(deny rules) per path. For typical OWASP-shaped inputs the constant
-    is tiny so this is effectively O(1) per record.
+    The instance compiles patterns once at construction: the extensions and
+    filenames go in hash sets, and the allow and deny globs each become one
+    regex alternation (see `application.utils.path_matcher`). An
+    `is_noise_*` call is then a few lookups and two regex matches per path,
+    however many rules there are, and returns the same reason the rules
+    checked one by one would.
 
     Attributes are populated from the YAML file and are publicly readable for
     tests and introspection.
@@ -58,6 +62,9 @@ class RegexFilter:
         self.deny_paths: tuple[str, ...] = tuple(data.get("deny_paths") or [])
         self.allow_overrides: tuple[str, ...] = tuple(data.get("allow_overrides") or [])
         self.patterns_path: Path = path
+        self._extensions = SuffixMatcher(self.deny_extensions)
+        self._allow = PatternMatcher.from_globs(self.allow_overrides)
+        self._deny = PatternMatcher.from_globs(self.deny_paths)
 
     def is_noise_path(self, path: str) -> tuple[bool, str]:
         """Check a file path against the deny rules.
@@ -76,15 +83,17 @@ class RegexFilter:
             3. deny_filenames
             4. deny_paths
         """
+        # Globs match the way fnmatch does, case-insensitively on Windows.
+        normalized = os.path.normcase(path)
+
         # 1. Allow-overrides take precedence over any deny rule.
-        for pattern in self.allow_overrides:
-            if fnmatch(path, pattern):
-                return (False, "")
+        if self._allow.first_match(normalized) is not None:
+            return (False, "")
 
         # 2. Extension check.
-        for ext in self.deny_extensions:
-            if path.endswith(ext):
-                return (True, f"deny_extension: {ext}")
+        ext = self._extensions.first_match(path)
+        if ext is not None:
+            return (True, f"deny_extension: {ext}")
 
         # 3. Basename check.
         basename = path.rsplit("/", 1)[-1]
@@ -92,9 +101,9 @@ class RegexFilter:
             return (True, f"deny_filename: {basename}")
 
         # 4. Path glob check.
-        for pattern in self.deny_paths:
-            if fnmatch(path, pattern):
-                return (True, f"deny_path: {pattern}")
+        index = self._deny.first_match(normalized)
+        if index is not None:
+            return (True, f"deny_path: {self.deny_paths[index]}")
 
         return (False, "")
 
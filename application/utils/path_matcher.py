@@ -0,0 +1,99 @@
+"""
+Compiled path matching for filters that test every changed file.
+
+``SuffixMatcher`` answers "which of these extensions does the path end
+with?" and ``PatternMatcher`` answers "which of these patterns matches
+first?", each in one pass over the path instead of one call per rule. Both
+report the same rule a loop over the rules in order would, so callers keep
+their precedence and their audit reasons.
+
+``PatternMatcher`` merges the patterns' regexes into one alternation, with
+a named group per pattern. Every alternative is anchored at the start of the
+path, so the regex engine tries them in order and the first that matches is
+the one reported.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from typing import Iterable, Optional, Sequence
+
+
+class SuffixMatcher:
+    """Ordered path suffixes such as ``.md`` or ``.min.js``."""
+
+    def __init__(self, suffixes: Iterable[str]) -> None:
+        self.suffixes: tuple[str, ...] = tuple(suffixes)
+        # dotted suffixes are looked up by each ".…" tail of the path; any
+        # others are checked in order
+        self._rank: dict[str, int] = {}
+        for rank, suffix in enumerate(self.suffixes):
+            if suffix.startswith("."):
+                self._rank.setdefault(suffix, rank)
+        self._undotted: tuple[tuple[int, str], ...] = tuple(
+            (rank, suffix)
+            for rank, suffix in enumerate(self.suffixes)
+            if not suffix.startswith(".")
+        )
+
+    def matches(self, path: str) -> bool:
+        return path.endswith(self.suffixes)
+
+    def first_match(self, path: str) -> Optional[str]:
+        """The earliest suffix ``path`` ends with, or None."""
+        if not path.endswith(self.suffixes):
+            return None
+
+        best: Optional[int] = None
+        dot = path.find(".")
+        while dot != -1:
+            rank = self._rank.get(path[dot:])
+            if rank is not None and (best is None or rank < best):
+                best = rank
+            dot = path.find(".", dot + 1)
+
+        for rank, suffix in self._undotted:
+            if best is not None and rank > best:
+                break
+            if path.endswith(suffix):
+                best = rank
+                break
+
+        return None if best is None else self.suffixes[best]
+
+
+class PatternMatcher:
+    """
+    Ordered regexes compiled into one alternation.
+
+    Each regex must only match at the start of the path (``fnmatch`` and
+    gitignore translations both do) and must not contain capturing groups.
+    """
+
+    def __init__(self, regexes: Sequence[str]) -> None:
+        self.regexes: tuple[str, ...] = tuple(regexes)
+        self._regex: Optional[re.Pattern[str]] = None
+        if not self.regexes:
+            return
+
+        self._regex = re.compile(
+            "|".join(f"(?P<p{index}>{regex})" for index, regex in enumerate(regexes))
+        )
+        if self._regex.groups != len(self.regexes):
+            raise ValueError("patterns must not contain capturing groups")
+
+    @classmethod
+    def from_globs(cls, globs: Iterable[str]) -> "PatternMatcher":
+        """A matcher with ``fnmatch.fnmatch``'s semantics for each glob."""
+        return cls([fnmatch.translate(os.path.normcase(glob)) for glob in globs])
+
+    def first_match(self, path: str) -> Optional[int]:
+        """The index of the first regex that matches ``path``, or None."""
+        if self._regex is None:
+            return None
+        match = self._regex.match(path)
+        if match is None:
+            return None
+        return int(match.lastgroup[1:])
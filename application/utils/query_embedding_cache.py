@@ -0,0 +1,210 @@
+"""
+Process-wide cache of chatbot question embeddings and their nearest node.
+
+``PromptHandler.generate_text`` embeds every question with the remote model and
+then searches the stored embeddings for its closest node. Both answers are
+cached here, keyed by the normalised question (``normalize_prompt``):
+
+  - vectors, per embeddings contract (``contract_key``: embedding model and
+    expected dimension, the pair ``assert_embedding_contract`` enforces);
+  - nearest ``(node id, similarity)``, per contract and dataset generation.
+
+Two tiers, as in ``response_cache``: an in-process LRU of
+``CRE_QUERY_EMBEDDING_CACHE_SIZE`` questions (default 1024, 0 disables the
+cache) and, with ``CRE_QUERY_EMBEDDING_CACHE_REDIS=1``, a Redis tier shared by
+all web processes whose keys expire after
+``CRE_QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS``. Seeing a new contract or
+generation drops the LRU; Redis keys carry both, so stale entries are never
+read again. Hit rates are reported by ``stats`` (and ``/rest/v1/health``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from application.feature_flags import is_query_embedding_cache_redis_enabled
+from application.utils import redis_tier
+from application.utils.env import env_int
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_REDIS_TTL_SECONDS = 7 * 24 * 60 * 60
+_REDIS_PREFIX = "cre:query-embedding"
+
+EMBEDDING = "embedding"
+NEIGHBOUR = "neighbour"
+
+Neighbour = Tuple[Optional[str], Optional[float]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, Unicode form, runs of whitespace and trailing punctuation folded."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?!. ")
+
+
+def contract_key(embed_model: str, expected_dim: Optional[int]) -> str:
+    return f"{embed_model}:{expected_dim or ''}"
+
+
+class QueryEmbeddingCache(redis_tier.ProcessCache):
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        redis_client: Any = None,
+        redis_ttl_seconds: int = DEFAULT_REDIS_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.redis = redis_tier.RedisTier(redis_client, "query embedding cache")
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._lock = threading.Lock()
+        # (kind, question digest) -> array of floats or Neighbour
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._scope: Dict[str, Optional[str]] = {EMBEDDING: None, NEIGHBOUR: None}
+        self.counters: Dict[str, int] = {
+            f"{kind}_{counter}": 0
+            for kind in (EMBEDDING, NEIGHBOUR)
+            for counter in ("hits", "redis_hits", "misses")
+        }
+        self.counters.update(evictions=0, invalidations=0)
+
+    @classmethod
+    def from_env(cls) -> "QueryEmbeddingCache":
+        return cls(
+            max_entries=env_int("CRE_QUERY_EMBEDDING_CACHE_SIZE", DEFAULT_MAX_ENTRIES),
+            redis_client=redis_tier.connect(is_query_embedding_cache_redis_enabled()),
+            redis_ttl_seconds=env_int(
+                "CRE_QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS",
+                DEFAULT_REDIS_TTL_SECONDS,
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _see_scope(self, kind: str, scope: str) -> None:
+        # Caller holds self._lock.
+        previous = self._scope[kind]
+        if previous == scope:
+            return
+        if previous is not None:
+            self.counters["invalidations"] += 1
+            logger.info(
+                "query embedding cache: %s scope %s -> %s, dropping entries",
+                kind,
+                previous,
+                scope,
+            )
+        self._scope[kind] = scope
+        for key in [key for key in self._entries if key[0] == kind]:
+            del self._entries[key]
+
+    def _redis_key(self, kind: str, scope: str, digest: str) -> str:
+        return f"{_REDIS_PREFIX}:{kind}:{scope}:{digest}"
+
+    def _store_local(self, key: Tuple[str, str], value: Any) -> None:
+        # Caller holds self._lock.
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _get(self, kind: str, scope: str, prompt: str) -> Optional[Any]:
+        """The local value, else the decoded JSON of the Redis one."""
+        if not self.enabled:
+            return None
+        key = (kind, hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest())
+        with self._lock:
+            self._see_scope(kind, scope)
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.counters[f"{kind}_hits"] += 1
+                return value
+        raw = self.redis.get(self._redis_key(kind, scope, key[1]))
+        if raw is not None:
+            with self._lock:
+                self.counters[f"{kind}_redis_hits"] += 1
+            return json.loads(raw)
+        with self._lock:
+            self.counters[f"{kind}_misses"] += 1
+        return None
+
+    def _put(self, kind: str, scope: str, prompt: str, value: Any, raw: str) -> None:
+        if not self.enabled:
+            return
+        key = (kind, hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest())
+        with self._lock:
+            self._see_scope(kind, scope)
+            self._store_local(key, value)
+        if raw:
+            self.redis.set(
+                self._redis_key(kind, scope, key[1]), raw, self.redis_ttl_seconds
+            )
+
+    def get_embedding(self, contract: str, prompt: str) -> Optional[List[float]]:
+        value = self._get(EMBEDDING, contract, prompt)
+        if value is None:
+            return None
+        if isinstance(value, list):  # from Redis
+            self._put(EMBEDDING, contract, prompt, array("d", value), "")
+            return value
+        vector: List[float] = value.tolist()
+        return vector
+
+    def put_embedding(
+        self, contract: str, prompt: str, embedding: Sequence[float]
+    ) -> None:
+        # array("d") keeps a vector at 8 bytes a dimension, not a list of floats
+        vector = array("d", embedding)
+        self._put(EMBEDDING, contract, prompt, vector, json.dumps(vector.tolist()))
+
+    def get_neighbour(
+        self, contract: str, generation: int, prompt: str
+    ) -> Optional[Neighbour]:
+        value = self._get(NEIGHBOUR, f"{contract}:{generation}", prompt)
+        if value is None:
+            return None
+        if isinstance(value, list):  # from Redis
+            value = (value[0], value[1])
+            self._put(NEIGHBOUR, f"{contract}:{generation}", prompt, value, "")
+        neighbour: Neighbour = value
+        return neighbour
+
+    def put_neighbour(
+        self, contract: str, generation: int, prompt: str, neighbour: Neighbour
+    ) -> None:
+        value = (neighbour[0], neighbour[1])
+        self._put(
+            NEIGHBOUR, f"{contract}:{generation}", prompt, value, json.dumps(value)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = {
+                **self.counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "redis": self.redis.enabled,
+                "redis_errors": self.redis.errors,
+            }
+        for kind in (EMBEDDING, NEIGHBOUR):
+            hits = result[f"{kind}_hits"] + result[f"{kind}_redis_hits"]
+            lookups = hits + result[f"{kind}_misses"]
+            result[f"{kind}_hit_rate"] = round(hits / lookups, 4) if lookups else None
+        return result
@@ -0,0 +1,105 @@
+"""
+Shared plumbing of the process-wide two-tier caches (``response_cache``,
+``query_embedding_cache``).
+
+``RedisTier`` is the optional shared tier: a Redis client used best-effort.
+A failed call is logged and counted, and the tier is skipped for
+``REDIS_RETRY_SECONDS`` so requests fall back to the local tier instead of
+waiting on a dead server each time.
+
+``ProcessCache`` gives a cache class its process-wide ``instance()``, built on
+first use by the subclass's ``from_env``, and ``reset()`` for tests.
+"""
+
+from __future__ import annotations
+
+import abc
+import logging
+import threading
+import time
+from typing import Any, ClassVar, Optional, Type, TypeVar
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# After a Redis failure, serve from the local tier only for this long.
+REDIS_RETRY_SECONDS = 60.0
+
+T = TypeVar("T", bound="ProcessCache")
+
+
+def connect(enabled: bool) -> Any:
+    """A Redis client from ``application.utils.redis.connect`` if ``enabled``."""
+    if not enabled:
+        return None
+    from application.utils import redis
+
+    return redis.connect()  # type: ignore[no-untyped-call]
+
+
+class RedisTier:
+    def __init__(self, client: Any = None, name: str = "cache") -> None:
+        self.client = client
+        self.name = name
+        self.errors = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._retry_at
+
+    def _failed(self, exc: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+            self._retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("%s: redis tier unavailable: %s", self.name, exc)
+
+    def get(self, key: str) -> Any:
+        """The stored value, or None if missing or the tier is unavailable."""
+        if not self.available():
+            return None
+        try:
+            return self.client.get(key)
+        except Exception as exc:
+            self._failed(exc)
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        if not self.available():
+            return
+        try:
+            self.client.set(key, value, ex=ttl_seconds)
+        except Exception as exc:
+            self._failed(exc)
+
+
+class ProcessCache(abc.ABC):
+    _instance: ClassVar[Optional["ProcessCache"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    @abc.abstractmethod
+    def from_env(cls: Type[T]) -> T:
+        """The cache configured from the environment."""
+
+    @classmethod
+    def instance(cls: Type[T]) -> T:
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls.from_env()
+            return cls._instance  # type: ignore[return-value]
+
+    @classmethod
+    def existing(cls: Type[T]) -> Optional[T]:
+        """The process-wide instance if something already built it."""
+        return cls._instance  # type: ignore[return-value]
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._instance_lock:
+            cls._instance = None
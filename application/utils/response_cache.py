@@ -0,0 +1,171 @@
+"""
+Process-wide read-through cache for hot REST responses.
+
+Two tiers: an in-process LRU bounded by bytes (``CRE_RESPONSE_CACHE_MAX_BYTES``,
+default 64 MiB) and, with ``CRE_RESPONSE_CACHE_REDIS=1``, a shared Redis tier
+(``redis_tier.RedisTier``). Entries are keyed by the
+dataset generation as well as route and normalized args, so applying an import
+(which bumps the generation) invalidates every tier wholesale: the LRU is
+dropped as soon as a newer generation is seen and stale Redis keys are never
+read again (they expire after ``CRE_RESPONSE_CACHE_REDIS_TTL_SECONDS``).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from application.feature_flags import is_response_cache_redis_enabled
+from application.utils import redis_tier
+from application.utils.env import env_int
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_REDIS_TTL_SECONDS = 24 * 60 * 60
+_REDIS_PREFIX = "cre:response-cache"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    status: int = 200
+
+    def to_bytes(self) -> bytes:
+        return f"{self.status} {self.mimetype}\n".encode("utf-8") + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedResponse":
+        header, _, body = raw.partition(b"\n")
+        status, _, mimetype = header.decode("utf-8").partition(" ")
+        return cls(body=body, mimetype=mimetype, status=int(status))
+
+
+def request_key(path: str, args: Any) -> str:
+    """Route + args with keys sorted (value order within a key is kept)."""
+    parts = [f"{k}={v}" for k in sorted(args.keys()) for v in args.getlist(k)]
+    return f"{path}?{'&'.join(parts)}"
+
+
+class ResponseCache(redis_tier.ProcessCache):
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        redis_client: Any = None,
+        redis_ttl_seconds: int = DEFAULT_REDIS_TTL_SECONDS,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.redis = redis_tier.RedisTier(redis_client, "response cache")
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._generation: Optional[int] = None
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_bytes=env_int("CRE_RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+            redis_client=redis_tier.connect(is_response_cache_redis_enabled()),
+            redis_ttl_seconds=env_int(
+                "CRE_RESPONSE_CACHE_REDIS_TTL_SECONDS", DEFAULT_REDIS_TTL_SECONDS
+            ),
+        )
+
+    @staticmethod
+    def _size(key: str, value: CachedResponse) -> int:
+        return len(key) + len(value.body) + len(value.mimetype)
+
+    def _see_generation(self, generation: int) -> None:
+        # Caller holds self._lock.
+        if self._generation == generation:
+            return
+        if self._generation is not None:
+            self.counters["invalidations"] += 1
+            logger.info(
+                "response cache: dataset generation %s -> %s, dropping %s entries",
+                self._generation,
+                generation,
+                len(self._entries),
+            )
+        self._entries.clear()
+        self._bytes = 0
+        self._generation = generation
+
+    def _redis_key(self, key: str, generation: int) -> str:
+        return f"{_REDIS_PREFIX}:{generation}:{key}"
+
+    def _store_local(self, key: str, value: CachedResponse) -> None:
+        # Caller holds self._lock.
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= self._size(key, previous)
+        self._entries[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_value = self._entries.popitem(last=False)
+            self._bytes -= self._size(old_key, old_value)
+            self.counters["evictions"] += 1
+
+    def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        with self._lock:
+            self._see_generation(generation)
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return value
+        raw = self.redis.get(self._redis_key(key, generation))
+        if raw is not None:
+            value = CachedResponse.from_bytes(raw)
+            with self._lock:
+                if self._generation == generation:
+                    self._store_local(key, value)
+                self.counters["redis_hits"] += 1
+            return value
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def put(self, key: str, generation: int, value: CachedResponse) -> None:
+        with self._lock:
+            self._see_generation(generation)
+            self._store_local(key, value)
+        self.redis.set(
+            self._redis_key(key, generation), value.to_bytes(), self.redis_ttl_seconds
+        )
+
+    def invalidate_all(self) -> None:
+        """Drop the local tier now (Redis entries die with their generation)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "generation": self._generation,
+                "redis": self.redis.enabled,
+                "redis_errors": self.redis.errors,
+            }
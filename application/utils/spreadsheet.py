@@ -3,10 +3,10 @@ import csv
 import io
 import logging
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List
 import os
 import yaml
-from application.database import db
+from application.database import db, export_stream
 from application.defs import cre_defs as defs
 from enum import Enum
 
@@ -244,6 +244,7 @@ class ExportSheet:
         sorted_cres = sorted(
             self.input_cres.values(), key=lambda x: cre_id_to_depth[x.id]
         )
+        roots = None
 
         for cre in sorted_cres:
             processed = False
@@ -269,9 +270,10 @@ class ExportSheet:
                 continue
             # if we still have the cre, it means it needs a path to a root cre and we need to append it to the body
             # find the root this cre is linked to
-            root = storage.get_root_cres()
+            if roots is None:
+                roots = storage.get_root_cres()
 
-            for r in root:
+            for r in roots:
                 path = storage.get_cre_path(fromID=r.id, toID=cre.id)
                 if path:
                     pathIndex = 0
@@ -319,62 +321,9 @@ def write_spreadsheet(title: str, docs: List[Dict[str, Any]], emails: List[str])
 
 def generate_mapping_template_file(
     database: db.Node_collection, docs: List[defs.CRE]
-) -> str:
-    maxOffset = 0
-    related = set()
-
-    def add_offset_cre(
-        cre: defs.CRE, database: db.Node_collection, offset: int, visited_cres: Set
-    ) -> List[Dict[str, str]]:
-        nonlocal maxOffset, related
-        maxOffset = max(maxOffset, offset)
-        rows = []
-
-        rows.append(
-            {f"CRE {offset}": f"{cre.id}{defs.ExportFormat.separator}{cre.name}"}
-        )
-        visited_cres.add(cre.id)
-        dbcre = database.get_CREs(external_id=cre.id)
-        if not dbcre:
-            raise ValueError(f"CRE with id {cre.id} not found in the database")
-        cre = dbcre[0]
-        for link in cre.links:
-            if (
-                link.document.doctype == defs.Credoctypes.CRE
-                and link.document.id not in visited_cres
-            ):
-                if link.ltype == defs.LinkTypes.Contains:
-                    rows.extend(
-                        add_offset_cre(
-                            cre=link.document,
-                            database=database,
-                            offset=offset + 1,
-                            visited_cres=visited_cres,
-                        )
-                    )
-                elif link.ltype == defs.LinkTypes.Related:
-                    related.add(link.document.id)
-        return rows
-
-    visited_cres = set()
-    csv: List[Dict[str, str]] = []
-
-    for cre in docs:
-        csv.extend(
-            add_offset_cre(
-                cre=cre, database=database, offset=0, visited_cres=visited_cres
-            )
-        )
-    result = [{f"CRE {offset}": "" for offset in range(0, maxOffset + 1)}]
-    result[0]["standard|name"] = ""
-    result[0]["standard|id"] = ""
-    result[0]["standard|hyperlink"] = ""
-    result.extend(csv)
-
-    orphaned_documents = [doc for doc in related if doc not in visited_cres]
-    if len(orphaned_documents):
-        raise ValueError(
-            "found CREs with only related links not provided in the root_cre list, unless you are really sure for this use case, this is a bug"
-        )
-
-    return result
+) -> List[Dict[str, str]]:
+    """The CRE mapping template under the root CREs docs, see
+    export_stream.mapping_template_rows"""
+    return export_stream.mapping_template_rows(
+        database, root_ids=[cre.id for cre in docs]
+    )
@@ -1,4 +1,5 @@
 import os
+import tempfile
 import time
 import json
 import logging
@@ -21,7 +22,8 @@ def emit_import_event(
     """
     Emits structured telemetry for an import run.
     If TELEMETRY_ENDPOINT is set, it POSTs the event.
-    Otherwise, it appends it to a local file (e.g. import_telemetry.json).
+    Otherwise, it appends it to TELEMETRY_FILE (default: import_telemetry.json
+    in the system temp directory, so runs never write into the working tree).
     """
     duration = end_time - start_time
 
@@ -53,8 +55,12 @@ def emit_import_event(
         _write_to_file(event)
 
 
+def default_telemetry_file() -> str:
+    return os.path.join(tempfile.gettempdir(), "import_telemetry.json")
+
+
 def _write_to_file(event: Dict[str, Any]) -> None:
-    filepath = os.environ.get("TELEMETRY_FILE", "import_telemetry.json")
+    filepath = os.environ.get("TELEMETRY_FILE") or default_telemetry_file()
     try:
         with open(filepath, "a") as f:
             f.write(json.dumps(event) + "\n")
@@ -190,6 +190,22 @@ OPENAPI_PATHS: List[PathSpec] = [
         query_schema=schemas.MapAnalysisWeakLinksQuerySchema,
         response_schema=schemas.MapAnalysisResponseSchema,
     ),
+    PathSpec(
+        "/rest/v1/map_analysis_controls",
+        "map_analysis_controls",
+        tags=["Gap analysis"],
+        summary="Cached map analysis, paginated by base control",
+        description=(
+            "The result of /rest/v1/map_analysis for a pair that has already "
+            "been computed, one page of base controls at a time in result "
+            "order. format=ndjson streams every control instead."
+        ),
+        query_schema=schemas.MapAnalysisControlsQuerySchema,
+        response_schema=schemas.MapAnalysisControlsResponseSchema,
+        extra_responses={
+            "400": {"description": "Fewer than two standards"},
+        },
+    ),
     PathSpec(
         "/rest/v1/ma_job_results",
         "fetch_job",
@@ -317,6 +333,27 @@ OPENAPI_PATHS: List[PathSpec] = [
             }
         },
     ),
+    PathSpec(
+        "/rest/v1/export_jsonl",
+        "export_jsonl",
+        tags=["CRE"],
+        summary="Stream the whole database as JSON lines",
+        description=(
+            "Every CRE with its links, then every standard, tool or code entry "
+            "no CRE links to, one JSON document per line."
+        ),
+        not_found=False,
+        response_override={
+            "200": {
+                "description": "Newline-delimited JSON download",
+                "content": {
+                    "application/x-ndjson": {
+                        "schema": {"type": "string", "format": "binary"}
+                    }
+                },
+            }
+        },
+    ),
     PathSpec(
         "/rest/v1/config",
         "get_config",
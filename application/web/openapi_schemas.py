@@ -88,6 +88,19 @@ class MapAnalysisWeakLinksQuerySchema(Schema):
     key = fields.Str(required=True, metadata={"description": "Gap-analysis cache key"})
 
 
+class MapAnalysisControlsQuerySchema(MapAnalysisQuerySchema):
+    page = fields.Int(required=False)
+    per_page = fields.Int(required=False)
+    format = fields.Str(
+        required=False,
+        validate=validate.OneOf(("json", "ndjson")),
+        metadata={
+            "description": "ndjson streams every control as one "
+            '{"key", "result"} document per line (default: json)'
+        },
+    )
+
+
 class JobResultsQuerySchema(Schema):
     id = fields.Str(required=True, metadata={"description": "Background job id"})
 
@@ -96,6 +109,16 @@ class MapAnalysisResponseSchema(Schema):
     result = fields.Raw(metadata={"description": "Gap analysis result payload"})
 
 
+class MapAnalysisControlsResponseSchema(Schema):
+    result = fields.Raw(
+        metadata={"description": "One page of the gap analysis result, by base control"}
+    )
+    page = fields.Int()
+    per_page = fields.Int()
+    total = fields.Int(metadata={"description": "Number of base controls"})
+    total_pages = fields.Int()
+
+
 class JobStatusResponseSchema(Schema):
     status = fields.Str()
     result = fields.Raw(required=False)
@@ -6,41 +6,45 @@ from functools import wraps
 import json
 import logging
 import os
-import io
 import pathlib
 import re
 import urllib.parse
-from typing import Any
+from typing import Any, Callable, Optional
 
 from rq import job, exceptions
 from rq import Queue
 
 from application.utils import redis
-from application.database import db
+from application.database import db, export_stream
 from application.defs import cre_defs as defs
 from application.defs import cre_exceptions
 from application.feature_flags import (
+    is_compressed_gap_analysis_storage_enabled,
     is_cre_import_allowed,
     is_health_endpoint_enabled,
     is_login_enabled,
     is_myopencre_enabled,
+    is_response_cache_enabled,
 )
 
 from application.utils import spreadsheet as sheet_utils
-from application.utils import mdutils, redirectors, gap_analysis
+from application.utils import mdutils, redirectors, gap_analysis, ga_payload
+from application.utils import dataset_generation, query_embedding_cache, response_cache
 from application.web.openapi_registry import openapi_documented
 from enum import Enum
 from flask import json as flask_json
 from flask import (
     Blueprint,
+    Response,
     abort,
     jsonify,
+    make_response,
     redirect,
     request,
     send_from_directory,
+    stream_with_context,
     url_for,
     session,
-    send_file,
 )
 from google.oauth2 import id_token
 from google_auth_oauthlib.flow import Flow
@@ -79,6 +83,117 @@ def _is_heroku_deploy() -> bool:
     return os.environ.get("DYNO") is not None or bool(os.environ.get("HEROKU"))
 
 
+def _if_none_match_hits(etag: str) -> bool:
+    # Flask-Compress suffixes strong ETags with the encoding ("tag:gzip").
+    if request.if_none_match.star_tag:
+        return True
+    return any(
+        tag == etag or tag.startswith(etag + ":")
+        for tag in request.if_none_match.as_set()
+    )
+
+
+def dataset_conditional(per_user: bool = False) -> Callable:
+    """
+    Strong ETag / Last-Modified validators derived from the dataset generation
+    counter, answering ``304 Not Modified`` before the view (and its DB queries)
+    runs. Only 200 responses without ``no-store`` or their own ETag get
+    validators. ``per_user`` views are skipped while per-user resource
+    filtering can change their output.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if per_user and is_login_enabled() and is_myopencre_enabled():
+                return view(*args, **kwargs)
+            version = dataset_generation.current()
+            if version is None:
+                return view(*args, **kwargs)
+            etag = version.etag(request.full_path)
+            last_modified = version.last_modified
+            if request.if_none_match:
+                fresh = _if_none_match_hits(etag)
+            else:
+                since = request.if_modified_since
+                fresh = bool(since and last_modified and since >= last_modified)
+            if fresh:
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if (
+                    response.status_code != 200
+                    or response.cache_control.no_store
+                    or response.get_etag()[0] is not None
+                ):
+                    return response
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached_response(
+    per_user: bool = False, capture: Optional[Callable[..., None]] = None
+) -> Callable:
+    """
+    Serve 200 responses from the process-wide response cache
+    (``CRE_RESPONSE_CACHE``), keyed by dataset generation, route and normalized
+    args. Goes below ``dataset_conditional`` so revalidations still 304 first.
+    ``per_user`` views bypass the cache while their output can differ per user.
+    ``capture`` records the view's analytics event (called with the view's
+    arguments) on a cache hit, since the view itself does not run.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not is_response_cache_enabled() or (
+                per_user and is_login_enabled() and is_myopencre_enabled()
+            ):
+                return view(*args, **kwargs)
+            version = dataset_generation.current()
+            if version is None:
+                return view(*args, **kwargs)
+            cache = response_cache.ResponseCache.instance()
+            key = response_cache.request_key(request.path, request.args)
+            hit = cache.get(key, version.generation)
+            if hit is not None:
+                if posthog and capture is not None:
+                    capture(*args, **kwargs)
+                return Response(hit.body, status=hit.status, mimetype=hit.mimetype)
+            response = make_response(view(*args, **kwargs))
+            if (
+                response.status_code == 200
+                and not response.cache_control.no_store
+                and not response.is_streamed
+                and "Content-Encoding" not in response.headers
+            ):
+                cache.put(
+                    key,
+                    version.generation,
+                    response_cache.CachedResponse(
+                        body=response.get_data(), mimetype=response.mimetype
+                    ),
+                )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _job_response(job_id: str) -> Response:
+    # A pending job id is not the representation; never validate or store it.
+    response = jsonify({"job_id": job_id})
+    response.cache_control.no_store = True
+    return response
+
+
 def _compute_ga_without_redis(
     database: db.Node_collection, standards: list[str]
 ) -> dict:
@@ -91,6 +206,37 @@ def _compute_ga_without_redis(
     return {"result": parsed.get("result", {})}
 
 
+def _encoded_gap_analysis_response(
+    database: db.Node_collection, cache_key: str
+) -> Optional[Response]:
+    """
+    Serve a compressed GA row (stored body is exactly ``{"result": ...}``) without
+    decoding its JSON: the gzip bytes go out as-is to clients that accept gzip.
+    Returns None for plain-text rows (or with CRE_GA_STORAGE unset, where
+    ``get_gap_analysis_result`` still decodes compressed rows) so callers fall
+    back to the JSON path.
+    """
+    if not is_compressed_gap_analysis_storage_enabled():
+        return None
+    encoded = database.get_gap_analysis_encoded(cache_key)
+    if encoded is None:
+        return None
+    etag = encoded.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif encoded.encoding in request.accept_encodings:
+        response = Response(encoded.body, mimetype="application/json")
+        response.headers["Content-Encoding"] = encoded.encoding
+    else:
+        response = Response(
+            ga_payload.decode(encoded.body, encoded.encoding),
+            mimetype="application/json",
+        )
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
 class SupportedFormats(Enum):
     Markdown = "md"
     CSV = "csv"
@@ -137,19 +283,24 @@ if os.environ.get("POSTHOG_API_KEY") and os.environ.get("POSTHOG_HOST"):
     )
 
 
+def _capture_find_cre(creid: str = None, crename: str = None) -> None:
+    source = request.args.get("source")
+    source_norm = ""
+    if source and source.strip():
+        source_norm = re.sub(r"[^a-z0-9.]+", "-", source.lower()).strip("-")
+    payload = f"id:{creid};name{crename}"
+    if source_norm:
+        payload += f";source:{source_norm}"
+    posthog.capture("find_cre", payload)
+
+
 @openapi_documented("find_cre")
 @app.route("/rest/v1/id/<creid>", methods=["GET"])
 @app.route("/rest/v1/name/<crename>", methods=["GET"])
+@cached_response(capture=_capture_find_cre)
 def find_cre(creid: str = None, crename: str = None) -> Any:  # refer
     if posthog:
-        source = request.args.get("source")
-        source_norm = ""
-        if source and source.strip():
-            source_norm = re.sub(r"[^a-z0-9.]+", "-", source.lower()).strip("-")
-        payload = f"id:{creid};name{crename}"
-        if source_norm:
-            payload += f";source:{source_norm}"
-        posthog.capture("find_cre", payload)
+        _capture_find_cre(creid, crename)
     database = db.Node_collection()
     include_only = request.args.getlist("include_only")
     # opt_osib = request.args.get("osib")
@@ -190,6 +341,12 @@ def find_cre(creid: str = None, crename: str = None) -> Any:  # refer
     abort(404, "CRE does not exist")
 
 
+def _capture_find_node_by_name(
+    name: str, ntype: str = defs.Credoctypes.Standard.value, **_: Any
+) -> None:
+    posthog.capture("find_node_by_name", f"name:{name};nodeType{ntype}")
+
+
 @openapi_documented("find_node_by_name")
 @app.route("/rest/v1/<ntype>/<name>", methods=["GET"])
 @app.route("/rest/v1/standard/<name>", methods=["GET"])
@@ -202,6 +359,7 @@ def find_cre(creid: str = None, crename: str = None) -> Any:  # refer
     "/rest/v1/<ntype>/<name>/sectionid/<sectionID>/subsection/<subsection>",
     methods=["GET"],
 )
+@cached_response(capture=_capture_find_node_by_name)
 def find_node_by_name(
     name: str,
     ntype: str = defs.Credoctypes.Standard.value,
@@ -210,7 +368,7 @@ def find_node_by_name(
     sectionID: str = "",
 ) -> Any:
     if posthog:
-        posthog.capture("find_node_by_name", f"name:{name};nodeType{ntype}")
+        _capture_find_node_by_name(name, ntype)
 
     database = db.Node_collection()
     opt_section = section or request.args.get("section")
@@ -296,13 +454,18 @@ def find_node_by_name(
         abort(404, "Node does not exist")
 
 
+def _capture_find_document_by_tag() -> None:
+    posthog.capture("find_document_by_tag", f"tags:{request.args.getlist('tag')}")
+
+
 # TODO: (spyros) paginate
 @openapi_documented("find_document_by_tag")
 @app.route("/rest/v1/tags", methods=["GET"])
+@cached_response(capture=_capture_find_document_by_tag)
 def find_document_by_tag() -> Any:
-    tags = request.args.getlist("tag")
     if posthog:
-        posthog.capture("find_document_by_tag", f"tags:{tags}")
+        _capture_find_document_by_tag()
+    tags = request.args.getlist("tag")
 
     database = db.Node_collection()
     # opt_osib = request.args.get("osib")
@@ -338,6 +501,7 @@ def find_document_by_tag() -> Any:
 
 @openapi_documented("map_analysis")
 @app.route("/rest/v1/map_analysis", methods=["GET"])
+@dataset_conditional()
 def map_analysis() -> Any:
     standards = request.args.getlist("standard")
     if posthog:
@@ -351,6 +515,9 @@ def map_analysis() -> Any:
 
     # ----- PR #825: OpenCRE fast path (SQL cache only on Heroku) -----
     if OPENCRE_STANDARD_NAME in standards:
+        encoded_response = _encoded_gap_analysis_response(database, standards_hash)
+        if encoded_response is not None:
+            return encoded_response
         if database.gap_analysis_exists(standards_hash):
             cached = database.get_gap_analysis_result(cache_key=standards_hash)
             if cached:
@@ -368,6 +535,9 @@ def map_analysis() -> Any:
 
     # ----- upstream: cached result -----
     cache_key = standards_hash
+    encoded_response = _encoded_gap_analysis_response(database, cache_key)
+    if encoded_response is not None:
+        return encoded_response
     if database.gap_analysis_exists(cache_key):
         cached = database.get_gap_analysis_result(cache_key=cache_key)
         if cached:
@@ -412,7 +582,7 @@ def map_analysis() -> Any:
                     job.JobStatus.QUEUED,
                     job.JobStatus.STARTED,
                 ):
-                    return jsonify({"job_id": inflight_job_id})
+                    return _job_response(inflight_job_id)
             except exceptions.NoSuchJobError:
                 conn.delete(inflight_key)
 
@@ -428,7 +598,7 @@ def map_analysis() -> Any:
         )
         conn.set(inflight_key, str(j.id))
         conn.expire(inflight_key, _ga_timeout_seconds())
-        return jsonify({"job_id": str(j.id)})
+        return _job_response(str(j.id))
     except Exception as exc:
         logger.warning(
             "Redis/RQ unavailable in map_analysis for %s; using synchronous fallback: %s",
@@ -444,6 +614,7 @@ def map_analysis() -> Any:
 
 @openapi_documented("map_analysis_weak_links")
 @app.route("/rest/v1/map_analysis_weak_links", methods=["GET"])
+@dataset_conditional()
 def map_analysis_weak_links() -> Any:
     standards = request.args.getlist("standard")
     if posthog:
@@ -453,6 +624,9 @@ def map_analysis_weak_links() -> Any:
     cache_key = gap_analysis.make_subresources_key(standards=standards, key=key)
 
     database = db.Node_collection()
+    encoded_response = _encoded_gap_analysis_response(database, cache_key)
+    if encoded_response is not None:
+        return encoded_response
     gap_analysis_results = database.get_gap_analysis_result(cache_key=cache_key)
     if gap_analysis_results:
         gap_analysis_dict = json.loads(gap_analysis_results)
@@ -468,6 +642,61 @@ def map_analysis_weak_links() -> Any:
     abort(404, "No such Cache")
 
 
+@openapi_documented("map_analysis_controls")
+@app.route("/rest/v1/map_analysis_controls", methods=["GET"])
+@dataset_conditional()
+def map_analysis_controls() -> Any:
+    """The cached map analysis of a pair one base control at a time: a page of
+    ``result`` entries, or every entry as NDJSON with ``format=ndjson``.
+
+    Served from the per-control index of the pair's GA row: only the entries
+    of the page are read and decoded, and NDJSON lines carry the stored JSON
+    as is. 404 until the pair has been computed through
+    ``/rest/v1/map_analysis``.
+    """
+    standards = request.args.getlist("standard")
+    if posthog:
+        posthog.capture("map_analysis_controls", f"standards:{standards}")
+    if len(standards) < 2:
+        abort(400, "Please provide two standards")
+    cache_key = gap_analysis.make_resources_key(standards[:2])
+    database = db.Node_collection()
+
+    if request.args.get("format") == "ndjson":
+        controls = database.iter_gap_analysis_controls(cache_key)
+        if controls is None:
+            abort(404, "No such Cache")
+        lines = (
+            '{"key": %s, "result": %s}\n' % (json.dumps(key), value)
+            for key, value in controls
+        )
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", ITEMS_PER_PAGE, type=int)
+    if page < 1:
+        page = 1
+    if per_page < 1:
+        per_page = ITEMS_PER_PAGE
+    per_page = min(per_page, MAX_ITEMS_PER_PAGE)
+
+    found = database.gap_analysis_controls(
+        cache_key, offset=(page - 1) * per_page, limit=per_page
+    )
+    if found is None:
+        abort(404, "No such Cache")
+    total, controls = found
+    return jsonify(
+        {
+            "result": {key: json.loads(value) for key, value in controls},
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "total_pages": -(-total // per_page),
+        }
+    )
+
+
 @openapi_documented("fetch_job")
 @app.route("/rest/v1/ma_job_results", methods=["GET"])
 def fetch_job() -> Any:
@@ -531,11 +760,17 @@ def fetch_job() -> Any:
         abort(500)
 
 
+def _capture_standards() -> None:
+    posthog.capture("standards", "")
+
+
 @openapi_documented("standards")
 @app.route("/rest/v1/standards", methods=["GET"])
+@dataset_conditional(per_user=True)
+@cached_response(per_user=True, capture=_capture_standards)
 def standards() -> Any:
     if posthog:
-        posthog.capture("standards", "")
+        _capture_standards()
 
     database = db.Node_collection()
     standards = list(database.standards())
@@ -597,7 +832,8 @@ def text_search() -> Any:
               all entries of <name> and optionally, section/subsection
         * '\d\d\d-\d\d\d' (two sets of 3 digits) will first try to match
                            CRE ids before it performs a free text search
-        Anything else will be a case insensitive LIKE query in the database
+        Anything else is a ranked full text search over node and CRE names,
+        sections and descriptions
     """
     database = db.Node_collection()
     text = request.args.get("text")
@@ -652,19 +888,33 @@ def health() -> Any:
 
     database = db.Node_collection()
     result = database.health_check()
+    # Only caches this process already uses: building one here would connect
+    # to Redis on every probe.
+    for name, cache in (
+        ("response_cache", response_cache.ResponseCache.existing()),
+        ("query_embedding_cache", query_embedding_cache.QueryEmbeddingCache.existing()),
+    ):
+        if cache is not None:
+            result[name] = cache.stats()
     status_code = 200 if result.get("ok") else 503
     return jsonify(result), status_code
 
 
+def _capture_find_root_cres() -> None:
+    posthog.capture("find_root_cres", "")
+
+
 @openapi_documented("find_root_cres")
 @app.route("/rest/v1/root_cres", methods=["GET"])
+@dataset_conditional()
+@cached_response(capture=_capture_find_root_cres)
 def find_root_cres() -> Any:
     """
     Useful for fast browsing the graph from the top
 
     """
     if posthog:
-        posthog.capture("find_root_cres", "")
+        _capture_find_root_cres()
 
     database = db.Node_collection()
     # opt_osib = request.args.get("osib")
@@ -1146,6 +1396,11 @@ def admin_import_run_apply(run_id: str) -> Any:
                 "applied_ops": res.applied_ops,
                 "skipped_ops": res.skipped_ops,
                 "already_applied": res.already_applied,
+                "gap_analysis_invalidation": (
+                    res.ga_invalidation_report.to_dict()
+                    if res.ga_invalidation_report
+                    else None
+                ),
             }
         )
     except import_apply.ApplyConflict as ae:
@@ -1397,6 +1652,7 @@ def put_user_resources() -> Any:
 
 @openapi_documented("all_cres")
 @app.route("/rest/v1/all_cres", methods=["GET"])
+@dataset_conditional()
 def all_cres() -> Any:
     database = db.Node_collection()
     if posthog:
@@ -1431,27 +1687,33 @@ def get_cre_csv() -> Any:
         posthog.capture("get_cre_csv", "")
 
     database = db.Node_collection()
-    root_cres = database.get_root_cres()
-    if root_cres:
-        docs = sheet_utils.generate_mapping_template_file(
-            database=database, docs=root_cres
-        )
-        csvVal = write_csv(docs=docs).getvalue().encode("utf-8")
-
-        # Creating the byteIO object from the StringIO Object
-        mem = io.BytesIO()
-        mem.write(csvVal)
-        mem.seek(0)
-
-        return send_file(
-            mem,
-            as_attachment=True,
-            download_name="CRE-Catalogue.csv",
+    if database.cre_hierarchy().roots():
+        # built from CRE ids and names only; written out in chunks
+        rows = export_stream.mapping_template_rows(database)
+        return Response(
+            stream_with_context(export_stream.iter_csv(rows, fieldnames=list(rows[0]))),
             mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=CRE-Catalogue.csv"},
         )
     abort(404)
 
 
+@openapi_documented("export_jsonl")
+@app.route("/rest/v1/export_jsonl", methods=["GET"])
+def export_jsonl() -> Any:
+    """Every CRE with its links, then every unlinked node, one JSON document
+    per line, streamed from the database in id order."""
+    if posthog:
+        posthog.capture("export_jsonl", "")
+
+    database = db.Node_collection()
+    return Response(
+        stream_with_context(export_stream.iter_jsonl(database)),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=opencre.jsonl"},
+    )
+
+
 @openapi_documented("get_config")
 @app.route("/rest/v1/config", methods=["GET"])
 def get_config() -> Any:
@@ -210,6 +210,16 @@ def main() -> None:
         action="store_true",
         help="delete all embedding rows then rebuild embeddings for every CRE and node (use after smart-extract or model changes)",
     )
+    parser.add_argument(
+        "--export_embeddings",
+        action="store_true",
+        help="write every doc type's embeddings to the memory-mapped float32 store (CRE_EMBEDDING_STORE_DIR, default <cache>.embeddings/) that the chatbot and librarian load",
+    )
+    parser.add_argument(
+        "--export_tarball",
+        default="",
+        help="stream the whole database (every CRE with its links, then every unlinked node) into one .tar.gz of YAML documents at this path",
+    )
     parser.add_argument(
         "--run_librarian",
         action="store_true",
@@ -261,6 +271,14 @@ def main() -> None:
         action="store_true",
         help="calculate only missing directed gap-analysis pairs in the current cache DB",
     )
+    parser.add_argument(
+        "--ga_storage_backfill",
+        choices=["compressed", "text"],
+        default="",
+        help="rewrite stored gap-analysis rows into the given storage mode "
+        "(compressed = gzip payload + content hash, see CRE_GA_STORAGE) "
+        "and index the controls of pairs cached before the per-control index",
+    )
     parser.add_argument(
         "--ga_backfill_batch_size",
         type=int,
@@ -284,6 +302,13 @@ def main() -> None:
         action="store_true",
         help="compute missing GA pairs synchronously without RQ queue",
     )
+    parser.add_argument(
+        "--ga_backfill_workers",
+        type=int,
+        default=0,
+        help="compute missing GA pairs on this many local processes, most expensive "
+        "first, resuming an interrupted run (0 = use the RQ queue / sync mode)",
+    )
     parser.add_argument(
         "--delete_map_analysis_for",
         default="",
@@ -309,6 +334,30 @@ def main() -> None:
         default="",
         help="output CSV path for --export",
     )
+    parser.add_argument(
+        "--harvest",
+        action="store_true",
+        help="fetch and diff the harvester repositories since their checkpoints"
+        " (a dry run: nothing consumes the diffs yet, so only first-run"
+        " baselines are recorded)",
+    )
+    parser.add_argument(
+        "--harvest_config",
+        default="",
+        help="repos.yaml to harvest (default: the packaged harvester repos.yaml)",
+    )
+    parser.add_argument(
+        "--harvest_workers",
+        type=int,
+        default=4,
+        help="repositories to fetch and diff in parallel with --harvest",
+    )
+    parser.add_argument(
+        "--harvest_per_host",
+        type=int,
+        default=2,
+        help="concurrent git fetches/clones per host with --harvest",
+    )
     parser.add_argument(
         "--run_noise_filter",
         action="store_true",
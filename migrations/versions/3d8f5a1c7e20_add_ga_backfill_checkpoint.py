@@ -0,0 +1,33 @@
+"""add ga_backfill_checkpoint table
+
+Revision ID: 3d8f5a1c7e20
+Revises: 5c1e7a9d2b64
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "3d8f5a1c7e20"
+down_revision = "5c1e7a9d2b64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ga_backfill_checkpoint",
+        sa.Column("cache_key", sa.String(), primary_key=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("ga_backfill_checkpoint")
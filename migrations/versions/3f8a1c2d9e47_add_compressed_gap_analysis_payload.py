@@ -0,0 +1,38 @@
+"""add compressed payload columns to gap_analysis_results
+
+Revision ID: 3f8a1c2d9e47
+Revises: 967016ee10fa
+Create Date: 2026-10-18
+
+Rows written with CRE_GA_STORAGE=compressed keep their JSON body gzip'ed in
+ga_payload (ga_object is NULL) with its SHA-256 and a schema version, so the
+web layer can stream it without decoding. Existing rows stay as text until
+`cre.py --ga_storage_backfill compressed` rewrites them.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "3f8a1c2d9e47"
+down_revision = "967016ee10fa"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("gap_analysis_results") as batch_op:
+        batch_op.add_column(sa.Column("ga_payload", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("payload_encoding", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("content_hash", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("schema_version", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    # Compressed rows have no text body; rewrite them before dropping the
+    # columns (`cre.py --ga_storage_backfill text`).
+    with op.batch_alter_table("gap_analysis_results") as batch_op:
+        batch_op.drop_column("schema_version")
+        batch_op.drop_column("content_hash")
+        batch_op.drop_column("payload_encoding")
+        batch_op.drop_column("ga_payload")
@@ -0,0 +1,86 @@
+"""add text_search_index for text_search
+
+Revision ID: 5c1e7a9d2b64
+Revises: 8b2e4d6f1a93
+Create Date: 2026-10-18
+
+One row per node / CRE: a title (name, section id, section / CRE name,
+external id) and a body (subsection, description, link / CRE description),
+backfilled here and maintained by add_node / add_cre and the import apply
+engine.
+
+- Postgres: a plain table with a generated, weighted tsvector and a GIN index.
+- SQLite: an FTS5 virtual table. If SQLite was built without FTS5, the table is
+  skipped and text search keeps using LIKE scans.
+
+The DDL is spelled out here rather than imported from the application so
+the migration replays the same way whatever the current code looks like.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+
+
+revision = "5c1e7a9d2b64"
+down_revision = "8b2e4d6f1a93"
+branch_labels = None
+depends_on = None
+
+
+def _backfill():
+    op.execute(
+        "INSERT INTO text_search_index (doc_id, kind, title, body)"
+        " SELECT id, 'node',"
+        " COALESCE(name, '') || ' ' || COALESCE(section_id, '')"
+        " || ' ' || COALESCE(section, ''),"
+        " COALESCE(subsection, '') || ' ' || COALESCE(description, '')"
+        " || ' ' || COALESCE(link, '')"
+        " FROM node"
+    )
+    op.execute(
+        "INSERT INTO text_search_index (doc_id, kind, title, body)"
+        " SELECT id, 'cre',"
+        " COALESCE(name, '') || ' ' || COALESCE(external_id, ''),"
+        " COALESCE(description, '')"
+        " FROM cre"
+    )
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE text_search_index ("
+            " doc_id VARCHAR PRIMARY KEY,"
+            " kind VARCHAR NOT NULL,"
+            " title TEXT NOT NULL DEFAULT '',"
+            " body TEXT NOT NULL DEFAULT '',"
+            " tsv tsvector GENERATED ALWAYS AS ("
+            "  setweight(to_tsvector('simple', title), 'A')"
+            "  || setweight(to_tsvector('simple', body), 'B')"
+            " ) STORED)"
+        )
+        op.execute(
+            "CREATE INDEX ix_text_search_index_tsv"
+            " ON text_search_index USING GIN (tsv)"
+        )
+    elif conn.dialect.name == "sqlite":
+        try:
+            conn.execute(
+                sa.text(
+                    "CREATE VIRTUAL TABLE text_search_index USING fts5("
+                    "doc_id UNINDEXED, kind UNINDEXED, title, body,"
+                    " tokenize = 'unicode61')"
+                )
+            )
+        except OperationalError:
+            # SQLite without FTS5: text search keeps using LIKE scans
+            return
+    else:
+        return
+    _backfill()
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS text_search_index")
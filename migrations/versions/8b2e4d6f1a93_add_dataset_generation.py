@@ -0,0 +1,32 @@
+"""add dataset_generation counter
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3f8a1c2d9e47
+Create Date: 2026-10-18
+
+Single-row counter bumped by imports (import_pipeline.apply_parse_result,
+import_apply.apply_changeset). Read-only REST endpoints derive their ETags
+from it.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "8b2e4d6f1a93"
+down_revision = "3f8a1c2d9e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_generation",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("generation", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("dataset_generation")
@@ -0,0 +1,34 @@
+"""add gap_analysis_control table (per-control map analysis index)
+
+Revision ID: 9e4b6c2d8a13
+Revises: 3d8f5a1c7e20
+Create Date: 2026-10-18
+
+Each row holds one entry of a pair's ``result``, compressed on its own.
+Indexing needs the application's JSON scanning, so existing caches are
+indexed by ``cre.py --ga_storage_backfill``; until then their pairs are paged
+by parsing the whole row.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "9e4b6c2d8a13"
+down_revision = "3d8f5a1c7e20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "gap_analysis_control",
+        sa.Column("cache_key", sa.String(), primary_key=True),
+        sa.Column("position", sa.Integer(), primary_key=True),
+        sa.Column("control_key", sa.String(), nullable=False),
+        sa.Column("value", sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("gap_analysis_control")
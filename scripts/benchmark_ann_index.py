@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""Benchmark ANN embedding search (application.utils.ann_index) against exact.
+
+Indexes either the embeddings of a SQLite cache (``--cache_file``) or a
+synthetic clustered hub, then reports build time, p50/p95 query latency and
+recall@1 / recall@10 versus exact cosine for every available backend.
+
+Usage:
+    python scripts/benchmark_ann_index.py [--cache_file standards_cache.sqlite] \\
+        [--doc_type CRE] [--size 50000] [--dim 768] [--queries 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from application.utils import ann_index
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _synthetic(size: int, dim: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, size // 50), dim))
+    return (
+        centres[rng.integers(0, len(centres), size)]
+        + 0.5 * rng.normal(size=(size, dim))
+    ).astype(np.float32)
+
+
+def _load_cache(path: str, doc_type: str) -> Tuple[List[str], np.ndarray]:
+    from application.cmd import cre_main
+
+    embeddings = cre_main.db_connect(path).get_embeddings_by_doc_type(doc_type)
+    if not embeddings:
+        raise SystemExit(f"no {doc_type} embeddings in {path}")
+    return list(embeddings), np.asarray(list(embeddings.values()), dtype=np.float32)
+
+
+def _run(
+    backend: str,
+    ids: Sequence[str],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: List[List[str]],
+) -> Dict[str, float]:
+    start = time.perf_counter()
+    index = ann_index.build_index(ids, vectors, backend=backend)
+    build = time.perf_counter() - start
+    latencies, recall1, recall10 = [], 0, 0.0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = [object_id for object_id, _ in index.search(query, 10)]
+        latencies.append(time.perf_counter() - start)
+        recall1 += bool(found) and found[0] == expected[0]
+        recall10 += len(set(found) & set(expected)) / len(expected)
+    return {
+        "build_s": build,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "recall1": recall1 / len(queries),
+        "recall10": recall10 / len(queries),
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache_file", default="")
+    parser.add_argument("--doc_type", default="CRE")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if args.cache_file:
+        ids, vectors = _load_cache(args.cache_file, args.doc_type)
+    else:
+        vectors = _synthetic(args.size, args.dim, seed=0)
+        ids = [str(i) for i in range(len(vectors))]
+    # queries are perturbed corpus vectors, like a re-worded section text
+    rng = np.random.default_rng(1)
+    picked = vectors[rng.integers(0, len(vectors), args.queries)]
+    scale = 0.1 * float(np.abs(picked).mean())
+    queries = picked + scale * rng.normal(size=picked.shape).astype(np.float32)
+
+    exact = ann_index.build_index(ids, vectors, backend="exact")
+    truth = [[object_id for object_id, _ in exact.search(q, 10)] for q in queries]
+
+    backends = ["exact", "ivf"]
+    try:
+        import hnswlib  # type: ignore  # noqa: F401
+
+        backends.append("hnswlib")
+    except ImportError:
+        pass
+
+    print(f"{len(ids)} vectors x {vectors.shape[1]} dims, {len(queries)} queries")
+    print(
+        f"{'backend':<10}{'build s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'recall@1':>10}{'recall@10':>11}"
+    )
+    for backend in backends:
+        r = _run(backend, ids, vectors, queries, truth)
+        print(
+            f"{backend:<10}{r['build_s']:>9.2f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+            f"{r['recall1']:>10.3f}{r['recall10']:>11.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""Benchmark standard registration: register_node per entry vs the bulk writer.
+
+Imports the same synthetic standard (``--sections`` controls, each linked to a
+few of ``--cres`` CREs, with part of it already present from an earlier
+import) into two fresh SQLite databases, once through ``register_node`` per
+entry and once through ``register_nodes_bulk``. Reports wall time, controls/s,
+SQL statements and commits for each, then checks the two databases with
+``scripts/benchmark_import_parity.py``'s ``diff_databases``.
+
+Usage:
+    python scripts/benchmark_bulk_import.py [--sections 2000] [--cres 400] \\
+        [--preexisting 0.25]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+import benchmark_import_parity
+from application import sqla  # type: ignore
+from application.cmd import cre_main
+from application.database import db
+from application.defs import cre_defs as defs
+
+NAME = "BenchmarkStandard"
+
+
+def _cres(count: int) -> List[defs.CRE]:
+    return [
+        defs.CRE(id=f"{i // 1000:03d}-{i % 1000:03d}", name=f"CRE {i}")
+        for i in range(count)
+    ]
+
+
+def _entries(sections: int, cres: List[defs.CRE]) -> List[defs.Standard]:
+    entries = []
+    for i in range(sections):
+        standard = defs.Standard(
+            name=NAME,
+            section=f"control {i}",
+            sectionID=f"V{i}",
+            description=f"verify control {i}",
+            hyperlink=f"https://example.com/{i}",
+            tags=["family:standard"],
+        )
+        for j in {i % len(cres), (i * 7 + 1) % len(cres), (i * 13 + 5) % len(cres)}:
+            standard.add_link(
+                defs.Link(document=cres[j], ltype=defs.LinkTypes.LinkedTo)
+            )
+        entries.append(standard)
+    return entries
+
+
+def _per_row(entries: List[defs.Standard], collection: db.Node_collection) -> None:
+    for entry in entries:
+        cre_main.register_node(entry, collection)
+
+
+def _run(
+    path: str,
+    register: Callable[[List[defs.Standard], db.Node_collection], None],
+    args: argparse.Namespace,
+) -> Dict[str, float]:
+    collection = cre_main.db_connect(path)
+    sqla.create_all()
+    cres = _cres(args.cres)
+    for cre in cres:
+        collection.add_cre(cre)
+    previous = int(args.sections * args.preexisting)
+    if previous:
+        _per_row(_entries(previous, cres), collection)
+
+    counts = {"statements": 0, "commits": 0}
+
+    def statement(*_: object) -> None:
+        counts["statements"] += 1
+
+    def commit(*_: object) -> None:
+        counts["commits"] += 1
+
+    engine = collection.session.get_bind()
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    try:
+        start = time.perf_counter()
+        register(_entries(args.sections, cres), collection)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", statement)
+        event.remove(engine, "commit", commit)
+    sqla.session.remove()
+    return {"seconds": elapsed, "rate": args.sections / elapsed, **counts}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=2000)
+    parser.add_argument("--cres", type=int, default=400)
+    parser.add_argument(
+        "--preexisting",
+        type=float,
+        default=0.25,
+        help="fraction of the controls already imported (exercises updates)",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            "per-row": os.path.join(tmp, "per_row.sqlite"),
+            "bulk": os.path.join(tmp, "bulk.sqlite"),
+        }
+        results = {
+            "per-row": _run(paths["per-row"], _per_row, args),
+            "bulk": _run(paths["bulk"], cre_main.register_nodes_bulk, args),
+        }
+        print(
+            f"{'path':<9}{'seconds':>9}{'controls/s':>12}{'statements':>12}{'commits':>9}"
+        )
+        for path, r in results.items():
+            print(
+                f"{path:<9}{r['seconds']:>9.2f}{r['rate']:>12.0f}"
+                f"{r['statements']:>12}{r['commits']:>9}"
+            )
+        same = benchmark_import_parity.diff_databases(
+            paths["bulk"], paths["per-row"], os.path.join(tmp, "parity.log")
+        )
+    print("parity:", "identical" if same else "DIFFERENT")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Benchmark CRE_Graph.add_link cycle checking against graph size.
+
+For each size, links a synthetic CRE hierarchy (every CRE is contained in a
+random earlier one, then ``--related`` Related links per CRE, some of which
+would close a cycle and are rejected) into a fresh in-memory graph. Times:
+
+* incremental: ``CRE_Graph`` as shipped (dynamic topological order),
+* copy: the previous check, copying the graph and running ``nx.find_cycle``
+  on the copy for every CRE->CRE link (only up to ``--copy-max`` CREs, it is
+  quadratic).
+
+Both must accept and reject the same links.
+
+Usage:
+    python scripts/benchmark_cre_graph.py [--sizes 500,1000,2000,4000,8000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import networkx as nx
+
+from application.database.inmemory_graph import CRE_Graph, CycleDetectedError
+from application.defs import cre_defs as defs
+
+
+class CopyingGraph(CRE_Graph):
+    """The pre-incremental check: add the edge to a copy and search it."""
+
+    def introduces_cycle(self, doc_from: defs.Document, link_to: defs.Link):
+        graph = self.get_raw_graph()
+        try:
+            nx.find_cycle(graph)
+            raise ValueError("Existing graph contains cycle")
+        except nx.exception.NetworkXNoCycle:
+            pass
+        new_graph = graph.copy()
+        edge = self._CRE_Graph__graph_edge(
+            doc_from=doc_from, link_to=link_to, graph=new_graph
+        )
+        if edge is not None:
+            new_graph.add_edge(edge[0], edge[1], ltype=edge[2])
+        try:
+            return nx.find_cycle(new_graph)
+        except nx.exception.NetworkXNoCycle:
+            return None
+
+
+def _links(size: int, related: int, seed: int) -> List[Tuple[defs.CRE, defs.Link]]:
+    rng = random.Random(seed)
+    cres = [
+        defs.CRE(name=f"cre {i}", id=f"{i // 1000:03d}-{i % 1000:03d}")
+        for i in range(size)
+    ]
+    links = [
+        (
+            cres[rng.randrange(i)],
+            defs.Link(document=cres[i], ltype=defs.LinkTypes.Contains),
+        )
+        for i in range(1, size)
+    ]
+    for _ in range(size * related):
+        a, b = rng.sample(cres, 2)
+        links.append((a, defs.Link(document=b, ltype=defs.LinkTypes.Related)))
+    return links
+
+
+def _run(graph_cls: type, links: List[Tuple[defs.CRE, defs.Link]]) -> Tuple[float, int]:
+    graph = graph_cls()
+    graph.with_graph(graph=nx.DiGraph(), graph_data=[])
+    rejected = 0
+    start = time.perf_counter()
+    for doc_from, link in links:
+        try:
+            graph.add_link(doc_from, link)
+        except CycleDetectedError:
+            rejected += 1
+    return time.perf_counter() - start, rejected
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="500,1000,2000,4000,8000")
+    parser.add_argument("--related", type=int, default=1)
+    parser.add_argument("--copy-max", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    # every rejected link logs a warning with its cycle
+    logging.getLogger("application.database.inmemory_graph").setLevel(logging.ERROR)
+
+    print(f"{'CREs':>6}{'links':>8}{'rejected':>10}{'incremental s':>15}{'copy s':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        links = _links(size, args.related, args.seed)
+        fast, rejected = _run(CRE_Graph, links)
+        slow = "-"
+        if size <= args.copy_max:
+            seconds, copy_rejected = _run(CopyingGraph, links)
+            if copy_rejected != rejected:
+                print(f"mismatch at {size}: {rejected} vs {copy_rejected} rejected")
+                return 1
+            slow = f"{seconds:.2f}"
+        print(f"{size:>6}{len(links):>8}{rejected:>10}{fast:>15.3f}{slow:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""Benchmark cre_defs.Document equality and hashing on large CREs.
+
+Builds a CRE linked to ``--links`` standards (each with tags and a
+``--dim``-wide embedding) plus a deep copy with its links reversed, then
+times ``==`` and ``hash`` against the previous implementations: pairwise
+``a in other.links and b in self.links`` over every pair of links (and of
+embedding floats), and ``hash(json.dumps(todict()))``.
+
+Usage:
+    python scripts/benchmark_document_equality.py [--links 100,400,1600] [--dim 32]
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.defs import cre_defs as defs
+
+
+def pairwise_eq(a: Any, b: Any) -> bool:
+    """The Document.__eq__ this change replaced."""
+    if isinstance(a, defs.Link):
+        return (
+            type(b) is defs.Link
+            and a.ltype.value == b.ltype.value
+            and a.tags == b.tags
+            and pairwise_eq(a.document, b.document)
+        )
+    return (
+        isinstance(b, type(a))
+        and a.id == b.id
+        and a.name == b.name
+        and a.doctype.value == b.doctype.value
+        and a.description == b.description
+        and len(a.links) == len(b.links)
+        and all(
+            [
+                any(pairwise_eq(x, y) for y in b.links)
+                and any(pairwise_eq(y, x) for x in a.links)
+                for x in a.links
+                for y in b.links
+            ]
+        )
+        and all([x in b.tags and y in a.tags for x in a.tags for y in b.tags])
+        and a.metadata == b.metadata
+        and all(
+            [
+                x in b.embeddings and y in a.embeddings
+                for x in a.embeddings
+                for y in b.embeddings
+            ]
+        )
+        and a.embeddings_text == b.embeddings_text
+    )
+
+
+def json_hash(doc: defs.Document) -> int:
+    return hash(json.dumps(doc.todict()))
+
+
+def _cre(links: int, dim: int) -> defs.CRE:
+    rng = random.Random(links)
+    cre = defs.CRE(id="111-111", name="large cre", description="d")
+    for i in range(links):
+        standard = defs.Standard(
+            name="ASVS",
+            sectionID=f"V{i}",
+            section=f"control {i}",
+            tags=["family:standard", f"t{i % 7}"],
+            embeddings=[rng.random() for _ in range(dim)],
+        )
+        cre.add_link(defs.Link(document=standard, ltype=defs.LinkTypes.LinkedTo))
+    return cre
+
+
+def _time(fn: Callable[[], Any], budget: float = 2.0) -> float:
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > budget or runs >= 50:
+            return elapsed / runs
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", default="100,400,1600")
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument(
+        "--pairwise-max",
+        type=int,
+        default=100,
+        help="largest link count to time the pairwise equality on (it is at least cubic)",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'links':>6}{'eq ms':>10}{'pairwise ms':>13}{'hash ms':>10}{'json hash ms':>14}"
+    )
+    for links in (int(n) for n in args.links.split(",")):
+        cre = _cre(links, args.dim)
+        other = copy.deepcopy(cre)
+        other.links.reverse()
+        assert cre == other and hash(cre) == hash(other)
+        eq = _time(lambda: cre == other) * 1000
+        pairwise = "-"
+        if links <= args.pairwise_max:
+            assert pairwise_eq(cre, other)
+            pairwise = f"{_time(lambda: pairwise_eq(cre, other), budget=0) * 1000:.1f}"
+        hashed = _time(lambda: hash(cre)) * 1000
+        dumped = _time(lambda: json_hash(cre)) * 1000
+        print(f"{links:>6}{eq:>10.2f}{pairwise:>13}{hashed:>10.2f}{dumped:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
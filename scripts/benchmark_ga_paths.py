@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+"""Benchmark post-processing of gap analysis paths.
+
+Two stages, each against the implementation it replaced, on the same paths and
+checking both produce the same output:
+
+* formatting Neo4j path records (``NEO_DB._format_gap_analysis_response``),
+  which used to find each segment's nodes by a linear scan and parse every
+  node occurrence; the records are built in memory, no Neo4j needed.
+* scoring and grouping (``db._group_gap_analysis_paths``), which used to call
+  ``get_path_score`` per path.
+
+Paths come from a recorded fixture (``--fixture``) or are synthesised: a base
+standard whose sections reach ``--targets`` sections of another standard
+through chains of up to ``--hops`` CREs. ``--record`` writes the paths a real
+pair returns from the in-memory engine so they can be replayed later.
+
+Usage:
+    python scripts/benchmark_ga_paths.py [--paths 20000] [--runs 3]
+    python scripts/benchmark_ga_paths.py --cache_file standards_cache.sqlite \\
+        --record ga_paths.json --standard ASVS --standard "NIST 800-53"
+    python scripts/benchmark_ga_paths.py --fixture ga_paths.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.database import db
+from application.defs import cre_defs as defs
+from application.utils.gap_analysis import get_path_score
+
+RELATIONSHIPS = ["CONTAINS", "CONTAINS", "RELATED", "LINKED_TO", "SAME"]
+REL_MODELS = {
+    "RELATED": db.RelatedRel,
+    "CONTAINS": db.ContainsRel,
+    "LINKED_TO": db.LinkedToRel,
+    "AUTOMATICALLY_LINKED_TO": db.AutoLinkedToRel,
+    "SAME": db.SameRel,
+}
+
+
+def legacy_format(base_standard, path_records):
+    """The NEO_DB._format_gap_analysis_response this change replaced."""
+    relation_map = {model: name for name, model in REL_MODELS.items()}
+
+    def format_segment(seg, nodes):
+        start_node = [
+            node for node in nodes if node.element_id == seg._start_node_element_id
+        ][0]
+        end_node = [
+            node for node in nodes if node.element_id == seg._end_node_element_id
+        ][0]
+        return {
+            "start": db.NEO_DB.parse_node_no_links(start_node),
+            "end": db.NEO_DB.parse_node_no_links(end_node),
+            "relationship": relation_map.get(type(seg), "RELATED"),
+        }
+
+    parsed_base = [db.NEO_DB.parse_node_no_links(rec) for rec in base_standard]
+    parsed_paths = [
+        {
+            "start": db.NEO_DB.parse_node_no_links(rec.start_node),
+            "end": db.NEO_DB.parse_node_no_links(rec.end_node),
+            "path": [format_segment(seg, rec.nodes) for seg in rec.relationships],
+        }
+        for rec in (record[0] for record in path_records)
+    ]
+    return parsed_base, parsed_paths
+
+
+def _neo_node(doc: defs.Document) -> Any:
+    if doc.doctype == defs.Credoctypes.CRE:
+        node = db.NeoCRE(name=doc.name, description="", tags=[], external_id=doc.id)
+    else:
+        node = db.NeoStandard(
+            name=doc.name,
+            description="",
+            tags=[],
+            version="",
+            hyperlink="",
+            section=doc.section,
+            section_id=doc.sectionID,
+            subsection=doc.subsection,
+        )
+    node.element_id_property = f"4:{doc.id}"
+    return node
+
+
+def neo_records(
+    base_standard: List[defs.Document], paths: List[Dict[str, Any]]
+) -> Tuple[List[Any], List[List[Any]]]:
+    """Path records as cypher_query(resolve_objects=True) returns them: fresh
+    node objects per record, relationships pointing at nodes by element id."""
+    records = []
+    for path in paths:
+        nodes = {}
+        relationships = []
+        for step in path["path"]:
+            for doc in (step["start"], step["end"]):
+                nodes.setdefault(doc.id, _neo_node(doc))
+            rel = REL_MODELS[step["relationship"]]()
+            rel._start_node_element_id_property = nodes[step["start"].id].element_id
+            rel._end_node_element_id_property = nodes[step["end"].id].element_id
+            relationships.append(rel)
+        record = SimpleNamespace(
+            start_node=nodes.get(path["start"].id) or _neo_node(path["start"]),
+            end_node=nodes.get(path["end"].id) or _neo_node(path["end"]),
+            nodes=list(nodes.values()),
+            relationships=relationships,
+        )
+        records.append([record])
+    return [_neo_node(doc) for doc in base_standard], records
+
+
+def legacy_group(
+    base_standard: List[defs.Document], paths: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """The _group_gap_analysis_paths this change replaced."""
+    grouped_paths: Dict[str, Any] = {}
+    extra_paths_dict: Dict[str, Any] = {}
+    for node in list(base_standard) + [p["start"] for p in paths]:
+        if node.id and node.id not in grouped_paths:
+            grouped_paths[node.id] = {"start": node, "paths": {}, "extra": 0}
+            extra_paths_dict[node.id] = {"paths": {}}
+    for path in paths:
+        key = path["start"].id
+        end_key = path["end"].id
+        if not end_key:
+            continue
+        path["score"] = get_path_score(path)
+        del path["start"]
+        if path["score"] <= 2:
+            if end_key in extra_paths_dict[key]["paths"]:
+                del extra_paths_dict[key]["paths"][end_key]
+                grouped_paths[key]["extra"] -= 1
+            if end_key in grouped_paths[key]["paths"]:
+                if grouped_paths[key]["paths"][end_key]["score"] > path["score"]:
+                    grouped_paths[key]["paths"][end_key] = path
+            else:
+                grouped_paths[key]["paths"][end_key] = path
+        else:
+            if end_key in grouped_paths[key]["paths"]:
+                continue
+            if end_key in extra_paths_dict[key]["paths"]:
+                if extra_paths_dict[key]["paths"][end_key]["score"] > path["score"]:
+                    extra_paths_dict[key]["paths"][end_key] = path
+            else:
+                extra_paths_dict[key]["paths"][end_key] = path
+                grouped_paths[key]["extra"] += 1
+    return grouped_paths, extra_paths_dict
+
+
+def synthesise(
+    count: int, targets: int, hops: int, seed: int
+) -> Tuple[List[defs.Document], List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    base = [defs.Standard(name="Base", sectionID=f"B{i}") for i in range(50)]
+    compare = [defs.Standard(name="Compare", sectionID=f"C{i}") for i in range(targets)]
+    cres = [
+        defs.CRE(name=f"cre {i}", id=f"{i // 1000:03}-{i % 1000:03}")
+        for i in range(2000)
+    ]
+    paths = []
+    for _ in range(count):
+        chain = [rng.choice(base)] + rng.sample(cres, rng.randint(1, hops))
+        chain.append(rng.choice(compare))
+        steps = []
+        for i, (a, b) in enumerate(zip(chain, chain[1:])):
+            ltype = "LINKED_TO" if i == 0 or b in compare else rng.choice(RELATIONSHIPS)
+            start, end = (a, b) if rng.random() < 0.5 else (b, a)
+            steps.append({"start": start, "end": end, "relationship": ltype})
+        paths.append({"start": chain[0], "end": chain[-1], "path": steps})
+    return base, paths
+
+
+def _doc(raw: Dict[str, Any]) -> defs.Document:
+    return defs.Document.from_dict(raw)
+
+
+def load_fixture(path: str) -> Tuple[List[defs.Document], List[Dict[str, Any]]]:
+    with open(path) as f:
+        raw = json.load(f)
+    paths = [
+        {
+            "start": _doc(p["start"]),
+            "end": _doc(p["end"]),
+            "path": [
+                {
+                    "start": _doc(s["start"]),
+                    "end": _doc(s["end"]),
+                    "relationship": s["relationship"],
+                }
+                for s in p["path"]
+            ],
+        }
+        for p in raw["paths"]
+    ]
+    return [_doc(d) for d in raw["base_standard"]], paths
+
+
+def record_fixture(cache_file: str, standards: List[str], path: str) -> None:
+    from application.cmd import cre_main
+    from application.database import inmemory_gap_analysis
+
+    cre_main.db_connect(path=cache_file)
+    engine = inmemory_gap_analysis.InMemoryGapAnalysis.instance(
+        db.Node_collection().session
+    )
+    base, paths = engine.gap_analysis(standards[0], standards[1])
+    raw = {
+        "base_standard": [d.todict() for d in base],
+        "paths": [
+            {
+                "start": p["start"].todict(),
+                "end": p["end"].todict(),
+                "path": [
+                    {
+                        "start": s["start"].todict(),
+                        "end": s["end"].todict(),
+                        "relationship": s["relationship"],
+                    }
+                    for s in p["path"]
+                ],
+            }
+            for p in paths
+        ],
+    }
+    with open(path, "w") as f:
+        json.dump(raw, f)
+    print(f"recorded {len(paths)} paths for {' >> '.join(standards)} to {path}")
+
+
+def _time(fn: Callable[[Any], Any], setup: Callable[[], Any], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=20000)
+    parser.add_argument("--targets", type=int, default=400)
+    parser.add_argument("--hops", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=16)
+    parser.add_argument("--fixture", default="")
+    parser.add_argument("--record", default="")
+    parser.add_argument("--cache_file", default="")
+    parser.add_argument("--standard", action="append", default=[])
+    args = parser.parse_args(argv)
+
+    if args.record:
+        if not args.cache_file or len(args.standard) != 2:
+            parser.error("--record needs --cache_file and two --standard")
+        record_fixture(args.cache_file, args.standard, args.record)
+        return 0
+
+    if args.fixture:
+        base, paths = load_fixture(args.fixture)
+    else:
+        base, paths = synthesise(args.paths, args.targets, args.hops, args.seed)
+
+    neo_base, records = neo_records(base, paths)
+    if db.NEO_DB._format_gap_analysis_response(neo_base, records) != legacy_format(
+        neo_base, records
+    ):
+        print("MISMATCH between legacy and indexed formatting")
+        return 1
+    expected = legacy_group(base, copy.deepcopy(paths))
+    if db._group_gap_analysis_paths(base, copy.deepcopy(paths)) != expected:
+        print("MISMATCH between legacy and batched grouping")
+        return 1
+
+    steps = sum(len(p["path"]) for p in paths)
+    print(f"{len(paths)} paths, {steps} steps, identical output")
+    stages = [
+        (
+            "format",
+            lambda: records,
+            lambda r: legacy_format(neo_base, r),
+            lambda r: db.NEO_DB._format_gap_analysis_response(neo_base, r),
+        ),
+        (
+            "group",
+            lambda: copy.deepcopy(paths),
+            lambda p: legacy_group(base, p),
+            lambda p: db._group_gap_analysis_paths(base, p),
+        ),
+    ]
+    for name, setup, legacy, current in stages:
+        before = _time(legacy, setup, args.runs)
+        after = _time(current, setup, args.runs)
+        print(
+            f"  {name:<8} legacy {before * 1000:9.1f} ms   "
+            f"now {after * 1000:9.1f} ms  ({before / after:.1f}x)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""Benchmark gap analysis result storage: text vs compressed (CRE_GA_STORAGE).
+
+Works on a throwaway copy of a SQLite cache. For each storage mode it rewrites
+every ``gap_analysis_results`` row (``backfill_gap_analysis_storage``), then
+reports the stored payload bytes, the VACUUMed file size, and p50/p95 latency
+of ``/rest/v1/map_analysis`` for a sample of cached primary pairs, requested
+the way browsers do (``Accept-Encoding: gzip``).
+
+Usage:
+    python scripts/benchmark_ga_storage.py --cache_file standards_cache.sqlite \\
+        [--pairs 50] [--runs 5]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import not_
+
+from application.cmd import cre_main
+from application.database import db
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _payload_bytes(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(COALESCE(LENGTH(ga_payload), LENGTH(CAST(ga_object AS BLOB)))), 0)"
+            " FROM gap_analysis_results"
+        ).fetchone()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return int(total)
+
+
+def _sample_pairs(limit: int) -> List[List[str]]:
+    rows = (
+        db.Node_collection()
+        .session.query(db.GapAnalysisResults.cache_key)
+        .filter(not_(db.GapAnalysisResults.cache_key.like("% >> %->%")))
+        .order_by(db.GapAnalysisResults.cache_key)
+        .limit(limit)
+        .all()
+    )
+    return [key.split(" >> ", 1) for (key,) in rows]
+
+
+def _time_requests(pairs: List[List[str]], runs: int) -> List[float]:
+    client = cre_main.app.test_client()
+    samples: List[float] = []
+    for _ in range(runs):
+        for a, b in pairs:
+            start = time.perf_counter()
+            response = client.get(
+                "/rest/v1/map_analysis",
+                query_string=[("standard", a), ("standard", b)],
+                headers={"Accept-Encoding": "gzip"},
+            )
+            response.get_data()
+            samples.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{a} >> {b}: HTTP {response.status_code}")
+    return samples
+
+
+def _run_mode(path: str, mode: str, pairs: int, runs: int) -> Dict[str, float]:
+    os.environ["CRE_GA_STORAGE"] = mode
+    cre_main.backfill_gap_analysis_storage(path, target=mode)
+    sample = _sample_pairs(pairs)
+    latencies = _time_requests(sample, runs) if sample else [0.0]
+    payload = _payload_bytes(path)
+    return {
+        "payload_bytes": payload,
+        "file_bytes": os.path.getsize(path),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache_file", required=True)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DYNO", "benchmark")  # cache misses 404, never compute
+    os.environ.setdefault("INSECURE_REQUESTS", "1")  # no https redirect
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        shutil.copyfile(args.cache_file, path)
+        results = {
+            mode: _run_mode(path, mode, args.pairs, args.runs)
+            for mode in ("text", "compressed")
+        }
+
+    print(f"{'mode':<12}{'payload MB':>12}{'file MB':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<12}{r['payload_bytes'] / 1e6:>12.2f}{r['file_bytes'] / 1e6:>10.2f}"
+            f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -421,11 +421,28 @@ def diff_databases(
 
     # ---- Gap Analysis Comparison ----
     def load_gap_analysis(db: Any) -> Dict[str, str]:
-        rows = _fetch_all(db, "SELECT cache_key, ga_object FROM gap_analysis_results")
+        from types import SimpleNamespace
+
+        from application.utils import ga_payload
+
+        # Compressed rows keep ga_object NULL; older schemas lack the payload columns.
+        cols = _table_column_names(db, "gap_analysis_results")
+        payload_cols = (
+            "ga_payload, payload_encoding"
+            if "ga_payload" in cols
+            else "NULL AS ga_payload, NULL AS payload_encoding"
+        )
+        rows = _fetch_all(
+            db,
+            f"SELECT cache_key, ga_object, {payload_cols} FROM gap_analysis_results",
+        )
         # Normalize cache keys: "DSOMM >> CWE" might be "DevSecOps Maturity Model (DSOMM) >> CWE" upstream
         # The true standard name is the first part before >> and the second part after >>.
         # However, mapping arbitrary names back and forth is hard. We will compare what matches.
-        return {str(r["cache_key"]).strip(): r["ga_object"] for r in rows}
+        return {
+            str(r["cache_key"]).strip(): ga_payload.row_text(SimpleNamespace(**r))
+            for r in rows
+        }
 
     log_msg("Loading Gap Analysis Results...")
     i_ga = load_gap_analysis(imported)
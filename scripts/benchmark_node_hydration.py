@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Benchmark node link hydration: per-node queries vs ``_hydrate_nodes_batch``.
+
+Loads every section of one standard the way ``Node_collection.get_nodes`` did
+before batching (one links query per node, one CRE query per link) and the way
+it does now, reporting SQL statements and wall time for each. Runs against a
+copy of an existing SQLite cache, or against a synthetic standard when no cache
+is given.
+
+Usage:
+    python scripts/benchmark_node_hydration.py [--cache_file standards_cache.sqlite] \\
+        [--standard ASVS] [--sections 1500] [--runs 5]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event
+
+from application import sqla  # type: ignore
+from application.cmd import cre_main
+from application.database import db
+from application.defs import cre_defs as defs
+
+
+def _per_node(collection: db.Node_collection, name: str) -> List[defs.Node]:
+    nodes = []
+    for dbnode in collection.session.query(db.Node).filter(db.Node.name == name):
+        node = db.nodeFromDB(dbnode=dbnode)
+        for dbcre_link in db.Links.query.filter(db.Links.node == dbnode.id).all():
+            dbcre = db.CRE.query.filter(db.CRE.id == dbcre_link.cre).first()
+            node.add_link(
+                defs.Link(
+                    ltype=defs.LinkTypes.from_str(dbcre_link.type),
+                    document=db.CREfromDB(dbcre),
+                )
+            )
+        nodes.append(node)
+    return nodes
+
+
+def _batched(collection: db.Node_collection, name: str) -> List[defs.Node]:
+    return collection.get_nodes(name=name)
+
+
+def _seed(collection: db.Node_collection, name: str, sections: int) -> None:
+    cres = [
+        collection.add_cre(defs.CRE(id=f"{i // 1000:03d}-{i % 1000:03d}", name=f"C{i}"))
+        for i in range(max(1, sections // 2))
+    ]
+    for i in range(sections):
+        dbnode = collection.add_node(
+            defs.Standard(name=name, section=f"section {i}", sectionID=f"V{i}")
+        )
+        for cre in (cres[i % len(cres)], cres[(i * 7 + 1) % len(cres)]):
+            collection.add_link(cre=cre, node=dbnode, ltype=defs.LinkTypes.LinkedTo)
+
+
+def _measure(
+    collection: db.Node_collection,
+    loader: Callable[[db.Node_collection, str], List[defs.Node]],
+    name: str,
+    runs: int,
+) -> Dict[str, float]:
+    statements = [0]
+
+    def count(*_: object) -> None:
+        statements[0] += 1
+
+    engine = collection.session.get_bind()
+    timings = []
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for _ in range(runs):
+            statements[0] = 0
+            collection.session.expire_all()
+            start = time.perf_counter()
+            nodes = loader(collection, name)
+            timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {
+        "nodes": len(nodes),
+        "links": sum(len(n.links) for n in nodes),
+        "queries": statements[0],
+        "p50_ms": statistics.median(timings) * 1000,
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache_file", default="")
+    parser.add_argument("--standard", default="BenchmarkStandard")
+    parser.add_argument("--sections", type=int, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        if args.cache_file:
+            shutil.copyfile(args.cache_file, path)
+        collection = cre_main.db_connect(path)
+        sqla.create_all()
+        if not args.cache_file:
+            _seed(collection, args.standard, args.sections)
+        results = {
+            "per-node": _measure(collection, _per_node, args.standard, args.runs),
+            "batched": _measure(collection, _batched, args.standard, args.runs),
+        }
+        sqla.session.remove()
+
+    print(f"{'loader':<10}{'nodes':>7}{'links':>8}{'queries':>9}{'p50 ms':>10}")
+    for loader, r in results.items():
+        print(
+            f"{loader:<10}{r['nodes']:>7}{r['links']:>8}{r['queries']:>9}"
+            f"{r['p50_ms']:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -252,20 +252,28 @@ def _db_resources_and_ga_snapshot() -> tuple[dict[str, Any], dict[str, Any]]:
         # ``"{A} >> {B}->{neo_fragment}"``. Exclude those via `` >> … ->`` so we do
         # not drop legitimate primaries whose *left* standard name contains ``->``.
         rows = (
-            session.query(GapAnalysisResults.cache_key, GapAnalysisResults.ga_object)
+            session.query(
+                GapAnalysisResults.cache_key,
+                GapAnalysisResults.ga_object,
+                GapAnalysisResults.ga_payload,
+                GapAnalysisResults.payload_encoding,
+            )
             .filter(not_(GapAnalysisResults.cache_key.like("% >> %->%")))
             .all()
         )
+        from application.utils import ga_payload
         from application.utils.gap_analysis import (
             primary_gap_analysis_payload_is_material,
         )
 
         keys: list[str] = []
         empty_primary_placeholders = 0
-        for ck, go in rows:
+        for row in rows:
+            ck = row.cache_key
             if not ck:
                 continue
-            payload = str(go or "")
+            # compressed rows keep ga_object NULL; row_text reads either form
+            payload = str(ga_payload.row_text(row) or "")
             if primary_gap_analysis_payload_is_material(payload):
                 keys.append(str(ck))
             else:
@@ -8,11 +8,49 @@ import json
 import sqlite3
 import sys
 import urllib.parse
-from typing import Iterable, List, Optional, Sequence, Tuple
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence
 
 import psycopg2
 from psycopg2 import extras
 
+# Allow `python scripts/sync_gap_analysis_table.py` without PYTHONPATH.
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from application.utils import ga_payload  # noqa: E402
+
+# Rows are copied in both storage forms: plain ``ga_object`` text and the
+# compressed ``ga_payload`` columns (see application/utils/ga_payload.py).
+GA_COLUMNS = (
+    "cache_key",
+    "ga_object",
+    "ga_payload",
+    "payload_encoding",
+    "content_hash",
+    "schema_version",
+)
+
+
+class GaRow(NamedTuple):
+    cache_key: str
+    ga_object: Optional[str]
+    ga_payload: Optional[bytes] = None
+    payload_encoding: Optional[str] = None
+    content_hash: Optional[str] = None
+    schema_version: Optional[int] = None
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]) -> "GaRow":
+        cache_key, ga_object, payload, *rest = values
+        return cls(
+            str(cache_key),
+            None if ga_object is None else str(ga_object),
+            None if payload is None else bytes(payload),
+            *rest,
+        )
+
 
 def _normalize_pg_url(url: str) -> str:
     if url.startswith("postgres://"):
@@ -42,11 +80,17 @@ def _is_primary_cache_key(cache_key: str) -> bool:
     return "->" not in cache_key[idx + len(marker) :]
 
 
-def _payload_is_material(ga_object: Optional[str]) -> bool:
-    if not ga_object or not isinstance(ga_object, str):
+def _payload_is_material(row: Optional[GaRow]) -> bool:
+    if row is None:
+        return False
+    try:
+        text = ga_payload.row_text(row)
+    except (OSError, ValueError):
+        return False
+    if not text or not isinstance(text, str):
         return False
     try:
-        parsed = json.loads(ga_object)
+        parsed = json.loads(text)
     except json.JSONDecodeError:
         return False
     res = parsed.get("result")
@@ -57,84 +101,92 @@ def _payload_is_material(ga_object: Optional[str]) -> bool:
     return bool(res)
 
 
-def _fetch_sqlite_rows(
-    path: str, material_only: bool
-) -> List[Tuple[str, Optional[str]]]:
+def _select_list(columns: Iterable[str]) -> str:
+    """GA_COLUMNS, with NULL for payload columns an older schema lacks."""
+    present = set(columns)
+    return ", ".join(c if c in present else f"NULL AS {c}" for c in GA_COLUMNS)
+
+
+def _fetch_sqlite_rows(path: str, material_only: bool) -> List[GaRow]:
     conn = sqlite3.connect(path)
-    cur = conn.execute("SELECT cache_key, ga_object FROM gap_analysis_results")
-    rows: List[Tuple[str, Optional[str]]] = []
-    for k, v in cur.fetchall():
-        payload = None if v is None else str(v)
-        if material_only and not _payload_is_material(payload):
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(gap_analysis_results)")]
+    cur = conn.execute(f"SELECT {_select_list(columns)} FROM gap_analysis_results")
+    rows: List[GaRow] = []
+    for values in cur.fetchall():
+        row = GaRow.from_values(values)
+        if material_only and not _payload_is_material(row):
             continue
-        rows.append((str(k), payload))
+        rows.append(row)
     conn.close()
     return rows
 
 
-def _fetch_postgres_rows(
-    pg_url: str, material_only: bool
-) -> List[Tuple[str, Optional[str]]]:
+def _fetch_postgres_rows(pg_url: str, material_only: bool) -> List[GaRow]:
     conn = psycopg2.connect(_normalize_pg_url(pg_url))
     try:
         cur = conn.cursor()
-        cur.execute("SELECT cache_key, ga_object FROM public.gap_analysis_results")
-        rows: List[Tuple[str, Optional[str]]] = []
-        for cache_key, ga_object in cur.fetchall():
-            payload = None if ga_object is None else str(ga_object)
-            if material_only and not _payload_is_material(payload):
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = 'gap_analysis_results'"
+        )
+        columns = [r[0] for r in cur.fetchall()]
+        cur.execute(f"SELECT {_select_list(columns)} FROM public.gap_analysis_results")
+        rows: List[GaRow] = []
+        for values in cur.fetchall():
+            row = GaRow.from_values(values)
+            if material_only and not _payload_is_material(row):
                 continue
-            rows.append((str(cache_key), payload))
+            rows.append(row)
         cur.close()
         return rows
     finally:
         conn.close()
 
 
-def _existing_primary_payloads(
+def _existing_primary_rows(
     cur: psycopg2.extensions.cursor, cache_keys: Sequence[str]
-) -> dict[str, Optional[str]]:
+) -> dict[str, GaRow]:
     primary_keys = [k for k in cache_keys if _is_primary_cache_key(k)]
     if not primary_keys:
         return {}
     cur.execute(
-        "SELECT cache_key, ga_object FROM public.gap_analysis_results "
+        f"SELECT {', '.join(GA_COLUMNS)} FROM public.gap_analysis_results "
         "WHERE cache_key = ANY(%s)",
         (list(primary_keys),),
     )
-    return {str(k): v for k, v in cur.fetchall()}
+    return {row.cache_key: row for row in map(GaRow.from_values, cur.fetchall())}
 
 
-def _may_overwrite_primary(
-    cache_key: str,
-    new_payload: Optional[str],
-    existing_payload: Optional[str],
-) -> bool:
-    if not _is_primary_cache_key(cache_key):
+def _may_overwrite_primary(new_row: GaRow, existing_row: Optional[GaRow]) -> bool:
+    if not _is_primary_cache_key(new_row.cache_key):
         return True
-    if _payload_is_material(new_payload):
+    if _payload_is_material(new_row):
         return True
-    if existing_payload is None:
+    if existing_row is None:
         return False
-    return not _payload_is_material(existing_payload)
+    return not _payload_is_material(existing_row)
 
 
-def _merge_postgres_rows(
-    pg_url: str, rows: Sequence[Tuple[str, Optional[str]]]
-) -> None:
+def _merge_postgres_rows(pg_url: str, rows: Sequence[GaRow]) -> None:
     """Update existing rows and insert missing keys (works without a unique index)."""
     conn = psycopg2.connect(_normalize_pg_url(pg_url))
     conn.autocommit = False
     batch_size = 500
+    columns = ", ".join(GA_COLUMNS)
     try:
         cur = conn.cursor()
+        # The per-control map analysis index (gap_analysis_control) of every
+        # copied row is dropped; until ``--ga_storage_backfill`` indexes them
+        # again, the app pages those pairs by parsing the whole row.
+        cur.execute("SELECT to_regclass('public.gap_analysis_control')")
+        has_control_index = cur.fetchone()[0] is not None
         for i in range(0, len(rows), batch_size):
             batch = list(rows[i : i + batch_size])
-            existing_by_key = _existing_primary_payloads(cur, [k for k, _ in batch])
+            existing_by_key = _existing_primary_rows(cur, [r.cache_key for r in batch])
             batch = [
-                (k, v)
-                for k, v in batch
-                if _may_overwrite_primary(k, v, existing_by_key.get(k))
+                r
+                for r in batch
+                if _may_overwrite_primary(r, existing_by_key.get(r.cache_key))
             ]
             if not batch:
                 continue
@@ -142,34 +194,63 @@ def _merge_postgres_rows(
                 """
                 CREATE TEMP TABLE ga_sync_stage (
                     cache_key text PRIMARY KEY,
-                    ga_object text
+                    ga_object text,
+                    ga_payload bytea,
+                    payload_encoding text,
+                    content_hash text,
+                    schema_version integer
                 ) ON COMMIT DROP
                 """
             )
             extras.execute_batch(
                 cur,
-                "INSERT INTO ga_sync_stage (cache_key, ga_object) VALUES (%s, %s)",
-                batch,
+                f"INSERT INTO ga_sync_stage ({columns}) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (
+                        r.cache_key,
+                        r.ga_object,
+                        None if r.ga_payload is None else psycopg2.Binary(r.ga_payload),
+                        r.payload_encoding,
+                        r.content_hash,
+                        r.schema_version,
+                    )
+                    for r in batch
+                ],
                 page_size=200,
             )
+            # Both storage forms are overwritten, so a row that changed form
+            # never keeps a stale payload that row_text would prefer.
             cur.execute(
                 """
                 UPDATE public.gap_analysis_results AS g
-                SET ga_object = s.ga_object
+                SET ga_object = s.ga_object,
+                    ga_payload = s.ga_payload,
+                    payload_encoding = s.payload_encoding,
+                    content_hash = s.content_hash,
+                    schema_version = s.schema_version
                 FROM ga_sync_stage AS s
                 WHERE g.cache_key = s.cache_key
                 """
             )
             cur.execute(
-                """
-                INSERT INTO public.gap_analysis_results (cache_key, ga_object)
-                SELECT s.cache_key, s.ga_object
+                f"""
+                INSERT INTO public.gap_analysis_results ({columns})
+                SELECT {", ".join(f"s.{c}" for c in GA_COLUMNS)}
                 FROM ga_sync_stage AS s
                 LEFT JOIN public.gap_analysis_results AS g
                   ON g.cache_key = s.cache_key
                 WHERE g.cache_key IS NULL
                 """
             )
+            if has_control_index:
+                cur.execute(
+                    """
+                    DELETE FROM public.gap_analysis_control AS c
+                    USING ga_sync_stage AS s
+                    WHERE c.cache_key = s.cache_key
+                    """
+                )
             conn.commit()
             print(
                 f"merged batch {i // batch_size + 1}: {len(batch)} row(s)",
@@ -184,7 +265,7 @@ def _fetch_rows(
     from_sqlite: Optional[str],
     from_postgres: Optional[str],
     material_only: bool,
-) -> List[Tuple[str, Optional[str]]]:
+) -> List[GaRow]:
     if from_sqlite:
         return _fetch_sqlite_rows(from_sqlite, material_only)
     if from_postgres:
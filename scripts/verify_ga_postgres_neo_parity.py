@@ -77,6 +77,7 @@ def main() -> int:
 
     from application.cmd import cre_main
     from application.database.db import NEO_DB, GapAnalysisResults
+    from application.utils import ga_payload
     from application.utils.gap_analysis import (
         make_resources_key,
         primary_gap_analysis_payload_is_material,
@@ -113,7 +114,7 @@ def main() -> int:
             .filter(GapAnalysisResults.cache_key == key)
             .first()
         )
-        payload = str(row.ga_object) if row else ""
+        payload = (ga_payload.row_text(row) or "") if row else ""
         pg_mat = primary_gap_analysis_payload_is_material(payload)
 
         parsed_base, parsed_paths = neo.gap_analysis(sa, sb)